@@ -0,0 +1,88 @@
+"""
+Benchmark for the per-request overhead of finding the generator for a request.
+
+Compares building and matching a Starlette Route for each generator on every request
+(the previous approach) with the precompiled generator router, for requests to each
+of the default generator routes and for an unmatched route.
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python benchmarks/bench_dispatch.py --iterations 100000
+"""
+
+import argparse
+import time
+
+from aoai_api_simulator.generator.manager import get_default_generators
+from aoai_api_simulator.models import Config, RequestContext
+from aoai_api_simulator.routing import get_generator_router
+from fastapi import Request
+from starlette.routing import Match, Route
+
+PATHS = [
+    "/openai/deployments/embedding/embeddings",
+    "/openai/deployments/gpt-35-turbo-10k-token/completions",
+    "/openai/deployments/gpt-35-turbo-10k-token/chat/completions",
+    "/openai/deployments/whisper/audio/translations",
+    "/openai/deployments/gpt-35-turbo-10k-token/unknown",
+]
+
+
+def _endpoint():
+    pass
+
+
+def _create_context(config: Config, path: str) -> RequestContext:
+    request = Request({"type": "http", "method": "POST", "path": path, "query_string": b"", "headers": []})
+    return RequestContext(config=config, request=request)
+
+
+def route_per_request(context: RequestContext, generators: list) -> int:
+    # previous behaviour: each generator built and matched a Route for every request
+    request = context.request
+    for index, generator in enumerate(generators):
+        route = Route(path=generator.route.path, methods=["POST"], endpoint=_endpoint)
+        match, _ = route.matches({"type": "http", "method": request.method, "path": request.url.path})
+        if match == Match.FULL:
+            return index
+    return -1
+
+
+def precompiled_router(context: RequestContext, generators: list) -> int:
+    router = get_generator_router(tuple(generators))
+    for generator in router.get_generators(context):
+        if context.get_route_params(generator.route) is not None:
+            return generators.index(generator)
+    return -1
+
+
+def measure(dispatch, config: Config, generators: list, path: str, iterations: int) -> float:
+    contexts = [_create_context(config, path) for _ in range(iterations)]
+    start = time.perf_counter()
+    for context in contexts:
+        dispatch(context, generators)
+    return (time.perf_counter() - start) / iterations
+
+
+def run(iterations: int):
+    config = Config(generators=get_default_generators())
+    generators = config.generators
+
+    print(f"{'path':<62} {'route per request':>18} {'precompiled':>12} {'speedup':>8}")
+    for path in PATHS:
+        context = _create_context(config, path)
+        assert route_per_request(context, generators) == precompiled_router(context, generators)
+
+        before = measure(route_per_request, config, generators, path, iterations)
+        after = measure(precompiled_router, config, generators, path, iterations)
+        print(f"{path:<62} {before * 1e6:>16.2f}us {after * 1e6:>10.2f}us {before / after:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100000, help="number of requests to dispatch per path")
+    args = parser.parse_args()
+    run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark for parsing concurrent audio uploads to the translation endpoint.
+
+Compares the previous behaviour (request.form(), which spools each file to a SpooledTemporaryFile,
+followed by reading the file back to measure its size) with parse_multipart_form (which streams
+the request and only counts the file bytes), for concurrent uploads on a single event loop.
+Reports the wall time and the peak Python memory allocated while parsing (via tracemalloc).
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python benchmarks/bench_multipart_upload.py --uploads 20 --size-mb 25
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from aoai_api_simulator.generator.form_parser import parse_multipart_form
+from fastapi import Request
+
+_BOUNDARY = b"----simulator-benchmark-boundary"
+# uvicorn passes the body to the app in chunks of up to 64 KB
+_CHUNK_SIZE = 64 * 1024
+
+
+def _create_body(size_bytes: int) -> bytes:
+    return b"".join(
+        [
+            b"--" + _BOUNDARY + b"\r\n",
+            b'Content-Disposition: form-data; name="response_format"\r\n\r\njson\r\n',
+            b"--" + _BOUNDARY + b"\r\n",
+            b'Content-Disposition: form-data; name="file"; filename="audio.wav"\r\n',
+            b"Content-Type: audio/wav\r\n\r\n",
+            b"\x01" * size_bytes,
+            b"\r\n--" + _BOUNDARY + b"--",
+        ]
+    )
+
+
+def _create_request(body: bytes) -> Request:
+    offset = 0
+
+    async def receive():
+        nonlocal offset
+        # yield to the event loop between chunks so that the uploads interleave
+        await asyncio.sleep(0)
+        chunk = body[offset : offset + _CHUNK_SIZE]
+        offset += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": offset < len(body)}
+
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/openai/deployments/whisper/audio/translations",
+            "query_string": b"",
+            "headers": [(b"content-type", b"multipart/form-data; boundary=" + _BOUNDARY)],
+        },
+        receive=receive,
+    )
+
+
+async def previous_parse(request: Request) -> int:
+    form = await request.form()
+    size = len(form["file"].file.read())
+    await form.close()
+    return size
+
+
+async def streaming_parse(request: Request) -> int:
+    form = await parse_multipart_form(request)
+    return form.files["file"].size
+
+
+async def measure(parse, body: bytes, uploads: int) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    sizes = await asyncio.gather(*[parse(_create_request(body)) for _ in range(uploads)])
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert all(size == sizes[0] for size in sizes)
+    return elapsed, peak
+
+
+async def run(uploads: int, size_mb: float):
+    body = _create_body(int(size_mb * 1024 * 1024))
+    print(f"{uploads} concurrent uploads of {size_mb} MB")
+    print(f"{'parser':>10} {'wall time':>10} {'peak memory':>12} {'per upload':>11}")
+    for name, parse in [("previous", previous_parse), ("streaming", streaming_parse)]:
+        elapsed, peak = await measure(parse, body, uploads)
+        print(f"{name:>10} {elapsed:>9.2f}s {peak / 1024 / 1024:>10.1f}MB {peak / uploads / 1024 / 1024:>9.2f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=20, help="number of concurrent uploads")
+    parser.add_argument("--size-mb", type=float, default=25, help="size of each uploaded file in MB")
+    args = parser.parse_args()
+    asyncio.run(run(args.uploads, args.size_mb))
+
+
+if __name__ == "__main__":
+    main()
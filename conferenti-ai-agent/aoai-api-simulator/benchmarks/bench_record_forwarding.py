@@ -0,0 +1,98 @@
+"""
+Benchmark for forwarding requests in record mode.
+
+Runs the simulator in record mode against a local stand-in for Azure OpenAI (served in-process
+via httpx.ASGITransport, so no network access or credentials are needed) and sends a batch of
+concurrent chat completion requests. With non-blocking forwarding the wall time for the batch
+should be close to a single upstream round trip rather than growing with the batch size.
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python benchmarks/bench_record_forwarding.py --requests 200 --upstream-latency-ms 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI, Request, Response
+
+UPSTREAM_ENDPOINT = "http://upstream.local"
+SIMULATOR_API_KEY = "bench-key"
+
+
+def create_upstream_app(latency_ms: float) -> FastAPI:
+    upstream = FastAPI()
+
+    @upstream.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency_ms / 1000)
+        content = {
+            "id": "chatcmpl-standin",
+            "object": "chat.completion",
+            "model": deployment,
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "echo: " + body["messages"][-1]["content"]},
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }
+        return Response(content=json.dumps(content), media_type="application/json")
+
+    return upstream
+
+
+async def run(request_count: int, upstream_latency_ms: float):
+    os.environ["SIMULATOR_MODE"] = "record"
+    os.environ["SIMULATOR_API_KEY"] = SIMULATOR_API_KEY
+    os.environ["RECORDING_DIR"] = tempfile.mkdtemp(prefix="aoai-sim-recording-")
+    os.environ["RECORDING_AUTOSAVE"] = "false"
+    os.environ["AZURE_OPENAI_ENDPOINT"] = UPSTREAM_ENDPOINT
+    os.environ["AZURE_OPENAI_KEY"] = "stand-in-key"
+
+    # pylint: disable=import-outside-toplevel
+    from aoai_api_simulator.main import app
+    from aoai_api_simulator.record_replay.openai import close_forwarder_client, set_forwarder_transport
+
+    set_forwarder_transport(httpx.ASGITransport(app=create_upstream_app(upstream_latency_ms)))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://simulator") as client:
+
+        async def send(i: int) -> int:
+            response = await client.post(
+                "/openai/deployments/gpt-35-turbo-100m-token/chat/completions",
+                headers={"api-key": SIMULATOR_API_KEY},
+                json={"messages": [{"role": "user", "content": f"request {i}"}]},
+            )
+            return response.status_code
+
+        start = time.perf_counter()
+        status_codes = await asyncio.gather(*[send(i) for i in range(request_count)])
+        elapsed = time.perf_counter() - start
+
+    await close_forwarder_client()
+
+    serial_estimate = request_count * upstream_latency_ms / 1000
+    print(f"requests:                {request_count} ({status_codes.count(200)} succeeded)")
+    print(f"upstream latency:        {upstream_latency_ms:.0f}ms")
+    print(f"wall time:               {elapsed:.2f}s (fully serialised forwarding would take {serial_estimate:.2f}s)")
+    print(f"throughput:              {request_count / elapsed:,.1f} requests/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="number of concurrent requests")
+    parser.add_argument("--upstream-latency-ms", type=float, default=200, help="latency of the stand-in upstream")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.upstream_latency_ms))
+
+
+if __name__ == "__main__":
+    main()
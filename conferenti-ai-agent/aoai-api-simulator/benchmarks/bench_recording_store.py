@@ -0,0 +1,128 @@
+"""
+Benchmark for the recording persisters used in record/replay mode.
+
+Generates a recording with many interactions, stores it in both the YAML and SQLite formats and
+reports the time to save, load and replay a sample of lookups along with the memory held by the
+loaded recording (measured in a separate process per format so that the figures don't include each other).
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python benchmarks/bench_recording_store.py --interactions 100000 --lookups 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from aoai_api_simulator.record_replay.models import RecordedResponse, hash_body, hash_request_parts
+from aoai_api_simulator.record_replay.persistence import create_recording_persister
+
+URL = "/openai/deployments/gpt-35-turbo-100m-token/chat/completions"
+
+
+def generate_recording(interactions: int) -> dict[str, RecordedResponse]:
+    recording = {}
+    headers = {"content-type": ["application/json"]}
+    for i in range(interactions):
+        request_body = json.dumps({"messages": [{"role": "user", "content": f"request {i}"}]})
+        request_hash = hash_request_parts("POST", URL, headers, body_hash=hash_body(headers, request_body))
+        response_body = json.dumps(
+            {
+                "id": f"chatcmpl-{i}",
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "lorem ipsum " * 20}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 40, "total_tokens": 50},
+            }
+        )
+        recording[request_hash] = RecordedResponse(
+            request_hash=request_hash,
+            status_code=200,
+            headers={"content-type": ["application/json"]},
+            body=response_body,
+            duration_ms=200,
+            context_values={},
+            full_request={"method": "POST", "uri": "http://localhost" + URL, "headers": headers, "body": request_body},
+        )
+    return recording
+
+
+def _get_rss_mb() -> float:
+    # current (rather than peak) RSS: peak RSS can be inherited from the parent process on Linux
+    with open("/proc/self/status", "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0
+
+
+def measure(recording_format: str, recording_dir: str, hashes_path: str):
+    with open(hashes_path, "r", encoding="utf-8") as f:
+        request_hashes = json.load(f)
+
+    rss_before = _get_rss_mb()
+    persister = create_recording_persister(recording_format, recording_dir)
+    start = time.perf_counter()
+    recording = persister.load_recording_for_url(URL, expect_recording_file=True)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for request_hash in request_hashes:
+        assert recording.get(request_hash) is not None
+    lookup_time = time.perf_counter() - start
+
+    rss_mb = _get_rss_mb() - rss_before
+    print(json.dumps({"load_time": load_time, "lookup_time": lookup_time, "rss_mb": rss_mb}))
+
+
+def run(interactions: int, lookups: int):
+    recording = generate_recording(interactions)
+    print(f"interactions:            {interactions}")
+
+    # sample the lookups up front so that enumerating the recording isn't included in the measurements
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(random.Random(0).sample(list(recording.keys()), lookups), f)
+        hashes_path = f.name
+
+    for recording_format in ["yaml", "sqlite"]:
+        recording_dir = tempfile.mkdtemp(prefix=f"aoai-sim-{recording_format}-")
+        persister = create_recording_persister(recording_format, recording_dir)
+        start = time.perf_counter()
+        persister.save_recording(URL, recording)
+        save_time = time.perf_counter() - start
+        if hasattr(persister, "close"):
+            persister.close()
+        size_mb = sum(os.path.getsize(os.path.join(recording_dir, f)) for f in os.listdir(recording_dir)) / 1024**2
+
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", recording_format, recording_dir, hashes_path],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+
+        print(f"{recording_format}:")
+        print(f"  save time:             {save_time:.2f}s ({size_mb:.1f}MB on disk)")
+        print(f"  load time:             {result['load_time'] * 1000:.1f}ms")
+        print(f"  {lookups} lookups:          {result['lookup_time'] * 1000:.1f}ms")
+        print(f"  RSS growth:            {result['rss_mb']:.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interactions", type=int, default=100000, help="number of interactions in the recording")
+    parser.add_argument("--lookups", type=int, default=1000, help="number of recorded responses to look up")
+    parser.add_argument("--measure", nargs=3, metavar=("FORMAT", "DIR", "HASHES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+    else:
+        run(args.interactions, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark for the per-request cost of reading the request body across the pipeline stages.
+
+Compares the previous behaviour (the generator and limiter each calling request.json(), which
+Starlette parses with the json module, and record mode hashing the body for the lookup and again
+for the recorded response) with the RequestContext body cache (one orjson parse and one body hash
+per request), for chat requests with prompts of different sizes.
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python benchmarks/bench_request_body.py --iterations 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from aoai_api_simulator.models import Config, RequestContext
+from aoai_api_simulator.record_replay.models import get_request_hash, hash_body, hash_request_parts
+from fastapi import Request
+
+PROMPT_SIZES = [1, 10, 100]
+_PATH = "/openai/deployments/gpt-35-turbo-10k-token/chat/completions"
+
+
+def _create_body(messages: int) -> bytes:
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": "Which sessions cover observability? " * 10}
+        for i in range(messages)
+    ]
+    return json.dumps({"messages": history, "max_tokens": 100}).encode("utf-8")
+
+
+def _create_context(config: Config, body: bytes) -> RequestContext:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    request = Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": _PATH,
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/json")],
+        },
+        receive=receive,
+    )
+    return RequestContext(config=config, request=request)
+
+
+async def previous_pipeline(context: RequestContext):
+    request = context.request
+    # generator, limiter (and the limiter's embeddings branch) each read the body
+    for _ in range(2):
+        await request.json()
+    # record mode: the lookup hash and the recorded response hash each hashed the body
+    for _ in range(2):
+        body = await request.body()
+        hash_request_parts(
+            request.method, request.url.path, request.headers, body_hash=hash_body(request.headers, body)
+        )
+
+
+async def cached_pipeline(context: RequestContext):
+    for _ in range(2):
+        await context.get_json_body()
+    for _ in range(2):
+        await get_request_hash(context)
+
+
+async def measure(pipeline, config: Config, body: bytes, iterations: int) -> float:
+    contexts = [_create_context(config, body) for _ in range(iterations)]
+    start = time.perf_counter()
+    for context in contexts:
+        await pipeline(context)
+    return (time.perf_counter() - start) / iterations
+
+
+async def run(iterations: int):
+    config = Config(generators=[])
+    print(f"{'messages':>8} {'body size':>10} {'previous':>10} {'cached':>10} {'speedup':>8}")
+    for messages in PROMPT_SIZES:
+        body = _create_body(messages)
+        before = await measure(previous_pipeline, config, body, iterations)
+        after = await measure(cached_pipeline, config, body, iterations)
+        print(f"{messages:>8} {len(body):>9}B {before * 1e6:>8.2f}us {after * 1e6:>8.2f}us {before / after:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000, help="number of requests per body size")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for the per-request cost of recording in-process statistics.
+
+Compares recording a request in SimulatorStats (the /stats and /metrics endpoints) with recording
+the existing OpenTelemetry histograms for a request (base/full latency and prompt/completion tokens)
+with the OpenTelemetry SDK configured (as when exporting to Azure Monitor), and reports the cost of rendering /metrics and the accuracy of the histogram percentiles.
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python benchmarks/bench_stats.py --requests 200000
+"""
+
+import argparse
+import random
+import time
+
+from aoai_api_simulator.metrics import simulator_metrics
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from aoai_api_simulator.stats import LatencyHistogram, SimulatorStats, get_prometheus_metrics, simulator_stats
+
+DEPLOYMENTS = ["gpt-35-turbo-10k-token", "gpt-35-turbo-100m-token", "embedding"]
+
+
+def _create_requests(count: int) -> list[tuple[str, int, float, float]]:
+    return [
+        (random.choice(DEPLOYMENTS), 200 if random.random() < 0.95 else 429, 0.002, random.lognormvariate(-1, 0.8))
+        for _ in range(count)
+    ]
+
+
+def record_stats(stats: SimulatorStats, requests: list[tuple[str, int, float, float]]):
+    for deployment_name, status_code, base_duration_s, full_duration_s in requests:
+        stats.record_request(deployment_name, status_code, base_duration_s, full_duration_s, 100, 50)
+
+
+def record_otel(requests: list[tuple[str, int, float, float]]):
+    for deployment_name, status_code, base_duration_s, full_duration_s in requests:
+        attributes = {"status_code": status_code, "deployment": deployment_name}
+        simulator_metrics.histogram_latency_base.record(base_duration_s, attributes=attributes)
+        simulator_metrics.histogram_latency_full.record(full_duration_s, attributes=attributes)
+        simulator_metrics.histogram_tokens_used.record(100, {"deployment": deployment_name, "token_type": "prompt"})
+        simulator_metrics.histogram_tokens_used.record(50, {"deployment": deployment_name, "token_type": "completion"})
+
+
+def measure(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000, help="number of requests to record")
+    args = parser.parse_args()
+
+    # the simulator's meter delegates to the SDK meter provider once it is set
+    metrics.set_meter_provider(MeterProvider(metric_readers=[InMemoryMetricReader()]))
+
+    requests = _create_requests(args.requests)
+    stats_s = measure(record_stats, simulator_stats, requests)
+    otel_s = measure(record_otel, requests)
+    metrics_s = measure(get_prometheus_metrics, {})
+
+    print(f"{'recording':<28} {'per request':>12}")
+    print(f"{'SimulatorStats':<28} {stats_s / args.requests * 1e6:>10.2f}us")
+    print(f"{'OpenTelemetry histograms':<28} {otel_s / args.requests * 1e6:>10.2f}us")
+    print(f"rendering /metrics: {metrics_s * 1000:.2f}ms")
+
+    durations = sorted(r[3] * 1000 for r in requests)
+    histogram = LatencyHistogram()
+    for request in requests:
+        histogram.record(request[3])
+    print(f"{'percentile':>10} {'exact':>10} {'histogram':>10}")
+    for percentile in [50, 90, 99, 99.9]:
+        exact = durations[max(0, round(percentile / 100 * len(durations)) - 1)]
+        print(f"{percentile:>10} {exact:>8.2f}ms {histogram.get_percentile(percentile):>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
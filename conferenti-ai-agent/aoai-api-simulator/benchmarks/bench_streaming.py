@@ -0,0 +1,82 @@
+"""
+Benchmark for the streaming engine used by streamed chat completions.
+
+Drives many concurrent streams on a single event loop (i.e. a single core) and reports
+chunk throughput and how closely the streams kept to the configured pacing.
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python benchmarks/bench_streaming.py --streams 2000 --words 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from aoai_api_simulator.generator.streaming import stream_chat_completion
+from aoai_api_simulator.models import StreamingLatency
+
+
+async def _consume(latency: StreamingLatency, content: str, tokens: int) -> tuple[int, float, float]:
+    start = time.perf_counter()
+    first_chunk_time = None
+    chunks = 0
+    async for _ in stream_chat_completion(
+        generated_content=content,
+        model_name="gpt-3.5-turbo",
+        completion_tokens=tokens,
+        finish_reason="stop",
+        latency=latency,
+    ):
+        if first_chunk_time is None:
+            first_chunk_time = time.perf_counter() - start
+        chunks += 1
+    return chunks, first_chunk_time, time.perf_counter() - start
+
+
+async def run(streams: int, words: int, ttft_ms: float, inter_token_ms: float):
+    latency = StreamingLatency().model_copy(
+        update={
+            "time_to_first_token_mean": ttft_ms,
+            "time_to_first_token_std_dev": 0,
+            "inter_token_mean": inter_token_ms,
+            "inter_token_std_dev": 0,
+        }
+    )
+    content = " ".join(["lorem"] * words)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[_consume(latency, content, words) for _ in range(streams)])
+    elapsed = time.perf_counter() - start
+
+    total_chunks = sum(r[0] for r in results)
+    ttfts = sorted(r[1] for r in results)
+    durations = sorted(r[2] for r in results)
+    expected_duration = (ttft_ms + inter_token_ms * (words - 1)) / 1000
+
+    print(f"streams:                 {streams}")
+    print(f"chunks sent:             {total_chunks}")
+    print(f"wall time:               {elapsed:.2f}s")
+    print(f"chunk throughput:        {total_chunks / elapsed:,.0f} chunks/s")
+    print(
+        f"ttft p50/p99:            {ttfts[len(ttfts) // 2] * 1000:.1f}ms"
+        + f" / {ttfts[int(len(ttfts) * 0.99)] * 1000:.1f}ms"
+    )
+    print(f"expected stream time:    {expected_duration * 1000:.1f}ms")
+    print(
+        f"stream time p50/p99:     {durations[len(durations) // 2] * 1000:.1f}ms"
+        + f" / {durations[int(len(durations) * 0.99)] * 1000:.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=2000, help="number of concurrent streams")
+    parser.add_argument("--words", type=int, default=200, help="number of words per stream")
+    parser.add_argument("--ttft-ms", type=float, default=300, help="time to first token in milliseconds")
+    parser.add_argument("--inter-token-ms", type=float, default=20, help="inter-token latency in milliseconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.streams, args.words, args.ttft_ms, args.inter_token_ms))
+
+
+if __name__ == "__main__":
+    main()
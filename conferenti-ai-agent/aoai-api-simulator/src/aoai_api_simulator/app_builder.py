@@ -1,3 +1,4 @@
+import dataclasses
 import logging
 import re
 import traceback
@@ -5,13 +6,18 @@ from typing import Annotated
 
 from aoai_api_simulator.auth import validate_api_key_header
 from aoai_api_simulator.config_loader import get_config, set_config
+from aoai_api_simulator.faults import SimulatedDisconnectMiddleware, inject_faults
 from aoai_api_simulator.generator.manager import invoke_generators
 from aoai_api_simulator.latency import LatencyGenerator
-from aoai_api_simulator.limiters import apply_limits
-from aoai_api_simulator.models import RequestContext
+from aoai_api_simulator.limiters import apply_limits, get_limiter_utilization
+from aoai_api_simulator.models import ProvisionedThroughput, RequestContext
 from aoai_api_simulator.record_replay.handler import RecordReplayHandler
-from aoai_api_simulator.record_replay.persistence import YamlRecordingPersister
+from aoai_api_simulator.record_replay.openai import close_forwarder_client
+from aoai_api_simulator.record_replay.persistence import create_recording_persister
+from aoai_api_simulator.responses import close_response
+from aoai_api_simulator.stats import get_prometheus_metrics, get_stats
 from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +52,11 @@ def apply_config():
             "📼 Recording auto-save                     : %s",
             get_config().recording.autosave,
         )
-        persister = YamlRecordingPersister(get_config().recording.dir)
+        logger.info(
+            "📼 Recording format                        : %s",
+            get_config().recording.format,
+        )
+        persister = create_recording_persister(get_config().recording.format, get_config().recording.dir)
 
         record_replay_handler = RecordReplayHandler(
             simulator_mode=get_config().simulator_mode,
@@ -65,6 +75,7 @@ def apply_config():
         get_config().openai_deployments,
     )
     logger.info("📝 Using latencies                         : %s", get_config().latency)
+    logger.info("🤖 Using agents config                     : %s", get_config().agents)
 
 
 def _default_validate_api_key_header(request: Request):
@@ -86,6 +97,15 @@ async def fix_double_slash_urls(request: Request, call_next):
     return response
 
 
+# Registered after the double slash middleware so that it is the outermost middleware
+app.add_middleware(SimulatedDisconnectMiddleware)
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await close_forwarder_client()
+
+
 @app.get("/")
 async def root():
     return {"message": "👋 aoai-api-simulator is running"}
@@ -105,35 +125,78 @@ def save_recordings(_: Annotated[bool, Depends(_default_validate_api_key_header)
     )
 
 
+# /stats and /metrics aren't authenticated so that they can be scraped (e.g. by Prometheus) during load tests
+@app.get("/stats")
+async def stats_get():
+    return get_stats(get_limiter_utilization(get_config().limiters))
+
+
+@app.get("/metrics")
+async def metrics_get():
+    return PlainTextResponse(
+        get_prometheus_metrics(get_limiter_utilization(get_config().limiters)),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@app.get("/++/utilization")
+def utilization_get(_: Annotated[bool, Depends(_default_validate_api_key_header)]):
+    # snapshot of the current limiter usage per deployment (e.g. for stepping capacity in ramp tests)
+    return get_limiter_utilization(get_config().limiters)
+
+
 @app.get("/++/config")
 def config_get(_: Annotated[bool, Depends(_default_validate_api_key_header)]):
     # return a subset of the config as not all properties make sense (e.g. generator functions)
     config = get_config()
+    streaming_latency = config.latency.open_ai_chat_completions_streaming
     return {
         "simulator_mode": config.simulator_mode,
         "latency": {
             "open_ai_embeddings": {
                 "mean": config.latency.open_ai_embeddings.mean,
                 "std_dev": config.latency.open_ai_embeddings.std_dev,
+                "distribution": config.latency.open_ai_embeddings.distribution,
             },
             "open_ai_completions": {
                 "mean": config.latency.open_ai_completions.mean,
                 "std_dev": config.latency.open_ai_completions.std_dev,
+                "distribution": config.latency.open_ai_completions.distribution,
             },
             "open_ai_chat_completions": {
                 "mean": config.latency.open_ai_chat_completions.mean,
                 "std_dev": config.latency.open_ai_chat_completions.std_dev,
+                "distribution": config.latency.open_ai_chat_completions.distribution,
             },
+            "open_ai_chat_completions_streaming": {
+                "time_to_first_token_mean": streaming_latency.time_to_first_token_mean,
+                "time_to_first_token_std_dev": streaming_latency.time_to_first_token_std_dev,
+                "inter_token_mean": streaming_latency.inter_token_mean,
+                "inter_token_std_dev": streaming_latency.inter_token_std_dev,
+            },
+            "time_of_day_curve": config.latency.time_of_day_curve,
+            "time_of_day_utc_offset": config.latency.time_of_day_utc_offset,
             "open_ai_translations": {
                 "mean": config.latency.open_ai_translations.mean,
                 "std_dev": config.latency.open_ai_translations.std_dev,
+                "distribution": config.latency.open_ai_translations.distribution,
             },
         },
+        "agents": {
+            "run_queue_delay_mean": config.agents.run_queue_delay_mean,
+            "run_queue_delay_std_dev": config.agents.run_queue_delay_std_dev,
+            "run_poll_latency_mean": config.agents.run_poll_latency_mean,
+            "run_poll_latency_std_dev": config.agents.run_poll_latency_std_dev,
+            "run_failure_rate": config.agents.run_failure_rate,
+            "max_threads": config.agents.max_threads,
+        },
+        "faults": config.faults.model_dump(),
         "openai_deployments": (
             {
                 name: {
                     "tokens_per_minute": deployment.tokens_per_minute,
                     "model": deployment.model,
+                    "provisioned_throughput": deployment.provisioned_throughput,
                 }
                 for name, deployment in config.openai_deployments.items()
             }
@@ -143,6 +206,31 @@ def config_get(_: Annotated[bool, Depends(_default_validate_api_key_header)]):
     }
 
 
+def _patch_openai_deployments(deployments: dict, deployment_updates: dict) -> dict:
+    # Limits can be changed for existing deployments, e.g.
+    # { "gpt-35-turbo-10k-token": { "tokens_per_minute": 20000 } }
+    # { "gpt-ptu": { "provisioned_throughput": { "units": 50 } } }
+    # The limiters are reconfigured in place so requests already in the windows still count
+    new_deployments = dict(deployments)
+    for name, deployment_update in deployment_updates.items():
+        deployment = deployments.get(name)
+        if not deployment:
+            raise HTTPException(status_code=400, detail=f"Deployment {name} not found")
+        update = {k: v for k, v in deployment_update.items() if k in ["tokens_per_minute", "requests_per_minute"]}
+        if "provisioned_throughput" in deployment_update:
+            provisioned_throughput = deployment_update["provisioned_throughput"]
+            if provisioned_throughput is None:
+                update["provisioned_throughput"] = None
+            elif deployment.provisioned_throughput:
+                update["provisioned_throughput"] = dataclasses.replace(
+                    deployment.provisioned_throughput, **provisioned_throughput
+                )
+            else:
+                update["provisioned_throughput"] = ProvisionedThroughput(**provisioned_throughput)
+        new_deployments[name] = dataclasses.replace(deployment, **update)
+    return new_deployments
+
+
 @app.patch("/++/config")
 def config_patch(
     config: dict, _: Annotated[bool, Depends(_default_validate_api_key_header)]
@@ -158,6 +246,14 @@ def config_patch(
     }
     new_config = original_config.model_copy(update=root_dict)
     if "latency" in config:
+        time_of_day = {
+            k: v for k, v in config["latency"].items() if k in ["time_of_day_curve", "time_of_day_utc_offset"]
+        }
+        if time_of_day:
+            try:
+                new_config.latency = original_config.latency.with_updates(time_of_day)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
         if "open_ai_completions" in config["latency"]:
             new_config.latency.open_ai_completions = (
                 original_config.latency.open_ai_completions.model_copy(
@@ -170,6 +266,12 @@ def config_patch(
                     update=config["latency"]["open_ai_chat_completions"]
                 )
             )
+        if "open_ai_chat_completions_streaming" in config["latency"]:
+            new_config.latency.open_ai_chat_completions_streaming = (
+                original_config.latency.open_ai_chat_completions_streaming.model_copy(
+                    update=config["latency"]["open_ai_chat_completions_streaming"]
+                )
+            )
         if "open_ai_embeddings" in config["latency"]:
             new_config.latency.open_ai_embeddings = (
                 original_config.latency.open_ai_embeddings.model_copy(
@@ -183,6 +285,20 @@ def config_patch(
                 )
             )
 
+    if "agents" in config:
+        new_config.agents = original_config.agents.model_copy(update=config["agents"])
+
+    if "faults" in config:
+        try:
+            new_config.faults = original_config.faults.with_updates(config["faults"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if "openai_deployments" in config:
+        new_config.openai_deployments = _patch_openai_deployments(
+            original_config.openai_deployments or {}, config["openai_deployments"]
+        )
+
     # Update the config and re-initialize
     set_config(new_config)
     apply_config()
@@ -211,6 +327,10 @@ async def catchall(request: Request):
                 logger.error("No response found for request: %s", request.url.path)
                 return Response(status_code=500)
 
+            # Inject faults (if configured) before the limits so that injected errors don't use up capacity
+            if response.status_code < 300:
+                response = await inject_faults(context, response)
+
             # Apply limits here so that that they apply to record/replay as well as generate
             if response.status_code < 300:
                 response = await apply_limits(context, response)
@@ -221,8 +341,12 @@ async def catchall(request: Request):
 
             return response
     except HTTPException as he:
+        if response is not None:
+            await close_response(response)
         raise he
     # pylint: disable-next=broad-exception-caught
     except Exception as e:
         logger.error("Error: %s\n%s", e, traceback.format_exc())
+        if response is not None:
+            await close_response(response)
         return Response(status_code=500)
@@ -18,3 +18,19 @@ def validate_api_key_header(request: Request, header_name: str, allowed_key_valu
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Missing or incorrect API Key",
     )
+
+
+def validate_bearer_token_header(request: Request, allowed_token_value: str):
+    """
+    A helper method for validating a bearer token in the Authorization header of a request
+    (for APIs whose clients authenticate with Entra ID tokens rather than API keys)
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token and secrets.compare_digest(token, allowed_token_value):
+        return True
+
+    logger.warning("🔒 Missing or incorrect bearer token provided")
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Missing or incorrect bearer token",
+    )
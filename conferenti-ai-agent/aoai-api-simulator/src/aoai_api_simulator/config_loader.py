@@ -6,8 +6,15 @@ import sys
 
 from aoai_api_simulator.generator.manager import get_default_generators
 from aoai_api_simulator.generator.model_catalogue import model_catalogue
+from aoai_api_simulator.latency_distributions import DISTRIBUTIONS, lognormal_from_percentiles
 from aoai_api_simulator.limiters import get_default_limiters
-from aoai_api_simulator.models import Config, OpenAIDeployment
+from aoai_api_simulator.models import (
+    Config,
+    LatencyProfile,
+    OpenAIDeployment,
+    ProvisionedThroughput,
+    StreamingLatency,
+)
 from aoai_api_simulator.record_replay.handler import get_default_forwarders
 
 
@@ -27,8 +34,9 @@ def get_config_from_env_vars(logger: logging.Logger) -> Config:
     return config
 
 
-def initialize_config(config: Config):
-    config.limiters = get_default_limiters(config)
+def initialize_config(config: Config, existing_limiters: dict | None = None):
+    # existing limiters are reconfigured rather than replaced to keep their window state
+    config.limiters = get_default_limiters(config, existing_limiters)
 
     # load extension and invoke to update config (customise forwarders, generators, etc.)
     load_extension(config)
@@ -69,10 +77,82 @@ def _load_openai_deployments(logger: logging.Logger) -> dict[str, OpenAIDeployme
             tokens_per_minute=int(deployment.get("tokensPerMinute", 0)),
             embedding_size=int(deployment.get("embeddingSize", 1536)),
             requests_per_minute=int(deployment.get("requestsPerMinute", 0)),
+            streaming_latency=_load_streaming_latency(deployment.get("streamingLatency")),
+            latency_profile=_load_latency_profile(deployment.get("latencyProfile")),
+            provisioned_throughput=_load_provisioned_throughput(deployment.get("provisionedThroughput")),
         )
     return deployments
 
 
+def _load_streaming_latency(streaming_latency_json: dict | None) -> StreamingLatency | None:
+    # Per-deployment streaming latency overrides, e.g.
+    # "streamingLatency": { "timeToFirstTokenMean": 500, "interTokenMean": 25 }
+    # Any values not specified fall back to the global LATENCY_OPENAI_STREAMING_* settings
+    if not streaming_latency_json:
+        return None
+
+    field_names = {
+        "timeToFirstTokenMean": "time_to_first_token_mean",
+        "timeToFirstTokenStdDev": "time_to_first_token_std_dev",
+        "interTokenMean": "inter_token_mean",
+        "interTokenStdDev": "inter_token_std_dev",
+    }
+    update = {field_names[k]: float(v) for k, v in streaming_latency_json.items() if k in field_names}
+    return StreamingLatency().model_copy(update=update)
+
+
+def _load_latency_profile(latency_profile_json: dict | None) -> LatencyProfile | None:
+    # Per-deployment latency distribution, e.g.
+    # "latencyProfile": { "distribution": "gamma", "mean": 19, "stdDev": 8 }
+    # "latencyProfile": { "distribution": "lognormal", "p50": 15, "p99": 60 }
+    # "latencyProfile": { "distribution": "empirical", "quantiles": [5.1, 9.8, ..., 120.4] }
+    # (see record_replay/latency_profile.py for generating empirical profiles from recordings)
+    if not latency_profile_json:
+        return None
+
+    distribution = latency_profile_json.get("distribution", "normal")
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unsupported latency distribution '{distribution}' (expected one of {DISTRIBUTIONS})")
+
+    if "p50" in latency_profile_json:
+        if distribution != "lognormal":
+            raise ValueError("p50/p99 latency profiles are only supported for the lognormal distribution")
+        mean, std_dev = lognormal_from_percentiles(
+            float(latency_profile_json["p50"]), float(latency_profile_json["p99"])
+        )
+    else:
+        mean = float(latency_profile_json.get("mean", 0))
+        std_dev = float(latency_profile_json.get("stdDev", 0))
+
+    quantiles = latency_profile_json.get("quantiles")
+    if distribution == "empirical" and not quantiles:
+        raise ValueError("empirical latency profiles require quantiles")
+    return LatencyProfile(
+        distribution=distribution,
+        mean=mean,
+        std_dev=std_dev,
+        quantiles=[float(q) for q in quantiles] if quantiles else None,
+    )
+
+
+def _load_provisioned_throughput(provisioned_throughput_json: dict | None) -> ProvisionedThroughput | None:
+    # Provisioned throughput (PTU) deployments, e.g.
+    # "provisionedThroughput": { "units": 100, "tokensPerMinutePerUnit": 2500, "completionTokenWeight": 4 }
+    # tokensPerMinutePerUnit and completionTokenWeight depend on the model (see the Azure OpenAI PTU docs)
+    if not provisioned_throughput_json:
+        return None
+
+    units = int(provisioned_throughput_json.get("units", 0))
+    if units <= 0:
+        raise ValueError("provisionedThroughput requires a positive number of units")
+    provisioned_throughput = ProvisionedThroughput(units=units)
+    if "tokensPerMinutePerUnit" in provisioned_throughput_json:
+        provisioned_throughput.tokens_per_minute_per_unit = float(provisioned_throughput_json["tokensPerMinutePerUnit"])
+    if "completionTokenWeight" in provisioned_throughput_json:
+        provisioned_throughput.completion_token_weight = float(provisioned_throughput_json["completionTokenWeight"])
+    return provisioned_throughput
+
+
 def _default_openai_deployments() -> dict[str, OpenAIDeployment]:
     # Default set of OpenAI deployment configurations for when none are provided
     embedding_model = model_catalogue["text-embedding-ada-002"]
@@ -148,5 +228,5 @@ def get_config() -> Config:
 def set_config(new_config: Config):
     # pylint: disable-next=global-statement
     global _config
-    initialize_config(new_config)
+    initialize_config(new_config, _config.limiters if _config else None)
     _config = new_config
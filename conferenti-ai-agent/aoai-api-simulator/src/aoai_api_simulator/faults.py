@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import random
+from typing import AsyncIterator
+
+from aoai_api_simulator import constants
+from aoai_api_simulator.metrics import simulator_metrics
+from aoai_api_simulator.models import FaultsConfig, RequestContext
+from aoai_api_simulator.responses import close_response
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+# This file contains the fault-injection stage of the request pipeline.
+#
+# Faults are configured globally (FAULTS_* env vars) and per deployment (via the /++/config endpoint)
+# and are applied to successful responses before the limiters:
+#  - error responses (429/500/503) returned instead of the response
+#  - stalled first bytes (a delay before the response starts)
+#  - latency spikes (extra latency, or a pause after the first chunk of a streamed response)
+#  - slow-start streams (extra delay before each of the first chunks)
+#  - mid-stream disconnects (the connection is dropped part way through a streamed response)
+
+logger = logging.getLogger(__name__)
+
+_ERROR_CONTENT = {
+    500: {
+        "code": "InternalServerError",
+        "message": "The server had an error while processing your request. (injected by the simulator)",
+    },
+    503: {
+        "code": "ServiceUnavailable",
+        "message": "The service is temporarily unable to process your request. (injected by the simulator)",
+    },
+}
+
+# chance of disconnecting after each chunk of a stream (if the stream ends first, the last chunk is dropped)
+_DISCONNECT_CHANCE_PER_CHUNK = 0.1
+
+
+class SimulatedDisconnectError(Exception):
+    """
+    Raised from a streamed response body to drop the connection mid-stream
+    (handled by SimulatedDisconnectMiddleware so that it isn't logged as an unhandled error)
+    """
+
+
+def _record_fault(deployment_name: str | None, fault: str):
+    simulator_metrics.histogram_faults.record(1, attributes={"deployment": deployment_name, "fault": fault})
+
+
+def _create_error_response(status_code: int, faults: FaultsConfig) -> Response:
+    if status_code == 429:
+        return Response(
+            status_code=429,
+            content=json.dumps(
+                {
+                    "error": {
+                        "code": "429",
+                        "message": "Requests to the OpenAI API Simulator have exceeded call rate limit. "
+                        + f"Please retry after {faults.error_429_retry_after} seconds. (injected by the simulator)",
+                    }
+                }
+            ),
+            headers={
+                "Content-Type": "application/json",
+                "Retry-After": str(faults.error_429_retry_after),
+            },
+        )
+    return Response(
+        status_code=status_code,
+        content=json.dumps({"error": _ERROR_CONTENT[status_code]}),
+        headers={
+            "Content-Type": "application/json",
+        },
+    )
+
+
+def _choose_error(faults: FaultsConfig) -> int | None:
+    value = random.random()
+    for status_code, rate in [
+        (429, faults.error_429_rate),
+        (500, faults.error_500_rate),
+        (503, faults.error_503_rate),
+    ]:
+        if value < rate:
+            return status_code
+        value -= rate
+    return None
+
+
+async def _inject_stream_faults(
+    body_iterator: AsyncIterator, slow_start_ms: float, slow_start_chunks: int, spike_ms: float, disconnect: bool
+) -> AsyncIterator:
+    chunk_count = 0
+    held_chunk = None
+    try:
+        async for chunk in body_iterator:
+            if chunk_count < slow_start_chunks:
+                await asyncio.sleep(slow_start_ms / 1000)
+            if disconnect:
+                # hold back one chunk so that the disconnect always happens before the end of the stream
+                chunk, held_chunk = held_chunk, chunk
+                if chunk is None:
+                    continue
+            yield chunk
+            chunk_count += 1
+            if disconnect and random.random() < _DISCONNECT_CHANCE_PER_CHUNK:
+                raise SimulatedDisconnectError()
+            if chunk_count == 1 and spike_ms:
+                await asyncio.sleep(spike_ms / 1000)
+        if disconnect:
+            raise SimulatedDisconnectError()
+    finally:
+        if hasattr(body_iterator, "aclose"):
+            await body_iterator.aclose()
+
+
+async def inject_faults(context: RequestContext, response: Response) -> Response:
+    """
+    Applies the configured faults for the request's deployment to the response
+    """
+    faults = context.config.faults
+    if not faults.is_enabled():
+        return response
+
+    deployment_name = context.values.get(constants.SIMULATOR_KEY_DEPLOYMENT_NAME)
+    faults = faults.for_deployment(deployment_name)
+
+    error_status_code = _choose_error(faults)
+    if error_status_code:
+        _record_fault(deployment_name, f"error_{error_status_code}")
+        await close_response(response)
+        return _create_error_response(error_status_code, faults)
+
+    if random.random() < faults.stalled_first_byte_rate:
+        _record_fault(deployment_name, "stalled_first_byte")
+        await asyncio.sleep(faults.stalled_first_byte_ms / 1000)
+
+    spike_ms = 0
+    if random.random() < faults.latency_spike_rate:
+        _record_fault(deployment_name, "latency_spike")
+        spike_ms = faults.latency_spike_ms
+
+    if not isinstance(response, StreamingResponse):
+        if spike_ms:
+            target_duration_ms = context.values.get(constants.TARGET_DURATION_MS) or 0
+            context.values[constants.TARGET_DURATION_MS] = target_duration_ms + spike_ms
+        return response
+
+    slow_start = random.random() < faults.slow_start_rate
+    disconnect = random.random() < faults.disconnect_rate
+    if slow_start:
+        _record_fault(deployment_name, "slow_start")
+    if disconnect:
+        _record_fault(deployment_name, "disconnect")
+    if slow_start or spike_ms or disconnect:
+        response.body_iterator = _inject_stream_faults(
+            response.body_iterator,
+            slow_start_ms=faults.slow_start_ms if slow_start else 0,
+            slow_start_chunks=int(faults.slow_start_chunks) if slow_start else 0,
+            spike_ms=spike_ms,
+            disconnect=disconnect,
+        )
+    return response
+
+
+def _contains_simulated_disconnect(error: BaseException) -> bool:
+    if isinstance(error, SimulatedDisconnectError):
+        return True
+    if isinstance(error, BaseExceptionGroup):
+        return any(_contains_simulated_disconnect(e) for e in error.exceptions)
+    return False
+
+
+# pylint: disable-next=too-few-public-methods
+class SimulatedDisconnectMiddleware:
+    """
+    ASGI middleware that ends the request quietly when a streamed response is disconnected by fault injection
+    (the server closes the connection as the response is incomplete)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.app(scope, receive, send)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if not _contains_simulated_disconnect(e):
+                raise
+            logger.info("💥 Simulated disconnect for %s", scope.get("path"))
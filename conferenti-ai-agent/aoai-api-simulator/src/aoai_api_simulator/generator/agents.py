@@ -0,0 +1,610 @@
+import asyncio
+import json
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+import nanoid
+from aoai_api_simulator import constants
+from aoai_api_simulator.auth import validate_bearer_token_header
+from aoai_api_simulator.constants import (
+    OPENAI_OPERATION_CHAT_COMPLETIONS,
+    SIMULATOR_KEY_DEPLOYMENT_NAME,
+    SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS,
+    SIMULATOR_KEY_OPENAI_PROMPT_TOKENS,
+    SIMULATOR_KEY_OPENAI_TOTAL_TOKENS,
+    SIMULATOR_KEY_OPERATION_NAME,
+)
+from aoai_api_simulator.generator.lorem import generate_lorem_text
+from aoai_api_simulator.generator.openai import get_chat_model_from_deployment_name
+from aoai_api_simulator.generator.openai_tokens import (
+    get_max_completion_tokens,
+    num_tokens_from_messages,
+    num_tokens_from_string,
+)
+from aoai_api_simulator.generator.streaming import get_streaming_latency, paced_words
+from aoai_api_simulator.models import OpenAIChatModel, RequestContext, StreamingLatency
+from aoai_api_simulator.routing import generator_route
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+# This file contains generators for the Azure AI Agents API (agents, threads, messages and runs)
+# as used by azure.ai.agents.AgentsClient (i.e. the Conferenti agent with use_ollama=False).
+#
+# The routes are under /api/projects/{project}, so set the client endpoint to
+# <simulator>/api/projects/<any project name>. Clients authenticate with a bearer token,
+# which must be the simulator API key.
+#
+# State is held in memory. Runs aren't executed in the background: a run records when it will start
+# (after the queue delay) and when it will finish (after the chat completions latency for its generated tokens),
+# and its status is updated from those times whenever it is read. The assistant's reply is added to the thread
+# when the run is first seen to have completed.
+# Streamed runs (stream=true) send the run/message events as SSE, pacing the message deltas with the
+# streaming latency for the agent's model.
+#
+# The behaviour of runs (queue delay, poll latency, failure rate) is set in AgentsConfig.
+
+# API docs: https://learn.microsoft.com/rest/api/aifoundry/aiagents/
+
+_PROJECT_PREFIX = "/api/projects/{project}"
+
+_RUN_ACTIVE_STATUSES = ["queued", "in_progress", "requires_action", "cancelling"]
+
+_PLACEHOLDER_CONTENT = "@@content@@"
+
+_DONE_EVENT = b"event: done\ndata: [DONE]\n\n"
+
+
+@dataclass
+class AgentRun:
+    data: dict
+    # times (from time.time()) at which the run starts and finishes
+    starts_at: float
+    finishes_at: float
+    reply: str
+    prompt_tokens: int
+    completion_tokens: int
+    fails: bool
+    # streamed runs are updated as the events are sent rather than from starts_at/finishes_at
+    streamed: bool = False
+
+
+@dataclass
+class AgentThread:
+    data: dict
+    messages: list[dict] = field(default_factory=list)
+    runs: dict[str, AgentRun] = field(default_factory=dict)
+
+
+class AgentsStore:
+    """In-memory store for the emulated agents and threads (threads are removed least recently used first)"""
+
+    def __init__(self):
+        self.agents: dict[str, dict] = {}
+        self._threads: OrderedDict[str, AgentThread] = OrderedDict()
+
+    def add_thread(self, thread: AgentThread, max_threads: int):
+        self._threads[thread.data["id"]] = thread
+        while len(self._threads) > max_threads:
+            self._threads.popitem(last=False)
+
+    def get_thread(self, thread_id: str) -> AgentThread | None:
+        thread = self._threads.get(thread_id)
+        if thread is not None:
+            self._threads.move_to_end(thread_id)
+        return thread
+
+    def delete_thread(self, thread_id: str) -> bool:
+        return self._threads.pop(thread_id, None) is not None
+
+
+store = AgentsStore()
+
+
+def _new_id(prefix: str) -> str:
+    return prefix + "_" + nanoid.non_secure_generate(alphabet="0123456789abcdefghijklmnopqrstuvwxyz", size=24)
+
+
+def _json_response(content: dict, status_code: int = 200) -> Response:
+    return Response(
+        content=json.dumps(content),
+        status_code=status_code,
+        headers={
+            "Content-Type": "application/json",
+        },
+    )
+
+
+def _error_response(status_code: int, code: str, message: str) -> Response:
+    return _json_response({"error": {"code": code, "message": message}}, status_code=status_code)
+
+
+def _not_found(kind: str, resource_id: str) -> Response:
+    return _error_response(404, "not_found", f"No {kind} found with id '{resource_id}'.")
+
+
+def _model_not_found(model_name: str) -> Response:
+    return _error_response(400, "invalid_request_error", f"Model '{model_name}' not found")
+
+
+def _list_response(items: list[dict], has_more: bool = False) -> Response:
+    return _json_response(
+        {
+            "object": "list",
+            "data": items,
+            "first_id": items[0]["id"] if items else None,
+            "last_id": items[-1]["id"] if items else None,
+            "has_more": has_more,
+        }
+    )
+
+
+def _validate_token(context: RequestContext):
+    validate_bearer_token_header(request=context.request, allowed_token_value=context.config.simulator_api_key)
+
+
+def _get_text(content: str | list) -> str:
+    # message content can be a string or a list of content blocks
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if block.get("type") == "text")
+
+
+def _get_text_from_message(message: dict) -> str:
+    return "".join(block["text"]["value"] for block in message["content"] if block["type"] == "text")
+
+
+def _create_message(thread_id: str, role: str, text: str, assistant_id: str | None = None, run_id: str | None = None):
+    created_at = int(time.time())
+    return {
+        "id": _new_id("msg"),
+        "object": "thread.message",
+        "created_at": created_at,
+        "thread_id": thread_id,
+        "status": "completed",
+        "incomplete_details": None,
+        "completed_at": created_at,
+        "incomplete_at": None,
+        "role": role,
+        "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+        "assistant_id": assistant_id,
+        "run_id": run_id,
+        "attachments": [],
+        "metadata": {},
+    }
+
+
+def _create_thread(context: RequestContext, thread_body: dict) -> AgentThread:
+    thread_id = _new_id("thread")
+    thread = AgentThread(
+        data={
+            "id": thread_id,
+            "object": "thread",
+            "created_at": int(time.time()),
+            "tool_resources": thread_body.get("tool_resources") or {},
+            "metadata": thread_body.get("metadata") or {},
+        }
+    )
+    for message in thread_body.get("messages") or []:
+        thread.messages.append(_create_message(thread_id, message.get("role", "user"), _get_text(message["content"])))
+    store.add_thread(thread, context.config.agents.max_threads)
+    return thread
+
+
+def _get_active_run(thread: AgentThread) -> AgentRun | None:
+    for run in thread.runs.values():
+        if run.data["status"] in _RUN_ACTIVE_STATUSES:
+            return run
+    return None
+
+
+def _set_run_completed(thread: AgentThread, run: AgentRun, completed_at: float):
+    data = run.data
+    thread.messages.append(
+        _create_message(thread.data["id"], "assistant", run.reply, assistant_id=data["assistant_id"], run_id=data["id"])
+    )
+    data["status"] = "completed"
+    data["completed_at"] = int(completed_at)
+    data["usage"] = {
+        "prompt_tokens": run.prompt_tokens,
+        "completion_tokens": run.completion_tokens,
+        "total_tokens": run.prompt_tokens + run.completion_tokens,
+    }
+
+
+def _set_run_failed(run: AgentRun, failed_at: float):
+    run.data["status"] = "failed"
+    run.data["failed_at"] = int(failed_at)
+    run.data["last_error"] = {
+        "code": "rate_limit_exceeded",
+        "message": "Rate limit is exceeded. Try again later.",
+    }
+
+
+def _refresh_run(thread: AgentThread, run: AgentRun):
+    """Updates the status of a (non-streamed) run from its start/finish times"""
+    if run.streamed or run.data["status"] not in _RUN_ACTIVE_STATUSES:
+        return
+    now = time.time()
+    if run.data["status"] == "queued" and now >= run.starts_at:
+        run.data["status"] = "in_progress"
+        run.data["started_at"] = int(run.starts_at)
+    if now >= run.finishes_at:
+        if run.fails:
+            _set_run_failed(run, run.finishes_at)
+        else:
+            _set_run_completed(thread, run, run.finishes_at)
+
+
+def _create_run(
+    context: RequestContext, thread: AgentThread, agent: dict, model: OpenAIChatModel, run_body: dict
+) -> AgentRun:
+    """Creates a run and generates the assistant's reply (which is added to the thread when the run completes)"""
+    config = context.config
+    model_name = agent["model"]
+    instructions = run_body.get("instructions") or agent["instructions"] or ""
+    if run_body.get("additional_instructions"):
+        instructions += run_body["additional_instructions"]
+
+    messages = [{"role": "system", "content": instructions}]
+    messages.extend({"role": m["role"], "content": _get_text_from_message(m)} for m in thread.messages)
+    prompt_tokens = num_tokens_from_messages(messages, model.name)
+    _, max_tokens = get_max_completion_tokens(
+        {"max_tokens": run_body.get("max_completion_tokens")}, model.name, prompt_tokens=prompt_tokens
+    )
+    reply = generate_lorem_text(max_tokens=max_tokens, model_name=model.name)
+    completion_tokens = num_tokens_from_string(reply, model.name)
+
+    created_at = time.time()
+    starts_at = created_at + config.agents.get_run_queue_delay() / 1000
+    finishes_at = starts_at + config.latency.open_ai_chat_completions.get_value() * completion_tokens / 1000
+    run_id = _new_id("run")
+    run = AgentRun(
+        data={
+            "id": run_id,
+            "object": "thread.run",
+            "thread_id": thread.data["id"],
+            "assistant_id": agent["id"],
+            "status": "queued",
+            "required_action": None,
+            "last_error": None,
+            "model": model_name,
+            "instructions": instructions,
+            "tools": run_body.get("tools") or agent["tools"],
+            "created_at": int(created_at),
+            "expires_at": int(created_at) + 600,
+            "started_at": None,
+            "completed_at": None,
+            "cancelled_at": None,
+            "failed_at": None,
+            "incomplete_details": None,
+            "usage": None,
+            "temperature": run_body.get("temperature", agent["temperature"]),
+            "top_p": run_body.get("top_p", agent["top_p"]),
+            "max_prompt_tokens": run_body.get("max_prompt_tokens"),
+            "max_completion_tokens": run_body.get("max_completion_tokens"),
+            "truncation_strategy": {"type": "auto", "last_messages": None},
+            "tool_choice": run_body.get("tool_choice", "auto"),
+            "response_format": run_body.get("response_format", "auto"),
+            "parallel_tool_calls": run_body.get("parallel_tool_calls", True),
+            "tool_resources": {},
+            "metadata": run_body.get("metadata") or {},
+        },
+        starts_at=starts_at,
+        finishes_at=finishes_at,
+        reply=reply,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        fails=random.random() < config.agents.run_failure_rate,
+        streamed=bool(run_body.get("stream")),
+    )
+    thread.runs[run_id] = run
+
+    # store values in the context for metrics
+    context.values[SIMULATOR_KEY_OPERATION_NAME] = OPENAI_OPERATION_CHAT_COMPLETIONS
+    context.values[SIMULATOR_KEY_DEPLOYMENT_NAME] = model_name
+    context.values[SIMULATOR_KEY_OPENAI_PROMPT_TOKENS] = prompt_tokens
+    context.values[SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS] = completion_tokens
+    context.values[SIMULATOR_KEY_OPENAI_TOTAL_TOKENS] = prompt_tokens + completion_tokens
+    return run
+
+
+def _event(name: str, data: dict) -> bytes:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+class MessageDeltaTemplate:
+    """A thread.message.delta SSE event with all values except the content bound"""
+
+    def __init__(self, message_id: str):
+        payload = {
+            "id": message_id,
+            "object": "thread.message.delta",
+            "delta": {"content": [{"index": 0, "type": "text", "text": {"value": _PLACEHOLDER_CONTENT}}]},
+        }
+        prefix, suffix = json.dumps(payload).split(json.dumps(_PLACEHOLDER_CONTENT))
+        self._prefix = ("event: thread.message.delta\ndata: " + prefix).encode("utf-8")
+        self._suffix = (suffix + "\n\n").encode("utf-8")
+
+    def render(self, content: str) -> bytes:
+        return self._prefix + json.dumps(content).encode("ascii") + self._suffix
+
+
+async def stream_run(thread: AgentThread, run: AgentRun, latency: StreamingLatency) -> AsyncIterator[bytes]:
+    """
+    Streams the events for a run: queued, in_progress (after the queue delay),
+    the assistant message (deltas paced by paced_words) and completed/failed
+    """
+    data = run.data
+    try:
+        yield _event("thread.run.created", data)
+        yield _event("thread.run.queued", data)
+
+        delay = run.starts_at - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if data["status"] != "queued":
+            # cancelled while queued
+            yield _event(f"thread.run.{data['status']}", data)
+            yield _DONE_EVENT
+            return
+        data["status"] = "in_progress"
+        data["started_at"] = int(time.time())
+        yield _event("thread.run.in_progress", data)
+
+        if run.fails:
+            _set_run_failed(run, time.time())
+            yield _event("thread.run.failed", data)
+            yield _DONE_EVENT
+            return
+
+        message = _create_message(
+            thread.data["id"], "assistant", "", assistant_id=data["assistant_id"], run_id=data["id"]
+        )
+        message["status"] = "in_progress"
+        message["completed_at"] = None
+        message["content"] = []
+        yield _event("thread.message.created", message)
+        yield _event("thread.message.in_progress", message)
+
+        delta = MessageDeltaTemplate(message["id"])
+        async for _, word in paced_words(run.reply, run.completion_tokens, latency):
+            if data["status"] != "in_progress":
+                break
+            yield delta.render(word)
+
+        if data["status"] == "in_progress":
+            _set_run_completed(thread, run, time.time())
+            yield _event("thread.message.completed", thread.messages[-1])
+        yield _event(f"thread.run.{data['status']}", data)
+        yield _DONE_EVENT
+    finally:
+        if data["status"] in _RUN_ACTIVE_STATUSES:
+            # the client disconnected before the run finished
+            data["status"] = "cancelled"
+            data["cancelled_at"] = int(time.time())
+
+
+def _create_run_response(context: RequestContext, thread: AgentThread, run: AgentRun) -> Response:
+    if not run.streamed:
+        return _json_response(run.data)
+    return StreamingResponse(
+        content=stream_run(thread, run, get_streaming_latency(context, run.data["model"])),
+        media_type="text/event-stream",
+    )
+
+
+@generator_route(_PROJECT_PREFIX + "/assistants", methods=["POST"])
+async def agents_create_agent(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    request_body = await context.get_json_body()
+    model_name = request_body.get("model")
+    if not model_name:
+        return _error_response(400, "invalid_request_error", "model is required")
+    if get_chat_model_from_deployment_name(context, model_name) is None:
+        return _model_not_found(model_name)
+
+    agent = {
+        "id": _new_id("asst"),
+        "object": "assistant",
+        "created_at": int(time.time()),
+        "name": request_body.get("name"),
+        "description": request_body.get("description"),
+        "model": model_name,
+        "instructions": request_body.get("instructions"),
+        "tools": request_body.get("tools") or [],
+        "tool_resources": request_body.get("tool_resources") or {},
+        "temperature": request_body.get("temperature", 1.0),
+        "top_p": request_body.get("top_p", 1.0),
+        "response_format": request_body.get("response_format", "auto"),
+        "metadata": request_body.get("metadata") or {},
+    }
+    store.agents[agent["id"]] = agent
+    return _json_response(agent)
+
+
+@generator_route(_PROJECT_PREFIX + "/assistants", methods=["GET"])
+async def agents_list_agents(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    return _list_response(list(store.agents.values()))
+
+
+@generator_route(_PROJECT_PREFIX + "/assistants/{assistant_id}", methods=["GET"])
+async def agents_get_agent(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    assistant_id = context.path_params["assistant_id"]
+    agent = store.agents.get(assistant_id)
+    if agent is None:
+        return _not_found("assistant", assistant_id)
+    return _json_response(agent)
+
+
+@generator_route(_PROJECT_PREFIX + "/assistants/{assistant_id}", methods=["DELETE"])
+async def agents_delete_agent(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    assistant_id = context.path_params["assistant_id"]
+    deleted = store.agents.pop(assistant_id, None) is not None
+    return _json_response({"id": assistant_id, "object": "assistant.deleted", "deleted": deleted})
+
+
+@generator_route(_PROJECT_PREFIX + "/threads", methods=["POST"])
+async def agents_create_thread(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    request_body = await context.get_json_body()
+    thread = _create_thread(context, request_body)
+    return _json_response(thread.data)
+
+
+@generator_route(_PROJECT_PREFIX + "/threads/runs", methods=["POST"])
+async def agents_create_thread_and_run(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    request_body = await context.get_json_body()
+    assistant_id = request_body.get("assistant_id")
+    agent = store.agents.get(assistant_id)
+    if agent is None:
+        return _not_found("assistant", assistant_id)
+    # the agent's deployment may have been removed (or its config changed) since the agent was created
+    model = get_chat_model_from_deployment_name(context, agent["model"])
+    if model is None:
+        return _model_not_found(agent["model"])
+
+    thread = _create_thread(context, request_body.get("thread") or {})
+    run = _create_run(context, thread, agent, model, request_body)
+    return _create_run_response(context, thread, run)
+
+
+@generator_route(_PROJECT_PREFIX + "/threads/{thread_id}", methods=["GET"])
+async def agents_get_thread(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    thread_id = context.path_params["thread_id"]
+    thread = store.get_thread(thread_id)
+    if thread is None:
+        return _not_found("thread", thread_id)
+    return _json_response(thread.data)
+
+
+@generator_route(_PROJECT_PREFIX + "/threads/{thread_id}", methods=["DELETE"])
+async def agents_delete_thread(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    thread_id = context.path_params["thread_id"]
+    deleted = store.delete_thread(thread_id)
+    return _json_response({"id": thread_id, "object": "thread.deleted", "deleted": deleted})
+
+
+@generator_route(_PROJECT_PREFIX + "/threads/{thread_id}/messages", methods=["POST"])
+async def agents_create_message(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    thread_id = context.path_params["thread_id"]
+    thread = store.get_thread(thread_id)
+    if thread is None:
+        return _not_found("thread", thread_id)
+
+    active_run = _get_active_run(thread)
+    if active_run is not None:
+        _refresh_run(thread, active_run)
+        if active_run.data["status"] in _RUN_ACTIVE_STATUSES:
+            return _error_response(
+                400,
+                "invalid_request_error",
+                f"Can't add messages to {thread_id} while a run {active_run.data['id']} is active.",
+            )
+
+    request_body = await context.get_json_body()
+    message = _create_message(thread_id, request_body.get("role", "user"), _get_text(request_body.get("content", "")))
+    message["metadata"] = request_body.get("metadata") or {}
+    thread.messages.append(message)
+    return _json_response(message)
+
+
+@generator_route(_PROJECT_PREFIX + "/threads/{thread_id}/messages", methods=["GET"])
+async def agents_list_messages(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    thread_id = context.path_params["thread_id"]
+    thread = store.get_thread(thread_id)
+    if thread is None:
+        return _not_found("thread", thread_id)
+    for run in thread.runs.values():
+        _refresh_run(thread, run)
+
+    query = context.request.query_params
+    messages = thread.messages
+    if query.get("run_id"):
+        messages = [m for m in messages if m["run_id"] == query["run_id"]]
+    if query.get("order", "desc") == "desc":
+        messages = messages[::-1]
+    if query.get("after"):
+        ids = [m["id"] for m in messages]
+        messages = messages[ids.index(query["after"]) + 1 :] if query["after"] in ids else []
+    limit = int(query.get("limit", 20))
+    return _list_response(messages[:limit], has_more=len(messages) > limit)
+
+
+@generator_route(_PROJECT_PREFIX + "/threads/{thread_id}/runs", methods=["POST"])
+async def agents_create_run(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    thread_id = context.path_params["thread_id"]
+    thread = store.get_thread(thread_id)
+    if thread is None:
+        return _not_found("thread", thread_id)
+    request_body = await context.get_json_body()
+    assistant_id = request_body.get("assistant_id")
+    agent = store.agents.get(assistant_id)
+    if agent is None:
+        return _not_found("assistant", assistant_id)
+    model = get_chat_model_from_deployment_name(context, agent["model"])
+    if model is None:
+        return _model_not_found(agent["model"])
+
+    active_run = _get_active_run(thread)
+    if active_run is not None:
+        _refresh_run(thread, active_run)
+        if active_run.data["status"] in _RUN_ACTIVE_STATUSES:
+            return _error_response(
+                400,
+                "invalid_request_error",
+                f"Thread {thread_id} already has an active run {active_run.data['id']}.",
+            )
+
+    for message in request_body.get("additional_messages") or []:
+        thread.messages.append(
+            _create_message(thread_id, message.get("role", "user"), _get_text(message.get("content", "")))
+        )
+    run = _create_run(context, thread, agent, model, request_body)
+    return _create_run_response(context, thread, run)
+
+
+@generator_route(_PROJECT_PREFIX + "/threads/{thread_id}/runs/{run_id}", methods=["GET"])
+async def agents_get_run(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    thread_id = context.path_params["thread_id"]
+    run_id = context.path_params["run_id"]
+    thread = store.get_thread(thread_id)
+    run = thread.runs.get(run_id) if thread is not None else None
+    if run is None:
+        return _not_found("run", run_id)
+
+    _refresh_run(thread, run)
+    # the target duration is applied by the LatencyGenerator
+    context.values[constants.TARGET_DURATION_MS] = context.config.agents.get_run_poll_latency()
+    context.values[SIMULATOR_KEY_DEPLOYMENT_NAME] = run.data["model"]
+    return _json_response(run.data)
+
+
+@generator_route(_PROJECT_PREFIX + "/threads/{thread_id}/runs/{run_id}/cancel", methods=["POST"])
+async def agents_cancel_run(context: RequestContext) -> Response | None:
+    _validate_token(context)
+    thread_id = context.path_params["thread_id"]
+    run_id = context.path_params["run_id"]
+    thread = store.get_thread(thread_id)
+    run = thread.runs.get(run_id) if thread is not None else None
+    if run is None:
+        return _not_found("run", run_id)
+
+    _refresh_run(thread, run)
+    if run.data["status"] not in _RUN_ACTIVE_STATUSES:
+        return _error_response(400, "invalid_request_error", f"Cannot cancel run with status '{run.data['status']}'.")
+    run.data["status"] = "cancelled"
+    run.data["cancelled_at"] = int(time.time())
+    return _json_response(run.data)
@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# This file contains a streaming multipart/form-data parser for upload endpoints (e.g. audio translations).
+#
+# Request.form() spools each uploaded file to a SpooledTemporaryFile (on disk above 1 MB, with the writes
+# dispatched to the threadpool) and the generators then only need the size of the file.
+# parse_multipart_form feeds the request stream to the multipart parser and only counts the bytes of
+# file parts, so the memory used per request stays bounded (one network chunk plus the non-file fields)
+# regardless of the upload size and nothing is written to disk.
+# File contents are only needed when forwarding requests in record mode, where the body is read by the
+# record/replay handler instead.
+
+# Non-file fields (e.g. response_format, prompt) are kept in memory so are limited in size
+DEFAULT_MAX_FIELD_SIZE = 1024 * 1024
+
+
+class MultipartFormError(ValueError):
+    """Raised when the request isn't valid multipart/form-data"""
+
+
+@dataclass
+class UploadedFileInfo:
+    filename: str
+    content_type: str | None
+    size: int = 0
+
+
+@dataclass
+class MultipartForm:
+    fields: dict[str, str] = field(default_factory=dict)
+    files: dict[str, UploadedFileInfo] = field(default_factory=dict)
+
+
+# pylint: disable-next=too-many-locals
+async def parse_multipart_form(request: Request, max_field_size: int = DEFAULT_MAX_FIELD_SIZE) -> MultipartForm:
+    """
+    Parses a multipart/form-data request from the request stream, keeping the non-file fields
+    and the name, content type and size of each uploaded file (but not the file contents)
+    """
+    content_type, params = parse_options_header(request.headers.get("Content-Type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise MultipartFormError("Expected multipart/form-data content with a boundary")
+    charset = params.get(b"charset", b"utf-8").decode("latin-1")
+
+    form = MultipartForm()
+    # state for the part being parsed
+    header_field = bytearray()
+    header_value = bytearray()
+    part_headers: dict[bytes, bytes] = {}
+    part_name = ""
+    part_file: UploadedFileInfo | None = None
+    part_value = bytearray()
+
+    def on_part_begin():
+        nonlocal part_file
+        part_headers.clear()
+        part_value.clear()
+        part_file = None
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        part_headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        nonlocal part_name, part_file
+        _, options = parse_options_header(part_headers.get(b"content-disposition"))
+        if b"name" not in options:
+            raise MultipartFormError('The Content-Disposition header must include a "name"')
+        part_name = options[b"name"].decode(charset)
+        if b"filename" in options:
+            part_content_type = part_headers.get(b"content-type")
+            part_file = UploadedFileInfo(
+                filename=options[b"filename"].decode(charset),
+                content_type=part_content_type.decode("latin-1") if part_content_type else None,
+            )
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if part_file is not None:
+            part_file.size += end - start
+            return
+        if len(part_value) + end - start > max_field_size:
+            raise MultipartFormError(f"Form field '{part_name}' exceeds the maximum size ({max_field_size} bytes)")
+        part_value.extend(data[start:end])
+
+    def on_part_end():
+        if part_file is not None:
+            form.files[part_name] = part_file
+        else:
+            form.fields[part_name] = part_value.decode(charset)
+
+    parser = MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except MultipartFormError:
+        raise
+    except ValueError as e:
+        # python_multipart errors derive from ValueError
+        raise MultipartFormError(str(e)) from e
+    return form
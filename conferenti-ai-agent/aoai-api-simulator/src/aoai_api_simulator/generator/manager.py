@@ -3,6 +3,7 @@ import logging
 from typing import Awaitable, Callable
 
 from aoai_api_simulator.models import RequestContext
+from aoai_api_simulator.routing import get_generator_router
 from fastapi import HTTPException, Response
 
 from .openai import (
@@ -11,6 +12,22 @@ from .openai import (
     azure_openai_embedding,
     azure_openai_translation,
 )
+from .agents import (
+    agents_cancel_run,
+    agents_create_agent,
+    agents_create_message,
+    agents_create_run,
+    agents_create_thread,
+    agents_create_thread_and_run,
+    agents_delete_agent,
+    agents_delete_thread,
+    agents_get_agent,
+    agents_get_run,
+    agents_get_thread,
+    agents_list_agents,
+    agents_list_messages,
+)
+from .ollama import ollama_chat, ollama_embeddings, ollama_generate
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +38,31 @@ def get_default_generators() -> list[Callable[[RequestContext], Response | Await
         azure_openai_completion,
         azure_openai_chat_completion,
         azure_openai_translation,
+        ollama_chat,
+        ollama_generate,
+        ollama_embeddings,
+        agents_create_agent,
+        agents_list_agents,
+        agents_get_agent,
+        agents_delete_agent,
+        agents_create_thread,
+        agents_create_thread_and_run,
+        agents_get_thread,
+        agents_delete_thread,
+        agents_create_message,
+        agents_list_messages,
+        agents_create_run,
+        agents_get_run,
+        agents_cancel_run,
     ]
 
 
 async def invoke_generators(
     context: RequestContext, generators: list[Callable[[RequestContext], Response | Awaitable[Response] | None]]
 ):
-    for generator in generators:
+    # only invoke the generator whose route matches (plus any generators without a declared route)
+    router = get_generator_router(tuple(generators))
+    for generator in router.get_generators(context):
         try:
             response = generator(context=context)
             if response is not None and inspect.isawaitable(response):
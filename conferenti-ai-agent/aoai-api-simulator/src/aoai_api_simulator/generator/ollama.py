@@ -0,0 +1,281 @@
+import json
+import time
+from datetime import datetime, timezone
+from json.encoder import encode_basestring_ascii
+from typing import AsyncIterator
+
+from aoai_api_simulator import constants
+from aoai_api_simulator.constants import (
+    LIMITER_OPENAI_TOKENS,
+    OPENAI_OPERATION_CHAT_COMPLETIONS,
+    OPENAI_OPERATION_COMPLETIONS,
+    OPENAI_OPERATION_EMBEDDINGS,
+    SIMULATOR_KEY_DEPLOYMENT_NAME,
+    SIMULATOR_KEY_LIMITER,
+    SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS,
+    SIMULATOR_KEY_OPENAI_MAX_TOKENS_EFFECTIVE,
+    SIMULATOR_KEY_OPENAI_MAX_TOKENS_REQUESTED,
+    SIMULATOR_KEY_OPENAI_PROMPT_TOKENS,
+    SIMULATOR_KEY_OPENAI_TOTAL_TOKENS,
+    SIMULATOR_KEY_OPERATION_NAME,
+)
+from aoai_api_simulator.generator.lorem import generate_lorem_text
+from aoai_api_simulator.generator.openai import (
+    calculate_latency_text_endpoints,
+    create_embedding_content,
+    default_openai_embedding_model,
+    get_chat_model_from_deployment_name,
+    get_embedding_deployment_from_name,
+)
+from aoai_api_simulator.generator.openai_tokens import (
+    get_max_completion_tokens,
+    num_tokens_from_messages,
+    num_tokens_from_string,
+)
+from aoai_api_simulator.generator.streaming import get_streaming_latency, paced_words
+from aoai_api_simulator.models import OpenAIChatModel, RequestContext, StreamingLatency
+from aoai_api_simulator.routing import generator_route
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+# This file contains generators for the Ollama API so that clients that use Ollama
+# (e.g. the Conferenti agent's default configuration) can be run against the simulator.
+#
+# Ollama models are treated as deployments: the model name in the request is looked up in the
+# deployment config (so a "llama3.2" deployment can set the tokens-per-minute limit and streaming latency)
+# and undefined models fall back to the default models when allow_undefined_openai_deployments is set.
+# Requests use the same lorem text generation, latency and limiters as the OpenAI generators.
+# Ollama doesn't use API keys, so (as with a local Ollama server) requests aren't authenticated.
+
+# API docs: https://github.com/ollama/ollama/blob/main/docs/api.md
+
+_PLACEHOLDER_CONTENT = "@@content@@"
+
+
+def _json_response(content: dict, status_code: int = 200) -> Response:
+    return Response(
+        content=json.dumps(content),
+        status_code=status_code,
+        headers={
+            "Content-Type": "application/json",
+        },
+    )
+
+
+def _created_at() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _get_options_max_tokens(request_body: dict) -> dict:
+    # Ollama sets the max tokens to generate with options.num_predict (-1 means no limit)
+    num_predict = (request_body.get("options") or {}).get("num_predict")
+    if num_predict is None or num_predict < 0:
+        return {}
+    return {"max_tokens": num_predict}
+
+
+def _get_chat_model(context: RequestContext, model_name: str | None, operation: str) -> OpenAIChatModel | Response:
+    if not model_name:
+        return _json_response({"error": "model is required"}, status_code=400)
+    model = get_chat_model_from_deployment_name(context, model_name)
+    if model is None:
+        return _json_response({"error": f'model "{model_name}" not found, try pulling it first'}, status_code=404)
+    if not isinstance(model, OpenAIChatModel):
+        return _json_response({"error": f'"{model_name}" does not support {operation}'}, status_code=400)
+    return model
+
+
+def _set_token_context_values(
+    context: RequestContext, operation_name: str, model_name: str, prompt_tokens: int, completion_tokens: int
+):
+    # store values in the context for use by the rate-limiter etc
+    context.values[SIMULATOR_KEY_LIMITER] = LIMITER_OPENAI_TOKENS
+    context.values[SIMULATOR_KEY_OPERATION_NAME] = operation_name
+    context.values[SIMULATOR_KEY_DEPLOYMENT_NAME] = model_name
+    context.values[SIMULATOR_KEY_OPENAI_PROMPT_TOKENS] = prompt_tokens
+    context.values[SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS] = completion_tokens
+    context.values[SIMULATOR_KEY_OPENAI_TOTAL_TOKENS] = prompt_tokens + completion_tokens
+
+
+def _get_final_values(
+    done_reason: str, prompt_tokens: int, completion_tokens: int, total_duration_ns: int, eval_duration_ns: int
+) -> dict:
+    return {
+        "done_reason": done_reason,
+        "total_duration": total_duration_ns,
+        "load_duration": 0,
+        "prompt_eval_count": prompt_tokens,
+        "prompt_eval_duration": max(0, total_duration_ns - eval_duration_ns),
+        "eval_count": completion_tokens,
+        "eval_duration": eval_duration_ns,
+    }
+
+
+class NdjsonChunkTemplate:
+    """
+    An Ollama streaming response line with all values except the content bound
+    (see ChunkTemplate in streaming.py for the equivalent OpenAI SSE chunk)
+    """
+
+    def __init__(self, payload: dict):
+        prefix, suffix = json.dumps(payload).split(json.dumps(_PLACEHOLDER_CONTENT))
+        self._prefix = prefix.encode("utf-8")
+        self._suffix = (suffix + "\n").encode("utf-8")
+
+    def render(self, content: str) -> bytes:
+        return self._prefix + encode_basestring_ascii(content).encode("ascii") + self._suffix
+
+
+# pylint: disable-next=too-many-arguments, too-many-positional-arguments
+async def stream_ollama_response(
+    model_name: str,
+    generated_content: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    done_reason: str,
+    latency: StreamingLatency,
+    chat: bool,
+) -> AsyncIterator[bytes]:
+    """
+    Streams the generated content as Ollama NDJSON lines (paced by paced_words)
+    followed by a final line with done=true and the token counts/durations
+    """
+    start_ns = time.perf_counter_ns()
+    first_token_ns = None
+
+    if chat:
+        payload = {"model": model_name, "created_at": _created_at()}
+        payload["message"] = {"role": "assistant", "content": _PLACEHOLDER_CONTENT}
+    else:
+        payload = {"model": model_name, "created_at": _created_at(), "response": _PLACEHOLDER_CONTENT}
+    payload["done"] = False
+    chunk = NdjsonChunkTemplate(payload)
+
+    async for _, word in paced_words(generated_content, completion_tokens, latency):
+        if first_token_ns is None:
+            first_token_ns = time.perf_counter_ns()
+        yield chunk.render(word)
+
+    end_ns = time.perf_counter_ns()
+    final = {"model": model_name, "created_at": _created_at()}
+    if chat:
+        final["message"] = {"role": "assistant", "content": ""}
+    else:
+        final["response"] = ""
+    final["done"] = True
+    final.update(
+        _get_final_values(
+            done_reason, prompt_tokens, completion_tokens, end_ns - start_ns, end_ns - (first_token_ns or start_ns)
+        )
+    )
+    yield (json.dumps(final) + "\n").encode("utf-8")
+
+
+# pylint: disable-next=too-many-arguments, too-many-positional-arguments
+async def _create_ollama_text_response(
+    context: RequestContext,
+    request_body: dict,
+    model_name: str,
+    model: OpenAIChatModel,
+    prompt_tokens: int,
+    operation_name: str,
+    chat: bool,
+) -> Response:
+    requested_max_tokens, max_tokens = get_max_completion_tokens(
+        _get_options_max_tokens(request_body), model.name, prompt_tokens=prompt_tokens
+    )
+    context.values[SIMULATOR_KEY_OPENAI_MAX_TOKENS_REQUESTED] = requested_max_tokens
+    context.values[SIMULATOR_KEY_OPENAI_MAX_TOKENS_EFFECTIVE] = max_tokens
+
+    text = generate_lorem_text(max_tokens=max_tokens, model_name=model.name)
+    completion_tokens = num_tokens_from_string(text, model.name)
+    done_reason = "length" if requested_max_tokens is not None and completion_tokens >= max_tokens else "stop"
+    _set_token_context_values(context, operation_name, model_name, prompt_tokens, completion_tokens)
+
+    # Ollama streams by default
+    if request_body.get("stream", True):
+        # streamed responses are paced by the streaming engine rather than a target duration
+        return StreamingResponse(
+            content=stream_ollama_response(
+                model_name=model_name,
+                generated_content=text,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                done_reason=done_reason,
+                latency=get_streaming_latency(context, model_name),
+                chat=chat,
+            ),
+            media_type="application/x-ndjson",
+        )
+
+    # calculate a simulated latency and store in context.values
+    # needs to be called after the context values have been set
+    await calculate_latency_text_endpoints(context, 200)
+    target_duration_ns = int(context.values.get(constants.TARGET_DURATION_MS, 0) * 1_000_000)
+
+    response_body = {"model": model_name, "created_at": _created_at()}
+    if chat:
+        response_body["message"] = {"role": "assistant", "content": text}
+    else:
+        response_body["response"] = text
+    response_body["done"] = True
+    response_body.update(
+        _get_final_values(done_reason, prompt_tokens, completion_tokens, target_duration_ns, target_duration_ns)
+    )
+    return _json_response(response_body)
+
+
+@generator_route("/api/chat", methods=["POST"])
+async def ollama_chat(context: RequestContext) -> Response | None:
+    request_body = await context.get_json_body()
+    model_name = request_body.get("model")
+    model = _get_chat_model(context, model_name, "chat")
+    if isinstance(model, Response):
+        return model
+
+    messages = request_body.get("messages") or []
+    # only count the text values (Ollama messages can also include images/tool calls)
+    text_messages = [{k: v for k, v in message.items() if isinstance(v, str)} for message in messages]
+    prompt_tokens = num_tokens_from_messages(text_messages, model.name)
+
+    return await _create_ollama_text_response(
+        context, request_body, model_name, model, prompt_tokens, OPENAI_OPERATION_CHAT_COMPLETIONS, chat=True
+    )
+
+
+@generator_route("/api/generate", methods=["POST"])
+async def ollama_generate(context: RequestContext) -> Response | None:
+    request_body = await context.get_json_body()
+    model_name = request_body.get("model")
+    model = _get_chat_model(context, model_name, "generate")
+    if isinstance(model, Response):
+        return model
+
+    prompt = (request_body.get("system") or "") + (request_body.get("prompt") or "")
+    prompt_tokens = num_tokens_from_string(prompt, model.name)
+
+    return await _create_ollama_text_response(
+        context, request_body, model_name, model, prompt_tokens, OPENAI_OPERATION_COMPLETIONS, chat=False
+    )
+
+
+@generator_route("/api/embeddings", methods=["POST"])
+async def ollama_embeddings(context: RequestContext) -> Response | None:
+    request_body = await context.get_json_body()
+    model_name = request_body.get("model")
+    if not model_name:
+        return _json_response({"error": "model is required"}, status_code=400)
+    deployment = get_embedding_deployment_from_name(context, model_name)
+    if deployment is None:
+        return _json_response({"error": f'model "{model_name}" not found, try pulling it first'}, status_code=404)
+
+    # Ollama can generate embeddings with chat models, so fall back to the default embedding size
+    embedding_size = deployment.embedding_size or default_openai_embedding_model.embedding_size
+    prompt = request_body.get("prompt") or ""
+    prompt_tokens = num_tokens_from_string(prompt, deployment.model.name)
+
+    _set_token_context_values(context, OPENAI_OPERATION_EMBEDDINGS, model_name, prompt_tokens, 0)
+    await calculate_latency_text_endpoints(context, 200)
+
+    embedding = create_embedding_content(0, embedding_size=embedding_size)["embedding"]
+    return _json_response({"embedding": embedding})
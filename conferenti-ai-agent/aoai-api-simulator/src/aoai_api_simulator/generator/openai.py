@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 import random
@@ -24,6 +23,7 @@ from aoai_api_simulator.constants import (
     SIMULATOR_KEY_OPENAI_TOTAL_TOKENS,
     SIMULATOR_KEY_OPERATION_NAME,
 )
+from aoai_api_simulator.generator.form_parser import MultipartFormError, parse_multipart_form
 from aoai_api_simulator.generator.lorem import generate_lorem_text
 from aoai_api_simulator.generator.model_catalogue import model_catalogue
 from aoai_api_simulator.generator.openai_tokens import (
@@ -31,13 +31,16 @@ from aoai_api_simulator.generator.openai_tokens import (
     num_tokens_from_messages,
     num_tokens_from_string,
 )
+from aoai_api_simulator.generator.streaming import get_streaming_latency, stream_chat_completion
 from aoai_api_simulator.models import (
+    LatencyProfile,
     OpenAIChatModel,
     OpenAIDeployment,
     OpenAIEmbeddingModel,
     OpenAIWhisperModel,
     RequestContext,
 )
+from aoai_api_simulator.routing import generator_route
 from fastapi import Response
 from fastapi.responses import StreamingResponse
 
@@ -172,6 +175,17 @@ def get_whisper_model_from_deployment_name(context: RequestContext, deployment_n
     return None
 
 
+def _get_latency_profile(context: RequestContext) -> LatencyProfile | None:
+    """Gets the latency profile for the deployment used by the request (if the deployment defines one)"""
+    deployments = context.config.openai_deployments
+    deployment_name = context.values.get(constants.SIMULATOR_KEY_DEPLOYMENT_NAME)
+    if deployments and deployment_name:
+        deployment = deployments.get(deployment_name)
+        if deployment:
+            return deployment.latency_profile
+    return None
+
+
 async def calculate_latency_text_endpoints(context: RequestContext, status_code: int):
     """Calculate additional latency that should be applied"""
     if status_code >= 300:
@@ -179,24 +193,28 @@ async def calculate_latency_text_endpoints(context: RequestContext, status_code:
 
     operation_name = context.values.get(constants.SIMULATOR_KEY_OPERATION_NAME)
     config = context.config
+    latency_profile = _get_latency_profile(context)
 
     # Determine the target latency for the request
     completion_tokens = context.values.get(constants.SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS)
-    if completion_tokens and completion_tokens > 0:
+    # embeddings don't generate completion tokens but still have a latency per request
+    if operation_name == OPENAI_OPERATION_EMBEDDINGS or (completion_tokens and completion_tokens > 0):
         target_duration_ms = None
         if operation_name == OPENAI_OPERATION_EMBEDDINGS:
             # embeddings config returns latency value to use (in milliseconds)
-            target_duration_ms = config.latency.open_ai_embeddings.get_value()
+            target_duration_ms = (latency_profile or config.latency.open_ai_embeddings).get_value()
         elif operation_name == OPENAI_OPERATION_COMPLETIONS:
             # completions config returns latency per completion token in milliseconds
-            target_duration_ms = config.latency.open_ai_completions.get_value()
+            target_duration_ms = (latency_profile or config.latency.open_ai_completions).get_value()
         elif operation_name == OPENAI_OPERATION_CHAT_COMPLETIONS:
             # chat completions config returns latency per completion token in milliseconds
-            target_duration_ms = config.latency.open_ai_chat_completions.get_value() * completion_tokens
+            target_duration_ms = (
+                latency_profile or config.latency.open_ai_chat_completions
+            ).get_value() * completion_tokens
 
         if target_duration_ms:
             # store the target duration in the context for use by the apply_latency method
-            context.values[constants.TARGET_DURATION_MS] = target_duration_ms
+            context.values[constants.TARGET_DURATION_MS] = target_duration_ms * config.latency.get_time_of_day_factor()
 
 
 async def calculate_latency_translation(context: RequestContext, status_code: int):
@@ -213,11 +231,12 @@ async def calculate_latency_translation(context: RequestContext, status_code: in
     if file_size_bytes is None:
         raise ValueError("Request file size not found in context values - unable to calculate latency")
     file_size_mb = file_size_bytes / 1024 / 1024
-    target_duration_ms = config.latency.open_ai_translations.get_value() * file_size_mb
+    latency = _get_latency_profile(context) or config.latency.open_ai_translations
+    target_duration_ms = latency.get_value() * file_size_mb
 
     if target_duration_ms:
         # store the target duration in the context for use by the apply_latency method
-        context.values[constants.TARGET_DURATION_MS] = target_duration_ms
+        context.values[constants.TARGET_DURATION_MS] = target_duration_ms * config.latency.get_time_of_day_factor()
 
 
 def create_embedding_content(index: int, embedding_size: int):
@@ -389,80 +408,16 @@ def create_chat_completion_response(
     context.values[SIMULATOR_KEY_OPENAI_TOTAL_TOKENS] = total_tokens
 
     if streaming:
-
-        async def send_words():
-            space = ""
-            role = "assistant"
-            for word in generated_content.split(" "):
-                chunk_string = json.dumps(
-                    {
-                        "id": "chatcmpl-" + nanoid.non_secure_generate(size=29),
-                        "object": "chat.completion.chunk",
-                        "created": int(time.time()),
-                        "model_name": model_name,
-                        "system_fingerprint": None,
-                        "choices": [
-                            {
-                                "delta": {
-                                    "content": space + word,
-                                    "function_call": None,
-                                    "role": role,
-                                    "tool_calls": None,
-                                    "finish_reason": None,
-                                    "index": 0,
-                                    "logprobs": None,
-                                    "content_filter_results": {
-                                        "hate": {"filtered": False, "severity": "safe"},
-                                        "self_harm": {"filtered": False, "severity": "safe"},
-                                        "sexual": {"filtered": False, "severity": "safe"},
-                                        "violence": {"filtered": False, "severity": "safe"},
-                                    },
-                                },
-                            },
-                        ],
-                    }
-                )
-                role = None
-
-                yield "data: " + chunk_string + "\n"
-                yield "\n"
-                await asyncio.sleep(0.05)
-                space = " "
-
-            chunk_string = json.dumps(
-                {
-                    "id": "chatcmpl-" + nanoid.non_secure_generate(size=29),
-                    "object": "chat.completion.chunk",
-                    "created": int(time.time()),
-                    "model_name": model_name,
-                    "system_fingerprint": None,
-                    "choices": [
-                        {
-                            "delta": {
-                                "content": None,
-                                "function_call": None,
-                                "role": None,
-                                "tool_calls": None,
-                                "finish_reason": finish_reason,
-                                "index": 0,
-                                "logprobs": None,
-                                "content_filter_results": {
-                                    "hate": {"filtered": False, "severity": "safe"},
-                                    "self_harm": {"filtered": False, "severity": "safe"},
-                                    "sexual": {"filtered": False, "severity": "safe"},
-                                    "violence": {"filtered": False, "severity": "safe"},
-                                },
-                            },
-                        },
-                    ],
-                }
-            )
-
-            yield "data: " + chunk_string + "\n"
-            yield "\n"
-            yield "[DONE]"
-
-        return StreamingResponse(content=send_words())
+        return StreamingResponse(
+            content=stream_chat_completion(
+                generated_content=generated_content,
+                model_name=model_name,
+                completion_tokens=completion_tokens,
+                finish_reason=finish_reason,
+                latency=get_streaming_latency(context, deployment_name),
+            ),
+            media_type="text/event-stream",
+        )
 
     response_body = {
         "id": "chatcmpl-" + nanoid.non_secure_generate(size=29),
@@ -517,17 +472,11 @@ def _validate_api_key_header(context: RequestContext):
     validate_api_key_header(request=request, header_name="api-key", allowed_key_value=context.config.simulator_api_key)
 
 
+@generator_route("/openai/deployments/{deployment}/embeddings", methods=["POST"])
 async def azure_openai_embedding(context: RequestContext) -> Response | None:
-    request = context.request
-    is_match, path_params = context.is_route_match(
-        request=request, path="/openai/deployments/{deployment}/embeddings", methods=["POST"]
-    )
-    if not is_match:
-        return None
-
     _validate_api_key_header(context)
-    deployment_name = path_params["deployment"]
-    request_body = await request.json()
+    deployment_name = context.path_params["deployment"]
+    request_body = await context.get_json_body()
     deployment = get_embedding_deployment_from_name(context, deployment_name)
 
     if deployment is None:
@@ -575,17 +524,11 @@ async def azure_openai_embedding(context: RequestContext) -> Response | None:
     return response
 
 
+@generator_route("/openai/deployments/{deployment}/completions", methods=["POST"])
 async def azure_openai_completion(context: RequestContext) -> Response | None:
-    request = context.request
-    is_match, path_params = context.is_route_match(
-        request=request, path="/openai/deployments/{deployment}/completions", methods=["POST"]
-    )
-    if not is_match:
-        return None
-
     _validate_api_key_header(context)
 
-    deployment_name = path_params["deployment"]
+    deployment_name = context.path_params["deployment"]
     model = get_chat_model_from_deployment_name(context, deployment_name)
     if model is None:
         return Response(
@@ -615,7 +558,7 @@ async def azure_openai_completion(context: RequestContext) -> Response | None:
                 "Content-Type": "application/json",
             },
         )
-    request_body = await request.json()
+    request_body = await context.get_json_body()
     prompt_tokens = num_tokens_from_string(request_body["prompt"], model.name)
 
     requested_max_tokens, max_tokens = get_max_completion_tokens(request_body, model.name, prompt_tokens=prompt_tokens)
@@ -638,18 +581,12 @@ async def azure_openai_completion(context: RequestContext) -> Response | None:
     return response
 
 
+@generator_route("/openai/deployments/{deployment}/chat/completions", methods=["POST"])
 async def azure_openai_chat_completion(context: RequestContext) -> Response | None:
-    request = context.request
-    is_match, path_params = context.is_route_match(
-        request=request, path="/openai/deployments/{deployment}/chat/completions", methods=["POST"]
-    )
-    if not is_match:
-        return None
-
     _validate_api_key_header(context)
 
-    request_body = await request.json()
-    deployment_name = path_params["deployment"]
+    request_body = await context.get_json_body()
+    deployment_name = context.path_params["deployment"]
     model = get_chat_model_from_deployment_name(context, deployment_name)
     if model is None:
         return Response(
@@ -698,24 +635,40 @@ async def azure_openai_chat_completion(context: RequestContext) -> Response | No
         prompt_messages=messages,
     )
 
-    # calculate a simulated latency and store in context.values
-    # needs to be called after the response has been created
-    await calculate_latency_text_endpoints(context, 200)
+    if not streaming:
+        # calculate a simulated latency and store in context.values
+        # needs to be called after the response has been created
+        # (streamed responses are paced by the streaming engine instead)
+        await calculate_latency_text_endpoints(context, 200)
 
     return response
 
 
-async def azure_openai_translation(context: RequestContext) -> Response | None:
-    request = context.request
-    is_match, path_params = context.is_route_match(
-        request=request, path="/openai/deployments/{deployment}/audio/translations", methods=["POST"]
+def _translation_bad_request(message: str) -> Response:
+    return Response(
+        status_code=400,
+        content=json.dumps(
+            {
+                "error": {
+                    "message": message,
+                    "type": "invalid_request_error",
+                    "param": "null",
+                    "code": "null",
+                }
+            }
+        ),
+        headers={
+            "Content-Type": "application/json",
+        },
     )
-    if not is_match:
-        return None
 
+
+@generator_route("/openai/deployments/{deployment}/audio/translations", methods=["POST"])
+async def azure_openai_translation(context: RequestContext) -> Response | None:
+    request = context.request
     _validate_api_key_header(context)
 
-    deployment_name = path_params["deployment"]
+    deployment_name = context.path_params["deployment"]
     model = get_whisper_model_from_deployment_name(context, deployment_name)
     if model is None:
         return Response(
@@ -725,11 +678,17 @@ async def azure_openai_translation(context: RequestContext) -> Response | None:
                 "Content-Type": "application/json",
             },
         )
-    request_form = await request.form()
-    audio_file = request_form["file"]
-    response_format = request_form["response_format"]
-
-    file_size = len(audio_file.file.read())
+    # stream the form rather than using request.form() to avoid holding the audio file in memory
+    try:
+        request_form = await parse_multipart_form(request)
+    except MultipartFormError as e:
+        return _translation_bad_request(str(e))
+    audio_file = request_form.files.get("file")
+    if audio_file is None:
+        return _translation_bad_request("'file' is a required property")
+    response_format = request_form.fields.get("response_format", "json")
+
+    file_size = audio_file.size
     context.values[SIMULATOR_KEY_OPENAI_REQUEST_FILE_SIZE_BYTES] = file_size
 
     if file_size == 0 or file_size > 26214400:
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import time
+from json.encoder import encode_basestring_ascii
+from typing import AsyncIterator
+
+import nanoid
+from aoai_api_simulator.models import RequestContext, StreamingLatency
+
+# This file contains the streaming engine used for streamed chat completions.
+#
+# Serialising a full chat.completion.chunk payload per token is expensive when driving
+# thousands of concurrent streams, so the chunk payload is serialised once (at import time)
+# with placeholders. Each stream binds its id/created/model values once, and each token
+# only needs its content escaped and concatenated between a pre-built prefix and suffix.
+
+_PLACEHOLDER_ID = "@@id@@"
+_PLACEHOLDER_CREATED = "@@created@@"
+_PLACEHOLDER_MODEL = "@@model@@"
+_PLACEHOLDER_CONTENT = "@@content@@"
+_PLACEHOLDER_ROLE = "@@role@@"
+_PLACEHOLDER_FINISH_REASON = "@@finish_reason@@"
+
+_chunk_template = json.dumps(
+    {
+        "id": _PLACEHOLDER_ID,
+        "object": "chat.completion.chunk",
+        "created": _PLACEHOLDER_CREATED,
+        "model_name": _PLACEHOLDER_MODEL,
+        "system_fingerprint": None,
+        "choices": [
+            {
+                "delta": {
+                    "content": _PLACEHOLDER_CONTENT,
+                    "function_call": None,
+                    "role": _PLACEHOLDER_ROLE,
+                    "tool_calls": None,
+                    "finish_reason": _PLACEHOLDER_FINISH_REASON,
+                    "index": 0,
+                    "logprobs": None,
+                    "content_filter_results": {
+                        "hate": {"filtered": False, "severity": "safe"},
+                        "self_harm": {"filtered": False, "severity": "safe"},
+                        "sexual": {"filtered": False, "severity": "safe"},
+                        "violence": {"filtered": False, "severity": "safe"},
+                    },
+                },
+            },
+        ],
+    }
+)
+
+_DONE_EVENT = b"data: [DONE]\n\n"
+
+
+def _json_value(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    return json.dumps(value)
+
+
+class ChunkTemplate:
+    """
+    A chat.completion.chunk SSE event with all values except the content bound.
+    Rendering a chunk is a single escape of the content plus a concatenation.
+    """
+
+    _prefix: bytes
+    _suffix: bytes
+
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
+    def __init__(self, stream_id: str, created: int, model_name: str, role: str | None, finish_reason: str | None):
+        bound = (
+            _chunk_template.replace(json.dumps(_PLACEHOLDER_ID), _json_value(stream_id))
+            .replace(json.dumps(_PLACEHOLDER_CREATED), _json_value(created))
+            .replace(json.dumps(_PLACEHOLDER_MODEL), _json_value(model_name))
+            .replace(json.dumps(_PLACEHOLDER_ROLE), _json_value(role))
+            .replace(json.dumps(_PLACEHOLDER_FINISH_REASON), _json_value(finish_reason))
+        )
+        prefix, suffix = bound.split(json.dumps(_PLACEHOLDER_CONTENT))
+        self._prefix = ("data: " + prefix).encode("utf-8")
+        self._suffix = (suffix + "\n\n").encode("utf-8")
+
+    def render(self, content: str | None) -> bytes:
+        # encode_basestring_ascii output is pure ASCII so can be encoded without a codec lookup
+        return self._prefix + _json_value(content).encode("ascii") + self._suffix
+
+
+def get_streaming_latency(context: RequestContext, deployment_name: str) -> StreamingLatency:
+    """
+    Gets the streaming latency for a deployment,
+    falling back to the global streaming latency if the deployment doesn't override it
+    (scaled by the time-of-day curve if one is configured)
+    """
+    latency = context.config.latency.open_ai_chat_completions_streaming
+    deployments = context.config.openai_deployments
+    if deployments:
+        deployment = deployments.get(deployment_name)
+        if deployment and deployment.streaming_latency:
+            latency = deployment.streaming_latency
+
+    factor = context.config.latency.get_time_of_day_factor()
+    if factor != 1.0:
+        latency = latency.model_copy(
+            update={
+                "time_to_first_token_mean": latency.time_to_first_token_mean * factor,
+                "time_to_first_token_std_dev": latency.time_to_first_token_std_dev * factor,
+                "inter_token_mean": latency.inter_token_mean * factor,
+                "inter_token_std_dev": latency.inter_token_std_dev * factor,
+            }
+        )
+    return latency
+
+
+async def paced_words(
+    generated_content: str, completion_tokens: int, latency: StreamingLatency
+) -> AsyncIterator[tuple[int, str]]:
+    """
+    Yields (index, word) for each word of the generated content (words after the first include the leading space).
+
+    The first word is yielded after the time-to-first-token delay and subsequent words are paced
+    using the inter-token latency (scaled by the number of tokens each word represents).
+    Delays are scheduled against absolute deadlines so that timer overhead doesn't accumulate
+    over long streams.
+    """
+    words = generated_content.split(" ")
+    tokens_per_chunk = completion_tokens / len(words) if completion_tokens else 1
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + latency.get_time_to_first_token() / 1000
+
+    space = ""
+    for index, word in enumerate(words):
+        delay = deadline - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        yield index, space + word
+
+        space = " "
+        deadline += latency.get_inter_token() * tokens_per_chunk / 1000
+
+
+async def stream_chat_completion(
+    generated_content: str,
+    model_name: str,
+    completion_tokens: int,
+    finish_reason: str,
+    latency: StreamingLatency,
+) -> AsyncIterator[bytes]:
+    """
+    Streams the generated content as chat.completion.chunk SSE events (paced by paced_words)
+    """
+    stream_id = "chatcmpl-" + nanoid.non_secure_generate(size=29)
+    created = int(time.time())
+    first_chunk = ChunkTemplate(stream_id, created, model_name, role="assistant", finish_reason=None)
+    content_chunk = ChunkTemplate(stream_id, created, model_name, role=None, finish_reason=None)
+    final_chunk = ChunkTemplate(stream_id, created, model_name, role=None, finish_reason=finish_reason)
+
+    async for index, word in paced_words(generated_content, completion_tokens, latency):
+        chunk = first_chunk if index == 0 else content_chunk
+        yield chunk.render(word)
+
+    yield final_chunk.render(None)
+    yield _DONE_EVENT
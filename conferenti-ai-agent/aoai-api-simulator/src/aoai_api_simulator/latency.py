@@ -1,10 +1,14 @@
 import asyncio
 import time
+from typing import AsyncIterator
 
 from aoai_api_simulator import constants
 from aoai_api_simulator.metrics import simulator_metrics
 from aoai_api_simulator.models import RequestContext
+from aoai_api_simulator.stats import simulator_stats
 from fastapi import Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 
 class LatencyGenerator:
@@ -12,25 +16,40 @@ class LatencyGenerator:
     LatencyGenerator is a context manager that adds simulated latency to the response.
     The latency added is based on the context.values[TARGET_DURATION_MS] value.
     Additionaly, the generator emits metrics for the response (base latency and added latency).
+    A streamed response stays in flight, and its full latency is observed, when its body has been sent
+    (or the stream is closed) rather than when the handler returns it.
     """
 
     __context: RequestContext
     __start_time: float
     __response: Response | None
+    __base_duration_s: float | None
+    __finished: bool
 
     def __init__(self, context: RequestContext):
         self.__context = context
         self.__response = None
+        self.__base_duration_s = None
+        self.__finished = False
 
     def set_response(self, response: Response):
         self.__response = response
 
     async def __aenter__(self):
         self.__start_time = time.perf_counter()
+        simulator_stats.in_flight += 1
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        await self.apply_latency()
+        try:
+            await self.apply_latency()
+        except BaseException:
+            self.__finish(record=False)
+            raise
+        if isinstance(self.__response, StreamingResponse):
+            self.__finish_when_streamed(self.__response)
+        else:
+            self.__finish()
 
     async def apply_latency(self):
         """Apply additional latency to the request if required"""
@@ -42,12 +61,9 @@ class LatencyGenerator:
         extra_latency_s = 0
         base_end_time = time.perf_counter()
         base_duration_s = base_end_time - self.__start_time
+        self.__base_duration_s = base_duration_s
 
         deployment_name = self.__context.values.get(constants.SIMULATOR_KEY_DEPLOYMENT_NAME)
-        prompt_tokens_used = self.__context.values.get(constants.SIMULATOR_KEY_OPENAI_PROMPT_TOKENS, 0)
-        completion_tokens_used = self.__context.values.get(constants.SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS, 0)
-        rate_limit_tokens = self.__context.values.get(constants.SIMULATOR_KEY_OPENAI_RATE_LIMIT_TOKENS, 0)
-
         status_code = self.__response.status_code
         if status_code < 300:
             target_duration_ms = self.__context.values.get(constants.TARGET_DURATION_MS, None)
@@ -55,10 +71,63 @@ class LatencyGenerator:
                 target_duration_s = target_duration_ms / 1000
                 extra_latency_s = target_duration_s - base_duration_s
 
+        deployment_stats = simulator_stats.get_deployment_stats(deployment_name)
         if extra_latency_s and extra_latency_s > 0:
-            await asyncio.sleep(extra_latency_s)
+            deployment_stats.queued += 1
+            try:
+                await asyncio.sleep(extra_latency_s)
+            finally:
+                deployment_stats.queued -= 1
+
+    def __finish_when_streamed(self, response: StreamingResponse):
+        """Finish the request once the response body has been streamed or the stream is closed"""
+        response.body_iterator = self.__observe_stream(response.body_iterator)
+
+        # A stream that is never started (e.g. the client disconnected first) isn't closed,
+        # but the response's background task is still run
+        background = response.background
+
+        async def finish_and_run_background():
+            self.__finish()
+            if background is not None:
+                await background()
+
+        response.background = BackgroundTask(finish_and_run_background)
+
+    async def __observe_stream(self, body_iterator: AsyncIterator) -> AsyncIterator:
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            self.__finish()
+            if hasattr(body_iterator, "aclose"):
+                await body_iterator.aclose()
+
+    def __finish(self, record: bool = True):
+        """Record the request (once) and take it out of the in-flight count"""
+        if self.__finished:
+            return
+        self.__finished = True
+        simulator_stats.in_flight -= 1
+        if record and self.__base_duration_s is not None:
+            self.__record(self.__base_duration_s, time.perf_counter() - self.__start_time)
 
-        full_end_time = time.perf_counter()
+    def __record(self, base_duration_s: float, full_duration_s: float):
+        """Emit the stats and metrics for the response"""
+        deployment_name = self.__context.values.get(constants.SIMULATOR_KEY_DEPLOYMENT_NAME)
+        prompt_tokens_used = self.__context.values.get(constants.SIMULATOR_KEY_OPENAI_PROMPT_TOKENS, 0)
+        completion_tokens_used = self.__context.values.get(constants.SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS, 0)
+        rate_limit_tokens = self.__context.values.get(constants.SIMULATOR_KEY_OPENAI_RATE_LIMIT_TOKENS, 0)
+        status_code = self.__response.status_code
+
+        simulator_stats.record_request(
+            deployment_name,
+            status_code,
+            base_duration_s,
+            full_duration_s,
+            prompt_tokens_used,
+            completion_tokens_used,
+        )
         simulator_metrics.histogram_latency_base.record(
             base_duration_s,
             attributes={
@@ -67,7 +136,7 @@ class LatencyGenerator:
             },
         )
         simulator_metrics.histogram_latency_full.record(
-            (full_end_time - self.__start_time),
+            full_duration_s,
             attributes={
                 "status_code": status_code,
                 "deployment": deployment_name,
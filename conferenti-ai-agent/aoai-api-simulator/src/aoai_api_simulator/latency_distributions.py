@@ -0,0 +1,85 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+# This file contains the distributions used to sample simulated latencies.
+#
+# normal: the original behaviour (clamped at zero)
+# lognormal/gamma: right-skewed distributions parameterised by mean and standard deviation
+#   (lognormal can also be fitted to observed p50/p99 values with lognormal_from_percentiles)
+# empirical: samples from evenly spaced quantiles of observed latencies (e.g. derived from recordings
+#   with `python -m aoai_api_simulator.record_replay.latency_profile`), interpolating between adjacent quantiles
+#
+# Time-of-day curves give a latency multiplier for each hour of the day to reproduce daily load patterns.
+
+DISTRIBUTIONS = ["normal", "lognormal", "gamma", "empirical"]
+DISTRIBUTION_PATTERN = "^(" + "|".join(DISTRIBUTIONS) + ")$"
+
+# z-score for the 99th percentile of the standard normal distribution
+_Z_99 = 2.3263478740408408
+
+
+def sample_latency(distribution: str, mean: float, std_dev: float, quantiles: list[float] | None = None) -> float:
+    """Samples a (non-negative) latency value from the distribution"""
+    if distribution == "empirical":
+        if not quantiles:
+            raise ValueError("empirical latency distribution requires quantiles")
+        if len(quantiles) == 1:
+            return quantiles[0]
+        position = random.random() * (len(quantiles) - 1)
+        index = int(position)
+        lower = quantiles[index]
+        return lower + (quantiles[index + 1] - lower) * (position - index)
+
+    if mean <= 0:
+        return 0.0
+    if std_dev <= 0:
+        return mean
+
+    if distribution == "lognormal":
+        sigma_squared = math.log(1 + (std_dev / mean) ** 2)
+        return random.lognormvariate(math.log(mean) - sigma_squared / 2, math.sqrt(sigma_squared))
+    if distribution == "gamma":
+        shape = (mean / std_dev) ** 2
+        return random.gammavariate(shape, std_dev**2 / mean)
+    return max(0.0, random.normalvariate(mean, std_dev))
+
+
+def lognormal_from_percentiles(p50: float, p99: float) -> tuple[float, float]:
+    """Returns the (mean, std_dev) of the log-normal distribution with the given median and 99th percentile"""
+    if p50 <= 0 or p99 < p50:
+        raise ValueError(f"invalid percentiles for a log-normal distribution (p50={p50}, p99={p99})")
+    mu = math.log(p50)
+    sigma = (math.log(p99) - mu) / _Z_99
+    mean = math.exp(mu + sigma**2 / 2)
+    return mean, mean * math.sqrt(math.exp(sigma**2) - 1)
+
+
+def quantiles_from_values(values: list[float], count: int = 101) -> list[float]:
+    """Returns count evenly spaced quantiles (from the minimum to the maximum) of the values"""
+    if not values:
+        raise ValueError("no values to calculate quantiles from")
+    values = sorted(values)
+    if len(values) == 1:
+        return [values[0]] * count
+    quantiles = []
+    for i in range(count):
+        position = i * (len(values) - 1) / (count - 1)
+        index = min(int(position), len(values) - 2)
+        lower = values[index]
+        quantiles.append(lower + (values[index + 1] - lower) * (position - index))
+    return quantiles
+
+
+def get_time_of_day_factor(curve: list[float] | None, utc_offset_hours: float, now: datetime | None = None) -> float:
+    """
+    Returns the latency multiplier for the current time from a curve of 24 hourly values
+    (the value for each hour applies at the start of the hour and is interpolated to the next hour)
+    """
+    if not curve:
+        return 1.0
+    now = (now or datetime.now(timezone.utc)) + timedelta(hours=utc_offset_hours)
+    position = now.hour + now.minute / 60 + now.second / 3600
+    index = int(position) % 24
+    lower = curve[index]
+    return lower + (curve[(index + 1) % 24] - lower) * (position - int(position))
@@ -4,15 +4,17 @@ import logging
 import math
 import time
 from dataclasses import dataclass
-from typing import Awaitable, Callable
+from typing import Awaitable
 
 from aoai_api_simulator import constants
 from aoai_api_simulator.metrics import simulator_metrics
 from aoai_api_simulator.models import (
     Config,
     OpenAIDeployment,
+    ProvisionedThroughput,
     RequestContext,
 )
+from aoai_api_simulator.responses import close_response
 from fastapi import Response
 
 logger = logging.getLogger(__name__)
@@ -25,6 +27,8 @@ async def apply_limits(context: RequestContext, response: Response) -> Awaitable
         limit_response = limiter(context, response)
         if limit_response and inspect.isawaitable(limit_response):
             limit_response = await limit_response
+        if limit_response is not response:
+            await close_response(response)
         return limit_response
 
     logger.info("No limiter found for response: %s [limiter name: %s]", context.request.url.path, limiter_name)
@@ -51,8 +55,13 @@ async def determine_token_cost(context: RequestContext):
 
     # Check whether the request has set max_tokens
     # If so, use that as the rate-limiting token value
-    request_body = await context.request.json()
+    request_body = await context.get_json_body()
     max_tokens = request_body.get("max_tokens")
+    if max_tokens is None:
+        # Ollama requests set the max tokens via options.num_predict (-1 means no limit)
+        num_predict = (request_body.get("options") or {}).get("num_predict")
+        if num_predict is not None and num_predict > 0:
+            max_tokens = num_predict
     if max_tokens:
         token_cost = max_tokens
     else:
@@ -72,8 +81,8 @@ async def determine_token_cost(context: RequestContext):
         elif operation_name == constants.OPENAI_OPERATION_COMPLETIONS:
             token_cost = 16
         elif operation_name == constants.OPENAI_OPERATION_EMBEDDINGS:
-            request_body = await context.request.json()
-            request_input = request_body.get("input")
+            # Ollama embedding requests pass the text as prompt rather than input
+            request_input = request_body.get("input", request_body.get("prompt"))
             if request_input is None:
                 logger.warning("openai_limiter: input not found in request body for embedding request")
                 token_cost = 0
@@ -128,6 +137,32 @@ class TokensPerMinuteSlidingWindow:
         while len(self._requests) > 0 and self._requests[0].timestamp <= cut_off:
             self._requests.pop(0)
 
+    @property
+    def requests_per_10_seconds(self) -> int:
+        return self._requests_per_10_seconds
+
+    @property
+    def tokens_per_minute(self) -> int:
+        return self._tokens_per_minute
+
+    def update_limits(self, requests_per_10_seconds: int, tokens_per_minute: int):
+        """
+        Update the limits, keeping the requests already in the window
+        """
+        self._requests_per_10_seconds = requests_per_10_seconds
+        self._tokens_per_minute = tokens_per_minute
+
+    def get_usage(self, timestamp: float = -1) -> tuple[int, int]:
+        """
+        Returns the number of requests in the last 10 seconds and the number of tokens in the last minute
+        """
+        if timestamp == -1:
+            timestamp = time.time()
+        self._purge(timestamp - 60)
+        request_count = sum(1 for request in self._requests if request.timestamp > timestamp - 10)
+        token_count = sum(request.token_cost for request in self._requests)
+        return request_count, token_count
+
     def _calculate_window_counts_for_request(self, token_cost: int, timestamp: float) -> tuple[int, int, float, float]:
         # Iterate the the list in reverse order
         # Track:
@@ -255,6 +290,25 @@ class RequestsPerMinuteSlidingWindow:
         while len(self._requests) > 0 and self._requests[0].timestamp <= cut_off:
             self._requests.pop(0)
 
+    @property
+    def requests_per_minute(self) -> int:
+        return self._requests_per_minute
+
+    def update_limits(self, requests_per_minute: int):
+        """
+        Update the limit, keeping the requests already in the window
+        """
+        self._requests_per_minute = requests_per_minute
+
+    def get_usage(self, timestamp: float = -1) -> int:
+        """
+        Returns the number of requests in the last minute
+        """
+        if timestamp == -1:
+            timestamp = time.time()
+        self._purge(timestamp - 60)
+        return len(self._requests)
+
     def add_request(self, timestamp: float = -1) -> WindowAddResult:
         """
         Add a request to the window
@@ -285,31 +339,235 @@ class RequestsPerMinuteSlidingWindow:
         )
 
 
-def create_openai_tokens_limiter(
-    deployments: dict[str, OpenAIDeployment],
-) -> Callable[[RequestContext, Response], Response | None]:
-    # dict of TokensPerMinuteSlidingWindow objects keyed on deployment name
-    deployment_limits: dict[str, TokensPerMinuteSlidingWindow] = {}
+@dataclass
+class UtilizationAddResult:
+    success: bool
+    utilization: float  # percentage of the provisioned throughput
+    retry_after_ms: int | None
+
+
+class ProvisionedThroughputBucket:
+    """
+    Leaky-bucket estimate of the utilization of a provisioned throughput (PTU) deployment
+
+    Each accepted request adds its weighted token cost to the bucket, which drains at the provisioned
+    tokens-per-minute rate. As with Azure OpenAI PTU deployments, requests are accepted while the
+    utilization is below 100% (so a large request can take the utilization above 100%)
+    and rejected until the bucket has drained back below 100%
+    """
+
+    _capacity: float
+    _drain_per_second: float
+    _level: float
+    _last_update: float | None
+
+    def __init__(self, tokens_per_minute: float):
+        self._capacity = tokens_per_minute
+        self._drain_per_second = tokens_per_minute / 60
+        self._level = 0
+        self._last_update = None
+
+    def _drain(self, timestamp: float):
+        if self._last_update is not None and timestamp > self._last_update:
+            self._level = max(0, self._level - (timestamp - self._last_update) * self._drain_per_second)
+        self._last_update = timestamp
+
+    @property
+    def tokens_per_minute(self) -> float:
+        return self._capacity
+
+    def update_limits(self, tokens_per_minute: float, timestamp: float = -1):
+        """
+        Update the provisioned tokens per minute, keeping the current bucket level
+        """
+        # drain at the previous rate up to the time of the change
+        self.get_utilization(timestamp)
+        self._capacity = tokens_per_minute
+        self._drain_per_second = tokens_per_minute / 60
+
+    def get_utilization(self, timestamp: float = -1) -> float:
+        if timestamp == -1:
+            timestamp = time.time()
+        self._drain(timestamp)
+        return self._level / self._capacity * 100
+
+    def add_request(self, token_cost: float, timestamp: float = -1) -> UtilizationAddResult:
+        """
+        Add a request to the bucket
+        """
+        utilization = self.get_utilization(timestamp)
+        if self._level >= self._capacity:
+            # time for the bucket to drain to just below capacity
+            retry_after_ms = math.ceil((self._level - self._capacity) / self._drain_per_second * 1000) + 1
+            return UtilizationAddResult(success=False, utilization=utilization, retry_after_ms=retry_after_ms)
+
+        self._level += token_cost
+        return UtilizationAddResult(success=True, utilization=self._level / self._capacity * 100, retry_after_ms=None)
+
+
+def _log_missing_deployment(deployment_name: str | None):
+    if not deployment_warnings_issues.get(deployment_name):
+        logger.warning("Deployment %s not found in limiters - not applying rate limits", deployment_name)
+        deployment_warnings_issues[deployment_name] = True
+
+
+class OpenAIPtuLimiter:
+    """
+    Limits provisioned throughput (PTU) deployments based on a leaky-bucket utilization estimate
+
+    Limiters are reconfigured in place when the config is patched so that the accumulated
+    utilization is kept when the provisioned throughput of a deployment changes
+    """
 
-    for deployment in deployments.values():
-        # only handle token-based limited models
-        if deployment.model.is_token_limited:
-            tokens_per_minute = deployment.tokens_per_minute
-            requests_per_10s = math.ceil(tokens_per_minute / 1000)  # 1/6 * (6 * TPM / 1000)
-            deployment_limits[deployment.name] = TokensPerMinuteSlidingWindow(
-                requests_per_10_seconds=requests_per_10s, tokens_per_minute=tokens_per_minute
+    _buckets: dict[str, ProvisionedThroughputBucket]
+    _provisioned_throughputs: dict[str, ProvisionedThroughput]
+
+    def __init__(self, deployments: dict[str, OpenAIDeployment]):
+        self._buckets = {}
+        self._provisioned_throughputs = {}
+        self.reconfigure(deployments)
+
+    def reconfigure(self, deployments: dict[str, OpenAIDeployment]):
+        buckets = {}
+        provisioned_throughputs = {}
+        for deployment in deployments.values():
+            if deployment.provisioned_throughput:
+                tokens_per_minute = deployment.provisioned_throughput.tokens_per_minute
+                bucket = self._buckets.get(deployment.name)
+                if bucket:
+                    bucket.update_limits(tokens_per_minute)
+                else:
+                    bucket = ProvisionedThroughputBucket(tokens_per_minute)
+                buckets[deployment.name] = bucket
+                provisioned_throughputs[deployment.name] = deployment.provisioned_throughput
+        self._buckets = buckets
+        self._provisioned_throughputs = provisioned_throughputs
+
+    def get_utilization(self) -> dict[str, dict]:
+        return {
+            deployment_name: {
+                "limiter": "openai-ptu",
+                "tokens_per_minute": bucket.tokens_per_minute,
+                "utilization": round(bucket.get_utilization(), 2),
+            }
+            for deployment_name, bucket in self._buckets.items()
+        }
+
+    async def __call__(self, context: RequestContext, response: Response) -> Response:
+        deployment_name = context.values.get(constants.SIMULATOR_KEY_DEPLOYMENT_NAME)
+        bucket = self._buckets.get(deployment_name)
+        if not bucket:
+            _log_missing_deployment(deployment_name)
+            return response
+
+        # PTU utilization is based on the prompt and completion tokens processed
+        # (with completion tokens weighted as they are more expensive to generate)
+        prompt_tokens = context.values.get(constants.SIMULATOR_KEY_OPENAI_PROMPT_TOKENS, 0)
+        completion_tokens = context.values.get(constants.SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS, 0)
+        completion_token_weight = self._provisioned_throughputs[deployment_name].completion_token_weight
+        token_cost = prompt_tokens + completion_tokens * completion_token_weight
+        context.values[constants.SIMULATOR_KEY_OPENAI_RATE_LIMIT_TOKENS] = token_cost
+
+        bucket_result = bucket.add_request(token_cost=token_cost)
+        utilization_header = f"{bucket_result.utilization:.1f}%"
+        if not bucket_result.success:
+            simulator_metrics.histogram_rate_limit.record(
+                token_cost,
+                attributes={
+                    "deployment": deployment_name,
+                    "reason": "utilization",
+                },
             )
 
-    async def limiter(context: RequestContext, response: Response) -> Awaitable[Response]:
+            retry_after = math.ceil(bucket_result.retry_after_ms / 1000)
+            content = {
+                "error": {
+                    "code": "429",
+                    "message": "Requests to the OpenAI API Simulator have exceeded the provisioned throughput "
+                    + f"utilization of the deployment. Please retry after {retry_after} seconds.",
+                }
+            }
+            return Response(
+                status_code=429,
+                content=json.dumps(content),
+                headers={
+                    "Retry-After": str(retry_after),
+                    "retry-after-ms": str(bucket_result.retry_after_ms),
+                    "azure-openai-deployment-utilization": utilization_header,
+                },
+            )
+        response.headers["azure-openai-deployment-utilization"] = utilization_header
+        return response
+
+
+class OpenAITokensLimiter:
+    """
+    Limits token-based deployments on tokens-per-minute and requests-per-10-seconds
+    (provisioned throughput deployments are passed to the PTU limiter)
+
+    Limiters are reconfigured in place when the config is patched so that the requests already
+    in the sliding windows are kept when the tokens-per-minute of a deployment changes
+    """
+
+    _windows: dict[str, TokensPerMinuteSlidingWindow]
+    _ptu_limiter: OpenAIPtuLimiter
+    _ptu_deployment_names: set[str]
+
+    def __init__(self, deployments: dict[str, OpenAIDeployment]):
+        self._windows = {}
+        self._ptu_limiter = OpenAIPtuLimiter(deployments)
+        self._ptu_deployment_names = set()
+        self.reconfigure(deployments)
+
+    def reconfigure(self, deployments: dict[str, OpenAIDeployment]):
+        windows = {}
+        for deployment in deployments.values():
+            # only handle token-based limited models (provisioned throughput deployments use the PTU limiter)
+            if deployment.model.is_token_limited and not deployment.provisioned_throughput:
+                tokens_per_minute = deployment.tokens_per_minute
+                requests_per_10s = math.ceil(tokens_per_minute / 1000)  # 1/6 * (6 * TPM / 1000)
+                window = self._windows.get(deployment.name)
+                if window:
+                    window.update_limits(requests_per_10_seconds=requests_per_10s, tokens_per_minute=tokens_per_minute)
+                else:
+                    window = TokensPerMinuteSlidingWindow(
+                        requests_per_10_seconds=requests_per_10s, tokens_per_minute=tokens_per_minute
+                    )
+                windows[deployment.name] = window
+        self._windows = windows
+        self._ptu_limiter.reconfigure(deployments)
+        self._ptu_deployment_names = {
+            deployment.name for deployment in deployments.values() if deployment.provisioned_throughput
+        }
+
+    def get_utilization(self) -> dict[str, dict]:
+        utilization = {}
+        for deployment_name, window in self._windows.items():
+            request_count, token_count = window.get_usage()
+            utilization[deployment_name] = {
+                "limiter": constants.LIMITER_OPENAI_TOKENS,
+                "tokens_per_minute": window.tokens_per_minute,
+                "tokens_used": token_count,
+                "requests_per_10_seconds": window.requests_per_10_seconds,
+                "requests_used": request_count,
+                "utilization": (
+                    round(token_count / window.tokens_per_minute * 100, 2) if window.tokens_per_minute else None
+                ),
+            }
+        utilization.update(self._ptu_limiter.get_utilization())
+        return utilization
+
+    async def __call__(self, context: RequestContext, response: Response) -> Response:
         deployment_name = context.values.get(constants.SIMULATOR_KEY_DEPLOYMENT_NAME)
         if not deployment_name:
             logger.warning("openai_limiter: deployment name not found in context")
 
-        window: TokensPerMinuteSlidingWindow = deployment_limits.get(deployment_name)
+        if deployment_name in self._ptu_deployment_names:
+            return await self._ptu_limiter(context, response)
+
+        window = self._windows.get(deployment_name)
         if not window:
-            if not deployment_warnings_issues.get(deployment_name):
-                logger.warning("Deployment %s not found in limiters - not applying rate limits", deployment_name)
-                deployment_warnings_issues[deployment_name] = True
+            _log_missing_deployment(deployment_name)
             return response
 
         token_cost = await determine_token_cost(context)
@@ -347,31 +605,56 @@ def create_openai_tokens_limiter(
         response.headers["x-ratelimit-remaining-requests"] = str(window_result.remaining_requests)
         return response
 
-    return limiter
 
+class OpenAIRequestsLimiter:
+    """
+    Limits request-based deployments (e.g. whisper) on requests-per-minute
+
+    Limiters are reconfigured in place when the config is patched so that the requests already
+    in the sliding windows are kept when the requests-per-minute of a deployment changes
+    """
+
+    _windows: dict[str, RequestsPerMinuteSlidingWindow]
 
-def create_openai_requests_limiter(
-    deployments: dict[str, OpenAIDeployment],
-) -> Callable[[RequestContext, Response], Response | None]:
-    # dict of RequestsPerMinuteSlidingWindow objects keyed on deployment name
-    deployment_limits: dict[str, RequestsPerMinuteSlidingWindow] = {}
+    def __init__(self, deployments: dict[str, OpenAIDeployment]):
+        self._windows = {}
+        self.reconfigure(deployments)
 
-    for deployment in deployments.values():
-        # only handle request-based limited models
-        if not deployment.model.is_token_limited:
-            requests_per_minute = deployment.requests_per_minute
-            deployment_limits[deployment.name] = RequestsPerMinuteSlidingWindow(requests_per_minute)
+    def reconfigure(self, deployments: dict[str, OpenAIDeployment]):
+        windows = {}
+        for deployment in deployments.values():
+            # only handle request-based limited models
+            if not deployment.model.is_token_limited:
+                window = self._windows.get(deployment.name)
+                if window:
+                    window.update_limits(deployment.requests_per_minute)
+                else:
+                    window = RequestsPerMinuteSlidingWindow(deployment.requests_per_minute)
+                windows[deployment.name] = window
+        self._windows = windows
+
+    def get_utilization(self) -> dict[str, dict]:
+        utilization = {}
+        for deployment_name, window in self._windows.items():
+            request_count = window.get_usage()
+            utilization[deployment_name] = {
+                "limiter": constants.LIMITER_OPENAI_REQUESTS,
+                "requests_per_minute": window.requests_per_minute,
+                "requests_used": request_count,
+                "utilization": (
+                    round(request_count / window.requests_per_minute * 100, 2) if window.requests_per_minute else None
+                ),
+            }
+        return utilization
 
-    async def limiter(context: RequestContext, response: Response) -> Awaitable[Response]:
+    async def __call__(self, context: RequestContext, response: Response) -> Response:
         deployment_name = context.values.get(constants.SIMULATOR_KEY_DEPLOYMENT_NAME)
         if not deployment_name:
             logger.warning("openai_limiter: deployment name not found in context")
 
-        window: RequestsPerMinuteSlidingWindow = deployment_limits.get(deployment_name)
+        window = self._windows.get(deployment_name)
         if not window:
-            if not deployment_warnings_issues.get(deployment_name):
-                logger.warning("Deployment %s not found in limiters - not applying rate limits", deployment_name)
-                deployment_warnings_issues[deployment_name] = True
+            _log_missing_deployment(deployment_name)
             return response
 
         window_result = window.add_request()
@@ -402,15 +685,44 @@ def create_openai_requests_limiter(
         response.headers["x-ratelimit-remaining-requests"] = str(window_result.remaining_requests)
         return response
 
-    return limiter
 
+def create_openai_tokens_limiter(deployments: dict[str, OpenAIDeployment]) -> OpenAITokensLimiter:
+    return OpenAITokensLimiter(deployments)
+
+
+def create_openai_requests_limiter(deployments: dict[str, OpenAIDeployment]) -> OpenAIRequestsLimiter:
+    return OpenAIRequestsLimiter(deployments)
 
-def get_default_limiters(config: Config):
+
+def get_default_limiters(config: Config, existing_limiters: dict | None = None):
     # Dictionary of limiters keyed by name
     # Each limiter is a function that takes a response and returns a boolean indicating
     # whether the request should be allowed
     # Limiter returns Response object if request should be blocked or None otherwise
-    return {
-        constants.LIMITER_OPENAI_TOKENS: create_openai_tokens_limiter(config.openai_deployments or {}),
-        constants.LIMITER_OPENAI_REQUESTS: create_openai_requests_limiter(config.openai_deployments or {}),
-    }
+    #
+    # Limiters that support reconfigure (i.e. the default limiters) are updated in place
+    # when existing_limiters is passed (e.g. when the config is patched) to keep their window state
+    deployments = config.openai_deployments or {}
+    limiters = {}
+    for name, create_limiter in [
+        (constants.LIMITER_OPENAI_TOKENS, create_openai_tokens_limiter),
+        (constants.LIMITER_OPENAI_REQUESTS, create_openai_requests_limiter),
+    ]:
+        existing_limiter = (existing_limiters or {}).get(name)
+        if hasattr(existing_limiter, "reconfigure"):
+            existing_limiter.reconfigure(deployments)
+            limiters[name] = existing_limiter
+        else:
+            limiters[name] = create_limiter(deployments)
+    return limiters
+
+
+def get_limiter_utilization(limiters: dict) -> dict[str, dict]:
+    """
+    Returns a snapshot of the current utilization of each deployment (for limiters that support it)
+    """
+    utilization = {}
+    for limiter in limiters.values():
+        if hasattr(limiter, "get_utilization"):
+            utilization.update(limiter.get_utilization())
+    return utilization
@@ -0,0 +1,150 @@
+"""
+Load generator for the aoai-api-simulator (Azure OpenAI and Ollama APIs) and the Conferenti agent API.
+
+Runs one or more scenarios with closed-loop (fixed concurrency) or open-loop (Poisson arrivals)
+load and reports throughput, latency percentiles, time to first token, 429 ratio and token rates
+as a console table and (optionally) JSON. Pass a previous JSON report as --baseline to fail
+(exit code 1) when throughput or p99 latency regresses by more than --max-regression
+(p99 latency is noisier, so it can be given its own tolerance with --max-p99-regression).
+
+Usage (from the aoai-api-simulator folder, with the simulator running):
+    PYTHONPATH=src python -m aoai_api_simulator.loadtest --scenario chat --scenario chat-stream \\
+        --mode closed --concurrency 50 --duration 30 --output loadtest.json
+    PYTHONPATH=src python -m aoai_api_simulator.loadtest --scenario embeddings --mode open --rate 200
+    PYTHONPATH=src python -m aoai_api_simulator.loadtest --scenario ollama-chat --concurrency 100
+    PYTHONPATH=src python -m aoai_api_simulator.loadtest --scenario agents-poll --agents-poll-interval 0.25 \\
+        --scenario agents-stream
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+
+from .report import check_regressions, format_table, summarise
+from .runner import run_closed_loop, run_open_loop
+from .scenarios import (
+    SCENARIO_NAMES,
+    AgentChatScenario,
+    AgentsPollScenario,
+    AgentsStreamScenario,
+    ChatScenario,
+    EmbeddingsScenario,
+    OllamaChatScenario,
+    Scenario,
+    StreamingChatScenario,
+    TranslationScenario,
+)
+
+
+def _create_scenario(name: str, args: argparse.Namespace) -> Scenario:
+    if name == ChatScenario.name:
+        return ChatScenario(args.chat_deployment, args.api_key, args.api_version, args.max_tokens)
+    if name == StreamingChatScenario.name:
+        return StreamingChatScenario(args.chat_deployment, args.api_key, args.api_version, args.max_tokens)
+    if name == EmbeddingsScenario.name:
+        return EmbeddingsScenario(args.embeddings_deployment, args.api_key, args.api_version)
+    if name == TranslationScenario.name:
+        return TranslationScenario(args.translation_deployment, args.api_key, args.api_version, args.audio_size)
+    if name == OllamaChatScenario.name:
+        return OllamaChatScenario(args.ollama_model, args.max_tokens)
+    if name == AgentsPollScenario.name:
+        return AgentsPollScenario(
+            args.agents_project, args.agents_model, args.api_key, args.max_tokens, args.agents_poll_interval
+        )
+    if name == AgentsStreamScenario.name:
+        return AgentsStreamScenario(args.agents_project, args.agents_model, args.api_key, args.max_tokens)
+    if name == AgentChatScenario.name:
+        return AgentChatScenario(args.agent_token)
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+async def _run_scenario(scenario: Scenario, args: argparse.Namespace) -> dict:
+    base_url = args.agent_url if isinstance(scenario, AgentChatScenario) else args.base_url
+    # size the connection pool so that the client doesn't limit the load generated
+    max_connections = args.concurrency if args.mode == "closed" else args.max_in_flight
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        if args.mode == "closed":
+            target = {"mode": "closed", "concurrency": args.concurrency}
+            run = await run_closed_loop(scenario, client, args.concurrency, args.duration, args.requests)
+        else:
+            target = {"mode": "open", "rate": args.rate}
+            run = await run_open_loop(scenario, client, args.rate, args.duration, args.max_in_flight, args.seed)
+    return summarise(scenario.name, target, run)
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    summaries = []
+    for name in args.scenario or [ChatScenario.name]:
+        scenario = _create_scenario(name, args)
+        print(f"Running {name} ({args.mode} loop)...", file=sys.stderr)
+        summaries.append(await _run_scenario(scenario, args))
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m aoai_api_simulator.loadtest",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--scenario", action="append", choices=SCENARIO_NAMES, help="scenario to run (repeatable)")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="simulator (or Azure OpenAI) endpoint")
+    parser.add_argument("--api-key", default=os.getenv("SIMULATOR_API_KEY"), help="defaults to SIMULATOR_API_KEY")
+    parser.add_argument("--api-version", default="2024-02-01")
+    parser.add_argument("--agent-url", default="http://localhost:8000", help="Conferenti agent API endpoint")
+    parser.add_argument(
+        "--agent-token", default=os.getenv("CONFERENTI_AGENT_TOKEN"), help="defaults to CONFERENTI_AGENT_TOKEN"
+    )
+    parser.add_argument("--chat-deployment", default="gpt-35-turbo-100m-token")
+    parser.add_argument("--embeddings-deployment", default="embedding")
+    parser.add_argument("--translation-deployment", default="whisper")
+    parser.add_argument("--ollama-model", default="llama3.2", help="model for the ollama-chat scenario")
+    parser.add_argument("--agents-project", default="loadtest", help="project name for the agents-* scenarios")
+    parser.add_argument("--agents-model", default="gpt-35-turbo-100m-token", help="model for the agents-* scenarios")
+    parser.add_argument(
+        "--agents-poll-interval", type=float, default=1.0, help="agents-poll: seconds between run status requests"
+    )
+    parser.add_argument("--max-tokens", type=int, default=50, help="max_tokens for chat requests")
+    parser.add_argument("--audio-size", type=int, default=5000, help="size of the audio file for translations")
+
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=10, help="closed loop: number of concurrent workers")
+    parser.add_argument("--rate", type=float, default=10, help="open loop: mean arrival rate (requests/second)")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="open loop: cap on outstanding requests")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to generate load for (per scenario)")
+    parser.add_argument("--requests", type=int, help="closed loop: stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=60, help="request timeout in seconds")
+    parser.add_argument("--seed", type=int, help="open loop: seed for the arrival times")
+
+    parser.add_argument("--output", help="path to write the JSON report to")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed regression vs the baseline")
+    parser.add_argument(
+        "--max-p99-regression", type=float, help="allowed p99 latency regression (defaults to --max-regression)"
+    )
+    args = parser.parse_args()
+
+    summaries = asyncio.run(run(args))
+    print(format_table(summaries))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        failures = check_regressions(summaries, baseline, args.max_regression, args.max_p99_regression)
+        for failure in failures:
+            print(f"REGRESSION: {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
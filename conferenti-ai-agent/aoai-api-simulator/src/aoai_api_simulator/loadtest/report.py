@@ -0,0 +1,138 @@
+import math
+
+from .runner import RunResult
+
+# This file contains the summary statistics and output formats for load test runs.
+
+_PERCENTILES = [50, 90, 95, 99]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _ms(value: float | None) -> float | None:
+    return round(value * 1000, 2) if value is not None else None
+
+
+def _distribution(values: list[float]) -> dict:
+    values = sorted(values)
+    summary = {f"p{pct}": _ms(percentile(values, pct)) for pct in _PERCENTILES}
+    summary["mean"] = _ms(sum(values) / len(values)) if values else None
+    summary["max"] = _ms(values[-1]) if values else None
+    return summary
+
+
+def summarise(scenario_name: str, target: dict, run: RunResult) -> dict:
+    results = run.results
+    total = len(results)
+    succeeded = [r for r in results if 200 <= r.status_code < 300]
+    status_codes: dict[str, int] = {}
+    for result in results:
+        key = str(result.status_code) if result.status_code else (result.error or "error")
+        status_codes[key] = status_codes.get(key, 0) + 1
+
+    elapsed = run.elapsed or 1e-9
+    prompt_tokens = sum(r.prompt_tokens for r in succeeded)
+    completion_tokens = sum(r.completion_tokens for r in succeeded)
+    ttfts = [r.time_to_first_token for r in succeeded if r.time_to_first_token is not None]
+
+    return {
+        "scenario": scenario_name,
+        **target,
+        "duration_s": round(run.elapsed, 3),
+        "requests": total,
+        "succeeded": len(succeeded),
+        "dropped": run.dropped,
+        "status_codes": status_codes,
+        "throughput_rps": round(total / elapsed, 2),
+        "success_rps": round(len(succeeded) / elapsed, 2),
+        "ratio_429": round(status_codes.get("429", 0) / total, 4) if total else 0.0,
+        "latency_ms": _distribution([r.latency for r in succeeded]),
+        "ttft_ms": _distribution(ttfts) if ttfts else None,
+        "tokens_per_second": {
+            "prompt": round(prompt_tokens / elapsed, 1),
+            "completion": round(completion_tokens / elapsed, 1),
+            "total": round((prompt_tokens + completion_tokens) / elapsed, 1),
+        },
+    }
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.1f}"
+    return str(value)
+
+
+def format_table(summaries: list[dict]) -> str:
+    columns = [
+        ("scenario", lambda s: s["scenario"]),
+        ("mode", lambda s: s["mode"]),
+        ("requests", lambda s: s["requests"]),
+        ("rps", lambda s: s["throughput_rps"]),
+        ("ok rps", lambda s: s["success_rps"]),
+        ("429 %", lambda s: s["ratio_429"] * 100),
+        ("p50 ms", lambda s: s["latency_ms"]["p50"]),
+        ("p90 ms", lambda s: s["latency_ms"]["p90"]),
+        ("p99 ms", lambda s: s["latency_ms"]["p99"]),
+        ("ttft p50", lambda s: s["ttft_ms"]["p50"] if s["ttft_ms"] else None),
+        ("ttft p99", lambda s: s["ttft_ms"]["p99"] if s["ttft_ms"] else None),
+        ("tok/s", lambda s: s["tokens_per_second"]["total"]),
+    ]
+    rows = [[name for name, _ in columns]]
+    for summary in summaries:
+        rows.append([_format_value(get(summary)) for _, get in columns])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+
+    lines = []
+    for index, row in enumerate(rows):
+        # left-align the scenario/mode columns, right-align the figures
+        cells = [cell.ljust(widths[i]) if i < 2 else cell.rjust(widths[i]) for i, cell in enumerate(row)]
+        lines.append("  ".join(cells))
+        if index == 0:
+            lines.append("  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def check_regressions(
+    summaries: list[dict], baseline: list[dict], max_regression: float, max_p99_regression: float | None = None
+) -> list[str]:
+    """
+    Compares summaries with a baseline run (matching on scenario and mode).
+    Returns a message for each scenario whose success throughput dropped by more than max_regression,
+    or whose p99 latency increased by more than max_p99_regression (defaults to max_regression),
+    as fractions of the baseline values
+    """
+    if max_p99_regression is None:
+        max_p99_regression = max_regression
+    baseline_by_key = {(s["scenario"], s["mode"]): s for s in baseline}
+    failures = []
+    for summary in summaries:
+        expected = baseline_by_key.get((summary["scenario"], summary["mode"]))
+        if expected is None:
+            continue
+        name = f"{summary['scenario']} ({summary['mode']})"
+
+        min_rps = expected["success_rps"] * (1 - max_regression)
+        if summary["success_rps"] < min_rps:
+            failures.append(
+                f"{name}: throughput {summary['success_rps']:.1f} rps is below {min_rps:.1f} rps"
+                + f" (baseline {expected['success_rps']:.1f} rps)"
+            )
+
+        expected_p99 = expected["latency_ms"]["p99"]
+        actual_p99 = summary["latency_ms"]["p99"]
+        if expected_p99 is not None and actual_p99 is not None:
+            max_p99 = expected_p99 * (1 + max_p99_regression)
+            if actual_p99 > max_p99:
+                failures.append(
+                    f"{name}: p99 latency {actual_p99:.1f}ms is above {max_p99:.1f}ms"
+                    + f" (baseline {expected_p99:.1f}ms)"
+                )
+    return failures
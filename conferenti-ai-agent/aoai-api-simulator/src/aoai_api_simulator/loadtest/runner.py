@@ -0,0 +1,96 @@
+import asyncio
+import random
+import time
+
+import httpx
+
+from .scenarios import RequestResult, Scenario
+
+# This file contains the arrival models used by the load generator.
+#
+# Closed loop: a fixed number of workers each send a request, wait for the response and then send the next,
+# so the request rate adapts to the latency of the target (measures capacity at a given concurrency).
+# Open loop: requests arrive as a Poisson process at a fixed mean rate regardless of how quickly the target
+# responds (measures latency at a given load, including queuing when the target falls behind).
+
+
+class RunResult:
+    def __init__(self, results: list[RequestResult], elapsed: float, dropped: int = 0):
+        self.results = results
+        self.elapsed = elapsed
+        # open loop only: arrivals not sent because max_in_flight requests were already outstanding
+        self.dropped = dropped
+
+
+async def run_closed_loop(
+    scenario: Scenario,
+    client: httpx.AsyncClient,
+    concurrency: int,
+    duration: float | None,
+    total_requests: int | None,
+) -> RunResult:
+    """
+    Runs concurrency workers until duration seconds have elapsed or total_requests have been sent
+    (whichever comes first)
+    """
+    results: list[RequestResult] = []
+    run_start = time.perf_counter()
+    deadline = run_start + duration if duration else None
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining
+        while deadline is None or time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            results.append(await scenario.send(client, run_start))
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return RunResult(results, time.perf_counter() - run_start)
+
+
+async def run_open_loop(
+    scenario: Scenario,
+    client: httpx.AsyncClient,
+    rate: float,
+    duration: float,
+    max_in_flight: int,
+    seed: int | None = None,
+) -> RunResult:
+    """
+    Sends requests with exponentially distributed inter-arrival times (mean rate requests/second) for duration
+    seconds, then waits for outstanding requests to complete
+    """
+    results: list[RequestResult] = []
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    run_start = time.perf_counter()
+    loop_start = loop.time()
+    in_flight: set[asyncio.Task] = set()
+    dropped = 0
+
+    async def send():
+        results.append(await scenario.send(client, run_start))
+
+    # schedule against absolute arrival times so that timer overhead doesn't reduce the rate
+    arrival = 0.0
+    while True:
+        arrival += rng.expovariate(rate)
+        if arrival >= duration:
+            break
+        delay = loop_start + arrival - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if len(in_flight) >= max_in_flight:
+            dropped += 1
+            continue
+        task = asyncio.create_task(send())
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return RunResult(results, time.perf_counter() - run_start, dropped)
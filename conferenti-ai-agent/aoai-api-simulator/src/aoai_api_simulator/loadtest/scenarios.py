@@ -0,0 +1,428 @@
+import asyncio
+import json
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import httpx
+
+# This file contains the request scenarios used by the load generator.
+# Each scenario sends a single request and reports its timings/usage as a RequestResult.
+
+_PROMPTS = [
+    "Suggest three speakers for a session on event-driven architecture.",
+    "Summarise the keynote on platform engineering in two sentences.",
+    "Which sessions cover observability for .NET applications?",
+    "Write a short bio for a speaker who works on cloud-native security.",
+    "What is the best order to attend the AI track sessions?",
+]
+
+# General questions, which the agent answers with the model alone (questions about speakers, sessions or
+# agendas also query Cosmos DB), so the agent-chat scenario measures the agent's overhead over the model API
+_AGENT_PROMPTS = [
+    "How do I get to the venue by public transport?",
+    "Is there a dress code for the conference?",
+    "Are meals included with the conference ticket?",
+    "Can I transfer my ticket to a colleague?",
+    "Where can I find the Wi-Fi details for the venue?",
+]
+
+
+@dataclass
+class RequestResult:
+    # time the request was sent (seconds since the start of the run)
+    start: float
+    # time to receive the full response (seconds)
+    latency: float
+    # 0 if the request failed without a response (e.g. connection error or timeout)
+    status_code: int
+    # time to receive the first content chunk (seconds) for streamed responses
+    time_to_first_token: float | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: str | None = None
+
+
+class Scenario(ABC):
+    name: str
+
+    @abstractmethod
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        pass
+
+    def parse_usage(self, response: httpx.Response) -> tuple[int, int]:
+        """Returns (prompt_tokens, completion_tokens) for a successful response"""
+        try:
+            usage = response.json().get("usage") or {}
+        except json.JSONDecodeError:
+            return 0, 0
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+    async def send(self, client: httpx.AsyncClient, run_start: float) -> RequestResult:
+        request = self.build_request(client)
+        start = time.perf_counter()
+        try:
+            response = await client.send(request)
+        except httpx.HTTPError as e:
+            return RequestResult(
+                start=start - run_start,
+                latency=time.perf_counter() - start,
+                status_code=0,
+                error=type(e).__name__,
+            )
+        latency = time.perf_counter() - start
+
+        prompt_tokens, completion_tokens = (0, 0)
+        if response.status_code < 300:
+            prompt_tokens, completion_tokens = self.parse_usage(response)
+        return RequestResult(
+            start=start - run_start,
+            latency=latency,
+            status_code=response.status_code,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+
+class OpenAIScenario(Scenario):
+    def __init__(self, deployment: str, api_key: str, api_version: str):
+        self.deployment = deployment
+        self.api_key = api_key
+        self.api_version = api_version
+
+    def _url(self, operation: str) -> str:
+        return f"/openai/deployments/{self.deployment}/{operation}?api-version={self.api_version}"
+
+
+class ChatScenario(OpenAIScenario):
+    name = "chat"
+
+    def __init__(self, deployment: str, api_key: str, api_version: str, max_tokens: int):
+        super().__init__(deployment, api_key, api_version)
+        self.max_tokens = max_tokens
+
+    def _body(self) -> dict:
+        return {
+            "messages": [{"role": "user", "content": random.choice(_PROMPTS)}],
+            "max_tokens": self.max_tokens,
+        }
+
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        return client.build_request(
+            "POST", self._url("chat/completions"), headers={"api-key": self.api_key}, json=self._body()
+        )
+
+
+class StreamingChatScenario(ChatScenario):
+    name = "chat-stream"
+
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        body = self._body()
+        body["stream"] = True
+        return client.build_request("POST", self._url("chat/completions"), headers={"api-key": self.api_key}, json=body)
+
+    async def send(self, client: httpx.AsyncClient, run_start: float) -> RequestResult:
+        request = self.build_request(client)
+        start = time.perf_counter()
+        time_to_first_token = None
+        content_chunks = 0
+        try:
+            response = await client.send(request, stream=True)
+            try:
+                if response.status_code < 300:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data: ") or line == "data: [DONE]":
+                            continue
+                        delta = json.loads(line[len("data: ") :])["choices"][0]["delta"]
+                        if delta.get("content"):
+                            if time_to_first_token is None:
+                                time_to_first_token = time.perf_counter() - start
+                            content_chunks += 1
+                else:
+                    await response.aread()
+            finally:
+                await response.aclose()
+        except (httpx.HTTPError, ValueError, KeyError, IndexError) as e:
+            # ValueError/KeyError/IndexError: the stream contained an unexpected event
+            return RequestResult(
+                start=start - run_start,
+                latency=time.perf_counter() - start,
+                status_code=0,
+                error=type(e).__name__,
+            )
+
+        return RequestResult(
+            start=start - run_start,
+            latency=time.perf_counter() - start,
+            status_code=response.status_code,
+            time_to_first_token=time_to_first_token,
+            # streamed responses don't include usage, so count each content chunk as a token
+            completion_tokens=content_chunks,
+        )
+
+
+class EmbeddingsScenario(OpenAIScenario):
+    name = "embeddings"
+
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        return client.build_request(
+            "POST",
+            self._url("embeddings"),
+            headers={"api-key": self.api_key},
+            json={"input": random.choice(_PROMPTS)},
+        )
+
+
+class TranslationScenario(OpenAIScenario):
+    name = "translation"
+
+    def __init__(self, deployment: str, api_key: str, api_version: str, file_size: int):
+        super().__init__(deployment, api_key, api_version)
+        # the simulator only looks at the size of the audio file, so the content is arbitrary
+        self.audio = bytes(file_size)
+
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        return client.build_request(
+            "POST",
+            self._url("audio/translations"),
+            headers={"api-key": self.api_key},
+            files={"file": ("audio.wav", self.audio, "audio/wav")},
+            data={"response_format": "json"},
+        )
+
+    def parse_usage(self, response: httpx.Response) -> tuple[int, int]:
+        return 0, 0
+
+
+class OllamaChatScenario(Scenario):
+    """Sends streamed chat requests to the Ollama API (/api/chat) as used by the Conferenti agent's AiAgent"""
+
+    name = "ollama-chat"
+
+    def __init__(self, model: str, max_tokens: int):
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        return client.build_request(
+            "POST",
+            "/api/chat",
+            json={
+                "model": self.model,
+                "messages": [{"role": "user", "content": random.choice(_PROMPTS)}],
+                "stream": True,
+                "options": {"num_predict": self.max_tokens},
+            },
+        )
+
+    async def send(self, client: httpx.AsyncClient, run_start: float) -> RequestResult:
+        request = self.build_request(client)
+        start = time.perf_counter()
+        time_to_first_token = None
+        prompt_tokens, completion_tokens = (0, 0)
+        try:
+            response = await client.send(request, stream=True)
+            try:
+                if response.status_code < 300:
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if chunk["done"]:
+                            # the final line includes the token counts
+                            prompt_tokens = chunk.get("prompt_eval_count", 0)
+                            completion_tokens = chunk.get("eval_count", 0)
+                        elif chunk["message"]["content"] and time_to_first_token is None:
+                            time_to_first_token = time.perf_counter() - start
+                else:
+                    await response.aread()
+            finally:
+                await response.aclose()
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            # ValueError/KeyError: the stream contained an unexpected line
+            return RequestResult(
+                start=start - run_start,
+                latency=time.perf_counter() - start,
+                status_code=0,
+                error=type(e).__name__,
+            )
+
+        return RequestResult(
+            start=start - run_start,
+            latency=time.perf_counter() - start,
+            status_code=response.status_code,
+            time_to_first_token=time_to_first_token,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+
+class AgentsRunScenario(Scenario):
+    """
+    Base for scenarios that send a message to an emulated Azure AI Agents agent in a new thread and wait for the run.
+    The agent is created on the first request
+    """
+
+    _RUN_TERMINAL_STATUSES = ["completed", "failed", "cancelled", "expired", "incomplete"]
+
+    def __init__(self, project: str, model: str, token: str, max_tokens: int):
+        self.prefix = f"/api/projects/{project}"
+        self.model = model
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.max_tokens = max_tokens
+        self.agent_id = None
+        self._agent_lock = asyncio.Lock()
+
+    async def _ensure_agent(self, client: httpx.AsyncClient):
+        async with self._agent_lock:
+            if self.agent_id is None:
+                response = await client.post(
+                    self.prefix + "/assistants",
+                    headers=self.headers,
+                    json={"model": self.model, "name": "loadtest", "instructions": "You help plan conferences."},
+                )
+                response.raise_for_status()
+                self.agent_id = response.json()["id"]
+
+    def _run_body(self, stream: bool) -> dict:
+        return {
+            "assistant_id": self.agent_id,
+            "thread": {"messages": [{"role": "user", "content": random.choice(_PROMPTS)}]},
+            "max_completion_tokens": self.max_tokens,
+            "stream": stream,
+        }
+
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        return client.build_request(
+            "POST", self.prefix + "/threads/runs", headers=self.headers, json=self._run_body(False)
+        )
+
+    def _run_result(self, start: float, run_start: float, run: dict, time_to_first_token: float | None = None):
+        usage = run.get("usage") or {}
+        return RequestResult(
+            start=start - run_start,
+            latency=time.perf_counter() - start,
+            # count runs that didn't complete as failures
+            status_code=200 if run["status"] == "completed" else 0,
+            time_to_first_token=time_to_first_token,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            error=None if run["status"] == "completed" else f"run {run['status']}",
+        )
+
+
+class AgentsPollScenario(AgentsRunScenario):
+    """Creates a thread and run, then polls the run status at a fixed interval (as AgentsClient.create_and_process)"""
+
+    name = "agents-poll"
+
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
+    def __init__(self, project: str, model: str, token: str, max_tokens: int, poll_interval: float):
+        super().__init__(project, model, token, max_tokens)
+        self.poll_interval = poll_interval
+
+    async def send(self, client: httpx.AsyncClient, run_start: float) -> RequestResult:
+        start = time.perf_counter()
+        try:
+            await self._ensure_agent(client)
+            response = await client.send(self.build_request(client))
+            while response.status_code < 300 and response.json()["status"] not in self._RUN_TERMINAL_STATUSES:
+                await asyncio.sleep(self.poll_interval)
+                run = response.json()
+                response = await client.get(
+                    f"{self.prefix}/threads/{run['thread_id']}/runs/{run['id']}", headers=self.headers
+                )
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            return RequestResult(
+                start=start - run_start,
+                latency=time.perf_counter() - start,
+                status_code=0,
+                error=type(e).__name__,
+            )
+        if response.status_code >= 300:
+            return RequestResult(
+                start=start - run_start, latency=time.perf_counter() - start, status_code=response.status_code
+            )
+        return self._run_result(start, run_start, response.json())
+
+
+class AgentsStreamScenario(AgentsRunScenario):
+    """Creates a thread and a streamed run, reading the run events until the run finishes"""
+
+    name = "agents-stream"
+
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        return client.build_request(
+            "POST", self.prefix + "/threads/runs", headers=self.headers, json=self._run_body(True)
+        )
+
+    async def send(self, client: httpx.AsyncClient, run_start: float) -> RequestResult:
+        start = time.perf_counter()
+        time_to_first_token = None
+        run = None
+        try:
+            await self._ensure_agent(client)
+            response = await client.send(self.build_request(client), stream=True)
+            try:
+                if response.status_code < 300:
+                    event = None
+                    async for line in response.aiter_lines():
+                        if line.startswith("event: "):
+                            event = line[len("event: ") :]
+                        elif line.startswith("data: ") and event is not None:
+                            if event == "thread.message.delta":
+                                if time_to_first_token is None:
+                                    time_to_first_token = time.perf_counter() - start
+                            elif event.startswith("thread.run."):
+                                run = json.loads(line[len("data: ") :])
+                else:
+                    await response.aread()
+            finally:
+                await response.aclose()
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            return RequestResult(
+                start=start - run_start,
+                latency=time.perf_counter() - start,
+                status_code=0,
+                error=type(e).__name__,
+            )
+        if response.status_code >= 300 or run is None:
+            return RequestResult(
+                start=start - run_start, latency=time.perf_counter() - start, status_code=response.status_code
+            )
+        return self._run_result(start, run_start, run, time_to_first_token)
+
+
+class AgentChatScenario(Scenario):
+    """Sends chat messages to the Conferenti agent API (/api/ai/chat)"""
+
+    name = "agent-chat"
+
+    def __init__(self, token: str | None):
+        self.token = token
+
+    def build_request(self, client: httpx.AsyncClient) -> httpx.Request:
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        return client.build_request(
+            "POST",
+            "/api/ai/chat",
+            headers=headers,
+            json={"message": random.choice(_AGENT_PROMPTS), "sessionId": str(uuid.uuid4())},
+        )
+
+    def parse_usage(self, response: httpx.Response) -> tuple[int, int]:
+        return 0, 0
+
+
+SCENARIO_NAMES = [
+    ChatScenario.name,
+    StreamingChatScenario.name,
+    EmbeddingsScenario.name,
+    TranslationScenario.name,
+    OllamaChatScenario.name,
+    AgentsPollScenario.name,
+    AgentsStreamScenario.name,
+    AgentChatScenario.name,
+]
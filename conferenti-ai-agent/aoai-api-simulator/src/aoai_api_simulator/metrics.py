@@ -10,6 +10,7 @@ class SimulatorMetrics:
     histogram_tokens_requested: metrics.Histogram
     histogram_tokens_rate_limit: metrics.Histogram
     histogram_rate_limit: metrics.Histogram
+    histogram_faults: metrics.Histogram
 
 
 def _get_simulator_metrics() -> SimulatorMetrics:
@@ -51,6 +52,12 @@ def _get_simulator_metrics() -> SimulatorMetrics:
             description="Number of requests that were rate-limited",
             unit="requests",
         ),
+        # dimensions: deployment, fault
+        histogram_faults=meter.create_histogram(
+            name="aoai-api-simulator.faults",
+            description="Number of requests that had faults injected",
+            unit="requests",
+        ),
     )
 
 
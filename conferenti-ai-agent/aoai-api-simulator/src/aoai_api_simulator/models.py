@@ -4,24 +4,42 @@ from dataclasses import dataclass
 from typing import Annotated, Awaitable, Callable
 
 import nanoid
+import orjson
+from aoai_api_simulator.latency_distributions import DISTRIBUTION_PATTERN, get_time_of_day_factor, sample_latency
+from aoai_api_simulator.record_replay.models import hash_body
+from aoai_api_simulator.routing import CompiledRoute, compile_route
 
 # from aoai_api_simulator.pipeline import RequestContext
 from fastapi import Request, Response
+from httpx import Response as httpx_Response
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from requests import Response as requests_Response
-from starlette.routing import Match, Route
+
+_NOT_LOADED = object()
 
 
 class RequestContext:
     _config: "Config"
     _request: Request
     _values: dict[str, any]
+    _json_body: any
+    _body_hash: str | None
+    _matched_route: CompiledRoute | None
+    _matched_route_params: dict | None
+    path_params: dict
 
     def __init__(self, config: "Config", request: Request):
         self._config = config
         self._request = request
         self._values = {}
+        # the parsed body and body hash are computed on first use and shared by all pipeline stages
+        self._json_body = _NOT_LOADED
+        self._body_hash = None
+        self._matched_route = None
+        self._matched_route_params = None
+        # path parameters for the route of the generator handling the request (see generator_route)
+        self.path_params = {}
 
     @property
     def config(self) -> "Config":
@@ -35,6 +53,26 @@ class RequestContext:
     def values(self) -> dict[str, any]:
         return self._values
 
+    async def get_body(self) -> bytes:
+        """Gets the raw request body (read once and cached by the request)"""
+        return await self._request.body()
+
+    async def get_json_body(self) -> any:
+        """
+        Gets the request body parsed as JSON.
+        The body is parsed once per request and the result is shared by generators, limiters and forwarders,
+        so callers must not modify it
+        """
+        if self._json_body is _NOT_LOADED:
+            self._json_body = orjson.loads(await self._request.body())
+        return self._json_body
+
+    async def get_body_hash(self) -> str:
+        """Gets the hash of the request body used for record/replay lookups (computed once per request)"""
+        if self._body_hash is None:
+            self._body_hash = hash_body(self._request.headers, await self._request.body())
+        return self._body_hash
+
     def _strip_path_query(self, path: str) -> str:
         query_start = path.find("?")
         if query_start != -1:
@@ -54,12 +92,25 @@ class RequestContext:
                 and a dictionary of path parameters if the match is successful.
         """
 
-        route = Route(path=path, methods=methods, endpoint=_endpoint)
-        path_to_match = self._strip_path_query(request.url.path)
-        match, scopes = route.matches({"type": "http", "method": request.method, "path": path_to_match})
-        if match != Match.FULL:
+        route = compile_route(path, tuple(methods))
+        path_params = route.match(request.method, self._strip_path_query(request.url.path))
+        if path_params is None:
             return (False, {})
-        return (True, scopes["path_params"])
+        return (True, path_params)
+
+    def set_route_match(self, route: CompiledRoute, path_params: dict):
+        """Records the route matched for the request (by the generator router) and its path parameters"""
+        self._matched_route = route
+        self._matched_route_params = path_params
+
+    def get_route_params(self, route: CompiledRoute) -> dict | None:
+        """
+        Gets the path parameters for the route if it matches the request, otherwise None.
+        Uses the router's match for the request if the router has already matched this route
+        """
+        if route is self._matched_route:
+            return self._matched_route_params
+        return route.match(self._request.method, self._strip_path_query(self._request.url.path))
 
     def is_form_data(self):
         """
@@ -79,8 +130,19 @@ class RecordingConfig(BaseSettings):
 
     dir: str = Field(default=".recording", alias="RECORDING_DIR")
     autosave: bool = Field(default=True, alias="RECORDING_AUTOSAVE")
+    # yaml: one human-editable YAML file per URL (loaded fully into memory)
+    # sqlite: a single indexed recordings.db in the recording dir (responses loaded on lookup)
+    format: str = Field(default="yaml", alias="RECORDING_FORMAT", pattern="^(yaml|sqlite)$")
     aoai_api_key: str | None = Field(default=None, alias="AZURE_OPENAI_KEY")
     aoai_api_endpoint: str | None = Field(default=None, alias="AZURE_OPENAI_ENDPOINT")
+    # max number of concurrent connections to the upstream API when forwarding in record mode
+    # (additional requests wait for a pooled connection)
+    forwarder_max_connections: int = Field(default=100, alias="RECORDING_FORWARDER_MAX_CONNECTIONS")
+    # timeout (in seconds) for connecting to/reading from the upstream API when forwarding in record mode
+    forwarder_timeout: float = Field(default=30, alias="RECORDING_FORWARDER_TIMEOUT")
+    # multiplier for the recorded timing of streamed responses when replaying
+    # (e.g. 0.5 replays twice as fast, 0 replays without delays)
+    replay_timing_scale: float = Field(default=1.0, ge=0, alias="RECORDING_REPLAY_TIMING_SCALE")
     forwarders: (
         list[
             Callable[
@@ -89,6 +151,8 @@ class RecordingConfig(BaseSettings):
                 | Awaitable[Response]
                 | requests_Response
                 | Awaitable[requests_Response]
+                | httpx_Response
+                | Awaitable[httpx_Response]
                 | dict
                 | Awaitable[dict]
                 | None,
@@ -98,36 +162,89 @@ class RecordingConfig(BaseSettings):
     ) = []
 
 
+def _with_updates(settings: BaseSettings, update: dict) -> BaseSettings:
+    """Returns a copy of the settings with the updated values (validated, unlike model_copy)"""
+    values = settings.model_dump(by_alias=True)
+    for name, value in update.items():
+        field = type(settings).model_fields.get(name)
+        values[field.alias if field and field.alias else name] = value
+    return settings.model_validate(values)
+
+
 class CompletionLatency(BaseSettings):
     mean: float = Field(default=15, alias="LATENCY_OPENAI_COMPLETIONS_MEAN")
     std_dev: float = Field(default=2, alias="LATENCY_OPENAI_COMPLETIONS_STD_DEV")
 
+    distribution: str = Field(
+        default="normal", alias="LATENCY_OPENAI_COMPLETIONS_DISTRIBUTION", pattern=DISTRIBUTION_PATTERN
+    )
+    # evenly spaced quantiles of observed latencies for the empirical distribution
+    quantiles: list[float] | None = Field(default=None, alias="LATENCY_OPENAI_COMPLETIONS_QUANTILES")
+
     def get_value(self) -> float:
-        return random.normalvariate(self.mean, self.std_dev)
+        return sample_latency(self.distribution, self.mean, self.std_dev, self.quantiles)
 
 
 class ChatCompletionLatency(BaseSettings):
     mean: float = Field(default=19, alias="LATENCY_OPENAI_CHAT_COMPLETIONS_MEAN")
     std_dev: float = Field(default=6, alias="LATENCY_OPENAI_CHAT_COMPLETIONS_STD_DEV")
 
+    distribution: str = Field(
+        default="normal", alias="LATENCY_OPENAI_CHAT_COMPLETIONS_DISTRIBUTION", pattern=DISTRIBUTION_PATTERN
+    )
+    # evenly spaced quantiles of observed latencies for the empirical distribution
+    quantiles: list[float] | None = Field(default=None, alias="LATENCY_OPENAI_CHAT_COMPLETIONS_QUANTILES")
+
     def get_value(self) -> float:
-        return random.normalvariate(self.mean, self.std_dev)
+        return sample_latency(self.distribution, self.mean, self.std_dev, self.quantiles)
 
 
 class EmbeddingLatency(BaseSettings):
     mean: float = Field(default=100, alias="LATENCY_OPENAI_EMBEDDINGS_MEAN")
     std_dev: float = Field(default=30, alias="LATENCY_OPENAI_EMBEDDINGS_STD_DEV")
 
+    distribution: str = Field(
+        default="normal", alias="LATENCY_OPENAI_EMBEDDINGS_DISTRIBUTION", pattern=DISTRIBUTION_PATTERN
+    )
+    # evenly spaced quantiles of observed latencies for the empirical distribution
+    quantiles: list[float] | None = Field(default=None, alias="LATENCY_OPENAI_EMBEDDINGS_QUANTILES")
+
     def get_value(self) -> float:
-        return random.normalvariate(self.mean, self.std_dev)
+        return sample_latency(self.distribution, self.mean, self.std_dev, self.quantiles)
 
 
 class TranslationLatency(BaseSettings):
     mean: float = Field(default=15000, alias="LATENCY_OPENAI_TRANSLATIONS_MEAN")
     std_dev: float = Field(default=1000, alias="LATENCY_OPENAI_TRANSLATIONS_STD_DEV")
 
+    distribution: str = Field(
+        default="normal", alias="LATENCY_OPENAI_TRANSLATIONS_DISTRIBUTION", pattern=DISTRIBUTION_PATTERN
+    )
+    # evenly spaced quantiles of observed latencies for the empirical distribution
+    quantiles: list[float] | None = Field(default=None, alias="LATENCY_OPENAI_TRANSLATIONS_QUANTILES")
+
     def get_value(self) -> float:
-        return random.normalvariate(self.mean, self.std_dev)
+        return sample_latency(self.distribution, self.mean, self.std_dev, self.quantiles)
+
+
+class StreamingLatency(BaseSettings):
+    """
+    Defines the pacing of streamed chat completions
+
+    time_to_first_token_*: delay before the first chunk is sent, in milliseconds
+    inter_token_*: delay between subsequent chunks, in milliseconds per token
+    """
+
+    time_to_first_token_mean: float = Field(default=300, alias="LATENCY_OPENAI_STREAMING_TTFT_MEAN")
+    time_to_first_token_std_dev: float = Field(default=100, alias="LATENCY_OPENAI_STREAMING_TTFT_STD_DEV")
+    inter_token_mean: float = Field(default=19, alias="LATENCY_OPENAI_STREAMING_INTER_TOKEN_MEAN")
+    inter_token_std_dev: float = Field(default=6, alias="LATENCY_OPENAI_STREAMING_INTER_TOKEN_STD_DEV")
+
+    def get_time_to_first_token(self) -> float:
+        return max(0.0, random.normalvariate(self.time_to_first_token_mean, self.time_to_first_token_std_dev))
+
+    def get_inter_token(self) -> float:
+        return max(0.0, random.normalvariate(self.inter_token_mean, self.inter_token_std_dev))
 
 
 class LatencyConfig(BaseSettings):
@@ -137,13 +254,128 @@ class LatencyConfig(BaseSettings):
     open_ai_embeddings: the latency for OpenAI embeddings - mean is mean request duration in milliseconds
     open_ai_completions: the latency for OpenAI completions - mean is the number of milliseconds per token
     open_ai_chat_completions: the latency for OpenAI chat completions - mean is the number of milliseconds per token
+    open_ai_chat_completions_streaming: the time-to-first-token and inter-token latency for streamed chat completions
+        (can be overridden per deployment)
     open_ai_translations: the latency for OpenAI translations - mean is the number of milliseconds per MB of input aud
+    time_of_day_curve: optional latency multipliers for each hour of the day (24 values, interpolated between hours)
+    time_of_day_utc_offset: the offset (in hours) from UTC of the time zone for the time_of_day_curve
+
+    Each latency can be sampled from a normal, lognormal, gamma or empirical distribution
+    (see latency_distributions.py) and can be overridden per deployment with a latency profile
     """
 
     open_ai_completions: CompletionLatency = Field(default=CompletionLatency())
     open_ai_chat_completions: ChatCompletionLatency = Field(default=ChatCompletionLatency())
+    open_ai_chat_completions_streaming: StreamingLatency = Field(default=StreamingLatency())
     open_ai_embeddings: EmbeddingLatency = Field(default=EmbeddingLatency())
     open_ai_translations: TranslationLatency = Field(default=TranslationLatency())
+    time_of_day_curve: list[float] | None = Field(default=None, alias="LATENCY_TIME_OF_DAY_CURVE")
+    time_of_day_utc_offset: float = Field(default=0, alias="LATENCY_TIME_OF_DAY_UTC_OFFSET")
+
+    # pylint: disable=no-self-argument
+    @field_validator("time_of_day_curve")
+    def time_of_day_curve_should_have_24_values(cls, v):
+        if v is not None and (len(v) != 24 or any(value < 0 for value in v)):
+            raise ValueError("time_of_day_curve must have 24 non-negative values (one per hour)")
+        return v
+
+    # pylint: enable=no-self-argument
+
+    def with_updates(self, update: dict) -> "LatencyConfig":
+        """Returns a copy with the updated values (validated, unlike model_copy)"""
+        return _with_updates(self, update)
+
+    def get_time_of_day_factor(self) -> float:
+        return get_time_of_day_factor(self.time_of_day_curve, self.time_of_day_utc_offset)
+
+
+class AgentsConfig(BaseSettings):
+    """
+    Defines the behaviour of the emulated Azure AI Agents runs
+
+    run_queue_delay_*: time a run stays queued before it starts, in milliseconds
+    run_poll_latency_*: latency of requests for the status of a run, in milliseconds
+    run_failure_rate: fraction of runs that fail with a rate_limit_exceeded error instead of completing
+    max_threads: max number of threads held in memory (the least recently used threads are removed)
+
+    Once started, runs take the chat completions latency per generated token (or the streaming latency if streamed)
+    """
+
+    run_queue_delay_mean: float = Field(default=500, alias="AGENTS_RUN_QUEUE_DELAY_MEAN")
+    run_queue_delay_std_dev: float = Field(default=200, alias="AGENTS_RUN_QUEUE_DELAY_STD_DEV")
+    run_poll_latency_mean: float = Field(default=50, alias="AGENTS_RUN_POLL_LATENCY_MEAN")
+    run_poll_latency_std_dev: float = Field(default=15, alias="AGENTS_RUN_POLL_LATENCY_STD_DEV")
+    run_failure_rate: float = Field(default=0, ge=0, le=1, alias="AGENTS_RUN_FAILURE_RATE")
+    max_threads: int = Field(default=10000, gt=0, alias="AGENTS_MAX_THREADS")
+
+    def get_run_queue_delay(self) -> float:
+        return max(0.0, random.normalvariate(self.run_queue_delay_mean, self.run_queue_delay_std_dev))
+
+    def get_run_poll_latency(self) -> float:
+        return max(0.0, random.normalvariate(self.run_poll_latency_mean, self.run_poll_latency_std_dev))
+
+
+class FaultsConfig(BaseSettings):
+    """
+    Defines the faults injected into responses to test client resilience (retries, hedging, circuit breakers)
+
+    error_429_rate/error_500_rate/error_503_rate: fraction of requests that return the error instead of the response
+    error_429_retry_after: the Retry-After value (in seconds) returned with injected 429 responses
+    stalled_first_byte_*: fraction of requests that stall before the response starts, and the stall in milliseconds
+    latency_spike_*: fraction of requests with a latency spike, and the extra latency in milliseconds
+        (for streamed responses the spike is a pause after the first chunk)
+    slow_start_*: fraction of streamed responses that start slowly, and the extra delay in milliseconds
+        before each of the first slow_start_chunks chunks
+    disconnect_rate: fraction of streamed responses where the connection is dropped part way through the stream
+
+    deployments: per-deployment overrides of the values above keyed by deployment name,
+        e.g. {"gpt-4o": {"error_503_rate": 0.1}} (set via the /++/config endpoint)
+    """
+
+    error_429_rate: float = Field(default=0, ge=0, le=1, alias="FAULTS_ERROR_429_RATE")
+    error_429_retry_after: int = Field(default=5, ge=0, alias="FAULTS_ERROR_429_RETRY_AFTER")
+    error_500_rate: float = Field(default=0, ge=0, le=1, alias="FAULTS_ERROR_500_RATE")
+    error_503_rate: float = Field(default=0, ge=0, le=1, alias="FAULTS_ERROR_503_RATE")
+    stalled_first_byte_rate: float = Field(default=0, ge=0, le=1, alias="FAULTS_STALLED_FIRST_BYTE_RATE")
+    stalled_first_byte_ms: float = Field(default=10000, ge=0, alias="FAULTS_STALLED_FIRST_BYTE_MS")
+    latency_spike_rate: float = Field(default=0, ge=0, le=1, alias="FAULTS_LATENCY_SPIKE_RATE")
+    latency_spike_ms: float = Field(default=5000, ge=0, alias="FAULTS_LATENCY_SPIKE_MS")
+    slow_start_rate: float = Field(default=0, ge=0, le=1, alias="FAULTS_SLOW_START_RATE")
+    slow_start_ms: float = Field(default=500, ge=0, alias="FAULTS_SLOW_START_MS")
+    slow_start_chunks: int = Field(default=5, ge=0, alias="FAULTS_SLOW_START_CHUNKS")
+    disconnect_rate: float = Field(default=0, ge=0, le=1, alias="FAULTS_DISCONNECT_RATE")
+    deployments: dict[str, dict[str, float]] = Field(default={})
+
+    # Disable all the no-self-argument violations in this function
+    # pylint: disable=no-self-argument
+    @field_validator("deployments")
+    def deployment_overrides_should_be_fault_values(cls, v):
+        for deployment_name, overrides in v.items():
+            for key, value in overrides.items():
+                if key not in cls.model_fields or key == "deployments":
+                    raise ValueError(f"Unknown fault setting '{key}' for deployment {deployment_name}")
+                if key.endswith("_rate") and not 0 <= value <= 1:
+                    raise ValueError(f"{key} for deployment {deployment_name} must be between 0 and 1")
+                if value < 0:
+                    raise ValueError(f"{key} for deployment {deployment_name} must not be negative")
+        return v
+
+    # pylint: enable=no-self-argument
+
+    def is_enabled(self) -> bool:
+        """Returns True if any faults are configured (so that requests can skip fault injection otherwise)"""
+        return bool(self.deployments) or any(
+            getattr(self, name) > 0 for name in type(self).model_fields if name.endswith("_rate")
+        )
+
+    def with_updates(self, update: dict) -> "FaultsConfig":
+        """Returns a copy with the updated values (validated, unlike model_copy)"""
+        return _with_updates(self, update)
+
+    def for_deployment(self, deployment_name: str | None) -> "FaultsConfig":
+        """Returns the faults config with the overrides for the deployment applied"""
+        overrides = self.deployments.get(deployment_name) if deployment_name else None
+        return self.model_copy(update=overrides) if overrides else self
 
 
 class PatchableConfig(BaseSettings):
@@ -152,6 +384,8 @@ class PatchableConfig(BaseSettings):
     recording: RecordingConfig = Field(default=RecordingConfig())
     openai_deployments: dict[str, "OpenAIDeployment"] | None = Field(default=None)
     latency: Annotated[LatencyConfig, Field(default=LatencyConfig())]
+    agents: AgentsConfig = Field(default=AgentsConfig())
+    faults: FaultsConfig = Field(default=FaultsConfig())
     allow_undefined_openai_deployments: bool = Field(default=True, alias="ALLOW_UNDEFINED_OPENAI_DEPLOYMENTS")
 
     # Disable all the no-self-argument violations in this function
@@ -208,6 +442,42 @@ class OpenAIWhisperModel(OpenAIModel):
         return False
 
 
+@dataclass
+class LatencyProfile:
+    """
+    A latency distribution for a deployment, overriding the global latency for the deployment's operation
+    (so values use the same units, e.g. milliseconds per completion token for chat completions)
+    """
+
+    distribution: str = "normal"
+    mean: float = 0
+    std_dev: float = 0
+    quantiles: list[float] | None = None
+
+    def get_value(self) -> float:
+        return sample_latency(self.distribution, self.mean, self.std_dev, self.quantiles)
+
+
+@dataclass
+class ProvisionedThroughput:
+    """
+    Provisioned throughput (PTU) capacity for a deployment, used by the PTU utilization limiter
+    instead of the tokens-per-minute limits
+
+    units: the number of provisioned throughput units
+    tokens_per_minute_per_unit: the prompt tokens per minute that each unit can process
+    completion_token_weight: the number of prompt tokens that each completion token counts as
+    """
+
+    units: int
+    tokens_per_minute_per_unit: float = 2500
+    completion_token_weight: float = 4
+
+    @property
+    def tokens_per_minute(self) -> float:
+        return self.units * self.tokens_per_minute_per_unit
+
+
 @dataclass
 class OpenAIDeployment:
     name: str
@@ -215,9 +485,9 @@ class OpenAIDeployment:
     tokens_per_minute: int = 0
     embedding_size: int = 0
     requests_per_minute: int = 0
-
-
-# re-using Starlette's Route class to define a route
-# endpoint to pass to Route
-def _endpoint():
-    pass
+    # overrides the default streaming latency from LatencyConfig for this deployment
+    streaming_latency: StreamingLatency | None = None
+    # overrides the default latency distribution from LatencyConfig for this deployment
+    latency_profile: LatencyProfile | None = None
+    # provisioned throughput deployments are limited on utilization rather than tokens per minute
+    provisioned_throughput: ProvisionedThroughput | None = None
@@ -1,19 +1,30 @@
+import asyncio
 import inspect
 import logging
 import time
+from collections.abc import MutableMapping
 from typing import Awaitable, Callable
 
 import fastapi
+import httpx
 import requests
 from aoai_api_simulator import constants
 from aoai_api_simulator.models import RequestContext
-from aoai_api_simulator.record_replay.models import RecordedResponse, get_request_hash, hash_body, hash_request_parts
+from aoai_api_simulator.record_replay.models import (
+    RecordedChunk,
+    RecordedResponse,
+    get_request_hash,
+)
 from aoai_api_simulator.record_replay.openai import forward_to_azure_openai
-from aoai_api_simulator.record_replay.persistence import YamlRecordingPersister
+from aoai_api_simulator.record_replay.persistence import RecordingPersister
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 logger = logging.getLogger(__name__)
 
 text_content_types = ["application/json", "application/text"]
+# headers describing the upstream encoding of the body, which don't apply once it is re-streamed
+_streamed_headers_to_remove = ["content-length", "content-encoding", "transfer-encoding"]
 
 
 def get_default_forwarders() -> (
@@ -24,6 +35,8 @@ def get_default_forwarders() -> (
             | Awaitable[fastapi.Response]
             | requests.Response
             | Awaitable[requests.Response]
+            | httpx.Response
+            | Awaitable[httpx.Response]
             | dict
             | Awaitable[dict]
             | None,
@@ -32,7 +45,7 @@ def get_default_forwarders() -> (
 ):
     # Return a list of functions to call when recording and no matching saved request is found
     #
-    # If the function returns a Response object (from FastAPI or requests package)
+    # If the function returns a Response object (from FastAPI, requests or httpx packages)
     # it will be used as the response for the request
     #
     # If the function returns a dict then it should have a "response" property
@@ -44,19 +57,82 @@ def get_default_forwarders() -> (
     ]
 
 
+def _is_event_stream(headers) -> bool:
+    return headers.get("content-type", "").startswith("text/event-stream")
+
+
+class EventStreamRecorder:
+    """
+    Splits a text/event-stream body into SSE events as it is received, capturing each event with its
+    offset from start_time. Events are timed when the blank line terminating them is received
+    (network reads can split or combine events)
+    """
+
+    def __init__(self, start_time: float):
+        self._start_time = start_time
+        self._buffer = b""
+        self.chunks: list[RecordedChunk] = []
+
+    def _offset_ms(self) -> int:
+        return int((time.perf_counter() - self._start_time) * 1000)
+
+    def feed(self, data: bytes):
+        offset_ms = self._offset_ms()
+        self._buffer += data
+        while True:
+            event_end = self._buffer.find(b"\n\n")
+            if event_end < 0:
+                break
+            event_end += 2
+            self.chunks.append(RecordedChunk(offset_ms=offset_ms, data=self._buffer[:event_end].decode("utf-8")))
+            self._buffer = self._buffer[event_end:]
+
+    def finish(self) -> list[RecordedChunk]:
+        if self._buffer:
+            self.chunks.append(RecordedChunk(offset_ms=self._offset_ms(), data=self._buffer.decode("utf-8")))
+            self._buffer = b""
+        return self.chunks
+
+
+async def replay_chunks(chunks: list[RecordedChunk], timing_scale: float):
+    """
+    Re-emits recorded SSE events with their original timing (relative to the start of the response)
+    multiplied by timing_scale (i.e. 0.5 replays twice as fast, 0 replays without delays)
+    """
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    for chunk in chunks:
+        delay = start_time + chunk.offset_ms * timing_scale / 1000 - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield chunk.data.encode("utf-8")
+
+
 class ForwardedResponse:
-    def __init__(self, response: fastapi.Response, persist_response: bool):
+    def __init__(
+        self,
+        response: fastapi.Response | None,
+        persist_response: bool,
+        upstream: httpx.Response | None = None,
+    ):
         self._response = response
         self._persist_response = persist_response
+        self._upstream = upstream
 
     @property
-    def response(self) -> fastapi.Response:
+    def response(self) -> fastapi.Response | None:
+        """The buffered response (None when the response is streamed from upstream)"""
         return self._response
 
     @property
     def persist_response(self) -> bool:
         return self._persist_response
 
+    @property
+    def upstream(self) -> httpx.Response | None:
+        """The upstream response whose body is still to be streamed"""
+        return self._upstream
+
 
 class RecordReplayHandler:
     _recordings: dict[str, dict[int, RecordedResponse]]
@@ -67,6 +143,8 @@ class RecordReplayHandler:
             | Awaitable[fastapi.Response]
             | requests.Response
             | Awaitable[requests.Response]
+            | httpx.Response
+            | Awaitable[httpx.Response]
             | dict
             | Awaitable[dict]
             | None,
@@ -76,7 +154,7 @@ class RecordReplayHandler:
     def __init__(
         self,
         simulator_mode: str,
-        persister: YamlRecordingPersister,
+        persister: RecordingPersister,
         forwarders: list[
             Callable[
                 [RequestContext],
@@ -84,6 +162,8 @@ class RecordReplayHandler:
                 | Awaitable[fastapi.Response]
                 | requests.Response
                 | Awaitable[requests.Response]
+                | httpx.Response
+                | Awaitable[httpx.Response]
                 | dict
                 | Awaitable[dict]
                 | None,
@@ -99,14 +179,14 @@ class RecordReplayHandler:
         # recordings keyed by URL, within a recording, requests are keyed by hash of request values
         self._recordings = {}
 
-    async def _get_recording_for_url(self, url: str) -> dict[int, RecordedResponse] | None:
+    async def _get_recording_for_url(self, url: str) -> MutableMapping[str, RecordedResponse] | None:
         recording = self._recordings.get(url)
-        if recording:
+        if recording is not None:
             return recording
 
         expect_recording_file = self._simulator_mode == "replay"
         recording = self._persister.load_recording_for_url(url, expect_recording_file)
-        if not recording:
+        if recording is None:
             return None
 
         self._recordings[url] = recording
@@ -116,15 +196,22 @@ class RecordReplayHandler:
         request = context.request
         url = request.url.path
         recording = await self._get_recording_for_url(url)
-        request_hash = await get_request_hash(request)
+        request_hash = await get_request_hash(context)
 
-        if recording:
-            # request_hash = await get_request_hash(request)
+        if recording is not None:
             response_info = recording.get(request_hash)
             if response_info:
                 headers = {k: v[0] for k, v in response_info.headers.items()}
                 for key, value in response_info.context_values.items():
                     context.values[key] = value
+                if response_info.chunks is not None:
+                    # the pacing of the stream replays the latency
+                    # so don't set a target duration (which would delay the start of the stream)
+                    return StreamingResponse(
+                        replay_chunks(response_info.chunks, context.config.recording.replay_timing_scale),
+                        status_code=response_info.status_code,
+                        headers=headers,
+                    )
                 context.values[constants.TARGET_DURATION_MS] = response_info.duration_ms
                 return fastapi.Response(
                     content=response_info.body, status_code=response_info.status_code, headers=headers
@@ -142,43 +229,99 @@ class RecordReplayHandler:
         request = context.request
 
         # Forward the response and capture the request duration
-        start_time = time.time()
+        start_time = time.perf_counter()
         forwarded_response: ForwardedResponse | None = await self.forward_request(context)
-        end_time = time.time()
         if not forwarded_response:
             raise ValueError(
                 "Failed to forward request - no configured forwarders returned a response for"
                 + f"{request.method} {request.url}"
             )
-        elapsed_time = end_time - start_time
-        elapsed_time_ms = int(elapsed_time * 1000)
+        if forwarded_response.upstream is not None:
+            return self._stream_response(context, forwarded_response, start_time)
 
-        recorded_response = await self.get_recorded_response(context, forwarded_response, elapsed_time_ms)
+        elapsed_time_ms = int((time.perf_counter() - start_time) * 1000)
+        response = forwarded_response.response
+        recorded_response = await self.get_recorded_response(
+            context, response.status_code, response.headers, response.body, None, elapsed_time_ms
+        )
         if forwarded_response.persist_response:
             self.store_recorded_response(request, recorded_response)
 
         context.values[constants.TARGET_DURATION_MS] = elapsed_time_ms
         return fastapi.Response(
-            content=recorded_response.body,
+            content=response.body,
             status_code=recorded_response.status_code,
-            headers=forwarded_response.response.headers,  # use original headers in returned content
+            headers=response.headers,  # use original headers in returned content
+        )
+
+    def _stream_response(
+        self, context: RequestContext, forwarded_response: ForwardedResponse, start_time: float
+    ) -> StreamingResponse:
+        """
+        Streams the upstream response to the client as it arrives, copying it into the recording.
+        The recording is stored once the upstream response is complete
+        (it is discarded if the client disconnects or the upstream fails part way through)
+        """
+        upstream = forwarded_response.upstream
+        # the body is decoded by aiter_bytes and the length is set by the chunked response
+        headers = {k: v for k, v in upstream.headers.items() if k.lower() not in _streamed_headers_to_remove}
+        # capture the timing of each event so that replay can reproduce the pacing
+        is_event_stream = _is_event_stream(upstream.headers) and upstream.status_code < 300
+        event_stream = EventStreamRecorder(start_time) if is_event_stream else None
+        body_parts = []
+
+        async def stream():
+            try:
+                async for data in upstream.aiter_bytes():
+                    if event_stream:
+                        event_stream.feed(data)
+                    else:
+                        body_parts.append(data)
+                    yield data
+            finally:
+                await upstream.aclose()
+
+            if forwarded_response.persist_response:
+                elapsed_time_ms = int((time.perf_counter() - start_time) * 1000)
+                recorded_response = await self.get_recorded_response(
+                    context,
+                    upstream.status_code,
+                    headers,
+                    b"".join(body_parts),
+                    event_stream.finish() if event_stream else None,
+                    elapsed_time_ms,
+                )
+                self.store_recorded_response(context.request, recorded_response)
+
+        # the stream carries the upstream latency, so don't set a target duration.
+        # The background task releases the upstream connection if the response is never sent
+        # (e.g. replaced by a 429), as the stream's finally block only runs once the stream has started
+        return StreamingResponse(
+            stream(), status_code=upstream.status_code, headers=headers, background=BackgroundTask(upstream.aclose)
         )
 
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
     async def get_recorded_response(
-        self, context: RequestContext, forwarded_response: ForwardedResponse, elapsed_time_ms: int
+        self,
+        context: RequestContext,
+        status_code: int,
+        headers: MutableMapping[str, str],
+        body: bytes,
+        chunks: list[RecordedChunk] | None,
+        elapsed_time_ms: int,
     ):
-        response = forwarded_response.response
         request = context.request
-        request_body = await request.body()
-        body = response.body
+        request_body = await context.get_body()
         # limit the request headers we persist - avoid persisting secrets and keep recording size low
         allowed_request_headers = ["content-type", "accept"]
         request_headers = {k: [v] for k, v in request.headers.items() if k.lower() in allowed_request_headers}
-        if "content-length" in response.headers:
-            del response.headers["content-length"]
+        response_headers = {k: [v] for k, v in dict(headers).items() if k.lower() != "content-length"}
 
-        response_content_type = response.headers.get("content-type", "").split(";")[0]
-        if response_content_type in text_content_types:
+        response_content_type = headers.get("content-type", "").split(";")[0]
+        if chunks is not None:
+            # streamed responses are recorded as chunks rather than a single body
+            body = None
+        elif response_content_type in text_content_types:
             # simplify format for editing recording files
             body = body.decode("utf-8")
 
@@ -186,14 +329,11 @@ class RecordReplayHandler:
         if request_content_type in text_content_types:
             request_body = request_body.decode("utf-8")
 
-        request_body_hash = hash_body(request_headers, request_body)
         recorded_response = RecordedResponse(
-            status_code=response.status_code,
-            headers={k: [v] for k, v in dict(response.headers).items()},
+            status_code=status_code,
+            headers=response_headers,
             body=body,
-            request_hash=hash_request_parts(
-                request.method, request.url.path, request.headers, body_hash=request_body_hash
-            ),
+            request_hash=await get_request_hash(context),
             context_values=context.values,
             full_request={
                 "method": request.method,
@@ -202,6 +342,7 @@ class RecordReplayHandler:
                 "body": request_body,
             },
             duration_ms=elapsed_time_ms,
+            chunks=chunks,
         )
 
         return recorded_response
@@ -209,14 +350,14 @@ class RecordReplayHandler:
     def store_recorded_response(self, request: fastapi.Request, recorded_response: RecordedResponse):
         logger.info("📝 Storing recording for %s %s", request.method, request.url)
         recording = self._recordings.get(request.url.path)
-        if not recording:
+        if recording is None:
             recording = {}
             self._recordings[request.url.path] = recording
         recording[recorded_response.request_hash] = recorded_response
 
         if self._autosave:
             # Save the recording to disk
-            self._persister.save_recording(request.url.path, recording)
+            self._persister.append_recorded_response(request.url.path, recording, recorded_response)
 
     def save_recordings(self):
         for url, recording in self._recordings.items():
@@ -244,6 +385,9 @@ class RecordReplayHandler:
                     response = fastapi.Response(
                         content=response.text, status_code=response.status_code, headers=response.headers
                     )
+                elif isinstance(response, httpx.Response):
+                    # leave the body to be streamed to the client (and recorded) as it arrives
+                    return ForwardedResponse(response=None, persist_response=persist_response, upstream=response)
                 else:
                     raise ValueError(f"Unhandled response type from forwarder: {type(response)}")
 
@@ -0,0 +1,103 @@
+"""
+Derives per-deployment latency profiles from the recorded durations of record-mode interactions.
+
+For each deployment, the recorded durations are normalised to the units the simulator uses for the
+deployment's operation (milliseconds per completion token for chat completions, milliseconds per request
+for completions and embeddings) and summarised as evenly spaced quantiles. The output maps deployment names
+to an empirical "latencyProfile" that can be copied into the OPENAI_DEPLOYMENT_CONFIG_PATH file.
+Streamed responses are skipped (their pacing is replayed from the recorded chunks).
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python -m aoai_api_simulator.record_replay.latency_profile --source .recording \\
+        --format sqlite --output latency-profiles.json
+"""
+
+import argparse
+import json
+import logging
+from collections.abc import Iterable
+
+from aoai_api_simulator.constants import (
+    OPENAI_OPERATION_CHAT_COMPLETIONS,
+    OPENAI_OPERATION_COMPLETIONS,
+    OPENAI_OPERATION_EMBEDDINGS,
+    SIMULATOR_KEY_DEPLOYMENT_NAME,
+    SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS,
+    SIMULATOR_KEY_OPERATION_NAME,
+)
+from aoai_api_simulator.latency_distributions import quantiles_from_values
+
+from .models import RecordedResponse
+from .persistence import create_recording_persister
+
+
+def get_latency_value(recorded_response: RecordedResponse) -> float | None:
+    """
+    Returns the recorded latency in the units of the simulator's latency config for the operation
+    (or None if the interaction can't be used for a latency profile)
+    """
+    if recorded_response.status_code >= 300 or recorded_response.chunks is not None:
+        return None
+
+    operation_name = recorded_response.context_values.get(SIMULATOR_KEY_OPERATION_NAME)
+    if operation_name == OPENAI_OPERATION_CHAT_COMPLETIONS:
+        completion_tokens = recorded_response.context_values.get(SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS)
+        if not completion_tokens:
+            return None
+        return recorded_response.duration_ms / completion_tokens
+    if operation_name in [OPENAI_OPERATION_COMPLETIONS, OPENAI_OPERATION_EMBEDDINGS]:
+        return float(recorded_response.duration_ms)
+    return None
+
+
+def build_latency_profiles(recorded_responses: Iterable[RecordedResponse], quantile_count: int = 101) -> dict:
+    values_by_deployment: dict[str, tuple[str, list[float]]] = {}
+    for recorded_response in recorded_responses:
+        value = get_latency_value(recorded_response)
+        deployment_name = recorded_response.context_values.get(SIMULATOR_KEY_DEPLOYMENT_NAME)
+        if value is None or not deployment_name:
+            continue
+        operation_name = recorded_response.context_values[SIMULATOR_KEY_OPERATION_NAME]
+        values_by_deployment.setdefault(deployment_name, (operation_name, []))[1].append(value)
+
+    profiles = {}
+    for deployment_name, (operation_name, values) in sorted(values_by_deployment.items()):
+        quantiles = [round(q, 3) for q in quantiles_from_values(values, quantile_count)]
+        # percentiles of the observations (for information - the simulator only uses the latencyProfile)
+        summary = {f"p{p}": quantiles[round(p / 100 * (quantile_count - 1))] for p in [50, 90, 99]}
+        profiles[deployment_name] = {
+            "operation": operation_name,
+            "observations": len(values),
+            **summary,
+            "latencyProfile": {"distribution": "empirical", "quantiles": quantiles},
+        }
+    return profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", required=True, help="recording folder")
+    parser.add_argument("--format", choices=["yaml", "sqlite"], default="yaml", help="recording format")
+    parser.add_argument("--quantiles", type=int, default=101, help="number of quantiles in each profile")
+    parser.add_argument("--output", help="path to write the profiles to (defaults to stdout)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    persister = create_recording_persister(args.format, args.source)
+    profiles = build_latency_profiles(persister.iter_recorded_responses(), args.quantiles)
+
+    output = json.dumps(profiles, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        for deployment_name, profile in profiles.items():
+            print(
+                f"{deployment_name}: {profile['observations']} observations"
+                + f" (p50 {profile['p50']}, p90 {profile['p90']}, p99 {profile['p99']})"
+            )
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Converts YAML recordings into the indexed SQLite recording format (RECORDING_FORMAT=sqlite).
+
+Usage (from the aoai-api-simulator folder):
+    PYTHONPATH=src python -m aoai_api_simulator.record_replay.migrate --source .recording --dest .recording
+"""
+
+import argparse
+import logging
+
+from .persistence import SqliteRecordingPersister, migrate_yaml_recordings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", required=True, help="folder containing the YAML recordings")
+    parser.add_argument(
+        "--dest",
+        help=f"folder to write {SqliteRecordingPersister.DB_FILE_NAME} to (defaults to the source folder)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    interaction_count = migrate_yaml_recordings(args.source, args.dest or args.source)
+    print(f"Migrated {interaction_count} interactions from {args.source}")
+
+
+if __name__ == "__main__":
+    main()
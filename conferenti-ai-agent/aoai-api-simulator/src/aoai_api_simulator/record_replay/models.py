@@ -1,7 +1,16 @@
 import hashlib
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from fastapi import Request
+if TYPE_CHECKING:
+    from aoai_api_simulator.models import RequestContext
+
+
+@dataclass
+class RecordedChunk:
+    # time since the request was forwarded that the chunk was received
+    offset_ms: int
+    data: str
 
 
 @dataclass
@@ -16,6 +25,8 @@ class RecordedResponse:
     # full_request currently here for compatibility with VCR serialization format
     # it _is_ handy for human inspection to have the URL/body etc. in the recording
     full_request: dict
+    # for streamed (text/event-stream) responses, the SSE events with their timings (body is None)
+    chunks: list[RecordedChunk] | None = None
 
 
 def hash_body(headers: dict, body: bytes) -> int:
@@ -59,6 +70,8 @@ def hash_request_parts(
     return result
 
 
-async def get_request_hash(request: Request):
-    body = await request.body()
-    return hash_request_parts(request.method, request.url.path, request.headers, body=body)
+async def get_request_hash(context: "RequestContext"):
+    request = context.request
+    return hash_request_parts(
+        request.method, request.url.path, request.headers, body_hash=await context.get_body_hash()
+    )
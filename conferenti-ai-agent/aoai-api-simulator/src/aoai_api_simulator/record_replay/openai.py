@@ -1,7 +1,7 @@
 import json
 import logging
 
-import requests
+import httpx
 from aoai_api_simulator.constants import (
     LIMITER_OPENAI_REQUESTS,
     LIMITER_OPENAI_TOKENS,
@@ -16,7 +16,7 @@ from aoai_api_simulator.constants import (
     SIMULATOR_KEY_OPENAI_TOTAL_TOKENS,
     SIMULATOR_KEY_OPERATION_NAME,
 )
-from aoai_api_simulator.models import RequestContext
+from aoai_api_simulator.models import RecordingConfig, RequestContext
 
 # This file contains a default openai forwarder
 # You can configure your own forwarders by creating a forwarder_config.py file and setting the
@@ -27,6 +27,50 @@ config_validated: bool = False
 
 logger = logging.getLogger(__name__)
 
+# Pooled client shared by all forwarded requests (created on first use)
+# pylint: disable-next=invalid-name
+_forwarder_client: httpx.AsyncClient | None = None
+# pylint: disable-next=invalid-name
+_forwarder_transport: httpx.AsyncBaseTransport | None = None
+
+
+def set_forwarder_transport(transport: httpx.AsyncBaseTransport | None):
+    """
+    Overrides the transport used to forward requests.
+    Passing an httpx.ASGITransport wrapping a stand-in for Azure OpenAI allows record mode to run offline.
+    Takes effect the next time the forwarder client is created (i.e. call before the first request
+    or after close_forwarder_client)
+    """
+    # pylint: disable-next=global-statement
+    global _forwarder_transport
+    _forwarder_transport = transport
+
+
+def _get_forwarder_client(recording_config: RecordingConfig) -> httpx.AsyncClient:
+    # pylint: disable-next=global-statement
+    global _forwarder_client
+
+    if _forwarder_client is None:
+        max_connections = recording_config.forwarder_max_connections
+        logger.info("🚀 Creating Azure OpenAI forwarder client (max connections: %s)", max_connections)
+        _forwarder_client = httpx.AsyncClient(
+            transport=_forwarder_transport,
+            # requests beyond max_connections queue for a pooled connection rather than failing
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(recording_config.forwarder_timeout, pool=None),
+        )
+    return _forwarder_client
+
+
+async def close_forwarder_client():
+    # pylint: disable-next=global-statement
+    global _forwarder_client
+
+    if _forwarder_client is not None:
+        client = _forwarder_client
+        _forwarder_client = None
+        await client.aclose()
+
 
 def _validate_endpoint_config(context: RequestContext):
     # pylint: disable-next=global-statement
@@ -61,6 +105,8 @@ aoai_response_headers_to_remove = [
     "x-request-id",
     "Cache-Control",
     "Content-Length",
+    "Content-Encoding",
+    "Transfer-Encoding",
     "Date",
     "Strict-Transport-Security",
     "access-control-allow-origin",
@@ -114,6 +160,10 @@ def _get_operation_name_from_url(url: str) -> str | None:
     return None
 
 
+def _is_event_stream(response: httpx.Response) -> bool:
+    return response.headers.get("content-type", "").startswith("text/event-stream")
+
+
 def _is_token_operation(operation_name: str):
     return operation_name in [
         OPENAI_OPERATION_EMBEDDINGS,
@@ -150,18 +200,19 @@ async def forward_to_azure_openai(context: RequestContext) -> dict:
     }
     fwd_headers["api-key"] = aoai_api_key
 
-    body = await request.body()
-
-    response = requests.request(
+    # Stream the request body upstream and leave the response body to be streamed back
+    # so that the event loop is never blocked waiting for Azure OpenAI
+    client = _get_forwarder_client(context.config.recording)
+    upstream_request = client.build_request(
         request.method,
         url,
         headers=fwd_headers,
-        data=body,
-        timeout=30,
+        content=request.stream(),
     )
+    response = await client.send(upstream_request, stream=True)
 
     for header in aoai_response_headers_to_remove:
-        if response.headers.get(header):
+        if header in response.headers:
             del response.headers[header]
 
     if response.status_code >= 300:
@@ -177,10 +228,15 @@ async def forward_to_azure_openai(context: RequestContext) -> dict:
     context.values[SIMULATOR_KEY_OPERATION_NAME] = operation_name
     if _is_token_operation(operation_name):
         context.values[SIMULATOR_KEY_LIMITER] = LIMITER_OPENAI_TOKENS
-        prompt_tokens, completion_tokens, total_tokens = _get_token_usage_from_response(response.text)
-        context.values[SIMULATOR_KEY_OPENAI_PROMPT_TOKENS] = prompt_tokens
-        context.values[SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS] = completion_tokens
-        context.values[SIMULATOR_KEY_OPENAI_TOTAL_TOKENS] = total_tokens
+        if not _is_event_stream(response):
+            # usage is only available in the body of non-streamed responses
+            await response.aread()
+            token_usage = _get_token_usage_from_response(response.text)
+            if token_usage:
+                prompt_tokens, completion_tokens, total_tokens = token_usage
+                context.values[SIMULATOR_KEY_OPENAI_PROMPT_TOKENS] = prompt_tokens
+                context.values[SIMULATOR_KEY_OPENAI_COMPLETION_TOKENS] = completion_tokens
+                context.values[SIMULATOR_KEY_OPENAI_TOTAL_TOKENS] = total_tokens
     else:
         context.values[SIMULATOR_KEY_LIMITER] = LIMITER_OPENAI_REQUESTS
 
@@ -1,30 +1,114 @@
+import base64
+import json
 import logging
 import os
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, MutableMapping
 
 import yaml
 from fastapi.datastructures import URL
 
-from .models import RecordedResponse, hash_body, hash_request_parts
+from .models import RecordedChunk, RecordedResponse, hash_body, hash_request_parts
 
 logger = logging.getLogger(__name__)
 
 
-class YamlRecordingPersister:
+class RecordingPersister(ABC):
+    """
+    Base class for recording persisters.
+    A recording is a mapping of request hash to RecordedResponse for a given URL
+    """
+
+    @abstractmethod
+    def save_recording(self, url: str, recording: MutableMapping[str, RecordedResponse]):
+        pass
+
+    @abstractmethod
+    def load_recording_for_url(
+        self, url: str, expect_recording_file: bool
+    ) -> MutableMapping[str, RecordedResponse] | None:
+        pass
+
+    @abstractmethod
+    def iter_recorded_responses(self) -> Iterator[RecordedResponse]:
+        """Iterates over the recorded responses for all URLs"""
+
+    # pylint: disable-next=unused-argument
+    def append_recorded_response(
+        self, url: str, recording: MutableMapping[str, RecordedResponse], recorded_response: RecordedResponse
+    ):
+        """
+        Persist a newly recorded response.
+        Persisters that support incremental appends override this, otherwise the whole recording is saved
+        """
+        self.save_recording(url, recording)
+
+
+def _get_request_for_save(recorded_response: RecordedResponse) -> dict:
+    request = recorded_response.full_request
+    # skip the full body for large requests (ensure we have a hash)
+    if "body" in request:
+        if "body_hash" not in request:
+            request["body_hash"] = hash_body(request["headers"], request["body"])
+
+        if len(request.get("body") or "") > 1024:
+            request["body"] = None
+    return request
+
+
+def _get_chunks_for_save(recorded_response: RecordedResponse) -> list[dict] | None:
+    if recorded_response.chunks is None:
+        return None
+    return [{"offset_ms": chunk.offset_ms, "data": chunk.data} for chunk in recorded_response.chunks]
+
+
+def _load_chunks(chunks: list[dict] | None) -> list[RecordedChunk] | None:
+    if chunks is None:
+        return None
+    return [RecordedChunk(offset_ms=chunk["offset_ms"], data=chunk["data"]) for chunk in chunks]
+
+
+def _load_recorded_response(interaction: dict) -> RecordedResponse:
+    request = interaction["request"]
+    response = interaction["response"]
+    uri_string = request["uri"]
+    # Allow for old recordings without body hash (or edited recordings with just the body)
+    # Also handle large recordings that omit the body and only have the hash
+    if "body_hash" not in request:
+        if "body" not in request:
+            raise ValueError(f"No body or body hash found in recording for request {uri_string}")
+        request["body_hash"] = hash_body(request["headers"], request["body"])
+
+    request_hash = hash_request_parts(
+        request["method"],
+        # parse URL to get path without host for matching against incoming request
+        URL(uri_string).path,
+        request["headers"],
+        body_hash=request["body_hash"],
+    )
+    context_values = interaction.get("context_values", {})
+
+    return RecordedResponse(
+        request_hash=request_hash,
+        status_code=response["status"]["code"],
+        headers=response["headers"],
+        body=response["body"].get("string"),
+        context_values=context_values,
+        full_request=request,
+        duration_ms=response.get("duration_ms", 0),  # didn't exist in earlier recordings so default to 0
+        chunks=_load_chunks(response.get("chunks")),
+    )
+
+
+class YamlRecordingPersister(RecordingPersister):
     def __init__(self, recording_dir: str):
         self._recording_dir = recording_dir
 
     def save_recording(self, url: str, recording: dict[int, RecordedResponse]):
         interactions = []
         for recorded_response in recording.values():
-            request = recorded_response.full_request
-            # skip the full body for large requests (ensure we have a hash)
-            if "body" in request:
-                if "body_hash" not in request:
-                    request["body_hash"] = hash_body(request["headers"], request["body"])
-
-                if len(request.get("body") or "") > 1024:
-                    request["body"] = None
-
+            request = _get_request_for_save(recorded_response)
             interaction = {
                 "request": request,
                 "response": {
@@ -35,6 +119,9 @@ class YamlRecordingPersister:
                 },
                 "context_values": recorded_response.context_values,
             }
+            chunks = _get_chunks_for_save(recorded_response)
+            if chunks is not None:
+                interaction["response"]["chunks"] = chunks
             interactions.append(interaction)
         recording_data = {"interactions": interactions, "version": 1}
 
@@ -63,37 +150,294 @@ class YamlRecordingPersister:
                 logger.warning("No recording file found at %s", recording_file_path)
             return None
 
+        return self.load_recording_file(recording_file_path)
+
+    def iter_recorded_responses(self) -> Iterator[RecordedResponse]:
+        if not os.path.exists(self._recording_dir):
+            return
+        for file_name in sorted(os.listdir(self._recording_dir)):
+            if file_name.endswith(".yaml"):
+                yield from self.load_recording_file(os.path.join(self._recording_dir, file_name)).values()
+
+    def load_recording_file(self, recording_file_path: str) -> dict[str, RecordedResponse]:
         with open(recording_file_path, "r", encoding="utf-8") as f:
             recording_data = yaml.load(f, Loader=yaml.CLoader)
-            interactions = recording_data["interactions"]
-            recording = {}
-            for interaction in interactions:
-                request = interaction["request"]
-                response = interaction["response"]
-                uri_string = request["uri"]
-                # Allow for old recordings without body hash (or edited recordings with just the body)
-                # Also handle large recordings that omit the body and only have the hash
-                if "body_hash" not in request:
-                    if "body" not in request:
-                        raise ValueError(f"No body or body hash found in recording for request {uri_string}")
-                    request["body_hash"] = hash_body(request["headers"], request["body"])
-
-                request_hash = hash_request_parts(
-                    request["method"],
-                    # parse URL to get path without host for matching against incoming request
-                    URL(uri_string).path,
-                    request["headers"],
-                    body_hash=request["body_hash"],
-                )
-                context_values = interaction.get("context_values", {})
-
-                recording[request_hash] = RecordedResponse(
-                    request_hash=request_hash,
-                    status_code=response["status"]["code"],
-                    headers=response["headers"],
-                    body=response["body"].get("string"),
-                    context_values=context_values,
-                    full_request=request,
-                    duration_ms=response.get("duration_ms", 0),  # didn't exist in earlier recordings so default to 0
+        recording = {}
+        for interaction in recording_data["interactions"]:
+            recorded_response = _load_recorded_response(interaction)
+            recording[recorded_response.request_hash] = recorded_response
+        return recording
+
+
+def _json_default(value):
+    # bytes bodies (e.g. multipart requests) aren't JSON serializable
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_object_hook(value: dict):
+    if len(value) == 1 and "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+
+class SqliteRecording(MutableMapping):
+    """
+    A recording backed by a SqliteRecordingPersister.
+    Responses are loaded from the database on lookup rather than held in memory.
+    Responses added to the recording are held in memory until the recording is saved
+    """
+
+    def __init__(self, persister: "SqliteRecordingPersister", url: str):
+        self._persister = persister
+        self._url = url
+        self._pending: dict[str, RecordedResponse] = {}
+
+    def __getitem__(self, request_hash: str) -> RecordedResponse:
+        recorded_response = self._pending.get(request_hash)
+        if recorded_response is None:
+            recorded_response = self._persister.load_recorded_response(self._url, request_hash)
+        if recorded_response is None:
+            raise KeyError(request_hash)
+        return recorded_response
+
+    def __setitem__(self, request_hash: str, recorded_response: RecordedResponse):
+        self._pending[request_hash] = recorded_response
+
+    def __delitem__(self, request_hash: str):
+        in_pending = self._pending.pop(request_hash, None) is not None
+        if not self._persister.delete_recorded_response(self._url, request_hash) and not in_pending:
+            raise KeyError(request_hash)
+
+    def __iter__(self) -> Iterator[str]:
+        persisted = self._persister.get_request_hashes(self._url)
+        yield from persisted
+        yield from (request_hash for request_hash in self._pending if request_hash not in persisted)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def pop_pending(self) -> dict[str, RecordedResponse]:
+        pending = self._pending
+        self._pending = {}
+        return pending
+
+
+class SqliteRecordingPersister(RecordingPersister):
+    """
+    Stores recordings for all URLs in a single SQLite database indexed on (url, request_hash).
+
+    Unlike the YAML persister, loading a recording doesn't read or rehash the interactions:
+    each lookup is a primary key read of a single interaction (via a memory-mapped database file),
+    and new recordings are appended as a single row rather than rewriting the whole recording.
+    """
+
+    DB_FILE_NAME = "recordings.db"
+    # size of the memory-mapped region for reads (SQLite only maps as much of the file as exists)
+    MMAP_SIZE = 1024 * 1024 * 1024
+
+    def __init__(self, recording_dir: str):
+        self._recording_dir = recording_dir
+        self._db_path = os.path.join(recording_dir, self.DB_FILE_NAME)
+        self._connection: sqlite3.Connection | None = None
+
+    def _get_connection(self, create: bool) -> sqlite3.Connection | None:
+        if self._connection is not None:
+            return self._connection
+
+        if not os.path.exists(self._db_path):
+            if not create:
+                return None
+            if not os.path.exists(self._recording_dir):
+                os.mkdir(self._recording_dir)
+
+        # the simulator handles requests on a single event loop thread
+        # but allow use from other threads (e.g. when called from a sync endpoint)
+        connection = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None)
+        connection.execute(f"PRAGMA mmap_size = {self.MMAP_SIZE}")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS interactions (
+                url TEXT NOT NULL,
+                request_hash TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB,
+                body_is_text INTEGER NOT NULL,
+                duration_ms INTEGER NOT NULL,
+                context_values TEXT NOT NULL,
+                full_request TEXT NOT NULL,
+                chunks TEXT,
+                PRIMARY KEY (url, request_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._connection = connection
+        return connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def load_recording_for_url(self, url: str, expect_recording_file: bool) -> SqliteRecording | None:
+        connection = self._get_connection(create=False)
+        if connection is None:
+            if expect_recording_file:
+                logger.warning("No recording database found at %s", self._db_path)
+            return None
+
+        row = connection.execute("SELECT 1 FROM interactions WHERE url = ? LIMIT 1", (url,)).fetchone()
+        if row is None:
+            if expect_recording_file:
+                logger.warning("No recording found in %s for %s", self._db_path, url)
+            return None
+
+        return SqliteRecording(self, url)
+
+    def load_recorded_response(self, url: str, request_hash: str) -> RecordedResponse | None:
+        connection = self._get_connection(create=False)
+        if connection is None:
+            return None
+
+        row = connection.execute(
+            "SELECT request_hash, status_code, headers, body, body_is_text, duration_ms, context_values, full_request,"
+            + " chunks FROM interactions WHERE url = ? AND request_hash = ?",
+            (url, request_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        return self._load_row(row)
+
+    def iter_recorded_responses(self) -> Iterator[RecordedResponse]:
+        connection = self._get_connection(create=False)
+        if connection is None:
+            return
+        yield from map(
+            self._load_row,
+            connection.execute(
+                "SELECT request_hash, status_code, headers, body, body_is_text, duration_ms, context_values,"
+                + " full_request, chunks FROM interactions"
+            ),
+        )
+
+    @staticmethod
+    def _load_row(row: tuple) -> RecordedResponse:
+        request_hash, status_code, headers, body, body_is_text, duration_ms, context_values, full_request, chunks = row
+        if body is not None and body_is_text:
+            body = body.decode("utf-8")
+        return RecordedResponse(
+            request_hash=request_hash,
+            status_code=status_code,
+            headers=json.loads(headers),
+            body=body,
+            duration_ms=duration_ms,
+            context_values=json.loads(context_values),
+            full_request=json.loads(full_request, object_hook=_json_object_hook),
+            chunks=_load_chunks(json.loads(chunks)) if chunks is not None else None,
+        )
+
+    def get_request_hashes(self, url: str) -> list[str]:
+        connection = self._get_connection(create=False)
+        if connection is None:
+            return []
+        rows = connection.execute("SELECT request_hash FROM interactions WHERE url = ?", (url,)).fetchall()
+        return [row[0] for row in rows]
+
+    def delete_recorded_response(self, url: str, request_hash: str) -> bool:
+        connection = self._get_connection(create=False)
+        if connection is None:
+            return False
+        cursor = connection.execute(
+            "DELETE FROM interactions WHERE url = ? AND request_hash = ?",
+            (url, request_hash),
+        )
+        return cursor.rowcount > 0
+
+    def _write_recorded_responses(self, url: str, recorded_responses: list[RecordedResponse]):
+        if not recorded_responses:
+            return
+
+        rows = []
+        for recorded_response in recorded_responses:
+            body = recorded_response.body
+            body_is_text = isinstance(body, str)
+            if body_is_text:
+                body = body.encode("utf-8")
+            chunks = _get_chunks_for_save(recorded_response)
+            rows.append(
+                (
+                    url,
+                    recorded_response.request_hash,
+                    recorded_response.status_code,
+                    json.dumps(recorded_response.headers),
+                    body,
+                    int(body_is_text),
+                    recorded_response.duration_ms,
+                    json.dumps(recorded_response.context_values, default=_json_default),
+                    json.dumps(_get_request_for_save(recorded_response), default=_json_default),
+                    json.dumps(chunks) if chunks is not None else None,
                 )
-            return recording
+            )
+
+        connection = self._get_connection(create=True)
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany("INSERT OR REPLACE INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def save_recording(self, url: str, recording: MutableMapping[str, RecordedResponse]):
+        if isinstance(recording, SqliteRecording):
+            # only the responses added since loading need writing
+            recorded_responses = list(recording.pop_pending().values())
+        else:
+            recorded_responses = list(recording.values())
+
+        self._write_recorded_responses(url, recorded_responses)
+        logger.info("💾 Recording for %s saved to %s (%s interactions)", url, self._db_path, len(recorded_responses))
+
+    def append_recorded_response(
+        self, url: str, recording: MutableMapping[str, RecordedResponse], recorded_response: RecordedResponse
+    ):
+        self._write_recorded_responses(url, [recorded_response])
+        if isinstance(recording, SqliteRecording):
+            recording.pop_pending()
+        logger.info("💾 Recording for %s appended to %s", url, self._db_path)
+
+
+def create_recording_persister(recording_format: str, recording_dir: str) -> RecordingPersister:
+    if recording_format == "sqlite":
+        return SqliteRecordingPersister(recording_dir)
+    return YamlRecordingPersister(recording_dir)
+
+
+def migrate_yaml_recordings(yaml_recording_dir: str, sqlite_recording_dir: str) -> int:
+    """
+    Converts the YAML recordings in yaml_recording_dir into a SQLite recording database in sqlite_recording_dir.
+    Returns the number of interactions migrated
+    """
+    yaml_persister = YamlRecordingPersister(yaml_recording_dir)
+    sqlite_persister = SqliteRecordingPersister(sqlite_recording_dir)
+
+    interaction_count = 0
+    try:
+        for file_name in sorted(os.listdir(yaml_recording_dir)):
+            if not file_name.endswith(".yaml"):
+                continue
+            recording = yaml_persister.load_recording_file(os.path.join(yaml_recording_dir, file_name))
+
+            # Group by the URL path recorded in each interaction (the file name is a lossy encoding of the URL)
+            recordings_by_url: dict[str, dict[str, RecordedResponse]] = {}
+            for request_hash, recorded_response in recording.items():
+                url = URL(recorded_response.full_request["uri"]).path
+                recordings_by_url.setdefault(url, {})[request_hash] = recorded_response
+
+            for url, url_recording in recordings_by_url.items():
+                sqlite_persister.save_recording(url, url_recording)
+                interaction_count += len(url_recording)
+    finally:
+        sqlite_persister.close()
+
+    return interaction_count
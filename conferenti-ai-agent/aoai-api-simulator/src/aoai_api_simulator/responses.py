@@ -0,0 +1,26 @@
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+# This file contains helpers for the responses passed along the request pipeline
+# (generators/record-replay -> faults -> limiters -> latency).
+#
+# A streamed response can hold resources until its body has been sent (e.g. in record mode the
+# upstream response, and its pooled connection, is only closed at the end of the stream).
+# Responses that hold resources release them in their background task, which is run once the response
+# has been sent. When a stage replaces a response (e.g. with a 429) or the request fails, the response is
+# never sent, so it must be released with close_response.
+
+
+async def close_response(response: Response):
+    """
+    Releases the resources held by a response that won't be sent.
+
+    Closing a body iterator that hasn't started doesn't run its finally blocks,
+    so the response's background task is run as well
+    """
+    if isinstance(response, StreamingResponse) and hasattr(response.body_iterator, "aclose"):
+        await response.body_iterator.aclose()
+    if response.background is not None:
+        background = response.background
+        response.background = None
+        await background()
@@ -0,0 +1,137 @@
+import functools
+import re
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from fastapi import Response
+from starlette.routing import compile_path
+
+if TYPE_CHECKING:
+    from aoai_api_simulator.models import RequestContext
+
+# This file contains the routing used to dispatch requests to generators.
+#
+# Generators declare the route they handle with the @generator_route decorator.
+# The route path is compiled once (when the generator is defined) and the routes for a list of generators
+# are combined into a single regex per HTTP method, so finding the generator for a request is one match
+# rather than one match per generator.
+#
+# Generators without a route (e.g. extension generators that call context.is_route_match themselves)
+# are still invoked for every request, in their original order relative to the routed generators.
+
+
+class CompiledRoute:
+    """
+    A route path (using Starlette path syntax, e.g. /openai/deployments/{deployment}/embeddings)
+    and set of methods, compiled for matching
+    """
+
+    def __init__(self, path: str, methods: list[str]):
+        self.path = path
+        self.methods = {method.upper() for method in methods}
+        if "GET" in self.methods:
+            # match Starlette's Route behaviour
+            self.methods.add("HEAD")
+        self.path_regex, _, self.param_convertors = compile_path(path)
+
+    def match(self, method: str, path: str) -> dict | None:
+        """Returns the path parameters if the method and path match the route, otherwise None"""
+        if method not in self.methods:
+            return None
+        match = self.path_regex.match(path)
+        if match is None:
+            return None
+        return {name: self.param_convertors[name].convert(value) for name, value in match.groupdict().items()}
+
+
+@functools.lru_cache(maxsize=256)
+def compile_route(path: str, methods: tuple[str, ...]) -> CompiledRoute:
+    return CompiledRoute(path, list(methods))
+
+
+def generator_route(path: str, methods: list[str]):
+    """
+    Decorator that declares the route a generator handles.
+
+    The decorated generator is only invoked for requests matching the route (returning None otherwise)
+    and can read the path parameters from context.path_params
+    """
+    route = compile_route(path, tuple(methods))
+
+    def decorator(generator: Callable[["RequestContext"], Response | Awaitable[Response] | None]):
+        @functools.wraps(generator)
+        def wrapper(context: "RequestContext"):
+            path_params = context.get_route_params(route)
+            if path_params is None:
+                return None
+            context.path_params = path_params
+            return generator(context)
+
+        wrapper.route = route
+        return wrapper
+
+    return decorator
+
+
+class GeneratorRouter:
+    """
+    Finds the generators to invoke for a request.
+    Returns the first routed generator whose route matches (found with a single regex match)
+    along with any generators that don't declare a route, preserving the order of the generator list
+    """
+
+    def __init__(self, generators: list[Callable]):
+        routes_by_method: dict[str, list[tuple[int, CompiledRoute]]] = {}
+        for index, generator in enumerate(generators):
+            route: CompiledRoute | None = getattr(generator, "route", None)
+            if route is None:
+                continue
+            for method in route.methods:
+                routes_by_method.setdefault(method, []).append((index, route))
+
+        unrouted = [index for index, generator in enumerate(generators) if getattr(generator, "route", None) is None]
+        self._unrouted_generators = [generators[index] for index in unrouted]
+        # for each routed generator, the generators to invoke when its route matches
+        self._generators_for_route = {
+            index: [generators[i] for i in sorted([index, *unrouted])]
+            for routes in routes_by_method.values()
+            for index, _ in routes
+        }
+        self._method_regexes: dict[str, tuple[re.Pattern, dict[str, tuple[int, CompiledRoute]]]] = {}
+        for method, routes in routes_by_method.items():
+            alternatives = []
+            routes_by_group = {}
+            for index, route in routes:
+                group = f"r{index}"
+                # prefix the route's parameter names so that they are unique within the combined regex
+                pattern = route.path_regex.pattern.removeprefix("^").removesuffix("$")
+                pattern = pattern.replace("(?P<", f"(?P<{group}_")
+                alternatives.append(f"(?P<{group}>{pattern})")
+                routes_by_group[group] = (index, route)
+            self._method_regexes[method] = (re.compile("^(?:" + "|".join(alternatives) + ")$"), routes_by_group)
+
+    def get_generators(self, context: "RequestContext") -> list[Callable]:
+        request = context.request
+        method_regex = self._method_regexes.get(request.method)
+        if method_regex is not None:
+            regex, routes_by_group = method_regex
+            match = regex.match(request.url.path)
+            if match is not None:
+                # the outer group for the route is the last group closed in the match
+                group = match.lastgroup
+                index, route = routes_by_group[group]
+                prefix = group + "_"
+                path_params = {
+                    name: route.param_convertors[name].convert(match.group(prefix + name))
+                    for name in route.param_convertors
+                }
+                context.set_route_match(route, path_params)
+                return self._generators_for_route[index]
+
+        return self._unrouted_generators
+
+
+@functools.lru_cache(maxsize=8)
+def get_generator_router(generators: tuple[Callable, ...]) -> GeneratorRouter:
+    # keyed on the generators (rather than the list) so that changes to the generator list
+    # (e.g. by extensions or config updates) result in a new router
+    return GeneratorRouter(list(generators))
@@ -0,0 +1,273 @@
+import math
+from dataclasses import dataclass, field
+
+# This file contains in-process request statistics for the /stats and /metrics endpoints.
+#
+# metrics.py records OpenTelemetry histograms, which are only exported when Azure Monitor is configured.
+# The statistics here are kept in process so that offline runs (e.g. load tests) can see latency,
+# token and throttling data: the simulator handles requests on a single event loop, so recording
+# is a few counter increments with no locking.
+#
+# Latencies are recorded in HDR-style log-linear histograms (LatencyHistogram): values are bucketed
+# by power of two with 64 linear sub-buckets per power, so percentiles are within 1/64 (~1.6%) of the
+# recorded values with a fixed, small memory footprint regardless of the number of values recorded.
+# As with HDR histograms, percentiles report the highest value in the bucket.
+
+# Values below _SUB_BUCKET_COUNT are recorded exactly, larger values keep _SUB_BUCKET_BITS significant bits
+_SUB_BUCKET_BITS = 7
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+_SUB_BUCKET_HALF_BITS = _SUB_BUCKET_BITS - 1
+
+PERCENTILES = [50, 90, 95, 99, 99.9]
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - _SUB_BUCKET_BITS
+    return (shift << _SUB_BUCKET_HALF_BITS) + (value >> shift)
+
+
+def _bucket_highest_value(index: int) -> int:
+    if index < _SUB_BUCKET_COUNT:
+        return index
+    shift = (index >> _SUB_BUCKET_HALF_BITS) - 1
+    sub_bucket = index - (shift << _SUB_BUCKET_HALF_BITS)
+    return ((sub_bucket + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies (recorded in microseconds, reported in milliseconds)
+    """
+
+    _counts: list[int]
+    count: int
+    total: int
+    min: int
+    max: int
+
+    def __init__(self):
+        self._counts = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, duration_s: float):
+        value = int(duration_s * 1_000_000)
+        if value < _SUB_BUCKET_COUNT:
+            if value < 0:
+                value = 0
+            index = value
+        else:
+            # inlined _bucket_index as this is called for every request
+            shift = value.bit_length() - _SUB_BUCKET_BITS
+            index = (shift << _SUB_BUCKET_HALF_BITS) + (value >> shift)
+        counts = self._counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        if value > self.max:
+            self.max = value
+        if value < self.min or self.count == 0:
+            self.min = value
+        self.count += 1
+        self.total += value
+
+    def get_percentile(self, percentile: float) -> float:
+        """Returns the latency (in milliseconds) at the percentile"""
+        if self.count == 0:
+            return 0
+        target_count = max(1, math.ceil(percentile / 100 * self.count))
+        cumulative_count = 0
+        for index, bucket_count in enumerate(self._counts):
+            cumulative_count += bucket_count
+            if cumulative_count >= target_count:
+                return min(_bucket_highest_value(index), self.max) / 1000
+        return self.max / 1000
+
+    def get_summary(self) -> dict:
+        summary = {
+            "count": self.count,
+            "mean": round(self.total / self.count / 1000, 3) if self.count else 0,
+            "min": self.min / 1000,
+            "max": self.max / 1000,
+        }
+        for percentile in PERCENTILES:
+            summary[f"p{percentile:g}"] = self.get_percentile(percentile)
+        return summary
+
+
+@dataclass
+class DeploymentStats:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    base_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    status_codes: dict[int, int] = field(default_factory=dict)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # requests waiting for their simulated latency to elapse
+    queued: int = 0
+
+
+class SimulatorStats:
+    """
+    Request statistics for the simulator (keyed by deployment name)
+    """
+
+    in_flight: int
+    deployments: dict[str, DeploymentStats]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.in_flight = 0
+        self.deployments = {}
+
+    def get_deployment_stats(self, deployment_name: str | None) -> DeploymentStats:
+        deployment_name = deployment_name or "unknown"
+        deployment_stats = self.deployments.get(deployment_name)
+        if deployment_stats is None:
+            deployment_stats = DeploymentStats()
+            self.deployments[deployment_name] = deployment_stats
+        return deployment_stats
+
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
+    def record_request(
+        self,
+        deployment_name: str | None,
+        status_code: int,
+        base_duration_s: float,
+        full_duration_s: float,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ):
+        deployment_stats = self.get_deployment_stats(deployment_name)
+        deployment_stats.latency.record(full_duration_s)
+        deployment_stats.base_latency.record(base_duration_s)
+        deployment_stats.status_codes[status_code] = deployment_stats.status_codes.get(status_code, 0) + 1
+        if status_code < 300:
+            deployment_stats.prompt_tokens += prompt_tokens
+            deployment_stats.completion_tokens += completion_tokens
+
+
+simulator_stats = SimulatorStats()
+
+
+def get_stats(limiter_utilization: dict[str, dict]) -> dict:
+    """
+    Returns the statistics (and the current limiter utilization) as a JSON-serializable dict
+    """
+    deployments = {}
+    for deployment_name in sorted(set(simulator_stats.deployments) | set(limiter_utilization)):
+        deployment_stats = simulator_stats.deployments.get(deployment_name) or DeploymentStats()
+        deployments[deployment_name] = {
+            "requests": {str(k): v for k, v in sorted(deployment_stats.status_codes.items())},
+            "queued": deployment_stats.queued,
+            "latency_ms": deployment_stats.latency.get_summary(),
+            "base_latency_ms": deployment_stats.base_latency.get_summary(),
+            "tokens": {
+                "prompt": deployment_stats.prompt_tokens,
+                "completion": deployment_stats.completion_tokens,
+            },
+            "limiter": limiter_utilization.get(deployment_name),
+        }
+    return {"in_flight": simulator_stats.in_flight, "deployments": deployments}
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _add_metric(lines: list[str], name: str, metric_type: str, description: str, samples: list[tuple[dict, float]]):
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for labels, value in samples:
+        label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+
+def _add_latency_summary(lines: list[str], name: str, description: str, histograms: dict[str, LatencyHistogram]):
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} summary")
+    for deployment_name, histogram in histograms.items():
+        label = f'deployment="{_escape_label(deployment_name)}"'
+        for percentile in PERCENTILES:
+            quantile = f"{percentile / 100:g}"
+            lines.append(
+                f'{name}{{{label},quantile="{quantile}"}} {round(histogram.get_percentile(percentile) / 1000, 6)}'
+            )
+        lines.append(f"{name}_sum{{{label}}} {histogram.total / 1_000_000}")
+        lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+
+def get_prometheus_metrics(limiter_utilization: dict[str, dict]) -> str:
+    """
+    Returns the statistics (and the current limiter utilization) in the Prometheus text exposition format
+    """
+    deployments = simulator_stats.deployments
+    lines = []
+    _add_metric(
+        lines,
+        "aoai_simulator_requests_in_flight",
+        "gauge",
+        "Number of requests currently being handled",
+        [({}, simulator_stats.in_flight)],
+    )
+    _add_metric(
+        lines,
+        "aoai_simulator_requests_total",
+        "counter",
+        "Number of requests handled",
+        [
+            ({"deployment": name, "status_code": status_code}, count)
+            for name, deployment_stats in deployments.items()
+            for status_code, count in sorted(deployment_stats.status_codes.items())
+        ],
+    )
+    _add_metric(
+        lines,
+        "aoai_simulator_deployment_queued_requests",
+        "gauge",
+        "Number of requests waiting for their simulated latency",
+        [({"deployment": name}, deployment_stats.queued) for name, deployment_stats in deployments.items()],
+    )
+    _add_metric(
+        lines,
+        "aoai_simulator_tokens_total",
+        "counter",
+        "Number of tokens used by successful requests",
+        [
+            sample
+            for name, deployment_stats in deployments.items()
+            for sample in [
+                ({"deployment": name, "token_type": "prompt"}, deployment_stats.prompt_tokens),
+                ({"deployment": name, "token_type": "completion"}, deployment_stats.completion_tokens),
+            ]
+        ],
+    )
+    _add_metric(
+        lines,
+        "aoai_simulator_deployment_utilization_percent",
+        "gauge",
+        "Current utilization of the deployment's rate limit window (or provisioned throughput)",
+        [
+            ({"deployment": name, "limiter": utilization["limiter"]}, utilization["utilization"])
+            for name, utilization in sorted(limiter_utilization.items())
+            if utilization.get("utilization") is not None
+        ],
+    )
+    _add_latency_summary(
+        lines,
+        "aoai_simulator_request_duration_seconds",
+        "Duration of requests including simulated latency (until the response starts for streamed responses)",
+        {name: deployment_stats.latency for name, deployment_stats in deployments.items()},
+    )
+    _add_latency_summary(
+        lines,
+        "aoai_simulator_request_base_duration_seconds",
+        "Duration of handling requests before adding simulated latency",
+        {name: deployment_stats.base_latency for name, deployment_stats in deployments.items()},
+    )
+    return "\n".join(lines) + "\n"
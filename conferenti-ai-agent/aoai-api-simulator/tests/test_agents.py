@@ -0,0 +1,52 @@
+"""
+Tests for the emulated Azure AI Agents API
+"""
+
+import logging
+
+import httpx
+import pytest
+import pytest_asyncio
+from aoai_api_simulator import app_builder
+from aoai_api_simulator.config_loader import get_config, get_config_from_env_vars, set_config
+
+SIMULATOR_API_KEY = "test-key"
+PROJECT_PATH = "/api/projects/test-project"
+
+
+@pytest_asyncio.fixture
+async def simulator(monkeypatch):
+    monkeypatch.setenv("SIMULATOR_API_KEY", SIMULATOR_API_KEY)
+    set_config(get_config_from_env_vars(logging.getLogger(__name__)))
+    app_builder.apply_config()
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app_builder.app),
+        base_url="http://simulator",
+        headers={"Authorization": f"Bearer {SIMULATOR_API_KEY}"},
+    ) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_run_with_removed_deployment_rejected(simulator):
+    # the agent is created while undefined deployments fall back to a default model
+    response = await simulator.post(f"{PROJECT_PATH}/assistants", json={"model": "undefined-deployment"})
+    assert response.status_code == 200
+    assistant_id = response.json()["id"]
+    response = await simulator.post(f"{PROJECT_PATH}/threads", json={})
+    assert response.status_code == 200
+    thread_id = response.json()["id"]
+    get_config().allow_undefined_openai_deployments = False
+
+    responses = [
+        await simulator.post(f"{PROJECT_PATH}/threads/runs", json={"assistant_id": assistant_id}),
+        await simulator.post(f"{PROJECT_PATH}/threads/{thread_id}/runs", json={"assistant_id": assistant_id}),
+    ]
+
+    for response in responses:
+        assert response.status_code == 400
+        assert response.json()["error"] == {
+            "code": "invalid_request_error",
+            "message": "Model 'undefined-deployment' not found",
+        }
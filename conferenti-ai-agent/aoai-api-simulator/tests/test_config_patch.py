@@ -0,0 +1,60 @@
+"""
+Tests for updating the simulator config via the /++/config endpoint
+"""
+
+import logging
+
+import httpx
+import pytest
+import pytest_asyncio
+from aoai_api_simulator import app_builder
+from aoai_api_simulator.config_loader import get_config, get_config_from_env_vars, set_config
+
+SIMULATOR_API_KEY = "test-key"
+
+
+@pytest_asyncio.fixture
+async def simulator(monkeypatch):
+    monkeypatch.setenv("SIMULATOR_API_KEY", SIMULATOR_API_KEY)
+    set_config(get_config_from_env_vars(logging.getLogger(__name__)))
+    app_builder.apply_config()
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app_builder.app),
+        base_url="http://simulator",
+        headers={"api-key": SIMULATOR_API_KEY},
+    ) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_time_of_day_latency_updated(simulator):
+    curve = [1.0] * 12 + [2.0] * 12
+
+    response = await simulator.patch(
+        "/++/config", json={"latency": {"time_of_day_curve": curve, "time_of_day_utc_offset": "-5"}}
+    )
+
+    assert response.status_code == 200
+    assert get_config().latency.time_of_day_curve == curve
+    assert get_config().latency.time_of_day_utc_offset == -5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "latency",
+    [
+        {"time_of_day_curve": [1.0] * 23},
+        {"time_of_day_curve": [1.0] * 23 + [-1.0]},
+        {"time_of_day_curve": [1.0] * 23 + ["fast"]},
+        {"time_of_day_curve": [1.0] * 23 + [None]},
+        {"time_of_day_utc_offset": "EST"},
+    ],
+)
+async def test_invalid_time_of_day_latency_rejected(simulator, latency):
+    original_latency = get_config().latency
+
+    response = await simulator.patch("/++/config", json={"latency": latency})
+
+    assert response.status_code == 400
+    assert get_config().latency is original_latency
@@ -0,0 +1,115 @@
+"""
+Tests for the in-flight gauge and latency stats recorded by the LatencyGenerator
+"""
+
+import asyncio
+
+import pytest
+from aoai_api_simulator import constants
+from aoai_api_simulator.latency import LatencyGenerator
+from aoai_api_simulator.models import RequestContext
+from aoai_api_simulator.stats import simulator_stats
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+DEPLOYMENT_NAME = "test-deployment"
+CHUNK_DELAY_S = 0.05
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    simulator_stats.reset()
+    yield
+    simulator_stats.reset()
+
+
+def _context() -> RequestContext:
+    context = RequestContext(config=None, request=None)
+    context.values[constants.SIMULATOR_KEY_DEPLOYMENT_NAME] = DEPLOYMENT_NAME
+    return context
+
+
+class _Body:
+    """Streams a few chunks, recording whether the stream was closed"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def __call__(self):
+        try:
+            for chunk in [b"a", b"b", b"c"]:
+                await asyncio.sleep(CHUNK_DELAY_S)
+                yield chunk
+        finally:
+            self.closed = True
+
+
+async def _handle(response: Response) -> Response:
+    async with LatencyGenerator(_context()) as latency_generator:
+        latency_generator.set_response(response)
+    return response
+
+
+def _recorded_requests() -> int:
+    return sum(simulator_stats.get_deployment_stats(DEPLOYMENT_NAME).status_codes.values())
+
+
+@pytest.mark.asyncio
+async def test_response_observed_on_return():
+    await _handle(Response(status_code=200))
+
+    assert simulator_stats.in_flight == 0
+    assert _recorded_requests() == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_observed_when_stream_completes():
+    response = await _handle(StreamingResponse(_Body()()))
+
+    # the request is still in flight until its body has been sent
+    assert simulator_stats.in_flight == 1
+    assert _recorded_requests() == 0
+
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert chunks == [b"a", b"b", b"c"]
+    assert simulator_stats.in_flight == 0
+    assert _recorded_requests() == 1
+    latency = simulator_stats.get_deployment_stats(DEPLOYMENT_NAME).latency
+    assert latency.get_percentile(50) >= 3 * CHUNK_DELAY_S * 0.9
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_observed_when_stream_closed():
+    body = _Body()
+    response = await _handle(StreamingResponse(body()))
+
+    await anext(response.body_iterator)
+    await response.body_iterator.aclose()
+
+    assert body.closed
+    assert simulator_stats.in_flight == 0
+    assert _recorded_requests() == 1
+
+    # the background task runs as well once the response has been sent, without observing it again
+    await response.background()
+    assert simulator_stats.in_flight == 0
+    assert _recorded_requests() == 1
+
+
+@pytest.mark.asyncio
+async def test_unstarted_stream_observed_by_background_task():
+    background_runs = []
+
+    async def background():
+        background_runs.append(True)
+
+    response = await _handle(StreamingResponse(_Body()(), background=BackgroundTask(background)))
+
+    # e.g. the client disconnected before the stream started
+    await response.background()
+
+    assert simulator_stats.in_flight == 0
+    assert _recorded_requests() == 1
+    assert background_runs == [True]
@@ -0,0 +1,263 @@
+"""
+Tests for forwarding and recording requests in record mode, against a stand-in for Azure OpenAI
+served in-process (no network access or credentials needed)
+"""
+
+import asyncio
+import json
+import logging
+
+import httpx
+import pytest
+import pytest_asyncio
+from aoai_api_simulator import app_builder
+from aoai_api_simulator.config_loader import get_config_from_env_vars, set_config
+from aoai_api_simulator.models import RecordingConfig
+from aoai_api_simulator.record_replay.handler import get_default_forwarders
+from aoai_api_simulator.record_replay.openai import close_forwarder_client, set_forwarder_transport
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+UPSTREAM_ENDPOINT = "http://upstream.local"
+SIMULATOR_API_KEY = "test-key"
+CHAT_COMPLETIONS_PATH = "/openai/deployments/gpt-35-turbo-100m-token/chat/completions"
+
+
+class _QueueStream(httpx.AsyncByteStream):
+    def __init__(self, queue: asyncio.Queue, task: asyncio.Task, on_close):
+        self._queue = queue
+        self._task = task
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        while (data := await self._queue.get()) is not None:
+            yield data
+
+    async def aclose(self):
+        self._task.cancel()
+        if not self._closed:
+            self._closed = True
+            self._on_close()
+
+
+class StreamingASGITransport(httpx.AsyncBaseTransport):
+    """
+    Calls an ASGI app in-process like httpx.ASGITransport, but returns the response as soon as it starts
+    and streams the body as the app sends it (httpx.ASGITransport buffers the whole body)
+    """
+
+    def __init__(self, app):
+        self._app = app
+        # responses not closed yet (i.e. connections that a pooled transport would hold)
+        self.open_responses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(k.lower(), v) for k, v in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port or 80),
+            "client": ("127.0.0.1", 123),
+            "root_path": "",
+        }
+        started = asyncio.get_running_loop().create_future()
+        body_queue: asyncio.Queue = asyncio.Queue()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if request_sent:
+                # no disconnect until the client closes the response
+                await asyncio.Event().wait()
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                started.set_result(message)
+            elif message["type"] == "http.response.body":
+                if message.get("body"):
+                    body_queue.put_nowait(message["body"])
+                if not message.get("more_body", False):
+                    body_queue.put_nowait(None)
+
+        def app_done(task: asyncio.Task):
+            if not started.done():
+                started.set_exception(task.exception() or RuntimeError("No response started"))
+            body_queue.put_nowait(None)
+
+        task = asyncio.create_task(self._app(scope, receive, send))
+        task.add_done_callback(app_done)
+        message = await started
+        self.open_responses += 1
+        return httpx.Response(
+            message["status"],
+            headers=message["headers"],
+            stream=_QueueStream(body_queue, task, self._response_closed),
+            request=request,
+        )
+
+    def _response_closed(self):
+        self.open_responses -= 1
+
+
+def _chat_request(content: str, stream: bool = False, max_tokens: int | None = None) -> dict:
+    body = {"messages": [{"role": "user", "content": content}], "stream": stream}
+    if max_tokens:
+        body["max_tokens"] = max_tokens
+    return body
+
+
+def _sse_event(content: str) -> bytes:
+    return f"data: {json.dumps({'choices': [{'delta': {'content': content}}]})}\n\n".encode("utf-8")
+
+
+@pytest.fixture
+def upstream_release():
+    """Set to let the stand-in upstream send the rest of a streamed response"""
+    return asyncio.Event()
+
+
+@pytest.fixture
+def upstream(upstream_release):
+    upstream_app = FastAPI()
+
+    @upstream_app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if not body.get("stream"):
+            content = {
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "hello"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            }
+            return Response(content=json.dumps(content), media_type="application/json")
+
+        async def events():
+            yield _sse_event("first")
+            await upstream_release.wait()
+            yield _sse_event("last")
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return upstream_app
+
+
+@pytest.fixture
+def upstream_transport(upstream):
+    return StreamingASGITransport(upstream)
+
+
+@pytest.fixture
+def faults():
+    """Overrides of the fault config (set before the simulator fixture applies the config)"""
+    return {}
+
+
+@pytest_asyncio.fixture
+async def simulator(monkeypatch, tmp_path, upstream_transport, faults):
+    monkeypatch.setenv("SIMULATOR_MODE", "record")
+    monkeypatch.setenv("SIMULATOR_API_KEY", SIMULATOR_API_KEY)
+    monkeypatch.setenv("RECORDING_DIR", str(tmp_path))
+    monkeypatch.setenv("RECORDING_AUTOSAVE", "false")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", UPSTREAM_ENDPOINT)
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "stand-in-key")
+    config = get_config_from_env_vars(logging.getLogger(__name__))
+    # the default recording config is read from the environment on import, so reload it
+    config.recording = RecordingConfig()
+    config.recording.forwarders = get_default_forwarders()
+    config.faults = config.faults.with_updates(faults)
+    set_config(config)
+    app_builder.apply_config()
+    set_forwarder_transport(upstream_transport)
+
+    async with httpx.AsyncClient(
+        transport=StreamingASGITransport(app_builder.app),
+        base_url="http://simulator",
+        headers={"api-key": SIMULATOR_API_KEY},
+    ) as client:
+        yield client
+
+    await close_forwarder_client()
+    set_forwarder_transport(None)
+
+
+def _recorded_responses() -> list:
+    # pylint: disable-next=protected-access
+    recording = app_builder.record_replay_handler._recordings.get(CHAT_COMPLETIONS_PATH) or {}
+    return list(recording.values())
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_reaches_client_before_upstream_completes(simulator, upstream_release):
+    # the upstream only sends its last chunk once released, so a buffered response never arrives
+    async with asyncio.timeout(5):
+        async with simulator.stream("POST", CHAT_COMPLETIONS_PATH, json=_chat_request("hi", stream=True)) as response:
+            assert response.status_code == 200
+            chunks = response.aiter_bytes()
+
+            first_chunk = await anext(chunks)
+            assert b"first" in first_chunk
+            assert not _recorded_responses()
+
+            upstream_release.set()
+            rest = b"".join([chunk async for chunk in chunks])
+
+    assert b"last" in rest
+    assert rest.endswith(b"data: [DONE]\n\n")
+
+    # the recording is stored once the stream completes, with each SSE event and its timing
+    (recorded,) = _recorded_responses()
+    assert recorded.body is None
+    assert [chunk.data.encode("utf-8") for chunk in recorded.chunks] == [
+        _sse_event("first"),
+        _sse_event("last"),
+        b"data: [DONE]\n\n",
+    ]
+    assert recorded.chunks[0].offset_ms <= recorded.chunks[1].offset_ms
+
+
+@pytest.mark.asyncio
+async def test_non_streamed_response_recorded_with_body(simulator):
+    response = await simulator.post(CHAT_COMPLETIONS_PATH, json=_chat_request("hi"))
+
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["content"] == "hello"
+    (recorded,) = _recorded_responses()
+    assert json.loads(recorded.body)["usage"]["total_tokens"] == 15
+    assert recorded.chunks is None
+    assert "content-length" not in {k.lower() for k in recorded.headers}
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_stream_releases_upstream_response(simulator, upstream_transport, upstream_release):
+    # the first request uses the deployment's tokens per minute, so the limiter returns a 429
+    # instead of the second streamed response, which is never started
+    path = "/openai/deployments/gpt-35-turbo-1k-token/chat/completions"
+    upstream_release.set()
+    async with asyncio.timeout(5):
+        first = await simulator.post(path, json=_chat_request("first", stream=True, max_tokens=1000))
+        second = await simulator.post(path, json=_chat_request("second", stream=True, max_tokens=1000))
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert upstream_transport.open_responses == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("faults", [{"error_429_rate": 1}])
+async def test_faulted_stream_releases_upstream_response(simulator, upstream_transport):
+    async with asyncio.timeout(5):
+        response = await simulator.post(CHAT_COMPLETIONS_PATH, json=_chat_request("hi", stream=True))
+
+    assert response.status_code == 429
+    assert upstream_transport.open_responses == 0
+    assert not _recorded_responses()
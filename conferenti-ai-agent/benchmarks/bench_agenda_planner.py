@@ -0,0 +1,82 @@
+"""
+Benchmark for planning personal agendas with the agenda planner.
+
+Generates a conference schedule (sessions in parallel rooms over several days, each
+tagged with a few topics) and reports the time to plan an agenda for a set of topics,
+with and without the travel buffer between rooms, and the time to build the schedule
+index the planner reads its sessions from.
+
+Usage (from the conferenti-ai-agent folder):
+    PYTHONPATH=src python benchmarks/bench_agenda_planner.py --sessions 2000 --rooms 20
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from conferenti_agent.services.agenda_planner import AgendaPreferences, plan_agenda
+from conferenti_agent.services.schedule_index import ScheduleIndex
+
+TOPICS = ["ai", "cloud", "security", "devops", "data", "frontend", "rust", "python"]
+
+
+def _create_sessions(count: int, rooms: int, days: int) -> list[dict]:
+    rng = random.Random(42)
+    base = datetime(2025, 6, 1, 8)
+    sessions = []
+    for i in range(count):
+        start = base + timedelta(
+            days=rng.randrange(days), minutes=rng.randrange(0, 12 * 60, 15)
+        )
+        sessions.append(
+            {
+                "id": f"session-{i}",
+                "title": f"Session {i}",
+                "startTime": start.isoformat(),
+                "endTime": (
+                    start + timedelta(minutes=rng.choice([30, 45, 60, 90]))
+                ).isoformat(),
+                "room": f"Room {rng.randrange(rooms)}",
+                "tags": rng.sample(TOPICS, 2),
+            }
+        )
+    return sessions
+
+
+def measure(func, repeat: int) -> tuple[float, object]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sessions", type=int, default=2000, help="number of sessions")
+    parser.add_argument("--rooms", type=int, default=20, help="number of rooms")
+    parser.add_argument("--days", type=int, default=3, help="number of days")
+    parser.add_argument("--repeat", type=int, default=20, help="plans to average")
+    args = parser.parse_args()
+
+    sessions = _create_sessions(args.sessions, args.rooms, args.days)
+    index_s, schedule = measure(lambda: ScheduleIndex(sessions), args.repeat)
+    print(f"{args.sessions} sessions in {args.rooms} rooms over {args.days} days")
+    print(f"{'schedule index':<28} {index_s * 1000:>8.2f}ms")
+    for name, travel_minutes in [("plan (no travel)", 0), ("plan (10 min travel)", 10)]:
+        preferences = AgendaPreferences(
+            topics=["ai", "cloud"], travel_minutes=travel_minutes
+        )
+        plan_s, plan = measure(
+            lambda: plan_agenda(schedule.sessions, preferences), args.repeat
+        )
+        print(
+            f"{name:<28} {plan_s * 1000:>8.2f}ms"
+            f"  ({len(plan.sessions)} sessions, relevance {plan.relevance})"
+        )
+
+
+if __name__ == "__main__":
+    main()
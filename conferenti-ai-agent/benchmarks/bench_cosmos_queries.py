@@ -0,0 +1,135 @@
+"""
+Benchmark for the request charge and payload size of the CosmosDbClient queries.
+
+Runs each use case against the configured Cosmos DB account (or emulator) twice: as the
+previous query (SELECT * and, for the chat history, a cross-partition query) and as the
+partition-aware projected query, and reports the request charge (RU), payload size and
+latency recorded by the Cosmos DB instrumentation.
+
+Usage (from the conferenti-ai-agent folder, with COSMOSDB_ENDPOINT/COSMOSDB_KEY set):
+    PYTHONPATH=src python benchmarks/bench_cosmos_queries.py --repeat 20 --chat-session <id>
+"""
+
+import argparse
+from collections import defaultdict
+
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from conferenti_agent.services import cosmos_instrumentation as instrumented
+from conferenti_agent.services.database import (
+    CHAT_HISTORY_FIELDS,
+    SESSION_SCHEDULE_FIELDS,
+    SPEAKER_PROMPT_FIELDS,
+    get_db_client,
+    select_fields,
+)
+
+
+def _use_cases(db, chat_session: str) -> list[tuple]:
+    """(name, container, query filter, parameters, previous kwargs, new kwargs, fields)"""
+    cross_partition = {"enable_cross_partition_query": True}
+    use_cases = [
+        (
+            "all_sessions",
+            db.session_container,
+            "",
+            [],
+            cross_partition,
+            cross_partition,
+            SESSION_SCHEDULE_FIELDS,
+        ),
+        (
+            "all_speakers",
+            db.speaker_container,
+            "",
+            [],
+            cross_partition,
+            cross_partition,
+            SPEAKER_PROMPT_FIELDS,
+        ),
+    ]
+    if chat_session:
+        use_cases.append(
+            (
+                "chat_history",
+                db.chat_container,
+                " WHERE c.sessionId=@session_id ORDER BY c.timestamp ASC",
+                [{"name": "@session_id", "value": chat_session}],
+                cross_partition,
+                {"partition_key": chat_session},
+                CHAT_HISTORY_FIELDS,
+            )
+        )
+    return use_cases
+
+
+def _collect(reader: InMemoryMetricReader) -> dict:
+    """Sum and count of each instrumentation histogram by db.operation"""
+    results = defaultdict(dict)
+    for resource_metrics in reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                for point in metric.data.data_points:
+                    results[point.attributes["db.operation"]][metric.name] = (
+                        point.sum / max(point.count, 1)
+                    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="number of times each query is run"
+    )
+    parser.add_argument(
+        "--chat-session", default="", help="chat session id for the chat history query"
+    )
+    args = parser.parse_args()
+
+    # the instrumentation's meter delegates to the SDK meter provider once it is set
+    reader = InMemoryMetricReader()
+    metrics.set_meter_provider(MeterProvider(metric_readers=[reader]))
+
+    db = get_db_client()
+    for (
+        name,
+        container,
+        suffix,
+        parameters,
+        previous_kwargs,
+        new_kwargs,
+        fields,
+    ) in _use_cases(db, args.chat_session):
+        for _ in range(args.repeat):
+            instrumented.query_items(
+                container,
+                f"{name}:previous",
+                select_fields(None) + suffix,
+                parameters,
+                **previous_kwargs,
+            )
+            instrumented.query_items(
+                container,
+                f"{name}:projected",
+                select_fields(fields) + suffix,
+                parameters,
+                **new_kwargs,
+            )
+
+    results = _collect(reader)
+    print(f"{'query':<32} {'RU':>8} {'payload':>10} {'items':>6} {'client':>9}")
+    for operation in sorted(results):
+        result = results[operation]
+        print(
+            f"{operation:<32} {result['cosmos.request_charge']:>8.2f}"
+            f" {result['cosmos.payload_bytes'] / 1024:>8.1f}KB"
+            f" {result['cosmos.item_count']:>6.0f} {result['cosmos.client.duration']:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
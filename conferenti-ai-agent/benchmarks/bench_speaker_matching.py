@@ -0,0 +1,121 @@
+"""
+Benchmark for matching speakers to sessions with the affinity matrix.
+
+Generates speakers (expertise and a bio) and sessions (tags, track and a
+description) and reports the time to build the speakers x sessions affinity
+matrix, to find the top sessions of every speaker and to assign speakers to
+sessions, compared with scoring every pair in a Python loop.
+
+Usage (from the conferenti-ai-agent folder):
+    PYTHONPATH=src python benchmarks/bench_speaker_matching.py --speakers 1000 --sessions 500
+"""
+
+import argparse
+import random
+import time
+
+from conferenti_agent.services.speaker_matching import (
+    assign_speakers,
+    build_affinity_matrix,
+)
+
+TOPICS = [
+    "ai",
+    "cloud",
+    "security",
+    "devops",
+    "data",
+    "frontend",
+    "rust",
+    "python",
+    "azure",
+    "kubernetes",
+    "testing",
+    "architecture",
+]
+WORDS = "agents apps scale build deploy observe secure model query stream api".split()
+
+
+def _text(rng: random.Random, topics: list[str]) -> str:
+    return " ".join(topics + rng.sample(WORDS, 5))
+
+
+def _create_data(speakers: int, sessions: int) -> tuple[list[dict], list[dict]]:
+    rng = random.Random(42)
+    speaker_docs = []
+    for i in range(speakers):
+        expertise = rng.sample(TOPICS, 3)
+        speaker_docs.append(
+            {
+                "id": f"speaker-{i}",
+                "position": "Engineer",
+                "expertise": expertise,
+                "bio": _text(rng, expertise),
+            }
+        )
+    session_docs = []
+    for i in range(sessions):
+        tags = rng.sample(TOPICS, 2)
+        session_docs.append(
+            {
+                "id": f"session-{i}",
+                "title": f"Session {i} on {tags[0]}",
+                "track": rng.choice(TOPICS),
+                "tags": tags,
+                "description": _text(rng, tags),
+            }
+        )
+    return speaker_docs, session_docs
+
+
+def _score_pairs(speakers: list[dict], sessions: list[dict]) -> list[list[float]]:
+    """Tag overlap of every pair, one pair at a time."""
+    scores = []
+    for speaker in speakers:
+        expertise = {t.lower() for t in speaker["expertise"]}
+        row = []
+        for session in sessions:
+            tags = {t.lower() for t in session["tags"]} | {session["track"].lower()}
+            row.append(len(expertise & tags) / ((len(expertise) * len(tags)) ** 0.5))
+        scores.append(row)
+    return scores
+
+
+def measure(func, repeat: int) -> tuple[float, object]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--speakers", type=int, default=1000, help="number of speakers")
+    parser.add_argument("--sessions", type=int, default=500, help="number of sessions")
+    parser.add_argument("--k", type=int, default=5, help="sessions per speaker")
+    parser.add_argument("--repeat", type=int, default=5, help="runs to average")
+    args = parser.parse_args()
+
+    speakers, sessions = _create_data(args.speakers, args.sessions)
+    print(f"{args.speakers} speakers x {args.sessions} sessions")
+
+    loop_s, _ = measure(lambda: _score_pairs(speakers, sessions), args.repeat)
+    print(f"{'tag overlap (pair loop)':<28} {loop_s * 1000:>8.2f}ms")
+    build_s, matrix = measure(
+        lambda: build_affinity_matrix(speakers, sessions), args.repeat
+    )
+    print(f"{'affinity matrix':<28} {build_s * 1000:>8.2f}ms")
+    top_s, _ = measure(lambda: matrix.top_k_indices(args.k), args.repeat)
+    print(f"{f'top {args.k} (all speakers)':<28} {top_s * 1000:>8.2f}ms")
+    assign_s, assignments = measure(lambda: assign_speakers(matrix), 1)
+    total = sum(score for _, _, score in assignments)
+    print(
+        f"{'assignment':<28} {assign_s * 1000:>8.2f}ms"
+        f"  ({len(assignments)} sessions, total affinity {total:.1f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark for the per-request cost of verifying Auth0 bearer tokens.
+
+Compares the previous verify_token behaviour (scanning the JWKS list for the kid and building
+an rsa_key dict that python-jose parses on every request) with JwksKeyManager verifying with
+the pre-parsed key, and with JwksKeyManager returning the cached claims for a repeated token.
+
+Usage (from the conferenti-ai-agent folder):
+    PYTHONPATH=src python benchmarks/bench_token_verification.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from conferenti_agent.auth import ALGORITHMS, JwksKeyManager
+
+AUDIENCE = "https://conferenti.com/api/"
+ISSUER = "https://benchmark.auth0.com/"
+
+
+def _create_jwks_and_token(key_count: int) -> tuple[dict, str]:
+    keys = []
+    private_pem = None
+    for i in range(key_count):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+        public_jwk.update({"kid": f"key-{i}", "use": "sig"})
+        keys.append(public_jwk)
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    # sign with the last key so the previous lookup scans the whole list
+    claims = {
+        "sub": "user",
+        "aud": AUDIENCE,
+        "iss": ISSUER,
+        "exp": int(time.time()) + 3600,
+    }
+    token = jwt.encode(
+        claims, private_pem, algorithm="RS256", headers={"kid": f"key-{key_count - 1}"}
+    )
+    return {"keys": keys}, token
+
+
+def previous_verify(jwks: dict, token: str) -> dict:
+    unverified_header = jwt.get_unverified_header(token)
+    rsa_key = {}
+    for key in jwks["keys"]:
+        if key["kid"] == unverified_header["kid"]:
+            rsa_key = {
+                "kty": key["kty"],
+                "kid": key["kid"],
+                "use": key["use"],
+                "n": key["n"],
+                "e": key["e"],
+            }
+    return jwt.decode(
+        token, rsa_key, algorithms=ALGORITHMS, audience=AUDIENCE, issuer=ISSUER
+    )
+
+
+async def run(requests: int, key_count: int):
+    jwks, token = _create_jwks_and_token(key_count)
+
+    async def fetch(_url: str) -> dict:
+        return jwks
+
+    uncached_manager = JwksKeyManager(
+        "", AUDIENCE, ISSUER, claims_cache_ttl_seconds=0, fetch=fetch
+    )
+    cached_manager = JwksKeyManager("", AUDIENCE, ISSUER, fetch=fetch)
+    await uncached_manager.refresh()
+    await cached_manager.refresh()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        previous_verify(jwks, token)
+    previous_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await uncached_manager.verify(token)
+    parsed_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await cached_manager.verify(token)
+    cached_s = time.perf_counter() - start
+
+    print(f"{requests} requests, {key_count} keys in the JWKS")
+    print(f"{'verification':<28} {'per request':>12}")
+    print(f"{'previous (rsa_key dict)':<28} {previous_s / requests * 1e6:>10.1f}us")
+    print(f"{'pre-parsed key':<28} {parsed_s / requests * 1e6:>10.1f}us")
+    print(f"{'cached claims':<28} {cached_s / requests * 1e6:>10.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="number of requests to verify"
+    )
+    parser.add_argument(
+        "--keys", type=int, default=3, help="number of keys in the JWKS"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.keys))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import os
 from typing import Optional, List, Dict, Any
-import asyncio
-import ollama
-from openai import AzureOpenAI
-from azure.ai.agents import AgentsClient
-from azure.identity import DefaultAzureCredential
-from azure.core.credentials import AzureKeyCredential
+
+# Backend SDKs (ollama, azure.ai.agents) are imported on first use: only one backend
+# is used in a given deployment and importing both slows down cold starts.
+
+
+def _ollama_client(host: str):
+    """Create an Ollama client, importing the SDK on first use."""
+    import ollama
+
+    return ollama.Client(host=host)
 
 
 class ConferentiAgentAdapter:
@@ -34,11 +38,19 @@ class ConferentiAgentAdapter:
 
         # If not using Ollama, initialize real Azure client
         if not use_ollama:
+            from azure.ai.agents import AgentsClient
+            from azure.core.credentials import AzureKeyCredential
+
             self.azure_client = AgentsClient(
                 endpoint=os.environ["PROJECT_ENDPOINT"],
                 credential=AzureKeyCredential(os.environ["API_KEY"]),
             )
 
+    def load_backend(self):
+        """Import the backend SDK ahead of the first request (used to warm up)."""
+        if self.use_ollama:
+            import ollama  # noqa: F401
+
     def create_agent(
         self,
         name: str,
@@ -124,7 +136,7 @@ class AiAgent:
         # NOTE: message is already appended by run(); do not append it again here.
         try:
             # Create Ollama client with custom host
-            client = ollama.Client(host=self.base_url)
+            client = _ollama_client(self.base_url)
             response = client.chat(model=self.model, messages=self.conversation_history)
 
             assistant_message = response["message"]["content"]
@@ -161,7 +173,7 @@ class AiAgent:
             full_response = ""
 
             # Create Ollama client with custom host
-            client = ollama.Client(host=self.base_url)
+            client = _ollama_client(self.base_url)
 
             for chunk in client.chat(
                 model=self.model, messages=self.conversation_history, stream=True
@@ -213,5 +225,8 @@ def create_agent_client(use_ollama: bool = None) -> ConferentiAgentAdapter:
 
     # Extract base URL for Ollama (remove /v1 suffix if present)
     base_url = endpoint.replace("/v1", "") if "/v1" in endpoint else endpoint
+    # OLLAMA_HOST (as used by the Ollama CLI) overrides the Ollama server URL
+    if use_ollama and os.getenv("OLLAMA_HOST"):
+        base_url = os.environ["OLLAMA_HOST"]
 
     return ConferentiAgentAdapter(model=model, base_url=base_url, use_ollama=use_ollama)
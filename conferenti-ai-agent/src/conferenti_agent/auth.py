@@ -1,11 +1,16 @@
-from functools import lru_cache
+import asyncio
+import logging
 import os
+import time
+from typing import Awaitable, Callable, Optional
 from conferenti_agent.config import get_settings
-from fastapi import Header, HTTPException, Security, requests, status
+from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
 import requests
 
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
@@ -13,56 +18,229 @@ AUTH0_DOMAIN = os.getenv("AUTH0_DOMAIN", "your-auth0-domain")
 AUTH0_AUDIENCE = os.getenv("AUTH0_AUDIENCE", "https://conferenti.com/api/")
 ALGORITHMS = ["RS256"]
 
+# Keys are refreshed in the background before they expire so requests never wait on Auth0
+JWKS_TTL_SECONDS = int(os.getenv("AUTH0_JWKS_TTL_SECONDS", "3600"))
+# Minimum time between refreshes triggered by an unknown kid (avoids refetching for forged tokens)
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 30
+# Verified claims are only cached briefly so revoked keys stop being accepted quickly
+CLAIMS_CACHE_TTL_SECONDS = int(os.getenv("AUTH0_CLAIMS_CACHE_TTL_SECONDS", "60"))
+CLAIMS_CACHE_MAX_SIZE = 10000
 
-@lru_cache()
-def get_jwks():
-    """Cache JWKS (public keys) from Auth0"""
-    response = requests.get(f"https://{AUTH0_DOMAIN}/.well-known/jwks.json")
-    return response.json()
 
+async def fetch_jwks(jwks_url: str) -> dict:
+    """Fetch the JWKS (public keys) from Auth0 without blocking the event loop"""
 
-async def verify_token(credentials=Security(security)) -> dict:
-    """Validate JWT token"""
-    settings = get_settings()
+    def _get() -> dict:
+        response = requests.get(jwks_url, timeout=10)
+        response.raise_for_status()
+        return response.json()
 
-    if settings.disable_auth:
-        return {
-            "sub": "local-dev",
-            "scope": "ai:suggest:speakers ai:suggest:sessions ai:chat",
-        }
+    return await asyncio.to_thread(_get)
 
-    token = credentials.credentials
 
-    try:
-        jwks = get_jwks()
-        unverified_header = jwt.get_unverified_header(token)
+class JwksKeyManager:
+    """
+    Caches the Auth0 signing keys (parsed once, by kid) and recently verified token claims.
+
+    Keys are refreshed in the background every ttl_seconds. A token signed with an unknown kid
+    (e.g. after a key rotation) triggers a single refresh that concurrent requests share.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        audience: str,
+        issuer: str,
+        ttl_seconds: float = JWKS_TTL_SECONDS,
+        min_refresh_interval_seconds: float = JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+        claims_cache_ttl_seconds: float = CLAIMS_CACHE_TTL_SECONDS,
+        claims_cache_max_size: int = CLAIMS_CACHE_MAX_SIZE,
+        fetch: Optional[Callable[[str], Awaitable[dict]]] = None,
+    ):
+        self.jwks_url = jwks_url
+        self.audience = audience
+        self.issuer = issuer
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self.claims_cache_ttl_seconds = claims_cache_ttl_seconds
+        self.claims_cache_max_size = claims_cache_max_size
+        self._fetch = fetch or fetch_jwks
+
+        self._keys: dict[str, Key] = {}
+        self._keys_expire_at = 0.0
+        self._last_refresh_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._background_task: Optional[asyncio.Task] = None
+        # token -> (claims, monotonic expiry)
+        self._claims_cache: dict[str, tuple[dict, float]] = {}
+
+    @property
+    def kids(self) -> list[str]:
+        return list(self._keys)
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._keys)
+
+    async def start(self):
+        """Load the keys and start refreshing them in the background"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Requests will retry loading the keys (single-flight) when they need them
+            logger.warning(f"⚠️ Could not load JWKS from {self.jwks_url}: {e}")
+        if self._background_task is None:
+            self._background_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self):
+        if self._background_task is not None:
+            self._background_task.cancel()
+            try:
+                await self._background_task
+            except asyncio.CancelledError:
+                pass
+            self._background_task = None
+
+    async def _refresh_periodically(self):
+        while True:
+            # Refresh before the keys expire so requests don't wait for the fetch
+            await asyncio.sleep(self.ttl_seconds * 0.8)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep using the current keys until the next refresh
+                logger.warning(f"⚠️ JWKS refresh failed, keeping current keys: {e}")
+
+    async def refresh(self):
+        """Fetch and parse the keys, sharing a fetch that is already in progress"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._load_keys())
+        await asyncio.shield(self._refresh_task)
+
+    async def _load_keys(self):
+        self._last_refresh_at = time.monotonic()
+        jwks = await self._fetch(self.jwks_url)
+        keys = {}
+        for key in jwks.get("keys", []):
+            if key.get("kty") != "RSA" or key.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[key["kid"]] = jwk.construct(key, algorithm=ALGORITHMS[0])
+            except Exception as e:
+                logger.warning(f"⚠️ Skipping invalid JWKS key {key.get('kid')}: {e}")
+        self._keys = keys
+        self._keys_expire_at = time.monotonic() + self.ttl_seconds
+        logger.info(f"🔑 Loaded {len(keys)} signing key(s) from JWKS")
+
+    async def get_key(self, kid: str) -> Optional[Key]:
+        """Return the parsed key for kid, refreshing the keys if they are stale or kid is unknown"""
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        if key is not None and now < self._keys_expire_at:
+            return key
+
+        refresh_allowed = (
+            self._last_refresh_at is None
+            or now - self._last_refresh_at >= self.min_refresh_interval_seconds
+            or (self._refresh_task is not None and not self._refresh_task.done())
+        )
+        if key is None and not refresh_allowed:
+            return None
+        if refresh_allowed:
+            try:
+                await self.refresh()
+            except Exception as e:
+                if key is None:
+                    raise
+                logger.warning(f"⚠️ JWKS refresh failed, using cached key: {e}")
+                return key
+        return self._keys.get(kid)
+
+    def _get_cached_claims(self, token: str) -> Optional[dict]:
+        cached = self._claims_cache.get(token)
+        if cached is None:
+            return None
+        claims, expires_at = cached
+        if time.monotonic() >= expires_at:
+            del self._claims_cache[token]
+            return None
+        return claims
+
+    def _cache_claims(self, token: str, claims: dict):
+        ttl = self.claims_cache_ttl_seconds
+        if ttl <= 0:
+            return
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            # Never serve claims past the token's own expiry
+            ttl = min(ttl, exp - time.time())
+            if ttl <= 0:
+                return
+        if len(self._claims_cache) >= self.claims_cache_max_size:
+            # Evict the oldest entry (dicts keep insertion order)
+            del self._claims_cache[next(iter(self._claims_cache))]
+        self._claims_cache[token] = (claims, time.monotonic() + ttl)
+
+    def clear_claims_cache(self):
+        self._claims_cache.clear()
 
-        rsa_key = {}
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"],
-                }
-        if not rsa_key:
+    async def verify(self, token: str) -> dict:
+        """Verify the token's signature, audience and issuer and return its claims"""
+        claims = self._get_cached_claims(token)
+        if claims is not None:
+            return claims
+
+        unverified_header = jwt.get_unverified_header(token)
+        kid = unverified_header.get("kid")
+        key = await self.get_key(kid) if kid else None
+        if key is None:
             raise HTTPException(
                 status_code=401, detail="Unable to find appropriate key"
             )
 
-        # Verify and decode token
-        payload = jwt.decode(
+        claims = jwt.decode(
             token,
-            rsa_key,
+            key,
             algorithms=ALGORITHMS,
+            audience=self.audience,
+            issuer=self.issuer,
+        )
+        self._cache_claims(token, claims)
+        return claims
+
+
+# Singleton instance
+_jwks_key_manager: Optional[JwksKeyManager] = None
+
+
+def get_jwks_key_manager() -> JwksKeyManager:
+    global _jwks_key_manager
+    if _jwks_key_manager is None:
+        _jwks_key_manager = JwksKeyManager(
+            jwks_url=f"https://{AUTH0_DOMAIN}/.well-known/jwks.json",
             audience=AUTH0_AUDIENCE,
             issuer=f"https://{AUTH0_DOMAIN}/",
         )
+    return _jwks_key_manager
+
 
-        return payload
+async def verify_token(credentials=Security(security)) -> dict:
+    """Validate JWT token"""
+    settings = get_settings()
+
+    if settings.disable_auth:
+        return {
+            "sub": "local-dev",
+            "scope": "ai:suggest:speakers ai:suggest:sessions ai:chat",
+        }
+
+    token = credentials.credentials
+
+    try:
+        return await get_jwks_key_manager().verify(token)
 
+    except HTTPException:
+        raise
     except JWTError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
     except Exception as e:
@@ -6,7 +6,6 @@ import os
 from typing import Optional
 from pydantic import Field, AliasChoices
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from conferenti_agent.keyvault import get_keyvault_config
 
 
 class Settings(BaseSettings):
@@ -81,30 +80,48 @@ class Settings(BaseSettings):
             self.cosmos_db_use_local = True
             self.cosmos_db_use_docker = True
 
-        kv = get_keyvault_config()
+        kv = None
+        if not is_key_vault_bypassed():
+            # Deferred so the Key Vault SDK is only imported when it is used
+            from conferenti_agent.keyvault import get_keyvault_config
+
+            kv = get_keyvault_config()
 
         if not self.api_key:
-            self.api_key = (
-                kv.get_secret("AI-API-KEY", self.api_key)
-                if not kv.bypass
-                else os.getenv("AI_API_KEY", "")
-            )
+            self.api_key = _get_secret(kv, "AI-API-KEY", "AI_API_KEY")
 
         if not self.cosmos_db_key:
-            self.cosmos_db_key = (
-                kv.get_secret("COSMOS-DB-KEY", self.cosmos_db_key)
-                if not kv.bypass
-                else os.getenv("COSMOSDB_KEY", "")
-            )
+            self.cosmos_db_key = _get_secret(kv, "COSMOS-DB-KEY", "COSMOSDB_KEY")
 
         if not self.conferenti_api_key:
-            self.conferenti_api_key = (
-                kv.get_secret("CONFERENTI-API-KEY", self.conferenti_api_key)
-                if not kv.bypass
-                else os.getenv("CONFERENTI_API_KEY", "")
+            self.conferenti_api_key = _get_secret(
+                kv, "CONFERENTI-API-KEY", "CONFERENTI_API_KEY"
             )
 
 
+def is_key_vault_bypassed() -> bool:
+    """Same check as KeyVaultConfig.bypass, without importing the Key Vault SDK."""
+    return os.getenv("BYPASS_KEY_VAULT", "true").lower() == "true"
+
+
+def _get_secret(kv, secret_name: str, env_name: str) -> Optional[str]:
+    """
+    Get a secret from the environment (bypass mode) or Key Vault.
+    Uses the secrets cached at startup when loaded so settings never wait on Key Vault.
+    Secrets missing from the cache (e.g. failed to load) are loaded in the background
+    by the provider, and the environment is used meanwhile.
+    """
+    if kv is None or kv.bypass:
+        return os.getenv(env_name, "")
+
+    from conferenti_agent.keyvault import get_secret_provider
+
+    secret_provider = get_secret_provider()
+    if secret_provider.is_loaded:
+        return secret_provider.get(secret_name, os.getenv(env_name, ""))
+    return kv.get_secret(secret_name)
+
+
 def get_settings() -> Settings:
     """Get application settings singleton."""
     return Settings()
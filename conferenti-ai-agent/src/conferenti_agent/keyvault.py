@@ -1,8 +1,19 @@
+import asyncio
 import os
-from typing import Optional
+import time
+from typing import Any, Optional
 from azure.keyvault.secrets import SecretClient
 from azure.identity import DefaultAzureCredential, ClientSecretCredential
 
+# Secrets loaded at startup by the SecretProvider
+REQUIRED_SECRETS = ["AI-API-KEY", "COSMOS-DB-KEY", "CONFERENTI-API-KEY"]
+# Cached secrets are refreshed in the background before they expire
+SECRET_TTL_SECONDS = int(os.getenv("KEY_VAULT_SECRET_TTL_SECONDS", "3600"))
+# Minimum time between background loads of secrets missing from the cache (e.g. failed to load)
+MISSING_SECRET_RETRY_SECONDS = int(
+    os.getenv("KEY_VAULT_MISSING_SECRET_RETRY_SECONDS", "60")
+)
+
 
 class KeyVaultConfig:
     def __init__(self):
@@ -65,6 +76,34 @@ class KeyVaultConfig:
             print(f"Failed to connect to Key Vault: {e}")
             self.client = None
 
+    def create_async_client(self) -> Optional[tuple[Any, Any]]:
+        """Create an async SecretClient and its credential (None in bypass mode)."""
+        if self.bypass or not self.client:
+            return None
+
+        from azure.keyvault.secrets.aio import SecretClient as AsyncSecretClient
+        from azure.identity.aio import (
+            DefaultAzureCredential as AsyncDefaultAzureCredential,
+            ClientSecretCredential as AsyncClientSecretCredential,
+        )
+
+        tenant_id = os.getenv("AZURE_TENANT_ID")
+        client_id = os.getenv("AZURE_CLIENT_ID")
+        client_secret = os.getenv("AZURE_CLIENT_SECRET")
+
+        if not self.use_emulator and all([tenant_id, client_id, client_secret]):
+            credential = AsyncClientSecretCredential(
+                tenant_id=tenant_id,
+                client_id=client_id,
+                client_secret=client_secret,
+            )
+        else:
+            credential = AsyncDefaultAzureCredential()
+        client = AsyncSecretClient(
+            vault_url=self.client.vault_url, credential=credential
+        )
+        return client, credential
+
     def get_secret(
         self, secret_name: str, default: Optional[str] = None
     ) -> Optional[str]:
@@ -91,3 +130,133 @@ def get_keyvault_config() -> KeyVaultConfig:
     if _keyvault_config is None:
         _keyvault_config = KeyVaultConfig()
     return _keyvault_config
+
+
+class SecretProvider:
+    """
+    Loads the required secrets concurrently with the async Key Vault SDK
+    and caches them in memory.
+
+    Secrets are loaded once at startup (one round trip) and refreshed in the
+    background before they expire, so reading a secret never waits on Key Vault.
+    If a refresh fails the cached value is kept until the next refresh. Secrets
+    missing from the cache are loaded again in the background when they are read
+    (at most once every missing_retry_seconds).
+    """
+
+    def __init__(
+        self,
+        secret_names: Optional[list[str]] = None,
+        ttl_seconds: float = SECRET_TTL_SECONDS,
+        missing_retry_seconds: float = MISSING_SECRET_RETRY_SECONDS,
+        client: Optional[Any] = None,
+        credential: Optional[Any] = None,
+    ):
+        self.secret_names = list(secret_names or REQUIRED_SECRETS)
+        self.ttl_seconds = ttl_seconds
+        self.missing_retry_seconds = missing_retry_seconds
+        self.client = client
+        self.credential = credential
+        self.enabled = client is not None
+
+        self._secrets: dict[str, str] = {}
+        self._loaded = False
+        self._load_task: Optional[asyncio.Task] = None
+        self._background_task: Optional[asyncio.Task] = None
+        self._missing_retry_task: Optional[asyncio.Task] = None
+        self._missing_retry_at = 0.0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def get(self, secret_name: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Return the cached secret (never calls Key Vault).
+        A missing secret is loaded in the background and default is returned meanwhile.
+        """
+        secret = self._secrets.get(secret_name)
+        if secret is None:
+            self._load_missing_in_background()
+            return default
+        return secret
+
+    def _load_missing_in_background(self):
+        now = time.monotonic()
+        if not self._loaded or now < self._missing_retry_at:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to load in (e.g. a script): wait for the next refresh
+            return
+        self._missing_retry_at = now + self.missing_retry_seconds
+        self._missing_retry_task = loop.create_task(self.load())
+
+    async def start(self):
+        """Load the secrets and start refreshing them in the background."""
+        if self.client is None:
+            async_client = get_keyvault_config().create_async_client()
+            if async_client is not None:
+                self.client, self.credential = async_client
+            self.enabled = self.client is not None
+        if not self.enabled:
+            return
+
+        await self.load()
+        if self._background_task is None:
+            self._background_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self):
+        if self._background_task is not None:
+            self._background_task.cancel()
+            try:
+                await self._background_task
+            except asyncio.CancelledError:
+                pass
+            self._background_task = None
+        if self._missing_retry_task is not None:
+            self._missing_retry_task.cancel()
+            self._missing_retry_task = None
+        if self.client is not None:
+            await self.client.close()
+        if self.credential is not None:
+            await self.credential.close()
+
+    async def _refresh_periodically(self):
+        while True:
+            # Refresh before the secrets expire so readers always have a value
+            await asyncio.sleep(self.ttl_seconds * 0.8)
+            await self.load()
+
+    async def load(self):
+        """Fetch all the secrets concurrently (sharing a load in progress)."""
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.create_task(self._load_secrets())
+        await asyncio.shield(self._load_task)
+
+    async def _load_secrets(self):
+        results = await asyncio.gather(
+            *[self.client.get_secret(name) for name in self.secret_names],
+            return_exceptions=True,
+        )
+        for name, result in zip(self.secret_names, results):
+            if isinstance(result, BaseException):
+                print(f"Failed to get secret '{name}': {result}")
+                continue
+            self._secrets[name] = result.value
+        self._loaded = True
+        print(
+            f"Loaded {len(self._secrets)}/{len(self.secret_names)} secrets"
+            " from Key Vault"
+        )
+
+
+_secret_provider: Optional[SecretProvider] = None
+
+
+def get_secret_provider() -> SecretProvider:
+    global _secret_provider
+    if _secret_provider is None:
+        _secret_provider = SecretProvider()
+    return _secret_provider
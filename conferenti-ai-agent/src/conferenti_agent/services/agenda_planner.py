@@ -0,0 +1,202 @@
+"""
+Personal agenda planning for the Conferenti AI Agent.
+
+Builds the agenda with the highest total topic relevance that an attendee can
+actually attend: no overlapping sessions, and time to walk between rooms. This is
+weighted interval scheduling, solved exactly with dynamic programming over the
+sessions sorted by end time. The agent is then only asked to phrase the plan.
+
+With a single travel buffer for changing rooms, the best agenda ending before a
+session is the better of the best agenda ending a buffer before it (in any room)
+and the best agenda ending before it in the same room. Both are binary searches
+over prefix maxima, so planning takes O(n log n).
+"""
+
+import bisect
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from conferenti_agent.services.schedule_index import parse_session_time
+from conferenti_agent.types.session import Session
+
+# Minutes to allow for walking between rooms
+DEFAULT_TRAVEL_MINUTES = 10
+
+# Relevance of a topic matching a session tag, track, title or description
+TAG_WEIGHT = 3
+TITLE_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+LEVEL_WEIGHT = 1
+
+
+@dataclass
+class AgendaPreferences:
+    topics: List[str] = field(default_factory=list)
+    level: Optional[str] = None
+    day: Optional[date] = None
+    travel_minutes: int = DEFAULT_TRAVEL_MINUTES
+
+
+@dataclass
+class PlannedSession:
+    start: datetime
+    end: datetime
+    relevance: int
+    session: Dict[str, Any]
+
+    @property
+    def room(self) -> Optional[str]:
+        return self.session.get("room")
+
+
+@dataclass
+class AgendaPlan:
+    sessions: List[PlannedSession]
+    relevance: int
+    # relevant sessions left out (overlapping the plan or too close to change rooms)
+    skipped: List[PlannedSession]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relevance": self.relevance,
+            "sessions": [
+                {**planned.session, "relevance": planned.relevance}
+                for planned in self.sessions
+            ],
+            "skippedSessionIds": [
+                planned.session.get("id") for planned in self.skipped
+            ],
+        }
+
+    def describe(self) -> str:
+        if not self.sessions:
+            return "No matching sessions found."
+        lines = []
+        for planned in self.sessions:
+            speakers = ", ".join(planned.session.get("speakerNames", []))
+            lines.append(
+                f"- {planned.start:%a %Y-%m-%d %H:%M}-{planned.end:%H:%M}"
+                f" {planned.session.get('title', planned.session.get('id'))}"
+                f" ({planned.room or 'room TBA'})"
+                + (f" with {speakers}" if speakers else "")
+            )
+        return "\n".join(lines)
+
+
+def score_session(
+    session: Dict[str, Any], topics: List[str], level: Optional[str] = None
+) -> int:
+    """
+    Topic relevance of a session: the best match of each topic (tag or track,
+    title, description), plus a bonus for the preferred level. Without topics
+    every session is relevant.
+    """
+    if not topics:
+        relevance = 1
+    else:
+        tags = {t.lower() for t in session.get("tags") or []}
+        if session.get("track"):
+            tags.add(session["track"].lower())
+        title = (session.get("title") or "").lower()
+        description = (session.get("description") or "").lower()
+        relevance = 0
+        for topic in {t.lower() for t in topics}:
+            if topic in tags:
+                relevance += TAG_WEIGHT
+            elif topic in title:
+                relevance += TITLE_WEIGHT
+            elif topic in description:
+                relevance += DESCRIPTION_WEIGHT
+        if relevance == 0:
+            return 0
+    if level and (session.get("level") or "").lower() == level.lower():
+        relevance += LEVEL_WEIGHT
+    return relevance
+
+
+def _candidates(
+    sessions: Iterable[Union[Session, Dict[str, Any]]], preferences: AgendaPreferences
+) -> List[PlannedSession]:
+    candidates = []
+    for session in sessions:
+        if isinstance(session, Session):
+            session = session.to_cosmos_dict()
+        start = parse_session_time(session.get("startTime"))
+        end = parse_session_time(session.get("endTime"))
+        if start is None or end is None or end < start:
+            continue
+        if preferences.day and start.date() != preferences.day:
+            continue
+        relevance = score_session(session, preferences.topics, preferences.level)
+        if relevance > 0:
+            candidates.append(PlannedSession(start, end, relevance, session))
+    return candidates
+
+
+class _PrefixBest:
+    """Best agenda among the sessions ending by a time (sessions added by end time)."""
+
+    def __init__(self):
+        self.ends: List[datetime] = []
+        self.best: List[Tuple[int, int]] = []
+
+    def add(self, end: datetime, relevance: int, index: int):
+        previous = self.best[-1] if self.best else (0, -1)
+        self.ends.append(end)
+        # Keep the earlier agenda on ties so plans are deterministic
+        self.best.append((relevance, index) if relevance > previous[0] else previous)
+
+    def ending_by(self, time: datetime) -> Tuple[int, int]:
+        count = bisect.bisect_right(self.ends, time)
+        return self.best[count - 1] if count else (0, -1)
+
+
+def plan_agenda(
+    sessions: Iterable[Union[Session, Dict[str, Any]]],
+    preferences: AgendaPreferences,
+) -> AgendaPlan:
+    """
+    Plan the agenda with the highest total relevance, with no overlapping sessions
+    and at least travel_minutes between sessions in different rooms.
+    """
+    candidates = sorted(
+        _candidates(sessions, preferences),
+        key=lambda p: (p.end, p.start, p.session.get("id", "")),
+    )
+    travel = timedelta(minutes=preferences.travel_minutes)
+
+    best: List[int] = []
+    previous: List[int] = []
+    any_room = _PrefixBest()
+    by_room: Dict[str, _PrefixBest] = {}
+    for index, candidate in enumerate(candidates):
+        before = any_room.ending_by(candidate.start - travel)
+        # No travel time is needed when staying in the same (known) room
+        same_room = by_room.get(candidate.room) if candidate.room else None
+        if same_room is not None:
+            before = max(
+                before, same_room.ending_by(candidate.start), key=lambda e: e[0]
+            )
+        best.append(before[0] + candidate.relevance)
+        previous.append(before[1])
+        any_room.add(candidate.end, best[index], index)
+        if candidate.room:
+            by_room.setdefault(candidate.room, _PrefixBest()).add(
+                candidate.end, best[index], index
+            )
+
+    relevance, index = any_room.best[-1] if candidates else (0, -1)
+    chosen = []
+    while index >= 0:
+        chosen.append(index)
+        index = previous[index]
+    chosen.reverse()
+    chosen_set = set(chosen)
+    return AgendaPlan(
+        sessions=[candidates[i] for i in chosen],
+        relevance=relevance,
+        skipped=sorted(
+            (c for i, c in enumerate(candidates) if i not in chosen_set),
+            key=lambda p: (p.start, p.session.get("id", "")),
+        ),
+    )
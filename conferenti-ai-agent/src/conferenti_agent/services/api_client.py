@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+import json
 import logging
 from datetime import datetime, timezone
 import os
@@ -6,19 +9,87 @@ import uuid
 from conferenti_agent.types.ai_chat import ChatMessage, ChatRequest, ChatResponse
 from conferenti_agent.types.ai_roles import Roles
 from pydantic import BaseModel, Field
-from fastapi import Depends, FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
+from conferenti_agent.services.agenda_planner import DEFAULT_TRAVEL_MINUTES
 from conferenti_agent.services.speaker_service import get_speaker_service
-from conferenti_agent.auth import verify_token, require_scope
+from conferenti_agent.services.speaker_session_index import get_speaker_session_index
+from conferenti_agent.auth import get_jwks_key_manager, verify_token, require_scope
+from conferenti_agent.config import get_settings, is_key_vault_bypassed
+from conferenti_agent.services.readiness import Readiness
 
 logger = logging.getLogger(__name__)
 
+
+def _create_readiness(secret_provider, key_manager) -> Readiness:
+    """Warm-up steps that must complete before the service reports ready"""
+
+    async def load_secrets():
+        if not secret_provider.is_loaded:
+            await secret_provider.load()
+
+    async def load_auth_keys():
+        if not key_manager.is_loaded:
+            await key_manager.refresh()
+
+    async def create_db_client():
+        from conferenti_agent.services.database import get_db_client
+
+        # Creates the Cosmos DB client and its connection pool
+        await asyncio.to_thread(get_db_client)
+
+    async def load_speaker_session_index():
+        await get_speaker_session_index().start()
+
+    async def load_agent_backend():
+        from conferenti_agent.agent import create_agent_client
+
+        await asyncio.to_thread(lambda: create_agent_client().load_backend())
+
+    steps = {}
+    if secret_provider:
+        steps["secrets"] = load_secrets
+    if key_manager:
+        steps["auth_keys"] = load_auth_keys
+    steps["database"] = create_db_client
+    steps["speaker_session_index"] = load_speaker_session_index
+    steps["agent"] = load_agent_backend
+    return Readiness(steps)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the Key Vault secrets and Auth0 signing keys at startup and keep them refreshed"""
+    secret_provider = None
+    if not is_key_vault_bypassed():
+        from conferenti_agent.keyvault import get_secret_provider
+
+        secret_provider = get_secret_provider()
+        await secret_provider.start()
+    key_manager = None
+    if not get_settings().disable_auth:
+        key_manager = get_jwks_key_manager()
+        await key_manager.start()
+
+    # Pools are warmed up in the background, /ready reports when they are done
+    app.state.readiness = _create_readiness(secret_provider, key_manager)
+    app.state.readiness.start()
+    yield
+    await app.state.readiness.stop()
+    await get_speaker_session_index().stop()
+    if key_manager:
+        await key_manager.stop()
+    if secret_provider:
+        await secret_provider.stop()
+
+
 app = FastAPI(
     title="Conferenti AI Agent Api",
     description="AI-powered agent for conference management tasks.",
     version="0.1.0",
     dependencies=[Depends(verify_token)],
+    lifespan=lifespan,
 )
 
 
@@ -56,6 +127,14 @@ class GenerateBioRequest(BaseModel):
     speaker_id: str = Field(..., description="Speaker ID")
 
 
+class GenerateBiosRequest(BaseModel):
+    """Request to generate bios for several speakers"""
+
+    speaker_ids: List[str] = Field(
+        ..., min_length=1, max_length=100, description="Speaker IDs"
+    )
+
+
 class MatchSpeakerRequest(BaseModel):
     """Request to match speaker to sessions"""
 
@@ -65,6 +144,20 @@ class MatchSpeakerRequest(BaseModel):
     )
 
 
+class BuildAgendaRequest(BaseModel):
+    """Request to build a personal agenda"""
+
+    topics: List[str] = Field(..., description="Topics the attendee is interested in")
+    date: Optional[str] = Field(None, description="Date to plan (YYYY-MM-DD)")
+    level: Optional[str] = Field(None, description="Preferred session level")
+    travel_minutes: int = Field(
+        DEFAULT_TRAVEL_MINUTES,
+        ge=0,
+        le=120,
+        description="Minutes to allow for changing rooms",
+    )
+
+
 class SpeakerResponse(BaseModel):
     """Response model for speaker operations"""
 
@@ -81,6 +174,31 @@ class SuggestionResponse(BaseModel):
     message: str
 
 
+class SessionMatchesResponse(BaseModel):
+    """Response for the sessions matching a speaker"""
+
+    success: bool
+    speakerId: str
+    matches: List[dict]
+
+
+class SpeakerAssignmentsResponse(BaseModel):
+    """Response for assigning speakers to sessions"""
+
+    success: bool
+    assignments: List[dict]
+
+
+class AgendaResponse(BaseModel):
+    """Response for a personal agenda"""
+
+    success: bool
+    suggestion: str
+    relevance: int
+    sessions: List[dict]
+    skippedSessionIds: List[str]
+
+
 @app.get("/")
 async def root():
     """API root endpoint"""
@@ -90,6 +208,7 @@ async def root():
         "endpoints": {
             "speakers": "/api/speakers",
             "suggestions": "/api/speakers/suggest",
+            "agenda": "/api/sessions/agenda",
             "docs": "/docs",
         },
     }
@@ -146,6 +265,98 @@ async def generate_speaker_bio(speaker_id: str, request: MatchSpeakerRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/speakers/generate-bios")
+async def generate_speaker_bios(
+    request: GenerateBiosRequest,
+    token: dict = Depends(require_scope("ai:chat")),
+):
+    """
+    Generate bios for several speakers, streamed as NDJSON: one line per speaker
+    as soon as its bio is ready (unchanged speakers get their cached bio).
+    """
+    speaker_service = get_speaker_service()
+
+    async def stream():
+        try:
+            async for result in speaker_service.generate_speaker_bios(
+                request.speaker_ids
+            ):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            # The response has started, so report the error in the stream
+            logger.error(f"Error generating speaker bios: {e}")
+            yield json.dumps({"status": "failed", "error": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get(
+    "/api/speakers/{speaker_id}/session-matches",
+    response_model=SessionMatchesResponse,
+)
+async def get_session_matches(
+    speaker_id: str,
+    k: int = Query(5, ge=1, le=100, description="Number of sessions to return"),
+    token: dict = Depends(require_scope("ai:chat")),
+):
+    """Sessions best matching a speaker, scored against every session"""
+    try:
+        matches = await get_speaker_service().get_session_matches(speaker_id, k=k)
+        return SessionMatchesResponse(
+            success=True, speakerId=speaker_id, matches=matches
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/sessions/speaker-assignments", response_model=SpeakerAssignmentsResponse)
+async def get_speaker_assignments(
+    speakers_per_session: int = Query(1, ge=1, le=10),
+    sessions_per_speaker: int = Query(1, ge=1, le=10),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    token: dict = Depends(require_scope("ai:chat")),
+):
+    """Assignment of speakers to sessions with the highest total affinity"""
+    try:
+        assignments = await get_speaker_service().assign_speakers_to_sessions(
+            speakers_per_session=speakers_per_session,
+            sessions_per_speaker=sessions_per_speaker,
+            min_score=min_score,
+        )
+        return SpeakerAssignmentsResponse(success=True, assignments=assignments)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/sessions/agenda", response_model=AgendaResponse)
+async def build_agenda(
+    request: BuildAgendaRequest,
+    token: dict = Depends(require_scope("ai:chat")),
+):
+    """
+    Build the personal agenda with the most relevant sessions for the topics,
+    without overlapping sessions.
+    """
+    from conferenti_agent.services.session_service import SessionService
+
+    try:
+        result = await SessionService().build_agenda(
+            topics=request.topics,
+            date=request.date,
+            level=request.level,
+            travel_minutes=request.travel_minutes,
+        )
+        return AgendaResponse(success=True, **result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/ai/chat", response_model=ChatResponse)
 async def handle_chat(request: ChatRequest):
     """
@@ -173,7 +384,9 @@ async def handle_chat(request: ChatRequest):
 
         context = build_context(conversation_history)
 
-        if intent == "speaker_search":
+        if intent == "agenda_planning":
+            response_text = await handle_agenda_query(request.message, topics)
+        elif intent == "speaker_search":
             response_text = await handle_speaker_query(request.message, context, topics)
         elif intent == "session_search":
             response_text = await handle_session_query(request.message, context)
@@ -181,12 +394,12 @@ async def handle_chat(request: ChatRequest):
             response_text = await handle_general_query(request.message, context)
 
         try:
-            store_message(
+            await store_message(
                 session_id=request.sessionId,
                 role=Roles.USER.value,
                 content=request.message,
             )
-            store_message(
+            await store_message(
                 session_id=request.sessionId,
                 role=Roles.ASSISTANT.value,
                 content=response_text,
@@ -231,6 +444,22 @@ async def health_check():
     }
 
 
+async def readiness_probe(request: Request) -> JSONResponse:
+    """
+    Readiness probe: ready once the caches are loaded and the client pools created.
+    Registered as a plain route so it doesn't require a bearer token.
+    """
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return JSONResponse({"status": "not ready", "checks": {}}, status_code=503)
+    return JSONResponse(
+        readiness.to_dict(), status_code=200 if readiness.is_ready else 503
+    )
+
+
+app.add_route("/ready", readiness_probe, methods=["GET"])
+
+
 def detect_intent(message: str) -> str:
     """
     Analyze message to determine user intent
@@ -311,6 +540,15 @@ def detect_intent(message: str) -> str:
     proper_nouns = [w for w in capitalized if w not in common_words]
     topics.extend(proper_nouns)
 
+    agenda_keywords = [
+        "my schedule",
+        "my agenda",
+        "plan my",
+        "itinerary",
+    ]
+    if any(keyword in message_lower for keyword in agenda_keywords):
+        return ("agenda_planning", topics)
+
     speaker_keywords = [
         "speaker",
         "presenter",
@@ -393,6 +631,23 @@ async def handle_session_query(message: str, context: str) -> str:
     return result or "I couldn't find information about that sessions."
 
 
+async def handle_agenda_query(message: str, topics: List[str]) -> str:
+    """
+    Handle agenda requests: the agenda is planned by the session service
+    and the agent only phrases it
+    """
+    import re
+
+    from conferenti_agent.services.session_service import SessionService
+
+    service = SessionService()
+    date = re.search(r"\d{4}-\d{2}-\d{2}", message)
+    result = await service.build_agenda(
+        topics=topics, date=date.group(0) if date else None, query=message
+    )
+    return result["suggestion"]
+
+
 async def handle_general_query(message: str, context: str) -> str:
     """
     Handle general conference queries
@@ -417,14 +672,13 @@ async def handle_general_query(message: str, context: str) -> str:
     return str(response)
 
 
-def store_message(session_id: str, role: str, content: str):
+async def store_message(session_id: str, role: str, content: str):
     """
     Store message in Cosmos Db with TTL
     """
     from conferenti_agent.services.database import get_db_client
 
     client = get_db_client()
-    container = client.chat_container
 
     message = {
         "id": str(uuid.uuid4()),
@@ -435,18 +689,20 @@ def store_message(session_id: str, role: str, content: str):
         "ttl": 259200,  # 3 days in seconds
     }
 
-    container.upsert_item(message)
+    await client.upsert_chat_message(message)
 
 
 async def load_messages_from_cosmos(session_id: str) -> List[ChatMessage]:
     """
     Load conversation history from Cosmos Db
     """
-    from conferenti_agent.services.database import get_db_client
+    from conferenti_agent.services.database import CHAT_HISTORY_FIELDS, get_db_client
 
     client = get_db_client()
 
-    items = await client.get_chats_from_session(session_id=session_id)
+    items = await client.get_chats_from_session(
+        session_id=session_id, fields=CHAT_HISTORY_FIELDS
+    )
 
     messages = []
     for item in items:
@@ -0,0 +1,111 @@
+"""
+Batch speaker bio generation support for the Conferenti AI Agent.
+
+Generating bios for many speakers runs several LLM calls at once, so calls are
+limited twice: by the number in flight (a semaphore held by the speaker service)
+and by a client-side rate budget, a token bucket shared by every bio generated in
+the process so batches can't exceed the backend's request rate between them.
+
+Generated bios are cached by the speaker's ETag (and session titles, which are
+part of the prompt), so a bio is only generated again after the speaker changes.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+# LLM calls in flight at once when generating bios
+BIO_GENERATION_CONCURRENCY = int(os.getenv("BIO_GENERATION_CONCURRENCY", "4"))
+# Client-side rate budget for LLM calls (0 disables it)
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+# Generated bios kept (least recently used are evicted)
+BIO_CACHE_SIZE = int(os.getenv("BIO_CACHE_SIZE", "1000"))
+
+
+class RateBudget:
+    """
+    Token bucket allowing requests_per_minute, with bursts of up to burst requests.
+    Waiting callers are served in order.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = requests_per_minute / 60
+        self.capacity = float(burst or BIO_GENERATION_CONCURRENCY)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until the budget allows another request, and spend it."""
+        if not self.enabled:
+            return
+        # Holding the lock while waiting keeps callers in order
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+@dataclass
+class _CachedBio:
+    etag: str
+    session_titles: Tuple[str, ...]
+    bio: str
+
+
+class BioCache:
+    """Generated bios by speaker, valid while the speaker's ETag is unchanged."""
+
+    def __init__(self, max_size: int = BIO_CACHE_SIZE):
+        self.max_size = max_size
+        self._bios: "OrderedDict[str, _CachedBio]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._bios)
+
+    def get(
+        self, speaker_id: str, etag: Optional[str], session_titles: List[str]
+    ) -> Optional[str]:
+        cached = self._bios.get(speaker_id)
+        if (
+            cached is None
+            or not etag
+            or cached.etag != etag
+            or cached.session_titles != tuple(session_titles)
+        ):
+            return None
+        self._bios.move_to_end(speaker_id)
+        return cached.bio
+
+    def put(
+        self, speaker_id: str, etag: Optional[str], session_titles: List[str], bio: str
+    ):
+        # Without an ETag there is no way to tell when the bio is out of date
+        if not etag or self.max_size <= 0:
+            return
+        self._bios[speaker_id] = _CachedBio(etag, tuple(session_titles), bio)
+        self._bios.move_to_end(speaker_id)
+        while len(self._bios) > self.max_size:
+            self._bios.popitem(last=False)
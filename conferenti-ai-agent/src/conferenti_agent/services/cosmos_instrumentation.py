@@ -0,0 +1,213 @@
+"""
+OpenTelemetry instrumentation for Cosmos DB container calls.
+
+Every call records its request charge (RU), client and server latency, item count,
+pages fetched and payload size as metrics and on a span tagged with the
+CosmosDbClient method name. Calls slower than COSMOS_SLOW_QUERY_MS are logged
+with their query text and parameters.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from opentelemetry import metrics, trace
+from opentelemetry.trace import SpanKind
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("COSMOS_SLOW_QUERY_MS", "500"))
+
+_tracer = trace.get_tracer(__name__)
+_meter = metrics.get_meter(__name__)
+
+histogram_request_charge = _meter.create_histogram(
+    name="cosmos.request_charge",
+    unit="RU",
+    description="Request units charged for a Cosmos DB call (all pages)",
+)
+histogram_client_duration = _meter.create_histogram(
+    name="cosmos.client.duration",
+    unit="ms",
+    description="Duration of a Cosmos DB call as seen by the client (all pages)",
+)
+histogram_server_duration = _meter.create_histogram(
+    name="cosmos.server.duration",
+    unit="ms",
+    description="Server-side duration of a Cosmos DB call (x-ms-request-duration-ms, all pages)",
+)
+histogram_item_count = _meter.create_histogram(
+    name="cosmos.item_count",
+    unit="{item}",
+    description="Number of items returned by a Cosmos DB call",
+)
+histogram_page_count = _meter.create_histogram(
+    name="cosmos.page_count",
+    unit="{page}",
+    description="Number of requests (pages, including continuations) made for a Cosmos DB call",
+)
+histogram_payload_bytes = _meter.create_histogram(
+    name="cosmos.payload_bytes",
+    unit="By",
+    description="Size of the Cosmos DB response payloads (all pages)",
+)
+
+
+class CosmosCallStats:
+    """
+    Accumulates the response headers of each request made for a call.
+    Passed to the SDK as the response_hook (called once per page).
+    """
+
+    def __init__(self, method: str, container: str):
+        self.method = method
+        self.container = container
+        self.request_charge = 0.0
+        self.server_duration_ms = 0.0
+        self.client_duration_ms = 0.0
+        self.pages = 0
+        self.item_count = 0
+        self.payload_bytes = 0
+
+    def __call__(self, headers: Mapping[str, Any], result: Any = None):
+        self.pages += 1
+        self.request_charge += float(headers.get("x-ms-request-charge") or 0)
+        self.server_duration_ms += float(headers.get("x-ms-request-duration-ms") or 0)
+        self.payload_bytes += int(headers.get("content-length") or 0)
+
+    @property
+    def continuation_pages(self) -> int:
+        return max(self.pages - 1, 0)
+
+    def to_attributes(self) -> Dict[str, Any]:
+        return {
+            "db.cosmosdb.request_charge": self.request_charge,
+            "db.cosmosdb.server_duration_ms": self.server_duration_ms,
+            "db.cosmosdb.item_count": self.item_count,
+            "db.cosmosdb.page_count": self.pages,
+            "db.cosmosdb.continuation_pages": self.continuation_pages,
+            "db.cosmosdb.payload_bytes": self.payload_bytes,
+        }
+
+
+def _record(
+    stats: CosmosCallStats,
+    query: Optional[str],
+    parameters: Optional[List[Dict[str, Any]]],
+):
+    attributes = {
+        "db.operation": stats.method,
+        "db.cosmosdb.container": stats.container,
+    }
+    histogram_request_charge.record(stats.request_charge, attributes)
+    histogram_client_duration.record(stats.client_duration_ms, attributes)
+    histogram_server_duration.record(stats.server_duration_ms, attributes)
+    histogram_item_count.record(stats.item_count, attributes)
+    histogram_page_count.record(stats.pages, attributes)
+    histogram_payload_bytes.record(stats.payload_bytes, attributes)
+
+    if stats.client_duration_ms >= SLOW_QUERY_MS:
+        logger.warning(
+            f"🐢 Slow Cosmos DB call {stats.method} on {stats.container}: "
+            f"{stats.client_duration_ms:.0f}ms (server {stats.server_duration_ms:.0f}ms), "
+            f"{stats.request_charge:.2f} RU, {stats.item_count} items, {stats.pages} pages "
+            f"| query: {' '.join((query or '').split())} | parameters: {parameters}"
+        )
+
+
+def _instrument(
+    container: Any,
+    method: str,
+    call: Callable[[CosmosCallStats], Any],
+    query: Optional[str] = None,
+    parameters: Optional[List[Dict[str, Any]]] = None,
+) -> Any:
+    stats = CosmosCallStats(method, getattr(container, "id", "unknown"))
+    with _tracer.start_as_current_span(
+        f"cosmos {method}", kind=SpanKind.CLIENT
+    ) as span:
+        span.set_attribute("db.system", "cosmosdb")
+        span.set_attribute("db.operation", method)
+        span.set_attribute("db.cosmosdb.container", stats.container)
+        if query:
+            span.set_attribute("db.statement", query)
+        start = time.perf_counter()
+        try:
+            result = call(stats)
+            if isinstance(result, list):
+                stats.item_count = len(result)
+            elif result is not None:
+                stats.item_count = 1
+            return result
+        finally:
+            stats.client_duration_ms = (time.perf_counter() - start) * 1000
+            span.set_attributes(stats.to_attributes())
+            _record(stats, query, parameters)
+
+
+def query_items(
+    container: Any,
+    method: str,
+    query: str,
+    parameters: Optional[List[Dict[str, Any]]] = None,
+    **kwargs,
+) -> List[Dict[str, Any]]:
+    """Run a query, fetching all pages, and record its request charge and latency."""
+
+    def call(stats: CosmosCallStats):
+        return list(
+            container.query_items(
+                query=query, parameters=parameters, response_hook=stats, **kwargs
+            )
+        )
+
+    return _instrument(container, method, call, query, parameters)
+
+
+def read_item(
+    container: Any, method: str, item: str, partition_key: Any
+) -> Dict[str, Any]:
+    """Point read an item and record its request charge and latency."""
+
+    def call(stats: CosmosCallStats):
+        return container.read_item(
+            item=item, partition_key=partition_key, response_hook=stats
+        )
+
+    return _instrument(
+        container, method, call, parameters=[{"name": "id", "value": item}]
+    )
+
+
+def upsert_item(container: Any, method: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Upsert an item and record its request charge and latency."""
+
+    def call(stats: CosmosCallStats):
+        return container.upsert_item(body, response_hook=stats)
+
+    return _instrument(
+        container, method, call, parameters=[{"name": "id", "value": body.get("id")}]
+    )
+
+
+def query_changes(
+    container: Any,
+    method: str,
+    continuation: Optional[str] = None,
+    start_time: Any = "Now",
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Read the change feed (from the continuation token, or from start_time) and
+    record its request charge and latency. Returns the changed items and the
+    continuation token to read the next changes from.
+    """
+    kwargs = (
+        {"continuation": continuation} if continuation else {"start_time": start_time}
+    )
+
+    def call(stats: CosmosCallStats):
+        return list(container.query_items_change_feed(response_hook=stats, **kwargs))
+
+    items = _instrument(container, method, call)
+    # The change feed continuation token is returned in the etag header
+    return items, container.client_connection.last_response_headers.get("etag")
@@ -1,12 +1,46 @@
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from azure.cosmos import CosmosClient, PartitionKey, exceptions
 from conferenti_agent.config import get_settings
+from conferenti_agent.services import cosmos_instrumentation as instrumented
 from conferenti_agent.types.ai_chat import ChatMessage
 
 logger = logging.getLogger(__name__)
 
+# Projections: the fields each use case reads, so queries only return (and are
+# charged for) what is used. Pass None to select whole documents.
+SESSION_SCHEDULE_FIELDS = [
+    "id",
+    "title",
+    "startTime",
+    "endTime",
+    "room",
+    "track",
+    "level",
+    "tags",
+]
+SPEAKER_PROMPT_FIELDS = ["id", "name", "position", "company", "expertise", "bio"]
+# Precomputed text embedding of a speaker or session, used for matching
+EMBEDDING_FIELD = "embedding"
+# _etag identifies the version of the speaker a generated bio was based on
+SPEAKER_BIO_FIELDS = ["id", "name", "position", "company", "email", "bio", "_etag"]
+CHAT_HISTORY_FIELDS = ["role", "content", "timestamp"]
+
+# Named time slots (start, end) in wall-clock time at the venue
+TIME_SLOTS = {
+    "morning": ("08:00", "12:00"),
+    "afternoon": ("12:00", "17:00"),
+    "evening": ("17:00", "22:00"),
+}
+
+
+def select_fields(fields: Optional[List[str]] = None) -> str:
+    """Build the SELECT clause for a projection (whole documents if fields is None)."""
+    if not fields:
+        return "SELECT * FROM c"
+    return "SELECT " + ", ".join(f"c.{field}" for field in fields) + " FROM c"
+
 
 class CosmosDbClient:
     """Cosmos Db client for Conferenti data operations"""
@@ -40,61 +74,99 @@ class CosmosDbClient:
             partition_key=PartitionKey(path="/sessionId"),
         )
 
+    def _query(
+        self,
+        container,
+        method: str,
+        query: str,
+        parameters: Optional[List[Dict[str, Any]]] = None,
+        partition_key: Optional[str] = None,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a query scoped to a single partition when its key is known,
+        otherwise across partitions.
+        """
+        if partition_key is not None:
+            kwargs["partition_key"] = partition_key
+        else:
+            kwargs["enable_cross_partition_query"] = True
+        return instrumented.query_items(
+            container, method, query=query, parameters=parameters, **kwargs
+        )
+
     async def get_speaker_by_id(self, speaker_id: str) -> Optional[Dict[str, Any]]:
         """Get a speaker by ID."""
         try:
-            item = self.speaker_container.read_item(
-                item=speaker_id, partition_key=speaker_id
+            item = instrumented.read_item(
+                self.speaker_container,
+                "get_speaker_by_id",
+                item=speaker_id,
+                partition_key=speaker_id,
             )
             return item
         except exceptions.CosmosResourceNotFoundError:
             return None
 
-    async def get_all_speakers(self, max_items: int = 100) -> List[Dict[str, Any]]:
+    async def get_all_speakers(
+        self, max_items: int = 100, fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Get all speakers."""
-        query = "SELECT * FROM c"
-        items = list(
-            self.speaker_container.query_items(
-                query=query, enable_cross_partition_query=True, max_item_count=max_items
-            )
+        query = select_fields(fields)
+        items = self._query(
+            self.speaker_container,
+            "get_all_speakers",
+            query,
+            max_item_count=max_items,
         )
 
         return items
 
-    async def get_speakers_by_session(self, session_id: str) -> List[Dict[str, Any]]:
-        """Get all speakers for a specific session."""
-        query = "SELECT * FROM c WHERE ARRAY_CONTAINS(c.sessionIds, @session_id)"
-        parameters = [{"name": "@session_id", "value": session_id}]
-
-        items = list(
-            self.speaker_container.query_items(
-                query=query, parameters=parameters, enable_cross_partition_query=True
-            )
+    async def get_speakers_by_ids(
+        self, speaker_ids: List[str], fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get several speakers by ID with a single query."""
+        if not speaker_ids:
+            return []
+        query = f"{select_fields(fields)} WHERE ARRAY_CONTAINS(@speaker_ids, c.id)"
+        parameters = [{"name": "@speaker_ids", "value": list(speaker_ids)}]
+
+        items = self._query(
+            self.speaker_container,
+            "get_speakers_by_ids",
+            query,
+            parameters,
         )
         return items
 
-    async def search_speakers(self, search_term: str) -> List[Dict[str, Any]]:
+    async def search_speakers(
+        self, search_term: str, fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Search speakers by name, title, or company (case-insensitive)."""
-        query = """
-        SELECT * FROM c
+        query = f"""
+        {select_fields(fields)}
         WHERE CONTAINS(LOWER(c.name), @search_term)
            OR CONTAINS(LOWER(c.position), @search_term)
            OR CONTAINS(LOWER(c.company), @search_term)
         """
         parameters = [{"name": "@search_term", "value": search_term.lower()}]
 
-        items = list(
-            self.speaker_container.query_items(
-                query=query, parameters=parameters, enable_cross_partition_query=True
-            )
+        items = self._query(
+            self.speaker_container,
+            "search_speakers",
+            query,
+            parameters,
         )
         return items
 
     async def get_session_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session details by ID."""
         try:
-            item = self.session_container.read_item(
-                item=session_id, partition_key=session_id
+            item = instrumented.read_item(
+                self.session_container,
+                "get_session_by_id",
+                item=session_id,
+                partition_key=session_id,
             )
             return item
         except exceptions.CosmosResourceNotFoundError:
@@ -103,7 +175,9 @@ class CosmosDbClient:
             print(f"Error fetching session: {e}")
             return None
 
-    async def get_sessions_by_topic(self, topic: str) -> Dict[str, Any]:
+    async def get_sessions_by_topic(
+        self, topic: str, fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Suggest sessions based on specific topic/technology
 
@@ -114,8 +188,8 @@ class CosmosDbClient:
             Dict with matching sessions and AI summary
         """
         try:
-            query = """
-                SELECT * FROM c
+            query = f"""
+                {select_fields(fields)}
                 WHERE CONTAINS(LOWER(c.title), LOWER(@topic))
                     OR CONTAINS(LOWER(c.description), LOWER(@topic))
                     OR ARRAY_CONTAINS(c.tags, @topic, true)
@@ -123,82 +197,11 @@ class CosmosDbClient:
             """
             parameters = [{"name": "@topic", "value": topic}]
 
-            sessions = list(
-                self.session_container.query_items(
-                    query=query,
-                    parameters=parameters,
-                    enable_cross_partition_query=True
-                )
-            )
-
-            return sessions
-        except exceptions.CosmosResourceNotFoundError:
-            return None
-        except Exception as e:
-            logger.error(f"Error in suggest_by_topic: {str(e)}")
-            raise
-
-    async def get_sessions_by_time(
-        self, date: str = None, time_slot: str = None
-    ) -> Dict[str, Any]:
-        """Get sessions by date or time slot"""
-        try:
-            query_conditions = ["SELECT * FROM c WHERE 1=1"]
-            parameters = []
-
-            if date:
-                query_conditions.append("AND STARTSWITH(c.startTime, @date)")
-                parameters.append({"name": "@date", "value": date})
-
-            if time_slot:
-                time_ranges = {
-                    "morning": ("08:00", "12:00"),
-                    "afternoon": ("12:00", "17:00"),
-                    "evening": ("17:00", "22:00"),
-                }
-
-                if time_slot.lower() in time_ranges:
-                    start, end = time_ranges[time_slot.lower()]
-                    query_conditions.append(
-                        "AND c.startTime >= @start AND c.startTime < @end"
-                    )
-                    parameters.append({"name": "@start", "value": start})
-                    parameters.append({"name": "@end", "value": end})
-
-            query_conditions.append("ORDER BY c.startTime")
-            query = " ".join(query_conditions)
-
-            sessions = list(
-                self.session_container.query_items(
-                    query=query,
-                    parameters=parameters,
-                    enable_cross_partition_query=True
-                )
-            )
-
-            return sessions
-        except exceptions.CosmosResourceNotFoundError:
-            return None
-        except Exception as e:
-            logger.error(f"Error in get_sessions_by_time: {str(e)}")
-            raise
-
-    async def suggest_session_by_speaker(self, speaker_id: str) -> List[Dict[str, Any]]:
-        """Get sessions by a specific speaker"""
-        try:
-            query = """
-                SELECT * FROM c
-                WHERE ARRAY_CONTAINS(c.speakerIds, @speaker_id)
-                ORDER BY c.startTime
-            """
-            parameters = [{"name": "@speaker_id", "value": speaker_id}]
-
-            sessions = list(
-                self.session_container.query_items(
-                    query=query,
-                    parameters=parameters,
-                    enable_cross_partition_query=True
-                )
+            sessions = self._query(
+                self.session_container,
+                "get_sessions_by_topic",
+                query,
+                parameters,
             )
 
             return sessions
@@ -208,32 +211,65 @@ class CosmosDbClient:
             logger.error(f"Error in suggest_by_topic: {str(e)}")
             raise
 
-    async def get_all_sessions(self, max_items: int = 5) -> List[Dict[str, Any]]:
+    async def get_all_sessions(
+        self, max_items: int = 5, fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Get all sessions."""
-        query = "SELECT * FROM c"
-        items = list(
-            self.session_container.query_items(
-                query=query, enable_cross_partition_query=True, max_item_count=max_items
-            )
+        query = select_fields(fields)
+        items = self._query(
+            self.session_container,
+            "get_all_sessions",
+            query,
+            max_item_count=max_items,
         )
 
         return items
 
-    async def get_chats_from_session(self, session_id: str) -> List[ChatMessage]:
+    async def get_chats_from_session(
+        self, session_id: str, fields: Optional[List[str]] = None
+    ) -> List[ChatMessage]:
         """
         Load conversation history from Cosmos Db
         """
 
-        query = "SELECT * FROM c WHERE c.sessionId=@session_id ORDER BY c.timestamp ASC"
+        query = (
+            f"{select_fields(fields)} WHERE c.sessionId=@session_id"
+            " ORDER BY c.timestamp ASC"
+        )
         parameters = [{"name": "@session_id", "value": session_id}]
 
-        items = list(
-            self.chat_container.query_items(
-                query=query, parameters=parameters, enable_cross_partition_query=True
-            )
+        # The chat container is partitioned on /sessionId
+        items = self._query(
+            self.chat_container,
+            "get_chats_from_session",
+            query,
+            parameters,
+            partition_key=session_id,
         )
         return items
 
+    async def get_session_changes(
+        self, continuation: Optional[str] = None, start_time: Any = "Now"
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get sessions created or updated since the continuation token (or start_time)."""
+        return instrumented.query_changes(
+            self.session_container, "get_session_changes", continuation, start_time
+        )
+
+    async def get_speaker_changes(
+        self, continuation: Optional[str] = None, start_time: Any = "Now"
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get speakers created or updated since the continuation token (or start_time)."""
+        return instrumented.query_changes(
+            self.speaker_container, "get_speaker_changes", continuation, start_time
+        )
+
+    async def upsert_chat_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a chat message."""
+        return instrumented.upsert_item(
+            self.chat_container, "upsert_chat_message", message
+        )
+
 
 _db_client: Optional[CosmosDbClient] = None
 
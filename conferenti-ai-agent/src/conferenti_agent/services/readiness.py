@@ -0,0 +1,73 @@
+"""
+Readiness tracking for the Conferenti AI Agent API.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Failed warm-up steps (e.g. Cosmos DB not reachable yet) are retried at this interval
+WARM_UP_RETRY_SECONDS = 10
+
+PENDING = "pending"
+READY = "ready"
+
+
+class Readiness:
+    """
+    Runs the warm-up steps (loading caches, creating client pools) in the background
+    and tracks their status, so the readiness probe only reports ready once all of
+    them have completed.
+    """
+
+    def __init__(
+        self,
+        steps: Dict[str, Callable[[], Awaitable[None]]],
+        retry_seconds: float = WARM_UP_RETRY_SECONDS,
+    ):
+        self.steps = steps
+        self.retry_seconds = retry_seconds
+        self.status: Dict[str, str] = {name: PENDING for name in steps}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return all(status == READY for status in self.status.values())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._warm_up())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_step(self, name: str):
+        try:
+            await self.steps[name]()
+            self.status[name] = READY
+        except Exception as e:
+            self.status[name] = f"failed: {e}"
+            logger.warning(f"⚠️ Warm-up step '{name}' failed: {e}")
+
+    async def _warm_up(self):
+        while True:
+            pending = [name for name, status in self.status.items() if status != READY]
+            await asyncio.gather(*[self._run_step(name) for name in pending])
+            if self.is_ready:
+                logger.info("✅ Warm-up complete, ready to receive traffic")
+                return
+            await asyncio.sleep(self.retry_seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "status": "ready" if self.is_ready else "not ready",
+            "checks": dict(self.status),
+        }
@@ -0,0 +1,254 @@
+"""
+Interval index over session times for the Conferenti AI Agent.
+
+Schedule questions (what's on at a time, on a day or in a slot, and which sessions
+overlap) are answered from the parsed session start/end times instead of string
+comparisons in Cosmos DB queries, and overlaps are computed here rather than left
+for the LLM to spot.
+
+Sessions are indexed as half-open intervals [start, end). A query for the sessions
+overlapping [t1, t2) is split into the sessions containing t1 (a stabbing query on a
+centered interval tree) and the sessions starting in (t1, t2) (a binary search on the
+start times), so queries take O(log n + k) for k results. Times are compared as
+wall-clock times at the venue: timezone offsets are dropped when parsing.
+"""
+
+import bisect
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from conferenti_agent.services.database import TIME_SLOTS
+
+logger = logging.getLogger(__name__)
+
+
+def parse_session_time(value: Any) -> Optional[datetime]:
+    """Parse a session start/end time (ISO format) as a wall-clock time."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+@dataclass
+class ScheduledSession:
+    start: datetime
+    end: datetime
+    session: Dict[str, Any]
+
+    @property
+    def id(self) -> str:
+        return self.session.get("id", "")
+
+    @property
+    def sort_key(self) -> Tuple[datetime, datetime, str]:
+        return (self.start, self.end, self.id)
+
+
+@dataclass
+class _IntervalNode:
+    """Interval tree node holding the intervals containing center (sorted both ways)."""
+
+    center: datetime
+    by_start: List[ScheduledSession]
+    by_end_desc: List[ScheduledSession]
+    left: Optional["_IntervalNode"] = None
+    right: Optional["_IntervalNode"] = None
+
+
+def _build_tree(intervals: List[ScheduledSession]) -> Optional[_IntervalNode]:
+    if not intervals:
+        return None
+    # With the lower median endpoint each node holds or splits off at least one interval
+    points = sorted([i.start for i in intervals] + [i.end for i in intervals])
+    center = points[(len(points) - 1) // 2]
+    left, right, here = [], [], []
+    for interval in intervals:
+        if interval.end <= center:
+            left.append(interval)
+        elif interval.start > center:
+            right.append(interval)
+        else:
+            here.append(interval)
+    return _IntervalNode(
+        center=center,
+        by_start=sorted(here, key=lambda i: i.start),
+        by_end_desc=sorted(here, key=lambda i: i.end, reverse=True),
+        left=_build_tree(left),
+        right=_build_tree(right),
+    )
+
+
+@dataclass
+class SessionConflict:
+    """Two sessions whose times overlap (an attendee can't attend both)."""
+
+    first: Dict[str, Any]
+    second: Dict[str, Any]
+    overlap_start: datetime
+    overlap_end: datetime
+    same_room: bool = field(default=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sessionIds": [self.first.get("id"), self.second.get("id")],
+            "overlapStart": self.overlap_start.isoformat(),
+            "overlapEnd": self.overlap_end.isoformat(),
+            "sameRoom": self.same_room,
+        }
+
+    def describe(self) -> str:
+        start = self.overlap_start.strftime("%Y-%m-%d %H:%M")
+        same_day = self.overlap_start.date() == self.overlap_end.date()
+        end = self.overlap_end.strftime("%H:%M" if same_day else "%Y-%m-%d %H:%M")
+        room = " (same room)" if self.same_room else ""
+        return (
+            f"'{self.first.get('title', self.first.get('id'))}' overlaps"
+            f" '{self.second.get('title', self.second.get('id'))}' {start}-{end}{room}"
+        )
+
+
+def find_conflicts(sessions: Iterable[Dict[str, Any]]) -> List[SessionConflict]:
+    """
+    Find the overlapping pairs of sessions with a sweep over the start times
+    (O(n log n + conflicts)), ordered by start time.
+    """
+    scheduled = sorted(_schedule(sessions), key=lambda s: s.sort_key)
+    conflicts = []
+    active: List[ScheduledSession] = []
+    for current in scheduled:
+        # Sessions ending by the time this one starts can't overlap it (or later ones)
+        active = [s for s in active if s.end > current.start]
+        for other in active:
+            room = other.session.get("room")
+            conflicts.append(
+                SessionConflict(
+                    first=other.session,
+                    second=current.session,
+                    overlap_start=current.start,
+                    overlap_end=min(other.end, current.end),
+                    same_room=bool(room) and room == current.session.get("room"),
+                )
+            )
+        active.append(current)
+    return conflicts
+
+
+def _schedule(sessions: Iterable[Dict[str, Any]]) -> List[ScheduledSession]:
+    scheduled = []
+    for session in sessions:
+        start = parse_session_time(session.get("startTime"))
+        end = parse_session_time(session.get("endTime"))
+        if start is None or end is None or end < start:
+            logger.debug(f"Session {session.get('id')} has no valid start/end time")
+            continue
+        scheduled.append(ScheduledSession(start, end, session))
+    return scheduled
+
+
+def slot_times(time_slot: str) -> Tuple[time, time]:
+    """Start and end time of a named time slot (e.g. "morning")."""
+    try:
+        start, end = TIME_SLOTS[time_slot.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown time slot '{time_slot}', expected one of {', '.join(TIME_SLOTS)}"
+        ) from None
+    return time.fromisoformat(start), time.fromisoformat(end)
+
+
+class ScheduleIndex:
+    """
+    Immutable interval index over the sessions with valid start and end times.
+    Results are lists of sessions ordered by start time.
+    """
+
+    def __init__(self, sessions: Iterable[Dict[str, Any]]):
+        self._sessions = sorted(_schedule(sessions), key=lambda s: s.sort_key)
+        self._starts = [s.start for s in self._sessions]
+        # Zero-length sessions never contain a moment, so only need the start times
+        self._tree = _build_tree([s for s in self._sessions if s.end > s.start])
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def sessions(self) -> List[Dict[str, Any]]:
+        return [s.session for s in self._sessions]
+
+    @property
+    def days(self) -> List[date]:
+        """The days sessions start on."""
+        return sorted({s.start.date() for s in self._sessions})
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Sessions overlapping [start, end)."""
+        start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
+        if end <= start:
+            return []
+        # Sessions running at start, then the sessions starting after it
+        results = sorted(self._containing(start), key=lambda s: s.sort_key)
+        first = bisect.bisect_right(self._starts, start)
+        last = bisect.bisect_left(self._starts, end)
+        results.extend(self._sessions[first:last])
+        return [s.session for s in results]
+
+    def starting_between(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Sessions starting in [start, end)."""
+        first = bisect.bisect_left(self._starts, start.replace(tzinfo=None))
+        last = bisect.bisect_left(self._starts, end.replace(tzinfo=None))
+        return [s.session for s in self._sessions[first:last]]
+
+    def at(self, moment: datetime) -> List[Dict[str, Any]]:
+        """Sessions running at a moment."""
+        running = self._containing(moment.replace(tzinfo=None))
+        return [s.session for s in sorted(running, key=lambda s: s.sort_key)]
+
+    def by_day(self, day: date) -> List[Dict[str, Any]]:
+        """Sessions running on a day."""
+        start = datetime.combine(day, time.min)
+        return self.overlapping(start, start + timedelta(days=1))
+
+    def by_slot(
+        self, time_slot: str, day: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Sessions starting in a time slot ("morning", "afternoon" or "evening"),
+        on a day or on every day of the conference.
+        """
+        slot_start, slot_end = slot_times(time_slot)
+        results = []
+        for slot_day in [day] if day else self.days:
+            results.extend(
+                self.starting_between(
+                    datetime.combine(slot_day, slot_start),
+                    datetime.combine(slot_day, slot_end),
+                )
+            )
+        return results
+
+    def _containing(self, moment: datetime) -> List[ScheduledSession]:
+        """Stabbing query: the sessions with start <= moment < end."""
+        results = []
+        node = self._tree
+        while node is not None:
+            if moment < node.center:
+                # All the node's intervals end after center (> moment)
+                for interval in node.by_start:
+                    if interval.start > moment:
+                        break
+                    results.append(interval)
+                node = node.left
+            else:
+                # All the node's intervals start at or before center (<= moment)
+                for interval in node.by_end_desc:
+                    if interval.end <= moment:
+                        break
+                    results.append(interval)
+                node = node.right
+        return results
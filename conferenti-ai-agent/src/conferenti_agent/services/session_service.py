@@ -1,6 +1,6 @@
 # session_service.py
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 import logging
 from typing import Any, Dict, List, Optional
 import os
@@ -11,7 +11,18 @@ from conferenti_agent.prompts import (
 )
 
 from conferenti_agent.agent import create_agent_client
-from conferenti_agent.services.database import get_db_client
+from conferenti_agent.services.database import (
+    SESSION_SCHEDULE_FIELDS,
+    TIME_SLOTS,
+    get_db_client,
+)
+from conferenti_agent.services.agenda_planner import (
+    DEFAULT_TRAVEL_MINUTES,
+    AgendaPreferences,
+    plan_agenda,
+)
+from conferenti_agent.services.schedule_index import find_conflicts
+from conferenti_agent.services.speaker_session_index import get_speaker_session_index
 from conferenti_agent.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -34,6 +45,7 @@ class SessionService:
 
         self.agent_client = create_agent_client()
         self.db = get_db_client()
+        self.index = get_speaker_session_index()
 
     async def suggest_general(self, query: str, context: Optional[str] = None) -> str:
         """
@@ -47,7 +59,9 @@ class SessionService:
             Dict with suggestion and metadata
         """
         try:
-            sessions = await self.db.get_all_sessions()
+            sessions = await self._with_speaker_names(
+                await self.db.get_all_sessions(fields=SESSION_SCHEDULE_FIELDS)
+            )
 
             if not sessions:
                 return {
@@ -94,7 +108,10 @@ class SessionService:
           Dict with matching sessions and AI summary
         """
         try:
-            sessions = await self.db.get_sessions_by_topic(topic)
+            # The sessions are returned to the client, so whole documents are queried
+            sessions = await self._with_speaker_names(
+                await self.db.get_sessions_by_topic(topic)
+            )
 
             if not sessions:
                 return {
@@ -144,7 +161,8 @@ class SessionService:
             Dict with speakers's sessions
         """
         try:
-            sessions = await self.db.suggest_session_by_speaker(speaker_id)
+            await self.index.ensure_loaded()
+            sessions = self.index.sessions_for_speaker(speaker_id)
 
             if not sessions:
                 return {
@@ -196,7 +214,7 @@ class SessionService:
             Dict with sessions in that time range
         """
         try:
-            sessions = await self.db.get_sessions_by_time(date, time_slot)
+            sessions = await self._get_sessions_by_time(date, time_slot)
             if not sessions:
                 return {
                     "suggestion": f"No sessions found for {date or ''} {time_slot or ''}",
@@ -205,14 +223,21 @@ class SessionService:
                     "time_slot": time_slot,
                 }
 
+            # Overlaps are computed from the schedule, the agent only explains them
+            conflicts = find_conflicts(sessions)
+            conflicts_text = "\n".join(f"- {c.describe()}" for c in conflicts) or "None"
+
             prompt = f"""You are a conference assistant.
           Sessions scheduled for {date or ''} {time_slot or ''}
           {self._format_sessions_for_prompt(sessions)}
+
+          Overlapping sessions:
+          {conflicts_text}
           
           Provide a helpful schedule overview including:
           1. List of sessions with times
           2. Suggestions for which sessions to attend
-          3. Any scheduling conflicts to be aware of
+          3. How to choose between the overlapping sessions listed above
           
           Be organized and helpful.
           """
@@ -228,25 +253,127 @@ class SessionService:
                 "date": date,
                 "time_slot": time_slot,
                 "count": len(sessions),
+                "conflicts": [c.to_dict() for c in conflicts],
             }
 
         except Exception as e:
             logger.error(f"Error in suggest_by_time: {str(e)}")
             raise
 
+    async def build_agenda(
+        self,
+        topics: List[str],
+        date: str = None,
+        level: str = None,
+        travel_minutes: int = DEFAULT_TRAVEL_MINUTES,
+        query: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build a personal agenda for the topics
+
+        Args:
+          topics: Topics the attendee is interested in
+          date: Optional date in ISO format (YYYY-MM-DD)
+          level: Optional preferred session level
+          travel_minutes: Minutes to allow for changing rooms
+          query: Optional original request, passed to the agent for phrasing
+
+        Returns:
+            Dict with the planned sessions and the agent's summary of the plan
+        """
+        try:
+            preferences = AgendaPreferences(
+                topics=topics,
+                level=level,
+                day=self._parse_date(date),
+                travel_minutes=travel_minutes,
+            )
+            await self.index.ensure_loaded()
+            # The plan is computed here, the agent only phrases it
+            plan = plan_agenda(self.index.schedule.sessions, preferences)
+            if not plan.sessions:
+                return {
+                    "suggestion": "I couldn't find any sessions about "
+                    f"{', '.join(topics) or 'those topics'}.",
+                    **plan.to_dict(),
+                }
+
+            prompt = f"""You are a conference assistant.
+          {f"The attendee asked: {query}" if query else ""}
+          Their personal agenda for {', '.join(topics) or 'the conference'} is:
+          {plan.describe()}
+
+          Present this agenda in a friendly, well-organized way. Keep the sessions,
+          times and rooms exactly as listed, and briefly say why each session is worth
+          attending. Do not add or remove sessions.
+          """
+            agent = self.agent_client.create_agent(
+                name="session_agenda_planner",
+                instructions=instructions,
+            )
+            response = agent.run(prompt)
+            suggestion = (
+                response.get("content") if isinstance(response, dict) else None
+            ) or plan.describe()
+
+            return {"suggestion": suggestion, **plan.to_dict()}
+
+        except Exception as e:
+            logger.error(f"Error in build_agenda: {str(e)}")
+            raise
+
+    def _parse_date(self, date: Optional[str]) -> Optional[date]:
+        if not date:
+            return None
+        try:
+            return datetime.fromisoformat(date).date()
+        except ValueError:
+            raise ValueError(f"Invalid date '{date}', expected YYYY-MM-DD")
+
+    async def _get_sessions_by_time(
+        self, date: str = None, time_slot: str = None
+    ) -> List[Dict[str, Any]]:
+        """Get the sessions on a date and/or in a time slot from the schedule index"""
+        day = self._parse_date(date)
+        await self.index.ensure_loaded()
+        schedule = self.index.schedule
+        if time_slot and time_slot.lower() in TIME_SLOTS:
+            sessions = schedule.by_slot(time_slot, day)
+        elif day:
+            sessions = schedule.by_day(day)
+        else:
+            sessions = schedule.sessions
+
+        return [dict(session) for session in sessions]
+
+    async def _with_speaker_names(
+        self, sessions: Optional[List[Dict[str, Any]]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Add the speaker names from the speaker/session index"""
+        if not sessions:
+            return sessions
+        await self.index.ensure_loaded()
+        return self.index.with_speaker_names(sessions)
+
     def _format_sessions_for_prompt(self, sessions: List[Dict[str, Any]]) -> str:
         """Format session data for AI prompt"""
         formatted = []
 
         for session in sessions:
+            # Schedule-only queries don't select the description
+            description = (
+                f"\nDescription: {session['description']}"
+                if "description" in session
+                else ""
+            )
             session_info = f"""
-Title: {session.get('title', 'N/A')}
-Description: {session.get('description', 'N/A')}
+Title: {session.get('title', 'N/A')}{description}
 Start Time: {session.get('startTime', 'N/A')}
 End Time: {session.get('endTime', 'N/A')}
 Room: {session.get('room', 'N/A')}
 Track: {session.get('track', 'N/A')}
 Level: {session.get('level', 'N/A')}
+Speakers: {', '.join(session.get('speakerNames', [])) or 'N/A'}
 Tags: {', '.join(session.get('tags', []))}
 ---"""
             formatted.append(session_info)
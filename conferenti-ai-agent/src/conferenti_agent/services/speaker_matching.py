@@ -0,0 +1,279 @@
+"""
+Speaker to session matching for the Conferenti AI Agent.
+
+Scores every speaker against every session at once with NumPy, instead of asking
+the LLM to match one speaker at a time. The affinity of a speaker and a session
+combines:
+
+- tag overlap: the cosine similarity of one-hot matrices of the speaker expertise
+  and the session tags/track (speakers x tags @ tags x sessions)
+- text similarity: the cosine similarity of the speaker and session embeddings
+  (an "embedding" field on every document), or of hashed term vectors of the
+  speaker bio/position and the session title/description when there are none
+
+The assignment solver picks the speaker for each session (or the sessions for each
+speaker) with the highest total affinity, with the Hungarian algorithm.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from conferenti_agent.services.database import EMBEDDING_FIELD
+
+# Weight of the tag overlap and of the text similarity in the affinity (0..1)
+TAG_WEIGHT = 0.6
+TEXT_WEIGHT = 0.4
+
+# Dimensions of the hashed term vectors used when there are no embeddings
+HASHED_DIMENSIONS = 1024
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9#+]+")
+# Words that say nothing about the topic of a bio or session
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the this to"
+    " we will with you your".split()
+)
+
+
+def _speaker_tags(speaker: Dict[str, Any]) -> List[str]:
+    return [t.lower() for t in speaker.get("expertise") or []]
+
+
+def _session_tags(session: Dict[str, Any]) -> List[str]:
+    tags = [t.lower() for t in session.get("tags") or []]
+    if session.get("track"):
+        tags.append(session["track"].lower())
+    return tags
+
+
+def _speaker_text(speaker: Dict[str, Any]) -> str:
+    return " ".join(
+        [
+            speaker.get("position") or "",
+            speaker.get("bio") or "",
+            " ".join(speaker.get("expertise") or []),
+        ]
+    )
+
+
+def _session_text(session: Dict[str, Any]) -> str:
+    return " ".join(
+        [
+            session.get("title") or "",
+            session.get("description") or "",
+            " ".join(session.get("tags") or []),
+        ]
+    )
+
+
+def one_hot(tag_lists: Sequence[List[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    """Rows of 0/1 tag indicators over the vocabulary."""
+    matrix = np.zeros((len(tag_lists), len(vocabulary)), dtype=np.float32)
+    rows, columns = [], []
+    for row, tags in enumerate(tag_lists):
+        for tag in tags:
+            if tag in vocabulary:
+                rows.append(row)
+                columns.append(vocabulary[tag])
+    matrix[rows, columns] = 1.0
+    return matrix
+
+
+def hashed_term_vectors(
+    texts: Sequence[str], dimensions: int = HASHED_DIMENSIONS
+) -> np.ndarray:
+    """Term frequency vectors of the texts, with the terms hashed into dimensions."""
+    matrix = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = [
+            t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOP_WORDS
+        ]
+        columns = [zlib.crc32(t.encode()) % dimensions for t in tokens]
+        np.add.at(matrix[row], columns, 1.0)
+    # Dampen repeated terms
+    return np.log1p(matrix)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _embeddings(documents: Sequence[Dict[str, Any]]) -> Optional[np.ndarray]:
+    embeddings = [document.get(EMBEDDING_FIELD) for document in documents]
+    if not embeddings or any(e is None for e in embeddings):
+        return None
+    try:
+        return np.asarray(embeddings, dtype=np.float32)
+    except ValueError:
+        # Embeddings of different sizes (e.g. from different models)
+        return None
+
+
+@dataclass
+class AffinityMatrix:
+    """Affinity (0..1) of every speaker (rows) with every session (columns)."""
+
+    speaker_ids: List[str]
+    session_ids: List[str]
+    scores: np.ndarray
+
+    def __post_init__(self):
+        self._speaker_rows = {sid: row for row, sid in enumerate(self.speaker_ids)}
+
+    def top_k(self, speaker_id: str, k: int = 5) -> List[Tuple[str, float]]:
+        """The k sessions with the highest affinity for a speaker."""
+        row = self._speaker_rows.get(speaker_id)
+        if row is None:
+            return []
+        columns = self.top_k_indices(k, self.scores[row : row + 1])[0]
+        return [(self.session_ids[c], float(self.scores[row, c])) for c in columns]
+
+    def top_k_indices(self, k: int, scores: Optional[np.ndarray] = None) -> np.ndarray:
+        """The columns of the k highest scores of each row, best first."""
+        scores = self.scores if scores is None else scores
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return np.zeros((scores.shape[0], 0), dtype=np.intp)
+        # argpartition selects the top k in O(n) per row, then only those are sorted
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(
+            -np.take_along_axis(scores, top, axis=1), axis=1, kind="stable"
+        )
+        return np.take_along_axis(top, order, axis=1)
+
+
+def build_affinity_matrix(
+    speakers: Sequence[Dict[str, Any]],
+    sessions: Sequence[Dict[str, Any]],
+    tag_weight: float = TAG_WEIGHT,
+    text_weight: float = TEXT_WEIGHT,
+) -> AffinityMatrix:
+    """Score every speaker against every session."""
+    speaker_tags = [_speaker_tags(s) for s in speakers]
+    session_tags = [_session_tags(s) for s in sessions]
+    vocabulary = {
+        tag: index
+        for index, tag in enumerate(
+            sorted({t for tags in speaker_tags + session_tags for t in tags})
+        )
+    }
+    tag_scores = (
+        normalize_rows(one_hot(speaker_tags, vocabulary))
+        @ normalize_rows(one_hot(session_tags, vocabulary)).T
+    )
+
+    speaker_vectors, session_vectors = _embeddings(speakers), _embeddings(sessions)
+    if (
+        speaker_vectors is None
+        or session_vectors is None
+        or speaker_vectors.shape[1] != session_vectors.shape[1]
+    ):
+        speaker_vectors = hashed_term_vectors([_speaker_text(s) for s in speakers])
+        session_vectors = hashed_term_vectors([_session_text(s) for s in sessions])
+    text_scores = normalize_rows(speaker_vectors) @ normalize_rows(session_vectors).T
+
+    scores = tag_weight * tag_scores + text_weight * np.clip(text_scores, 0.0, None)
+    return AffinityMatrix(
+        speaker_ids=[s["id"] for s in speakers],
+        session_ids=[s["id"] for s in sessions],
+        scores=scores.astype(np.float32, copy=False),
+    )
+
+
+def _hungarian(cost: np.ndarray) -> np.ndarray:
+    """
+    Minimum cost assignment of every row to a distinct column (rows <= columns),
+    returning the column of each row. The Hungarian algorithm with potentials,
+    with the inner loop over columns vectorised: O(rows^2 * columns).
+    """
+    rows, columns = cost.shape
+    u = np.zeros(rows + 1)
+    v = np.zeros(columns + 1)
+    # row assigned to each column (1-based, 0 = unassigned), column 0 is a sentinel
+    assigned = np.zeros(columns + 1, dtype=np.intp)
+    way = np.zeros(columns + 1, dtype=np.intp)
+    for row in range(1, rows + 1):
+        assigned[0] = row
+        column = 0
+        min_reduced = np.full(columns + 1, np.inf)
+        used = np.zeros(columns + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current_row = assigned[column]
+            free = ~used
+            free[0] = False
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            improved = free[1:] & (reduced < min_reduced[1:])
+            min_reduced[1:][improved] = reduced[improved]
+            way[1:][improved] = column
+            candidates = np.where(free, min_reduced, np.inf)
+            next_column = int(np.argmin(candidates))
+            delta = candidates[next_column]
+            u[assigned[used]] += delta
+            v[used] -= delta
+            min_reduced[free] -= delta
+            column = next_column
+            if assigned[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            assigned[column] = assigned[previous]
+            column = previous
+
+    result = np.full(rows, -1, dtype=np.intp)
+    for column in range(1, columns + 1):
+        if assigned[column]:
+            result[assigned[column] - 1] = column - 1
+    return result
+
+
+def assign_speakers(
+    matrix: AffinityMatrix,
+    speakers_per_session: int = 1,
+    sessions_per_speaker: int = 1,
+    min_score: float = 0.0,
+) -> List[Tuple[str, str, float]]:
+    """
+    Assign speakers to sessions maximising the total affinity, with up to
+    speakers_per_session speakers per session or up to sessions_per_speaker sessions
+    per speaker. Pairs scoring min_score or less are never assigned, so sessions can
+    be left without a speaker. Returns (speaker_id, session_id, score) by session.
+    """
+    if speakers_per_session > 1 and sessions_per_speaker > 1:
+        # Repeating both sides could assign the same speaker to a session twice
+        raise ValueError(
+            "Only one of speakers_per_session and sessions_per_speaker can be above 1"
+        )
+    # Pairs at or below min_score add nothing, so are equivalent to no assignment
+    scores = np.where(matrix.scores > min_score, matrix.scores, 0.0)
+    # Repeat the sessions (or speakers) for their capacity
+    session_slots = np.repeat(np.arange(scores.shape[1]), speakers_per_session)
+    speaker_slots = np.repeat(np.arange(scores.shape[0]), sessions_per_speaker)
+    slots = scores.T.astype(np.float64)[np.ix_(session_slots, speaker_slots)]
+    if slots.size == 0:
+        return []
+
+    if slots.shape[0] <= slots.shape[1]:
+        columns = _hungarian(-slots)
+        pairs = zip(session_slots, speaker_slots[columns])
+    else:
+        rows = _hungarian(-slots.T)
+        pairs = zip(session_slots[rows], speaker_slots)
+
+    assignments = [
+        (session, speaker)
+        for session, speaker in pairs
+        if matrix.scores[speaker, session] > min_score
+    ]
+    assignments.sort(key=lambda a: (a[0], -matrix.scores[a[1], a[0]]))
+    return [
+        (
+            matrix.speaker_ids[speaker],
+            matrix.session_ids[session],
+            float(matrix.scores[speaker, session]),
+        )
+        for session, speaker in assignments
+    ]
@@ -1,6 +1,7 @@
 # speaker_service.py
 
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
 import logging
 import os
 from conferenti_agent.prompts import (
@@ -10,7 +11,17 @@ from conferenti_agent.prompts import (
     GENERATE_SPEAKER_BIO_PROMPT,
 )
 from conferenti_agent.agent import create_agent_client
-from conferenti_agent.services.database import get_db_client
+from conferenti_agent.services.bio_generation import (
+    BIO_GENERATION_CONCURRENCY,
+    BioCache,
+    RateBudget,
+)
+from conferenti_agent.services.database import (
+    SPEAKER_BIO_FIELDS,
+    SPEAKER_PROMPT_FIELDS,
+    get_db_client,
+)
+from conferenti_agent.services.speaker_session_index import get_speaker_session_index
 from conferenti_agent.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -34,6 +45,14 @@ class SpeakerService:
 
         self.agent_client = create_agent_client()
         self.db = get_db_client()
+        self.index = get_speaker_session_index()
+        # speakers x sessions affinity matrix, rebuilt when the index changes
+        self._affinity = None
+        self._affinity_version = None
+        # Bio generation: LLM calls in flight, rate budget and bios by speaker ETag
+        self._bio_slots = asyncio.Semaphore(BIO_GENERATION_CONCURRENCY)
+        self.rate_budget = RateBudget()
+        self.bio_cache = BioCache()
 
     async def get_speaker(self, speaker_id: str) -> Optional[Dict]:
         """Get a speaker by ID from Cosmos DB."""
@@ -45,15 +64,66 @@ class SpeakerService:
 
     async def get_speakers_for_session(self, session_id: str) -> List[Dict]:
         """Get all speakers for a specific session"""
-        return await self.db.get_speakers_by_session(session_id)
+        await self.index.ensure_loaded()
+        return self.index.speakers_for_session(session_id)
 
     async def search_speakers(self, query: str) -> List[Dict]:
         """Search speakers by name, title or company"""
         return await self.db.search_speakers(query)
 
     async def get_sessions_for_speaker(self, speaker_id: str) -> List[Dict]:
-        """Get all sessions for a specific speaker."""
-        return []
+        """Get all sessions for a specific speaker, ordered by start time."""
+        await self.index.ensure_loaded()
+        return self.index.sessions_for_speaker(speaker_id)
+
+    async def get_session_matches(
+        self, speaker_id: str, k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the k sessions that best match a speaker's expertise and background,
+        scored against every session without calling the agent.
+
+        Returns: Sessions with their affinity score (0..1), best first.
+        """
+        affinity = await self._get_affinity_matrix()
+        if speaker_id not in self.index.speakers:
+            raise ValueError(f"Speaker {speaker_id} not found")
+
+        return [
+            {**self.index.sessions[session_id], "score": round(score, 4)}
+            for session_id, score in affinity.top_k(speaker_id, k)
+        ]
+
+    async def assign_speakers_to_sessions(
+        self,
+        speakers_per_session: int = 1,
+        sessions_per_speaker: int = 1,
+        min_score: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Assign speakers to sessions maximising the total affinity.
+
+        Returns: (speakerId, sessionId, score) assignments ordered by session.
+        """
+        from conferenti_agent.services.speaker_matching import assign_speakers
+
+        affinity = await self._get_affinity_matrix()
+        return [
+            {"speakerId": speaker_id, "sessionId": session_id, "score": round(score, 4)}
+            for speaker_id, session_id, score in assign_speakers(
+                affinity, speakers_per_session, sessions_per_speaker, min_score
+            )
+        ]
+
+    async def _get_affinity_matrix(self):
+        # NumPy is only imported when matching is first used
+        from conferenti_agent.services.speaker_matching import build_affinity_matrix
+
+        await self.index.ensure_loaded()
+        if self._affinity is None or self._affinity_version != self.index.version:
+            self._affinity = build_affinity_matrix(*self.index.matching_documents())
+            self._affinity_version = self.index.version
+        return self._affinity
 
     async def suggest_speakers_general(self, query: str, topics: List[str]) -> str:
         """
@@ -63,7 +133,7 @@ class SpeakerService:
         Returns: Formatted text for chatbot UI display.
         """
         try:
-            speakers = await self.db.get_all_speakers()
+            speakers = await self.db.get_all_speakers(fields=SPEAKER_PROMPT_FIELDS)
 
             if not speakers:
                 return {
@@ -111,8 +181,66 @@ class SpeakerService:
         if not speaker:
             raise ValueError(f"Speaker {speaker_id} not found")
 
-        sessions = await self.get_sessions_for_speaker(speaker_id)
+        bio, _ = await self._generate_bio(speaker)
+        return bio
+
+    async def generate_speaker_bios(
+        self, speaker_ids: List[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate bios for several speakers, fetched with a single query.
+        Bios are generated concurrently (within the LLM concurrency and rate
+        budget) and unchanged speakers get their cached bio.
+
+        Yields: A result per speaker as soon as it is ready, with a status of
+        "completed", "cached", "not_found" or "failed".
+        """
+        speaker_ids = list(dict.fromkeys(speaker_ids))
+        speakers = {
+            speaker["id"]: speaker
+            for speaker in await self.db.get_speakers_by_ids(
+                speaker_ids, fields=SPEAKER_BIO_FIELDS
+            )
+        }
+
+        async def generate(speaker_id: str) -> Dict[str, Any]:
+            speaker = speakers.get(speaker_id)
+            if speaker is None:
+                return {
+                    "speakerId": speaker_id,
+                    "status": "not_found",
+                    "error": f"Speaker {speaker_id} not found",
+                }
+            try:
+                bio, cached = await self._generate_bio(speaker)
+            except Exception as e:
+                logger.warning(f"Bio generation failed for speaker {speaker_id}: {e}")
+                return {"speakerId": speaker_id, "status": "failed", "error": str(e)}
+            return {
+                "speakerId": speaker_id,
+                "status": "cached" if cached else "completed",
+                "bio": bio,
+            }
+
+        tasks = [
+            asyncio.create_task(generate(speaker_id)) for speaker_id in speaker_ids
+        ]
+        try:
+            for result in asyncio.as_completed(tasks):
+                yield await result
+        finally:
+            # The client went away (or the stream failed): stop the remaining calls
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_bio(self, speaker: Dict[str, Any]) -> Tuple[str, bool]:
+        """Generate a speaker's bio unless it is cached for their ETag."""
+        sessions = await self.get_sessions_for_speaker(speaker["id"])
         session_titles = [s.get("title", "") for s in sessions]
+        etag = speaker.get("_etag")
+        bio = self.bio_cache.get(speaker["id"], etag, session_titles)
+        if bio is not None:
+            return bio, True
 
         prompt = GENERATE_SPEAKER_BIO_PROMPT.format(
             speaker_name=speaker.get("name", ""),
@@ -127,9 +255,15 @@ class SpeakerService:
             name="bio_generator",
             instructions="You are a professional biography writer.",
         )
-        response = agent.run(prompt)
-
-        return response["content"]
+        async with self._bio_slots:
+            await self.rate_budget.acquire()
+            # The agent call blocks, so run it off the event loop
+            response = await asyncio.to_thread(agent.run, prompt)
+        if response.get("status") == "failed":
+            raise RuntimeError(response.get("error", "Bio generation failed"))
+
+        self.bio_cache.put(speaker["id"], etag, session_titles, response["content"])
+        return response["content"], False
 
     async def suggest_speaker_topics(
         self, speaker_id: str, session_id: str, count: int = 3
@@ -0,0 +1,391 @@
+"""
+In-memory speaker <-> session index for the Conferenti AI Agent.
+
+Sessions list their speakers in speakerIds and speakers list their sessions in
+sessionIds, and looking up either direction in Cosmos DB is a cross-partition
+ARRAY_CONTAINS scan. The index keeps both directions as
+adjacency sets, so lookups are O(degree), and keeps the speaker names on each
+session so session prompts don't need separate speaker lookups. Sessions are kept
+as whole documents, since they are returned to API clients, while speakers only
+keep the prompt fields and their links. The session times are indexed by a
+ScheduleIndex (schedule), rebuilt when sessions change.
+
+Speaker and session embeddings (used for matching) are kept apart from the
+documents, so they are never returned with them.
+
+The index is loaded once (in the background at startup) and kept up to date from
+the Cosmos DB change feed. The change feed doesn't report deletes, so the index is
+also rebuilt periodically.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from conferenti_agent.services.database import (
+    EMBEDDING_FIELD,
+    SPEAKER_PROMPT_FIELDS,
+    get_db_client,
+)
+from conferenti_agent.services.schedule_index import ScheduleIndex
+
+logger = logging.getLogger(__name__)
+
+# Fields kept for each speaker (the prompt fields plus the links)
+INDEX_SPEAKER_FIELDS = SPEAKER_PROMPT_FIELDS + ["sessionIds"]
+
+# Interval for applying the change feed, and for rebuilding the index (to drop deletes)
+INDEX_REFRESH_SECONDS = float(os.getenv("SPEAKER_SESSION_INDEX_REFRESH_SECONDS", "60"))
+INDEX_RELOAD_SECONDS = float(os.getenv("SPEAKER_SESSION_INDEX_RELOAD_SECONDS", "3600"))
+
+
+def _project(document: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    return {field: document[field] for field in fields if field in document}
+
+
+def _set_embedding(
+    embeddings: Dict[str, List[float]], document_id: str, document: Dict[str, Any]
+):
+    embedding = document.get(EMBEDDING_FIELD)
+    if embedding is None:
+        embeddings.pop(document_id, None)
+    else:
+        embeddings[document_id] = embedding
+
+
+def _with_embeddings(
+    documents: Dict[str, Dict[str, Any]], embeddings: Dict[str, List[float]]
+) -> List[Dict[str, Any]]:
+    return [
+        (
+            {**document, EMBEDDING_FIELD: embeddings[document_id]}
+            if document_id in embeddings
+            else document
+        )
+        for document_id, document in documents.items()
+    ]
+
+
+class SpeakerSessionIndex:
+    """
+    Bipartite graph of speakers and sessions.
+
+    A speaker and a session are linked when either side lists the other, so the
+    links declared by each side are tracked separately and an edge is only removed
+    once neither side declares it.
+    """
+
+    def __init__(
+        self,
+        db: Optional[Any] = None,
+        refresh_seconds: float = INDEX_REFRESH_SECONDS,
+        reload_seconds: float = INDEX_RELOAD_SECONDS,
+    ):
+        self.db = db
+        self.refresh_seconds = refresh_seconds
+        self.reload_seconds = reload_seconds
+
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.speakers: Dict[str, Dict[str, Any]] = {}
+        self.session_embeddings: Dict[str, List[float]] = {}
+        self.speaker_embeddings: Dict[str, List[float]] = {}
+        self._speakers_by_session: Dict[str, Set[str]] = {}
+        self._sessions_by_speaker: Dict[str, Set[str]] = {}
+        # links declared by each document, and the number of sides declaring each edge
+        self._declared_by_session: Dict[str, Set[str]] = {}
+        self._declared_by_speaker: Dict[str, Set[str]] = {}
+        self._link_counts: Dict[Tuple[str, str], int] = {}
+        # interval index over the session times, rebuilt when sessions change
+        self._sessions_version = 0
+        self._speakers_version = 0
+        self._schedule: Optional[ScheduleIndex] = None
+        self._schedule_version = -1
+
+        self._loaded = False
+        self._loaded_at: Optional[datetime] = None
+        self._session_continuation: Optional[str] = None
+        self._speaker_continuation: Optional[str] = None
+        self._load_task: Optional[asyncio.Task] = None
+        self._background_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """Changes whenever a session or speaker changes (for derived caches)."""
+        return (self._sessions_version, self._speakers_version)
+
+    @property
+    def schedule(self) -> ScheduleIndex:
+        """Interval index over the session start/end times."""
+        if self._schedule_version != self._sessions_version:
+            self._schedule = ScheduleIndex(self.sessions.values())
+            self._schedule_version = self._sessions_version
+        return self._schedule
+
+    # Lookups
+
+    def session_ids_for_speaker(self, speaker_id: str) -> Set[str]:
+        return set(self._sessions_by_speaker.get(speaker_id, ()))
+
+    def speaker_ids_for_session(self, session_id: str) -> Set[str]:
+        return set(self._speakers_by_session.get(session_id, ()))
+
+    def sessions_for_speaker(self, speaker_id: str) -> List[Dict[str, Any]]:
+        """Sessions of a speaker (with their speaker names), ordered by start time."""
+        sessions = [
+            dict(self.sessions[session_id])
+            for session_id in self._sessions_by_speaker.get(speaker_id, ())
+            if session_id in self.sessions
+        ]
+        return sorted(sessions, key=lambda s: (s.get("startTime") or "", s["id"]))
+
+    def speakers_for_session(self, session_id: str) -> List[Dict[str, Any]]:
+        """Speakers of a session, in the session's speakerIds order."""
+        return [
+            dict(self.speakers[speaker_id])
+            for speaker_id in self._ordered_speaker_ids(session_id)
+            if speaker_id in self.speakers
+        ]
+
+    def matching_documents(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Speakers and sessions with their embeddings (when they have one)."""
+        return (
+            _with_embeddings(self.speakers, self.speaker_embeddings),
+            _with_embeddings(self.sessions, self.session_embeddings),
+        )
+
+    def speaker_names(self, session_id: str) -> List[str]:
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return list(session["speakerNames"])
+        return self._speaker_names(session_id)
+
+    def with_speaker_names(
+        self, sessions: Iterable[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Add the speaker names to sessions queried from Cosmos DB."""
+        return [
+            {**session, "speakerNames": self.speaker_names(session.get("id"))}
+            for session in sessions
+        ]
+
+    # Incremental updates
+
+    def upsert_session(self, session: Dict[str, Any]):
+        session_id = session["id"]
+        self.sessions[session_id] = {
+            field: value for field, value in session.items() if field != EMBEDDING_FIELD
+        }
+        _set_embedding(self.session_embeddings, session_id, session)
+        self._sessions_version += 1
+        self._set_declared_links(
+            self._declared_by_session,
+            session_id,
+            set(session.get("speakerIds") or []),
+            lambda speaker_id: (speaker_id, session_id),
+        )
+        self._update_speaker_names(session_id)
+
+    def upsert_speaker(self, speaker: Dict[str, Any]):
+        speaker_id = speaker["id"]
+        previous_name = self.speakers.get(speaker_id, {}).get("name")
+        self.speakers[speaker_id] = _project(speaker, INDEX_SPEAKER_FIELDS)
+        _set_embedding(self.speaker_embeddings, speaker_id, speaker)
+        self._speakers_version += 1
+        self._set_declared_links(
+            self._declared_by_speaker,
+            speaker_id,
+            set(speaker.get("sessionIds") or []),
+            lambda session_id: (speaker_id, session_id),
+        )
+        if speaker.get("name") != previous_name:
+            for session_id in self._sessions_by_speaker.get(speaker_id, ()):
+                self._update_speaker_names(session_id)
+
+    def remove_session(self, session_id: str):
+        self._set_declared_links(
+            self._declared_by_session,
+            session_id,
+            set(),
+            lambda speaker_id: (speaker_id, session_id),
+        )
+        self.sessions.pop(session_id, None)
+        self.session_embeddings.pop(session_id, None)
+        self._sessions_version += 1
+
+    def remove_speaker(self, speaker_id: str):
+        session_ids = self.session_ids_for_speaker(speaker_id)
+        self._set_declared_links(
+            self._declared_by_speaker,
+            speaker_id,
+            set(),
+            lambda session_id: (speaker_id, session_id),
+        )
+        self.speakers.pop(speaker_id, None)
+        self.speaker_embeddings.pop(speaker_id, None)
+        self._speakers_version += 1
+        for session_id in session_ids:
+            self._update_speaker_names(session_id)
+
+    def _set_declared_links(self, declared_by, document_id, linked_ids, edge):
+        previous_ids = declared_by.get(document_id, set())
+        for linked_id in previous_ids - linked_ids:
+            self._unlink(*edge(linked_id))
+        for linked_id in linked_ids - previous_ids:
+            self._link(*edge(linked_id))
+        if linked_ids:
+            declared_by[document_id] = linked_ids
+        else:
+            declared_by.pop(document_id, None)
+
+    def _link(self, speaker_id: str, session_id: str):
+        count = self._link_counts.get((speaker_id, session_id), 0)
+        self._link_counts[(speaker_id, session_id)] = count + 1
+        if count == 0:
+            self._sessions_by_speaker.setdefault(speaker_id, set()).add(session_id)
+            self._speakers_by_session.setdefault(session_id, set()).add(speaker_id)
+            self._update_speaker_names(session_id)
+
+    def _unlink(self, speaker_id: str, session_id: str):
+        count = self._link_counts.pop((speaker_id, session_id), 0) - 1
+        if count > 0:
+            self._link_counts[(speaker_id, session_id)] = count
+            return
+        for adjacency, key, value in [
+            (self._sessions_by_speaker, speaker_id, session_id),
+            (self._speakers_by_session, session_id, speaker_id),
+        ]:
+            linked = adjacency.get(key)
+            if linked is not None:
+                linked.discard(value)
+                if not linked:
+                    del adjacency[key]
+        self._update_speaker_names(session_id)
+
+    def _ordered_speaker_ids(self, session_id: str) -> List[str]:
+        speaker_ids = self._speakers_by_session.get(session_id, set())
+        session = self.sessions.get(session_id, {})
+        ordered = [s for s in session.get("speakerIds") or [] if s in speaker_ids]
+        return ordered + sorted(speaker_ids - set(ordered))
+
+    def _speaker_names(self, session_id: str) -> List[str]:
+        return [
+            self.speakers[speaker_id].get("name", "")
+            for speaker_id in self._ordered_speaker_ids(session_id)
+            if speaker_id in self.speakers
+        ]
+
+    def _update_speaker_names(self, session_id: str):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session["speakerNames"] = self._speaker_names(session_id)
+
+    # Loading
+
+    async def start(self):
+        """Load the index and start applying changes in the background."""
+        await self.load()
+        if self._background_task is None:
+            self._background_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self):
+        if self._background_task is not None:
+            self._background_task.cancel()
+            try:
+                await self._background_task
+            except asyncio.CancelledError:
+                pass
+            self._background_task = None
+
+    async def ensure_loaded(self):
+        if not self._loaded:
+            await self.load()
+
+    async def _refresh_periodically(self):
+        elapsed = 0.0
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            elapsed += self.refresh_seconds
+            try:
+                if elapsed >= self.reload_seconds:
+                    elapsed = 0.0
+                    await self.load()
+                else:
+                    await self.refresh()
+            except Exception as e:
+                # Keep serving the current index until the next refresh
+                logger.warning(f"⚠️ Failed to refresh the speaker/session index: {e}")
+
+    async def load(self):
+        """Build the index from Cosmos DB (sharing a load in progress)."""
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.create_task(self._load_all())
+        await asyncio.shield(self._load_task)
+
+    async def _load_all(self):
+        db = self.db or get_db_client()
+        # Changes made while loading are applied again by the next refresh
+        loaded_at = datetime.now(timezone.utc)
+        sessions = await db.get_all_sessions(max_items=100)
+        speakers = await db.get_all_speakers(
+            max_items=100, fields=INDEX_SPEAKER_FIELDS + [EMBEDDING_FIELD]
+        )
+
+        # Build a new index and swap it in, so lookups never see a partial index
+        index = SpeakerSessionIndex()
+        for speaker in speakers:
+            index.upsert_speaker(speaker)
+        for session in sessions:
+            index.upsert_session(session)
+        self.sessions = index.sessions
+        self.speakers = index.speakers
+        self.session_embeddings = index.session_embeddings
+        self.speaker_embeddings = index.speaker_embeddings
+        self._speakers_by_session = index._speakers_by_session
+        self._sessions_by_speaker = index._sessions_by_speaker
+        self._declared_by_session = index._declared_by_session
+        self._declared_by_speaker = index._declared_by_speaker
+        self._link_counts = index._link_counts
+        self._sessions_version += 1
+        self._speakers_version += 1
+        self._loaded_at = loaded_at
+        self._session_continuation = None
+        self._speaker_continuation = None
+        self._loaded = True
+        logger.info(
+            f"✅ Indexed {len(self.sessions)} sessions, {len(self.speakers)} speakers"
+            f" and {len(self._link_counts)} links"
+        )
+
+    async def refresh(self):
+        """Apply the sessions and speakers changed since the last load or refresh."""
+        if not self._loaded:
+            await self.load()
+            return
+        db = self.db or get_db_client()
+        speakers, self._speaker_continuation = await db.get_speaker_changes(
+            self._speaker_continuation, start_time=self._loaded_at
+        )
+        sessions, self._session_continuation = await db.get_session_changes(
+            self._session_continuation, start_time=self._loaded_at
+        )
+        for speaker in speakers:
+            self.upsert_speaker(speaker)
+        for session in sessions:
+            self.upsert_session(session)
+
+
+_speaker_session_index: Optional[SpeakerSessionIndex] = None
+
+
+def get_speaker_session_index() -> SpeakerSessionIndex:
+    global _speaker_session_index
+    if _speaker_session_index is None:
+        _speaker_session_index = SpeakerSessionIndex()
+    return _speaker_session_index
@@ -0,0 +1,224 @@
+"""
+Unit tests for the personal agenda planner.
+"""
+
+import itertools
+import random
+from datetime import date, datetime, timedelta
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from conferenti_agent.services.agenda_planner import (
+    AgendaPreferences,
+    plan_agenda,
+    score_session,
+)
+from conferenti_agent.services.session_service import SessionService
+from conferenti_agent.services.speaker_session_index import SpeakerSessionIndex
+from conferenti_agent.types.session import Session, SessionFormat, SessionLevel
+
+
+def make_session(session_id, start, end, room="Room A", tags=None, **fields):
+    return {
+        "id": session_id,
+        "title": f"Session {session_id}",
+        "startTime": start,
+        "endTime": end,
+        "room": room,
+        "tags": tags or [],
+        **fields,
+    }
+
+
+def ids(plan):
+    return [p.session["id"] for p in plan.sessions]
+
+
+class TestScoreSession:
+    """Test topic relevance scoring."""
+
+    def test_tag_title_description_weights(self):
+        """Test tags score higher than titles and descriptions."""
+        session = make_session(
+            "s",
+            None,
+            None,
+            tags=["AI"],
+            title="Cloud native apps",
+            description="Kubernetes in practice",
+        )
+
+        assert score_session(session, ["ai"]) == 3
+        assert score_session(session, ["cloud"]) == 2
+        assert score_session(session, ["kubernetes"]) == 1
+        assert score_session(session, ["ai", "cloud", "rust"]) == 5
+
+    def test_level_bonus_only_for_relevant_sessions(self):
+        """Test the preferred level only adds to relevant sessions."""
+        session = make_session("s", None, None, tags=["ai"], level="Beginner")
+
+        assert score_session(session, ["ai"], level="beginner") == 4
+        assert score_session(session, ["rust"], level="beginner") == 0
+
+
+class TestPlanAgenda:
+    """Test the agenda is optimal and attendable."""
+
+    def test_picks_most_relevant_non_overlapping_sessions(self):
+        """Test two relevant sessions beat one overlapping session."""
+        sessions = [
+            make_session("long", "2025-06-01T09:00", "2025-06-01T11:00", tags=["ai"]),
+            make_session("a", "2025-06-01T09:00", "2025-06-01T10:00", tags=["ai"]),
+            make_session("b", "2025-06-01T10:00", "2025-06-01T11:00", tags=["cloud"]),
+            make_session("other", "2025-06-01T12:00", "2025-06-01T13:00"),
+        ]
+
+        plan = plan_agenda(sessions, AgendaPreferences(topics=["ai", "cloud"]))
+
+        assert ids(plan) == ["a", "b"]
+        assert plan.relevance == 6
+        assert [p.session["id"] for p in plan.skipped] == ["long"]
+
+    def test_travel_buffer_between_rooms(self):
+        """Test back-to-back sessions need the travel buffer to change rooms."""
+        sessions = [
+            make_session("a", "2025-06-01T09:00", "2025-06-01T10:00", tags=["ai"]),
+            make_session(
+                "b", "2025-06-01T10:00", "2025-06-01T11:00", "Room B", tags=["ai"]
+            ),
+            make_session("c", "2025-06-01T10:00", "2025-06-01T11:00", tags=["ai"]),
+        ]
+
+        with_buffer = plan_agenda(sessions, AgendaPreferences(topics=["ai"]))
+        without_buffer = plan_agenda(
+            sessions[:2], AgendaPreferences(topics=["ai"], travel_minutes=0)
+        )
+
+        assert ids(with_buffer) == ["a", "c"]
+        assert ids(without_buffer) == ["a", "b"]
+
+    def test_day_filter_and_session_dataclass(self):
+        """Test Session dataclasses are accepted and filtered by day."""
+        session = Session(
+            id="s-1",
+            title="Intro to AI",
+            slug="intro-to-ai",
+            tags=["ai"],
+            description="",
+            startTime=datetime(2025, 6, 2, 9),
+            endTime=datetime(2025, 6, 2, 10),
+            room="Room A",
+            level=SessionLevel.BEGINNER,
+            format=SessionFormat.LECTURE,
+            language="English",
+            speakerIds=[],
+        )
+
+        assert ids(plan_agenda([session], AgendaPreferences(topics=["ai"]))) == ["s-1"]
+        assert (
+            plan_agenda(
+                [session], AgendaPreferences(topics=["ai"], day=date(2025, 6, 1))
+            ).sessions
+            == []
+        )
+
+    def test_optimal_against_brute_force(self):
+        """Test the plan matches an exhaustive search on random schedules."""
+        rng = random.Random(11)
+        base = datetime(2025, 6, 1, 9)
+        for _ in range(40):
+            sessions = []
+            for i in range(9):
+                start = base + timedelta(minutes=rng.randrange(0, 480, 15))
+                end = start + timedelta(minutes=rng.choice([30, 45, 60, 90]))
+                sessions.append(
+                    make_session(
+                        str(i),
+                        start.isoformat(),
+                        end.isoformat(),
+                        rng.choice(["Room A", "Room B", "Room C"]),
+                        tags=rng.sample(["ai", "cloud", "rust"], rng.randint(0, 2)),
+                    )
+                )
+            preferences = AgendaPreferences(topics=["ai", "cloud"], travel_minutes=15)
+
+            plan = plan_agenda(sessions, preferences)
+
+            assert plan.relevance == _brute_force(sessions, preferences)
+            assert plan.relevance == sum(p.relevance for p in plan.sessions)
+            for first, second in zip(plan.sessions, plan.sessions[1:]):
+                buffer = 0 if first.room == second.room else 15
+                assert first.end + timedelta(minutes=buffer) <= second.start
+
+
+def _brute_force(sessions, preferences):
+    travel = timedelta(minutes=preferences.travel_minutes)
+    candidates = [
+        (
+            datetime.fromisoformat(s["startTime"]),
+            datetime.fromisoformat(s["endTime"]),
+            s["room"],
+            score_session(s, preferences.topics),
+        )
+        for s in sessions
+    ]
+    best = 0
+    for count in range(1, len(candidates) + 1):
+        for subset in itertools.combinations(candidates, count):
+            ordered = sorted(subset)
+            if all(
+                a[1] + (timedelta(0) if a[2] == b[2] else travel) <= b[0]
+                for a, b in zip(ordered, ordered[1:])
+            ):
+                best = max(best, sum(c[3] for c in ordered))
+    return best
+
+
+@pytest.fixture
+def session_service():
+    """Create SessionService with mocked settings, agent client and index."""
+    sessions = [
+        make_session("a", "2025-06-01T09:00", "2025-06-01T10:00", tags=["ai"]),
+        make_session("b", "2025-06-01T09:30", "2025-06-01T10:30", tags=["ai"]),
+    ]
+    db = AsyncMock()
+    db.get_all_sessions.return_value = sessions
+    db.get_all_speakers.return_value = []
+    settings = MagicMock()
+    settings.project_endpoint = "http://localhost:11434"
+    settings.model_deployment_name = "llama3.2"
+    settings.api_key = None
+
+    with patch(
+        "conferenti_agent.services.session_service.get_settings",
+        return_value=settings,
+    ), patch("conferenti_agent.services.session_service.create_agent_client"), patch(
+        "conferenti_agent.services.session_service.get_db_client", return_value=db
+    ), patch(
+        "conferenti_agent.services.session_service.get_speaker_session_index",
+        return_value=SpeakerSessionIndex(db=db),
+    ):
+        yield SessionService()
+
+
+class TestSessionServiceBuildAgenda:
+    """Test the agent only phrases the planned agenda."""
+
+    @pytest.mark.asyncio
+    async def test_build_agenda(self, session_service):
+        """Test the planned sessions are passed to the agent and returned."""
+        agent = MagicMock()
+        agent.run.return_value = {"status": "completed", "content": "Your agenda"}
+        session_service.agent_client.create_agent.return_value = agent
+
+        result = await session_service.build_agenda(["ai"], date="2025-06-01")
+
+        assert result["suggestion"] == "Your agenda"
+        assert [s["id"] for s in result["sessions"]] == ["a"]
+        assert result["skippedSessionIds"] == ["b"]
+        assert "Session a" in agent.run.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_invalid_date(self, session_service):
+        """Test invalid dates are rejected."""
+        with pytest.raises(ValueError, match="Invalid date"):
+            await session_service.build_agenda(["ai"], date="June 1st")
@@ -0,0 +1,239 @@
+"""
+Unit tests for JWT verification and the JWKS key manager.
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt, JWTError
+from conferenti_agent.auth import JwksKeyManager, verify_token
+
+AUDIENCE = "https://conferenti.com/api/"
+ISSUER = "https://test.auth0.com/"
+
+
+def _create_signing_key(kid: str) -> tuple[bytes, dict]:
+    """Create an RSA private key (PEM) and its public JWK."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+    public_jwk.update({"kid": kid, "use": "sig"})
+    return private_pem, public_jwk
+
+
+@pytest.fixture(scope="module")
+def signing_keys():
+    """Provide two signing keys (as if before and after a key rotation)."""
+    return {kid: _create_signing_key(kid) for kid in ["key-1", "key-2"]}
+
+
+def _create_token(signing_keys, kid: str, **claims) -> str:
+    private_pem, _ = signing_keys[kid]
+    payload = {
+        "sub": "user-123",
+        "aud": AUDIENCE,
+        "iss": ISSUER,
+        "exp": int(time.time()) + 3600,
+        "scope": "ai:chat",
+    }
+    payload.update(claims)
+    return jwt.encode(payload, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+def _create_manager(fetch, **kwargs) -> JwksKeyManager:
+    return JwksKeyManager(
+        jwks_url="https://test.auth0.com/.well-known/jwks.json",
+        audience=AUDIENCE,
+        issuer=ISSUER,
+        fetch=fetch,
+        **kwargs,
+    )
+
+
+class TestJwksKeyManager:
+    """Test JwksKeyManager key caching and token verification."""
+
+    @pytest.mark.asyncio
+    async def test_start_parses_keys_by_kid(self, signing_keys):
+        """Test keys are fetched once and parsed by kid at startup."""
+        fetch = AsyncMock(return_value={"keys": [signing_keys["key-1"][1]]})
+        manager = _create_manager(fetch)
+
+        await manager.start()
+        try:
+            assert manager.is_loaded is True
+            assert manager.kids == ["key-1"]
+            fetch.assert_awaited_once()
+        finally:
+            await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_verify_returns_claims(self, signing_keys):
+        """Test a valid token is verified with the cached key."""
+        fetch = AsyncMock(return_value={"keys": [signing_keys["key-1"][1]]})
+        manager = _create_manager(fetch)
+        await manager.refresh()
+
+        claims = await manager.verify(_create_token(signing_keys, "key-1"))
+
+        assert claims["sub"] == "user-123"
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_verify_caches_claims(self, signing_keys):
+        """Test repeated tokens skip signature verification."""
+        fetch = AsyncMock(return_value={"keys": [signing_keys["key-1"][1]]})
+        manager = _create_manager(fetch)
+        await manager.refresh()
+        token = _create_token(signing_keys, "key-1")
+
+        await manager.verify(token)
+        with patch("conferenti_agent.auth.jwt.decode") as mock_decode:
+            claims = await manager.verify(token)
+
+        mock_decode.assert_not_called()
+        assert claims["sub"] == "user-123"
+
+    @pytest.mark.asyncio
+    async def test_claims_cache_respects_token_expiry(self, signing_keys):
+        """Test claims are not cached past the token's expiry."""
+        fetch = AsyncMock(return_value={"keys": [signing_keys["key-1"][1]]})
+        manager = _create_manager(fetch)
+        await manager.refresh()
+
+        manager._cache_claims("expired-token", {"exp": int(time.time()) - 1})
+
+        assert manager._get_cached_claims("expired-token") is None
+
+    @pytest.mark.asyncio
+    async def test_claims_cache_is_bounded(self, signing_keys):
+        """Test the oldest claims are evicted when the cache is full."""
+        manager = _create_manager(AsyncMock(), claims_cache_max_size=2)
+
+        for token in ["token-1", "token-2", "token-3"]:
+            manager._cache_claims(token, {"sub": token})
+
+        assert manager._get_cached_claims("token-1") is None
+        assert manager._get_cached_claims("token-3") == {"sub": "token-3"}
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refreshes_once(self, signing_keys):
+        """Test concurrent requests with a rotated key share a single fetch."""
+        fetch = AsyncMock(
+            side_effect=[
+                {"keys": [signing_keys["key-1"][1]]},
+                {"keys": [signing_keys["key-1"][1], signing_keys["key-2"][1]]},
+            ]
+        )
+        manager = _create_manager(fetch, min_refresh_interval_seconds=0)
+        await manager.refresh()
+        tokens = [
+            _create_token(signing_keys, "key-2", sub=f"user-{i}") for i in range(5)
+        ]
+
+        results = await asyncio.gather(*[manager.verify(token) for token in tokens])
+
+        assert [claims["sub"] for claims in results] == [f"user-{i}" for i in range(5)]
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refresh_is_rate_limited(self, signing_keys):
+        """Test tokens with an unknown kid don't refetch the keys on every request."""
+        fetch = AsyncMock(return_value={"keys": [signing_keys["key-1"][1]]})
+        manager = _create_manager(fetch, min_refresh_interval_seconds=60)
+        await manager.refresh()
+
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc_info:
+                await manager.verify(_create_token(signing_keys, "key-2"))
+            assert exc_info.value.status_code == 401
+
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_refresh_failure_keeps_keys(self, signing_keys):
+        """Test stale keys are still used when a refresh fails."""
+        fetch = AsyncMock(
+            side_effect=[
+                {"keys": [signing_keys["key-1"][1]]},
+                Exception("Auth0 unavailable"),
+            ]
+        )
+        manager = _create_manager(fetch, ttl_seconds=0, min_refresh_interval_seconds=0)
+        await manager.refresh()
+
+        claims = await manager.verify(_create_token(signing_keys, "key-1"))
+
+        assert claims["sub"] == "user-123"
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_verify_rejects_wrong_audience(self, signing_keys):
+        """Test tokens for another audience are rejected."""
+        fetch = AsyncMock(return_value={"keys": [signing_keys["key-1"][1]]})
+        manager = _create_manager(fetch)
+        await manager.refresh()
+
+        with pytest.raises(JWTError):
+            await manager.verify(
+                _create_token(signing_keys, "key-1", aud="https://other.com/api/")
+            )
+
+
+class TestVerifyToken:
+    """Test the verify_token dependency."""
+
+    @pytest.mark.asyncio
+    @patch("conferenti_agent.auth.get_settings")
+    async def test_disable_auth(self, mock_get_settings):
+        """Test auth is bypassed when disabled."""
+        mock_get_settings.return_value = MagicMock(disable_auth=True)
+
+        claims = await verify_token(MagicMock())
+
+        assert claims["sub"] == "local-dev"
+
+    @pytest.mark.asyncio
+    @patch("conferenti_agent.auth.get_jwks_key_manager")
+    @patch("conferenti_agent.auth.get_settings")
+    async def test_invalid_token_returns_401(self, mock_get_settings, mock_get_manager):
+        """Test invalid tokens are rejected with 401."""
+        mock_get_settings.return_value = MagicMock(disable_auth=False)
+        mock_get_manager.return_value.verify = AsyncMock(
+            side_effect=JWTError("Signature verification failed")
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await verify_token(MagicMock(credentials="invalid"))
+
+        assert exc_info.value.status_code == 401
+        assert "Invalid token" in exc_info.value.detail
+
+    @pytest.mark.asyncio
+    @patch("conferenti_agent.auth.get_jwks_key_manager")
+    @patch("conferenti_agent.auth.get_settings")
+    async def test_unknown_key_returns_401(self, mock_get_settings, mock_get_manager):
+        """Test the key lookup error is not rewrapped."""
+        mock_get_settings.return_value = MagicMock(disable_auth=False)
+        mock_get_manager.return_value.verify = AsyncMock(
+            side_effect=HTTPException(
+                status_code=401, detail="Unable to find appropriate key"
+            )
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await verify_token(MagicMock(credentials="token"))
+
+        assert exc_info.value.detail == "Unable to find appropriate key"
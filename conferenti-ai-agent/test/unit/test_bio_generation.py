@@ -0,0 +1,112 @@
+"""
+Unit tests for the bio generation rate budget and cache.
+"""
+
+import pytest
+from unittest.mock import patch
+from conferenti_agent.services.bio_generation import BioCache, RateBudget
+
+
+class FakeClock:
+    """Clock advanced by the (patched) asyncio.sleep."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Patch asyncio.sleep in the rate budget to advance a fake clock."""
+    fake = FakeClock()
+    with patch(
+        "conferenti_agent.services.bio_generation.asyncio.sleep", new=fake.sleep
+    ):
+        yield fake
+
+
+class TestRateBudget:
+    """Test the client-side rate budget."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_rate(self, clock):
+        """Test a burst is allowed at once, then requests are spaced by the rate."""
+        budget = RateBudget(requests_per_minute=60, burst=3, clock=clock)
+
+        for _ in range(5):
+            await budget.acquire()
+
+        # 3 at once, then one a second
+        assert clock.now == pytest.approx(2.0)
+        assert clock.sleeps == [pytest.approx(1.0), pytest.approx(1.0)]
+
+    @pytest.mark.asyncio
+    async def test_refills_while_idle(self, clock):
+        """Test the budget refills up to the burst while unused."""
+        budget = RateBudget(requests_per_minute=120, burst=2, clock=clock)
+        await budget.acquire()
+        await budget.acquire()
+
+        clock.now += 60
+        await budget.acquire()
+        await budget.acquire()
+
+        assert clock.sleeps == []
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, clock):
+        """Test a budget of 0 requests per minute never waits."""
+        budget = RateBudget(requests_per_minute=0, burst=1, clock=clock)
+
+        for _ in range(10):
+            await budget.acquire()
+
+        assert not budget.enabled
+        assert clock.sleeps == []
+
+
+class TestBioCache:
+    """Test caching bios by speaker ETag."""
+
+    def test_hit_while_unchanged(self):
+        """Test a cached bio is returned for the same ETag and sessions."""
+        cache = BioCache()
+        cache.put("speaker-1", '"etag-1"', ["Intro"], "Bio")
+
+        assert cache.get("speaker-1", '"etag-1"', ["Intro"]) == "Bio"
+
+    def test_miss_when_speaker_or_sessions_change(self):
+        """Test a new ETag or new session titles invalidate the bio."""
+        cache = BioCache()
+        cache.put("speaker-1", '"etag-1"', ["Intro"], "Bio")
+
+        assert cache.get("speaker-1", '"etag-2"', ["Intro"]) is None
+        assert cache.get("speaker-1", '"etag-1"', ["Intro", "Advanced"]) is None
+        assert cache.get("speaker-2", '"etag-1"', ["Intro"]) is None
+
+    def test_not_cached_without_etag(self):
+        """Test bios of speakers without an ETag are never cached."""
+        cache = BioCache()
+        cache.put("speaker-1", None, [], "Bio")
+
+        assert len(cache) == 0
+        assert cache.get("speaker-1", None, []) is None
+
+    def test_evicts_least_recently_used(self):
+        """Test the cache keeps the most recently used bios."""
+        cache = BioCache(max_size=2)
+        cache.put("a", "1", [], "A")
+        cache.put("b", "1", [], "B")
+        cache.get("a", "1", [])
+        cache.put("c", "1", [], "C")
+
+        assert cache.get("a", "1", []) == "A"
+        assert cache.get("b", "1", []) is None
+        assert cache.get("c", "1", []) == "C"
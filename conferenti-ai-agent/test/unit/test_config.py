@@ -61,8 +61,10 @@ class TestSettings:
         },
         clear=True,
     )
-    def test_settings_with_key_vault_emulator(self):
+    @patch("conferenti_agent.keyvault.get_keyvault_config")
+    def test_settings_with_key_vault_emulator(self, mock_get_kv):
         """Test settings configured for Key Vault emulator."""
+        mock_get_kv.return_value = MagicMock(bypass=True)
         settings = Settings()
 
         assert settings.bypass_key_vault is False
@@ -142,3 +144,61 @@ class TestSettings:
         settings = Settings()
 
         assert settings.conferenti_api_url == "https://api.conferenti.com/api"
+
+    @patch.dict(
+        os.environ,
+        {
+            "PROJECT_ENDPOINT": "http://localhost:11434",
+            "MODEL_DEPLOYMENT_NAME": "llama3.2",
+            "AUTH0_DOMAIN": "test.auth0.com",
+            "BYPASS_KEY_VAULT": "false",
+            "USE_KEY_VAULT_EMULATOR": "true",
+        },
+        clear=True,
+    )
+    @patch("conferenti_agent.keyvault.get_secret_provider")
+    @patch("conferenti_agent.keyvault.get_keyvault_config")
+    def test_secrets_from_provider_cache(self, mock_get_kv, mock_get_provider):
+        """Test secrets loaded at startup are read from the cache."""
+        kv = MagicMock(bypass=False)
+        mock_get_kv.return_value = kv
+        provider = MagicMock(is_loaded=True)
+        provider.get.side_effect = lambda name, default=None: f"cached-{name}"
+        mock_get_provider.return_value = provider
+
+        settings = Settings()
+
+        assert settings.api_key == "cached-AI-API-KEY"
+        assert settings.cosmos_db_key == "cached-COSMOS-DB-KEY"
+        assert settings.conferenti_api_key == "cached-CONFERENTI-API-KEY"
+        kv.get_secret.assert_not_called()
+
+    @patch.dict(
+        os.environ,
+        {
+            "PROJECT_ENDPOINT": "http://localhost:11434",
+            "MODEL_DEPLOYMENT_NAME": "llama3.2",
+            "AUTH0_DOMAIN": "test.auth0.com",
+            "BYPASS_KEY_VAULT": "false",
+            "USE_KEY_VAULT_EMULATOR": "true",
+            "COSMOSDB_KEY": "env-cosmos-key",
+        },
+        clear=True,
+    )
+    @patch("conferenti_agent.keyvault.get_secret_provider")
+    @patch("conferenti_agent.keyvault.get_keyvault_config")
+    def test_secret_missing_from_cache_uses_env(self, mock_get_kv, mock_get_provider):
+        """Test a secret that failed to load at startup never calls Key Vault."""
+        kv = MagicMock(bypass=False)
+        mock_get_kv.return_value = kv
+        cached = {"AI-API-KEY": "cached-AI-API-KEY"}
+        provider = MagicMock(is_loaded=True)
+        provider.get.side_effect = cached.get
+        mock_get_provider.return_value = provider
+
+        settings = Settings()
+
+        assert settings.api_key == "cached-AI-API-KEY"
+        assert settings.cosmos_db_key == "env-cosmos-key"
+        assert settings.conferenti_api_key == ""
+        kv.get_secret.assert_not_called()
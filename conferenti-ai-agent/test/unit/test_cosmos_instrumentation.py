@@ -0,0 +1,154 @@
+"""
+Unit tests for Cosmos DB call instrumentation.
+"""
+
+import logging
+import pytest
+from unittest.mock import MagicMock, patch
+from conferenti_agent.services import cosmos_instrumentation as instrumented
+
+
+class FakeContainer:
+    """Container returning pages of items and calling the response hook per page (like the SDK)."""
+
+    def __init__(self, pages, container_id="SessionContainer"):
+        self.id = container_id
+        self.pages = pages
+        self.query_kwargs = None
+
+    def query_items(self, query, parameters=None, response_hook=None, **kwargs):
+        self.query_kwargs = kwargs
+        for headers, items in self.pages:
+            response_hook(headers, items)
+            yield from items
+
+    def read_item(self, item, partition_key, response_hook=None):
+        headers, items = self.pages[0]
+        response_hook(headers, items[0])
+        return items[0]
+
+
+def _headers(charge: float, duration_ms: float, size: int) -> dict:
+    return {
+        "x-ms-request-charge": str(charge),
+        "x-ms-request-duration-ms": str(duration_ms),
+        "content-length": str(size),
+    }
+
+
+@pytest.fixture
+def mock_histograms():
+    """Patch the metric histograms to capture recorded values."""
+    names = [
+        "histogram_request_charge",
+        "histogram_client_duration",
+        "histogram_server_duration",
+        "histogram_item_count",
+        "histogram_page_count",
+        "histogram_payload_bytes",
+    ]
+    patchers = {name: patch.object(instrumented, name) for name in names}
+    mocks = {name: patcher.start() for name, patcher in patchers.items()}
+    yield mocks
+    for patcher in patchers.values():
+        patcher.stop()
+
+
+class TestCosmosInstrumentation:
+    """Test request charge and latency recording."""
+
+    def test_query_accumulates_pages(self, mock_histograms):
+        """Test request charge, server time and items are summed over all pages."""
+        container = FakeContainer(
+            [
+                (_headers(2.5, 1.5, 1000), [{"id": "1"}, {"id": "2"}]),
+                (_headers(3.0, 2.0, 600), [{"id": "3"}]),
+            ]
+        )
+
+        items = instrumented.query_items(
+            container,
+            "get_sessions_by_topic",
+            query="SELECT * FROM c",
+            enable_cross_partition_query=True,
+        )
+
+        assert [item["id"] for item in items] == ["1", "2", "3"]
+        assert container.query_kwargs == {"enable_cross_partition_query": True}
+        attributes = {
+            "db.operation": "get_sessions_by_topic",
+            "db.cosmosdb.container": "SessionContainer",
+        }
+        mock_histograms["histogram_request_charge"].record.assert_called_once_with(
+            5.5, attributes
+        )
+        mock_histograms["histogram_server_duration"].record.assert_called_once_with(
+            3.5, attributes
+        )
+        mock_histograms["histogram_item_count"].record.assert_called_once_with(
+            3, attributes
+        )
+        mock_histograms["histogram_page_count"].record.assert_called_once_with(
+            2, attributes
+        )
+        mock_histograms["histogram_payload_bytes"].record.assert_called_once_with(
+            1600, attributes
+        )
+
+    def test_read_item_records_single_item(self, mock_histograms):
+        """Test point reads are recorded as one item."""
+        container = FakeContainer([(_headers(1.0, 0.5, 300), [{"id": "session-1"}])])
+
+        item = instrumented.read_item(
+            container, "get_session_by_id", item="session-1", partition_key="session-1"
+        )
+
+        assert item == {"id": "session-1"}
+        charge, attributes = mock_histograms[
+            "histogram_request_charge"
+        ].record.call_args.args
+        assert charge == 1.0
+        assert attributes["db.operation"] == "get_session_by_id"
+
+    def test_failed_call_is_recorded(self, mock_histograms):
+        """Test calls that raise are still recorded."""
+        container = MagicMock(id="SpeakerContainer")
+        container.read_item.side_effect = Exception("Not found")
+
+        with pytest.raises(Exception, match="Not found"):
+            instrumented.read_item(
+                container, "get_speaker_by_id", item="x", partition_key="x"
+            )
+
+        mock_histograms["histogram_client_duration"].record.assert_called_once()
+
+    def test_slow_query_is_logged(self, mock_histograms, caplog):
+        """Test slow queries are logged with their text and parameters."""
+        container = FakeContainer([(_headers(12.0, 40.0, 5000), [{"id": "1"}])])
+        parameters = [{"name": "@topic", "value": "kubernetes"}]
+
+        with patch.object(instrumented, "SLOW_QUERY_MS", 0):
+            with caplog.at_level(logging.WARNING):
+                instrumented.query_items(
+                    container,
+                    "get_sessions_by_topic",
+                    query="SELECT * FROM c\n  WHERE ARRAY_CONTAINS(c.tags, @topic)",
+                    parameters=parameters,
+                )
+
+        assert "get_sessions_by_topic" in caplog.text
+        assert "12.00 RU" in caplog.text
+        assert "SELECT * FROM c WHERE ARRAY_CONTAINS(c.tags, @topic)" in caplog.text
+        assert "kubernetes" in caplog.text
+
+    def test_fast_query_is_not_logged(self, mock_histograms, caplog):
+        """Test queries under the threshold aren't logged."""
+        container = FakeContainer([(_headers(1.0, 1.0, 100), [{"id": "1"}])])
+
+        with patch.object(instrumented, "SLOW_QUERY_MS", 60000):
+            with caplog.at_level(logging.WARNING):
+                instrumented.query_items(
+                    container, "get_all_sessions", query="SELECT 1"
+                )
+
+        assert caplog.text == ""
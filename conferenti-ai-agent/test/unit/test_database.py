@@ -0,0 +1,96 @@
+"""
+Unit tests for CosmosDbClient query construction.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from conferenti_agent.services.database import (
+    CHAT_HISTORY_FIELDS,
+    SESSION_SCHEDULE_FIELDS,
+    SPEAKER_BIO_FIELDS,
+    CosmosDbClient,
+    select_fields,
+)
+
+
+@pytest.fixture
+def db_client():
+    """Create CosmosDbClient with mocked containers (without connecting)."""
+    client = CosmosDbClient.__new__(CosmosDbClient)
+    client.speaker_container = MagicMock(id="SpeakerContainer")
+    client.session_container = MagicMock(id="SessionContainer")
+    client.chat_container = MagicMock(id="ChatContainer")
+    return client
+
+
+@pytest.fixture
+def mock_query_items():
+    """Capture the queries sent to Cosmos DB."""
+    with patch(
+        "conferenti_agent.services.database.instrumented.query_items",
+        return_value=[],
+    ) as mock:
+        yield mock
+
+
+class TestSelectFields:
+    """Test projection SELECT clauses."""
+
+    def test_whole_documents(self):
+        """Test no projection selects whole documents."""
+        assert select_fields(None) == "SELECT * FROM c"
+
+    def test_projection(self):
+        """Test projections only select the listed fields."""
+        assert select_fields(["id", "title"]) == "SELECT c.id, c.title FROM c"
+
+
+class TestCosmosDbClientQueries:
+    """Test partition keys and projections are passed to queries."""
+
+    @pytest.mark.asyncio
+    async def test_chats_query_single_partition(self, db_client, mock_query_items):
+        """Test chat history is queried within the session's partition."""
+        await db_client.get_chats_from_session("chat-1", fields=CHAT_HISTORY_FIELDS)
+
+        args, kwargs = mock_query_items.call_args
+        assert args[0] is db_client.chat_container
+        assert kwargs["partition_key"] == "chat-1"
+        assert "enable_cross_partition_query" not in kwargs
+        assert kwargs["query"].startswith(
+            "SELECT c.role, c.content, c.timestamp FROM c WHERE"
+        )
+
+    @pytest.mark.asyncio
+    async def test_sessions_query_projection(self, db_client, mock_query_items):
+        """Test cross-partition session queries use the projection."""
+        await db_client.get_sessions_by_topic("ai", fields=SESSION_SCHEDULE_FIELDS)
+
+        args, kwargs = mock_query_items.call_args
+        assert args[1] == "get_sessions_by_topic"
+        assert kwargs["enable_cross_partition_query"] is True
+        assert "SELECT c.id, c.title, c.startTime" in kwargs["query"]
+        assert "SELECT *" not in kwargs["query"]
+
+    @pytest.mark.asyncio
+    async def test_speakers_by_ids_single_query(self, db_client, mock_query_items):
+        """Test several speakers are fetched with one query."""
+        await db_client.get_speakers_by_ids(["s-1", "s-2"], fields=SPEAKER_BIO_FIELDS)
+
+        args, kwargs = mock_query_items.call_args
+        assert mock_query_items.call_count == 1
+        assert args[0] is db_client.speaker_container
+        assert "ARRAY_CONTAINS(@speaker_ids, c.id)" in kwargs["query"]
+        assert "c._etag" in kwargs["query"]
+        assert kwargs["parameters"] == [
+            {"name": "@speaker_ids", "value": ["s-1", "s-2"]}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_default_selects_whole_documents(self, db_client, mock_query_items):
+        """Test queries without a projection select whole documents."""
+        await db_client.get_all_sessions(max_items=5)
+
+        _, kwargs = mock_query_items.call_args
+        assert kwargs["query"] == "SELECT * FROM c"
+        assert kwargs["max_item_count"] == 5
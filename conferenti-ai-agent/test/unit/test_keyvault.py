@@ -2,10 +2,16 @@
 Unit tests for Key Vault configuration.
 """
 
+import asyncio
 import os
+import time
 import pytest
 from unittest.mock import patch, MagicMock
-from conferenti_agent.keyvault import KeyVaultConfig, get_keyvault_config
+from conferenti_agent.keyvault import (
+    KeyVaultConfig,
+    SecretProvider,
+    get_keyvault_config,
+)
 
 
 class TestKeyVaultConfig:
@@ -187,3 +193,142 @@ class TestKeyVaultSingleton:
         kv2 = get_keyvault_config()
 
         assert kv1 is kv2
+
+
+class FakeAsyncSecretClient:
+    """Local stand-in for the async Key Vault SecretClient (as served by the emulator)."""
+
+    def __init__(self, secrets: dict, delay: float = 0.05):
+        self.secrets = dict(secrets)
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def get_secret(self, name: str):
+        self.calls.append(name)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if name not in self.secrets:
+                raise Exception(f"Secret not found: {name}")
+            return MagicMock(value=self.secrets[name])
+        finally:
+            self.in_flight -= 1
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def vault_secrets():
+    """Provide the secrets stored in the fake Key Vault."""
+    return {
+        "AI-API-KEY": "ai-key",
+        "COSMOS-DB-KEY": "cosmos-key",
+        "CONFERENTI-API-KEY": "conferenti-key",
+    }
+
+
+class TestSecretProvider:
+    """Test SecretProvider concurrent loading and caching."""
+
+    @pytest.mark.asyncio
+    async def test_load_fetches_secrets_concurrently(self, vault_secrets):
+        """Test all required secrets are fetched in a single round trip."""
+        client = FakeAsyncSecretClient(vault_secrets, delay=0.2)
+        provider = SecretProvider(client=client)
+
+        start = time.perf_counter()
+        await provider.load()
+        elapsed = time.perf_counter() - start
+
+        assert client.max_in_flight == 3
+        assert elapsed < 0.4
+        assert provider.get("AI-API-KEY") == "ai-key"
+        assert provider.get("COSMOS-DB-KEY") == "cosmos-key"
+        assert provider.get("CONFERENTI-API-KEY") == "conferenti-key"
+
+    @pytest.mark.asyncio
+    async def test_get_uses_cache(self, vault_secrets):
+        """Test reading secrets doesn't call Key Vault."""
+        client = FakeAsyncSecretClient(vault_secrets)
+        provider = SecretProvider(client=client)
+        await provider.load()
+
+        for _ in range(10):
+            provider.get("AI-API-KEY")
+
+        assert len(client.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_are_shared(self, vault_secrets):
+        """Test concurrent loads share a single fetch."""
+        client = FakeAsyncSecretClient(vault_secrets)
+        provider = SecretProvider(client=client)
+
+        await asyncio.gather(provider.load(), provider.load(), provider.load())
+
+        assert len(client.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_cached_value(self, vault_secrets):
+        """Test a secret that fails to refresh keeps its cached value."""
+        client = FakeAsyncSecretClient(vault_secrets)
+        provider = SecretProvider(client=client)
+        await provider.load()
+
+        del client.secrets["COSMOS-DB-KEY"]
+        client.secrets["AI-API-KEY"] = "rotated-ai-key"
+        await provider.load()
+
+        assert provider.get("AI-API-KEY") == "rotated-ai-key"
+        assert provider.get("COSMOS-DB-KEY") == "cosmos-key"
+
+    @pytest.mark.asyncio
+    async def test_missing_secret_loaded_in_background(self, vault_secrets):
+        """Test a secret that failed to load is loaded in the background when read."""
+        client = FakeAsyncSecretClient(vault_secrets, delay=0)
+        del client.secrets["COSMOS-DB-KEY"]
+        provider = SecretProvider(client=client, missing_retry_seconds=60)
+        await provider.load()
+
+        client.secrets["COSMOS-DB-KEY"] = "cosmos-key"
+        assert provider.get("COSMOS-DB-KEY", "env-key") == "env-key"
+        # Reads within the retry interval don't start another load
+        assert provider.get("COSMOS-DB-KEY", "env-key") == "env-key"
+        await asyncio.sleep(0.01)
+
+        assert provider.get("COSMOS-DB-KEY") == "cosmos-key"
+        assert len(client.calls) == 6
+
+    @pytest.mark.asyncio
+    async def test_background_refresh(self, vault_secrets):
+        """Test secrets are refreshed in the background before they expire."""
+        client = FakeAsyncSecretClient(vault_secrets, delay=0)
+        provider = SecretProvider(client=client, ttl_seconds=0.05)
+
+        await provider.start()
+        client.secrets["AI-API-KEY"] = "rotated-ai-key"
+        await asyncio.sleep(0.1)
+        await provider.stop()
+
+        assert provider.get("AI-API-KEY") == "rotated-ai-key"
+        assert client.closed is True
+
+    @pytest.mark.asyncio
+    @patch.dict(os.environ, {"BYPASS_KEY_VAULT": "true"}, clear=True)
+    async def test_start_in_bypass_mode(self):
+        """Test the provider is disabled in bypass mode."""
+        import conferenti_agent.keyvault as kv_module
+
+        kv_module._keyvault_config = None
+        provider = SecretProvider()
+
+        await provider.start()
+
+        assert provider.enabled is False
+        assert provider.is_loaded is False
+        kv_module._keyvault_config = None
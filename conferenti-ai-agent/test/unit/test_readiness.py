@@ -0,0 +1,58 @@
+"""
+Unit tests for readiness tracking.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from conferenti_agent.services.readiness import Readiness
+
+
+class TestReadiness:
+    """Test Readiness warm-up tracking."""
+
+    @pytest.mark.asyncio
+    async def test_not_ready_until_warm(self):
+        """Test readiness is only reported once all steps complete."""
+        warm = asyncio.Event()
+
+        async def create_pool():
+            await warm.wait()
+
+        readiness = Readiness({"database": create_pool, "secrets": AsyncMock()})
+        readiness.start()
+        await asyncio.sleep(0)
+
+        assert readiness.is_ready is False
+        assert readiness.to_dict()["checks"]["database"] == "pending"
+
+        warm.set()
+        await asyncio.sleep(0.01)
+
+        assert readiness.is_ready is True
+        assert readiness.to_dict() == {
+            "status": "ready",
+            "checks": {"database": "ready", "secrets": "ready"},
+        }
+        await readiness.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_step_is_retried(self):
+        """Test failed steps are retried until they succeed."""
+        step = AsyncMock(side_effect=[Exception("Cosmos DB unavailable"), None])
+        ok_step = AsyncMock()
+        readiness = Readiness({"database": step, "agent": ok_step}, retry_seconds=0.01)
+
+        readiness.start()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert readiness.is_ready is False
+        assert readiness.status["database"].startswith("failed")
+
+        await asyncio.sleep(0.05)
+
+        assert readiness.is_ready is True
+        assert step.await_count == 2
+        ok_step.assert_awaited_once()
+        await readiness.stop()
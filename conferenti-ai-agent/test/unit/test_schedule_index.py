@@ -0,0 +1,138 @@
+"""
+Unit tests for the schedule interval index and conflict detection.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+import pytest
+from conferenti_agent.services.schedule_index import (
+    ScheduleIndex,
+    find_conflicts,
+    parse_session_time,
+)
+
+
+def make_session(session_id, start, end, room="Room A"):
+    return {
+        "id": session_id,
+        "title": f"Session {session_id}",
+        "startTime": start,
+        "endTime": end,
+        "room": room,
+    }
+
+
+@pytest.fixture
+def sessions():
+    """Two conference days of sessions."""
+    return [
+        make_session("keynote", "2025-06-01T09:00:00", "2025-06-01T10:00:00"),
+        make_session("ai", "2025-06-01T09:30:00", "2025-06-01T10:30:00", "Room B"),
+        make_session("cloud", "2025-06-01T10:30:00", "2025-06-01T11:15:00"),
+        make_session("lunch", "2025-06-01T12:00:00", "2025-06-01T13:00:00"),
+        make_session("party", "2025-06-01T19:00:00", "2025-06-02T01:00:00"),
+        make_session("day2", "2025-06-02T09:00:00Z", "2025-06-02T10:00:00Z"),
+        make_session("unscheduled", None, None),
+    ]
+
+
+@pytest.fixture
+def schedule(sessions):
+    return ScheduleIndex(sessions)
+
+
+def ids(sessions):
+    return [s["id"] for s in sessions]
+
+
+class TestScheduleIndex:
+    """Test overlap, day and slot queries."""
+
+    def test_sessions_without_times_skipped(self, schedule):
+        """Test sessions without start/end times are not indexed."""
+        assert len(schedule) == 6
+        assert schedule.days == [date(2025, 6, 1), date(2025, 6, 2)]
+
+    def test_overlapping(self, schedule):
+        """Test sessions overlapping a half-open range."""
+        result = schedule.overlapping(
+            datetime(2025, 6, 1, 9, 45), datetime(2025, 6, 1, 10, 30)
+        )
+
+        assert ids(result) == ["keynote", "ai"]
+
+    def test_at(self, schedule):
+        """Test sessions running at a moment (end times are exclusive)."""
+        assert ids(schedule.at(datetime(2025, 6, 1, 10, 0))) == ["ai"]
+
+    def test_by_day_includes_sessions_running_past_midnight(self, schedule):
+        """Test by day returns the sessions running on the day."""
+        assert ids(schedule.by_day(date(2025, 6, 2))) == ["party", "day2"]
+
+    def test_by_slot(self, schedule):
+        """Test by slot matches the time of day on a day or every day."""
+        assert ids(schedule.by_slot("morning", date(2025, 6, 1))) == [
+            "keynote",
+            "ai",
+            "cloud",
+        ]
+        assert ids(schedule.by_slot("Morning")) == ["keynote", "ai", "cloud", "day2"]
+        assert ids(schedule.by_slot("evening")) == ["party"]
+
+    def test_unknown_slot(self, schedule):
+        """Test unknown slots are rejected."""
+        with pytest.raises(ValueError, match="Unknown time slot"):
+            schedule.by_slot("night")
+
+    def test_overlapping_matches_linear_scan(self):
+        """Test the interval tree against a linear scan of random sessions."""
+        rng = random.Random(7)
+        base = datetime(2025, 6, 1, 8)
+        sessions = []
+        for i in range(300):
+            start = base + timedelta(minutes=rng.randrange(0, 3 * 24 * 60, 15))
+            end = start + timedelta(minutes=rng.choice([0, 15, 30, 45, 90, 480]))
+            sessions.append(make_session(str(i), start.isoformat(), end.isoformat()))
+        schedule = ScheduleIndex(sessions)
+
+        for _ in range(200):
+            t1 = base + timedelta(minutes=rng.randrange(-60, 3 * 24 * 60, 5))
+            t2 = t1 + timedelta(minutes=rng.randrange(1, 600))
+            expected = {
+                s["id"]
+                for s in sessions
+                if parse_session_time(s["startTime"]) < t2
+                and parse_session_time(s["endTime"]) > t1
+            }
+            assert set(ids(schedule.overlapping(t1, t2))) == expected
+
+
+class TestFindConflicts:
+    """Test deterministic conflict detection."""
+
+    def test_overlapping_pairs(self, sessions):
+        """Test only overlapping sessions conflict, in start time order."""
+        conflicts = find_conflicts(sessions)
+
+        assert [(c.first["id"], c.second["id"]) for c in conflicts] == [
+            ("keynote", "ai")
+        ]
+        assert conflicts[0].to_dict() == {
+            "sessionIds": ["keynote", "ai"],
+            "overlapStart": "2025-06-01T09:30:00",
+            "overlapEnd": "2025-06-01T10:00:00",
+            "sameRoom": False,
+        }
+        assert "'Session keynote' overlaps 'Session ai'" in conflicts[0].describe()
+
+    def test_same_room(self):
+        """Test double-booked rooms are flagged."""
+        conflicts = find_conflicts(
+            [
+                make_session("a", "2025-06-01T09:00:00", "2025-06-01T10:00:00"),
+                make_session("b", "2025-06-01T09:00:00", "2025-06-01T09:30:00"),
+            ]
+        )
+
+        assert len(conflicts) == 1
+        assert conflicts[0].same_room
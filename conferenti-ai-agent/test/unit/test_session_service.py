@@ -0,0 +1,103 @@
+"""
+Unit tests for SessionService.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from conferenti_agent.services.session_service import SessionService
+from conferenti_agent.services.speaker_session_index import SpeakerSessionIndex
+
+
+def make_session(session_id, start, end, speaker_ids):
+    return {
+        "id": session_id,
+        "title": f"Session {session_id}",
+        "description": f"About {session_id}",
+        "startTime": start,
+        "endTime": end,
+        "room": "Room A",
+        "tags": ["ai"],
+        "speakerIds": speaker_ids,
+        "slug": f"session-{session_id}",
+    }
+
+
+@pytest.fixture
+def sessions():
+    return [
+        make_session("a", "2025-06-01T09:00", "2025-06-01T10:00", ["sp-1"]),
+        make_session("b", "2025-06-01T09:30", "2025-06-01T10:30", ["sp-1"]),
+    ]
+
+
+@pytest.fixture
+def session_service(sessions):
+    """Create SessionService with mocked settings, agent client and database."""
+    db = AsyncMock()
+    db.get_all_sessions.return_value = [
+        {**session, "embedding": [0.1, 0.2]} for session in sessions
+    ]
+    db.get_all_speakers.return_value = [
+        {"id": "sp-1", "name": "Ada", "sessionIds": ["a", "b"]}
+    ]
+    db.get_sessions_by_topic.return_value = [dict(sessions[0])]
+    settings = MagicMock()
+    settings.project_endpoint = "http://localhost:11434"
+    settings.model_deployment_name = "llama3.2"
+    settings.api_key = None
+
+    with patch(
+        "conferenti_agent.services.session_service.get_settings",
+        return_value=settings,
+    ), patch(
+        "conferenti_agent.services.session_service.create_agent_client"
+    ) as create_agent_client, patch(
+        "conferenti_agent.services.session_service.get_db_client", return_value=db
+    ), patch(
+        "conferenti_agent.services.session_service.get_speaker_session_index",
+        return_value=SpeakerSessionIndex(db=db),
+    ):
+        agent = MagicMock()
+        agent.run.return_value = {"status": "completed", "content": "Suggestion"}
+        create_agent_client.return_value.create_agent.return_value = agent
+        yield SessionService()
+
+
+class TestSessionServicePayloads:
+    """Test the sessions returned to API clients are whole documents."""
+
+    @pytest.mark.asyncio
+    async def test_suggest_by_topic(self, session_service, sessions):
+        """Test topic suggestions query and return whole documents."""
+        result = await session_service.suggest_by_topic("ai")
+
+        session_service.db.get_sessions_by_topic.assert_called_once_with("ai")
+        assert result["sessions"] == [{**sessions[0], "speakerNames": ["Ada"]}]
+
+    @pytest.mark.asyncio
+    async def test_suggest_by_time(self, session_service, sessions):
+        """Test schedule suggestions return whole documents without embeddings."""
+        result = await session_service.suggest_by_time(
+            date="2025-06-01", time_slot="morning"
+        )
+
+        assert result["sessions"] == [
+            {**session, "speakerNames": ["Ada"]} for session in sessions
+        ]
+        assert len(result["conflicts"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_suggest_by_speaker(self, session_service, sessions):
+        """Test speaker suggestions return whole documents."""
+        result = await session_service.suggest_by_speaker("sp-1")
+
+        assert [s["speakerIds"] for s in result["sessions"]] == [["sp-1"], ["sp-1"]]
+        assert "embedding" not in result["sessions"][0]
+
+    @pytest.mark.asyncio
+    async def test_returned_sessions_are_copies(self, session_service):
+        """Test changes to the returned sessions don't reach the index."""
+        result = await session_service.suggest_by_time(date="2025-06-01")
+        result["sessions"][0]["title"] = "Changed"
+
+        assert session_service.index.sessions["a"]["title"] == "Session a"
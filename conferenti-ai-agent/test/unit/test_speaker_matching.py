@@ -0,0 +1,232 @@
+"""
+Unit tests for speaker to session matching.
+"""
+
+import itertools
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from conferenti_agent.services.speaker_matching import (
+    AffinityMatrix,
+    _hungarian,
+    assign_speakers,
+    build_affinity_matrix,
+    hashed_term_vectors,
+    one_hot,
+)
+from conferenti_agent.services.speaker_service import SpeakerService
+from conferenti_agent.services.speaker_session_index import SpeakerSessionIndex
+
+SPEAKERS = [
+    {"id": "ai", "name": "Ada", "expertise": ["AI", "Python"], "bio": "LLM agents"},
+    {"id": "cloud", "name": "Bob", "expertise": ["Azure"], "bio": "Kubernetes ops"},
+    {"id": "web", "name": "Cy", "expertise": ["React"], "bio": "Frontend apps"},
+]
+SESSIONS = [
+    {"id": "s-web", "title": "Modern frontend", "tags": ["react"]},
+    {"id": "s-ai", "title": "Building LLM agents", "tags": ["ai", "python"]},
+    {"id": "s-k8s", "title": "Kubernetes on Azure", "track": "Azure", "tags": []},
+]
+
+
+def matrix_of(scores):
+    scores = np.asarray(scores, dtype=np.float32)
+    return AffinityMatrix(
+        speaker_ids=[f"p{i}" for i in range(scores.shape[0])],
+        session_ids=[f"s{j}" for j in range(scores.shape[1])],
+        scores=scores,
+    )
+
+
+class TestAffinityMatrix:
+    """Test building and querying the affinity matrix."""
+
+    def test_one_hot(self):
+        """Test tags are marked in the columns of the vocabulary."""
+        matrix = one_hot([["a", "c"], [], ["b", "unknown"]], {"a": 0, "b": 1, "c": 2})
+
+        assert matrix.tolist() == [[1, 0, 1], [0, 0, 0], [0, 1, 0]]
+
+    def test_hashed_term_vectors_ignore_case_and_stop_words(self):
+        """Test equal texts (up to case and stop words) get equal vectors."""
+        vectors = hashed_term_vectors(["The Python agents", "python AGENTS", ""])
+
+        assert np.array_equal(vectors[0], vectors[1])
+        assert not vectors[2].any()
+
+    def test_best_match_for_each_speaker(self):
+        """Test each speaker scores highest with their own topic."""
+        affinity = build_affinity_matrix(SPEAKERS, SESSIONS)
+
+        assert affinity.scores.shape == (3, 3)
+        assert affinity.top_k("ai", 1)[0][0] == "s-ai"
+        assert affinity.top_k("cloud", 1)[0][0] == "s-k8s"
+        assert affinity.top_k("web", 1)[0][0] == "s-web"
+        assert affinity.scores.min() >= 0 and affinity.scores.max() <= 1
+
+    def test_embeddings_used_when_present(self):
+        """Test precomputed embeddings replace the hashed term vectors."""
+        speakers = [{"id": "p", "embedding": [1.0, 0.0]}]
+        sessions = [
+            {"id": "a", "title": "unrelated", "embedding": [0.0, 1.0]},
+            {"id": "b", "title": "unrelated", "embedding": [1.0, 0.0]},
+        ]
+
+        affinity = build_affinity_matrix(speakers, sessions)
+
+        assert affinity.top_k("p", 2) == [("b", pytest.approx(0.4)), ("a", 0.0)]
+
+    def test_top_k_ordered_and_bounded(self):
+        """Test top_k returns the best k sessions, best first."""
+        affinity = matrix_of([[0.1, 0.9, 0.5, 0.7]])
+
+        assert [s for s, _ in affinity.top_k("p0", 3)] == ["s1", "s3", "s2"]
+        assert len(affinity.top_k("p0", 10)) == 4
+        assert affinity.top_k("missing") == []
+
+
+class TestAssignment:
+    """Test assigning speakers to sessions."""
+
+    def test_hungarian_matches_brute_force(self):
+        """Test the Hungarian algorithm finds the minimum cost assignment."""
+        rng = np.random.default_rng(7)
+        for rows, columns in [(1, 1), (3, 3), (3, 5), (5, 6)]:
+            cost = rng.random((rows, columns))
+            columns_of_rows = _hungarian(cost)
+            best = min(
+                sum(cost[r, c] for r, c in enumerate(choice))
+                for choice in itertools.permutations(range(columns), rows)
+            )
+
+            assert len(set(columns_of_rows.tolist())) == rows
+            assert cost[np.arange(rows), columns_of_rows].sum() == pytest.approx(best)
+
+    def test_maximises_total_not_greedy(self):
+        """Test the assignment beats greedily taking the best pair first."""
+        # Greedy takes p0-s0 (0.9) and is left with p1-s1 (0.1)
+        pairs = assign_speakers(matrix_of([[0.9, 0.8], [0.7, 0.1]]))
+
+        assert [(p, s) for p, s, _ in pairs] == [("p1", "s0"), ("p0", "s1")]
+
+    def test_capacities(self):
+        """Test sessions can have several speakers and speakers several sessions."""
+        scores = [[0.9, 0.8, 0.1], [0.8, 0.2, 0.7]]
+
+        per_session = assign_speakers(matrix_of(scores), speakers_per_session=2)
+        per_speaker = assign_speakers(matrix_of(scores), sessions_per_speaker=2)
+
+        assert sorted((p, s) for p, s, _ in per_session) == [
+            ("p0", "s0"),
+            ("p1", "s0"),
+        ]
+        assert sorted((p, s) for p, s, _ in per_speaker) == [
+            ("p0", "s0"),
+            ("p0", "s1"),
+            ("p1", "s2"),
+        ]
+
+    def test_min_score_leaves_sessions_unassigned(self):
+        """Test pairs at or below min_score are never assigned."""
+        pairs = assign_speakers(matrix_of([[0.9, 0.2]]), min_score=0.5)
+
+        assert [(p, s) for p, s, _ in pairs] == [("p0", "s0")]
+
+    def test_both_capacities_above_one_rejected(self):
+        """Test only one side can take several assignments."""
+        with pytest.raises(ValueError):
+            assign_speakers(
+                matrix_of([[1.0]]), speakers_per_session=2, sessions_per_speaker=2
+            )
+
+
+@pytest.fixture
+def speaker_service():
+    """Create SpeakerService over an index of the test speakers and sessions."""
+    db = AsyncMock()
+    db.get_all_speakers.return_value = SPEAKERS
+    db.get_all_sessions.return_value = SESSIONS
+    settings = MagicMock()
+    settings.project_endpoint = "http://localhost:11434"
+    settings.model_deployment_name = "llama3.2"
+    settings.api_key = None
+    with patch(
+        "conferenti_agent.services.speaker_service.get_settings",
+        return_value=settings,
+    ), patch(
+        "conferenti_agent.services.speaker_service.create_agent_client",
+        return_value=MagicMock(),
+    ), patch(
+        "conferenti_agent.services.speaker_service.get_db_client"
+    ):
+        service = SpeakerService()
+    service.index = SpeakerSessionIndex(db=db)
+    return service
+
+
+class TestSpeakerServiceMatching:
+    """Test the SpeakerService matching methods."""
+
+    @pytest.mark.asyncio
+    async def test_get_session_matches(self, speaker_service):
+        """Test a speaker's best sessions come with their score."""
+        matches = await speaker_service.get_session_matches("ai", k=2)
+
+        assert matches[0]["id"] == "s-ai"
+        assert matches[0]["score"] >= matches[1]["score"]
+
+    @pytest.mark.asyncio
+    async def test_get_session_matches_unknown_speaker(self, speaker_service):
+        """Test matching an unknown speaker raises ValueError."""
+        with pytest.raises(ValueError):
+            await speaker_service.get_session_matches("missing")
+
+    @pytest.mark.asyncio
+    async def test_affinity_matrix_rebuilt_on_change(self, speaker_service):
+        """Test the cached matrix is rebuilt when the index changes."""
+        await speaker_service.get_session_matches("ai")
+        cached = speaker_service._affinity
+        await speaker_service.get_session_matches("web")
+        assert speaker_service._affinity is cached
+
+        speaker_service.index.upsert_speaker({"id": "new", "expertise": ["react"]})
+        matches = await speaker_service.get_session_matches("new", k=1)
+
+        assert speaker_service._affinity is not cached
+        assert matches[0]["id"] == "s-web"
+
+    @pytest.mark.asyncio
+    async def test_get_session_matches_uses_embeddings(self, speaker_service):
+        """Test embeddings loaded into the index are used, but never returned."""
+        db = speaker_service.index.db
+        db.get_all_speakers.return_value = [
+            {**s, "embedding": [1.0, 0.0] if s["id"] == "web" else [0.0, 1.0]}
+            for s in SPEAKERS
+        ]
+        db.get_all_sessions.return_value = [
+            {**s, "embedding": [1.0, 0.0] if s["id"] == "s-k8s" else [0.0, 1.0]}
+            for s in SESSIONS
+        ]
+
+        matches = await speaker_service.get_session_matches("web", k=3)
+
+        # Only the embeddings point the frontend speaker at the Kubernetes session
+        assert [(m["id"], m["score"]) for m in matches[:2]] == [
+            ("s-web", pytest.approx(0.6)),
+            ("s-k8s", pytest.approx(0.4)),
+        ]
+        assert all("embedding" not in m for m in matches)
+        # Sessions are loaded whole, speakers are projected with their embedding
+        assert "fields" not in db.get_all_sessions.call_args.kwargs
+        assert "embedding" in db.get_all_speakers.call_args.kwargs["fields"]
+
+    @pytest.mark.asyncio
+    async def test_assign_speakers_to_sessions(self, speaker_service):
+        """Test every session gets its best matching speaker."""
+        assignments = await speaker_service.assign_speakers_to_sessions()
+
+        assert {a["sessionId"]: a["speakerId"] for a in assignments} == {
+            "s-web": "web",
+            "s-ai": "ai",
+            "s-k8s": "cloud",
+        }
@@ -2,12 +2,17 @@
 Unit tests for SpeakerService.
 """
 
+import asyncio
+import threading
+import time
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from conferenti_agent.services.speaker_service import (
     SpeakerService,
     get_speaker_service,
 )
+from conferenti_agent.services.bio_generation import RateBudget
+from conferenti_agent.services.speaker_session_index import SpeakerSessionIndex
 
 
 @pytest.fixture
@@ -99,6 +104,22 @@ class TestSpeakerService:
         assert result == expected_results
         mock_db_client.search_speakers.assert_called_once_with("John")
 
+    @pytest.mark.asyncio
+    async def test_get_sessions_for_speaker(self, speaker_service, mock_db_client):
+        """Test getting a speaker's sessions from the speaker/session index."""
+        mock_db_client.get_all_sessions.return_value = [
+            {"id": "s-1", "title": "Intro to Python", "speakerIds": ["speaker-123"]}
+        ]
+        mock_db_client.get_all_speakers.return_value = [
+            {"id": "speaker-123", "name": "Jane Smith"}
+        ]
+        speaker_service.index = SpeakerSessionIndex(db=mock_db_client)
+
+        result = await speaker_service.get_sessions_for_speaker("speaker-123")
+
+        assert [s["title"] for s in result] == ["Intro to Python"]
+        assert result[0]["speakerNames"] == ["Jane Smith"]
+
     @pytest.mark.asyncio
     async def test_suggest_speakers_general(self, speaker_service, mock_agent_client):
         """Test general speaker suggestions."""
@@ -164,6 +185,123 @@ class TestSpeakerService:
             await speaker_service.generate_speaker_bio("missing-speaker")
 
 
+class TestGenerateSpeakerBios:
+    """Test generating bios for several speakers."""
+
+    @pytest.fixture
+    def speakers(self, speaker_service, mock_db_client, mock_agent_client):
+        """Speakers fetched in bulk, with an agent echoing the prompt's speaker."""
+        speakers = [
+            {"id": f"speaker-{i}", "name": f"Speaker {i}", "_etag": f'"{i}"'}
+            for i in range(3)
+        ]
+        mock_db_client.get_speakers_by_ids.return_value = speakers
+        speaker_service.index = SpeakerSessionIndex(db=mock_db_client)
+        mock_db_client.get_all_sessions.return_value = []
+        mock_db_client.get_all_speakers.return_value = speakers
+
+        def run(prompt):
+            name = next(s["name"] for s in speakers if s["name"] in prompt)
+            return {"status": "completed", "content": f"Bio of {name}"}
+
+        mock_agent_client.create_agent.return_value.run.side_effect = run
+        return speakers
+
+    async def collect(self, speaker_service, speaker_ids):
+        return [r async for r in speaker_service.generate_speaker_bios(speaker_ids)]
+
+    @pytest.mark.asyncio
+    async def test_generates_each_speaker_once(
+        self, speaker_service, mock_db_client, speakers
+    ):
+        """Test speakers are fetched in one query and each bio is generated."""
+        results = await self.collect(
+            speaker_service, ["speaker-0", "speaker-1", "speaker-0", "missing"]
+        )
+
+        mock_db_client.get_speakers_by_ids.assert_called_once()
+        mock_db_client.get_speaker_by_id.assert_not_called()
+        by_id = {r["speakerId"]: r for r in results}
+        assert len(results) == 3
+        assert by_id["speaker-0"] == {
+            "speakerId": "speaker-0",
+            "status": "completed",
+            "bio": "Bio of Speaker 0",
+        }
+        assert by_id["missing"]["status"] == "not_found"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_speakers_not_regenerated(
+        self, speaker_service, mock_agent_client, speakers
+    ):
+        """Test bios are cached by ETag and regenerated when the speaker changes."""
+        agent = mock_agent_client.create_agent.return_value
+        await self.collect(speaker_service, ["speaker-0", "speaker-1"])
+        speakers[1]["_etag"] = '"changed"'
+
+        results = await self.collect(speaker_service, ["speaker-0", "speaker-1"])
+
+        statuses = {r["speakerId"]: r["status"] for r in results}
+        assert statuses == {"speaker-0": "cached", "speaker-1": "completed"}
+        assert agent.run.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_reported_per_speaker(
+        self, speaker_service, mock_agent_client, speakers
+    ):
+        """Test a failed bio is reported without failing the batch or being cached."""
+        agent = mock_agent_client.create_agent.return_value
+        agent.run.side_effect = lambda prompt: (
+            {"status": "failed", "error": "Backend unavailable"}
+            if "Speaker 1" in prompt
+            else {"status": "completed", "content": "Bio"}
+        )
+
+        results = await self.collect(speaker_service, ["speaker-0", "speaker-1"])
+
+        by_id = {r["speakerId"]: r for r in results}
+        assert by_id["speaker-0"]["status"] == "completed"
+        assert by_id["speaker-1"] == {
+            "speakerId": "speaker-1",
+            "status": "failed",
+            "error": "Backend unavailable",
+        }
+        assert len(speaker_service.bio_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self, speaker_service, mock_agent_client):
+        """Test no more than the concurrency limit of agent calls run at once."""
+        in_flight, peak = 0, 0
+        lock = threading.Lock()
+
+        def run(prompt):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return {"status": "completed", "content": "Bio"}
+
+        mock_agent_client.create_agent.return_value.run.side_effect = run
+        speaker_service._bio_slots = asyncio.Semaphore(2)
+        speaker_service.rate_budget = RateBudget(requests_per_minute=0)
+        speaker_service.db.get_speakers_by_ids.return_value = [
+            {"id": f"speaker-{i}", "name": f"Speaker {i}"} for i in range(6)
+        ]
+        speaker_service.index = SpeakerSessionIndex(db=speaker_service.db)
+        speaker_service.db.get_all_sessions.return_value = []
+        speaker_service.db.get_all_speakers.return_value = []
+
+        results = await self.collect(
+            speaker_service, [f"speaker-{i}" for i in range(6)]
+        )
+
+        assert [r["status"] for r in results] == ["completed"] * 6
+        assert peak == 2
+
+
 class TestSpeakerServiceSingleton:
     """Test speaker service singleton pattern."""
 
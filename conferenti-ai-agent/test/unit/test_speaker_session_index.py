@@ -0,0 +1,160 @@
+"""
+Unit tests for the speaker/session index.
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+from conferenti_agent.services.speaker_session_index import SpeakerSessionIndex
+
+
+def make_session(session_id, speaker_ids, start="2025-06-01T09:00:00"):
+    return {
+        "id": session_id,
+        "title": f"Session {session_id}",
+        "startTime": start,
+        "speakerIds": speaker_ids,
+        "slug": "full-document",
+    }
+
+
+@pytest.fixture
+def index():
+    """Create an index with two speakers sharing a session."""
+    index = SpeakerSessionIndex()
+    index.upsert_speaker({"id": "sp-1", "name": "Ada", "sessionIds": ["s-1"]})
+    index.upsert_speaker({"id": "sp-2", "name": "Grace"})
+    index.upsert_session(make_session("s-1", ["sp-2", "sp-1"]))
+    index.upsert_session(make_session("s-2", ["sp-1"], start="2025-06-01T08:00:00"))
+    return index
+
+
+class TestSpeakerSessionIndexLookups:
+    """Test lookups in both directions."""
+
+    def test_sessions_for_speaker(self, index):
+        """Test a speaker's sessions are ordered by start time."""
+        sessions = index.sessions_for_speaker("sp-1")
+
+        assert [s["id"] for s in sessions] == ["s-2", "s-1"]
+        assert sessions[0]["slug"] == "full-document"
+
+    def test_speakers_for_session(self, index):
+        """Test a session's speakers follow its speakerIds order."""
+        speakers = index.speakers_for_session("s-1")
+
+        assert [s["name"] for s in speakers] == ["Grace", "Ada"]
+
+    def test_speaker_names_denormalised(self, index):
+        """Test sessions carry their speaker names."""
+        assert index.sessions_for_speaker("sp-2")[0]["speakerNames"] == [
+            "Grace",
+            "Ada",
+        ]
+
+    def test_unknown_ids(self, index):
+        """Test unknown ids have no links."""
+        assert index.sessions_for_speaker("missing") == []
+        assert index.speakers_for_session("missing") == []
+
+    def test_with_speaker_names(self, index):
+        """Test speaker names are added to sessions queried from Cosmos DB."""
+        sessions = index.with_speaker_names([{"id": "s-2", "title": "Queried"}])
+
+        assert sessions == [{"id": "s-2", "title": "Queried", "speakerNames": ["Ada"]}]
+
+
+class TestSpeakerSessionIndexUpdates:
+    """Test incremental maintenance of the index."""
+
+    def test_link_kept_while_either_side_declares_it(self, index):
+        """Test a link declared by both sides needs both to drop it."""
+        index.upsert_session(make_session("s-1", ["sp-2"]))
+        assert index.speaker_ids_for_session("s-1") == {"sp-1", "sp-2"}
+
+        index.upsert_speaker({"id": "sp-1", "name": "Ada", "sessionIds": []})
+        assert index.speaker_ids_for_session("s-1") == {"sp-2"}
+        assert index.session_ids_for_speaker("sp-1") == {"s-2"}
+        assert index.speaker_names("s-1") == ["Grace"]
+
+    def test_rename_updates_session_names(self, index):
+        """Test renaming a speaker updates the names on their sessions."""
+        index.upsert_speaker({"id": "sp-1", "name": "Ada L.", "sessionIds": ["s-1"]})
+
+        assert index.speaker_names("s-1") == ["Grace", "Ada L."]
+        assert index.speaker_names("s-2") == ["Ada L."]
+
+    def test_remove_speaker(self, index):
+        """Test removing a speaker drops their links and names."""
+        index.remove_speaker("sp-2")
+        index.upsert_session(make_session("s-1", ["sp-1"]))
+
+        assert index.sessions_for_speaker("sp-2") == []
+        assert index.speaker_names("s-1") == ["Ada"]
+
+    def test_schedule_rebuilt_after_session_changes(self, index):
+        """Test the schedule index follows session upserts."""
+        assert len(index.schedule) == 0
+
+        index.upsert_session(
+            {**make_session("s-3", ["sp-1"]), "endTime": "2025-06-01T10:00:00"}
+        )
+
+        assert [s["id"] for s in index.schedule.sessions] == ["s-3"]
+        assert index.schedule.sessions[0]["speakerNames"] == ["Ada"]
+
+    def test_remove_session(self, index):
+        """Test removing a session hides it from speaker lookups."""
+        index.remove_session("s-2")
+
+        assert [s["id"] for s in index.sessions_for_speaker("sp-1")] == ["s-1"]
+
+    def test_embeddings_kept_apart(self, index):
+        """Test embeddings are only added to the documents used for matching."""
+        index.upsert_speaker({"id": "sp-2", "name": "Grace", "embedding": [1.0]})
+        index.upsert_session({**make_session("s-2", ["sp-1"]), "embedding": [0.5]})
+
+        speakers, sessions = index.matching_documents()
+
+        assert {s["id"]: s.get("embedding") for s in speakers} == {
+            "sp-1": None,
+            "sp-2": [1.0],
+        }
+        assert {s["id"]: s.get("embedding") for s in sessions} == {
+            "s-1": None,
+            "s-2": [0.5],
+        }
+        assert "embedding" not in index.speakers_for_session("s-1")[0]
+        assert "embedding" not in index.sessions_for_speaker("sp-1")[0]
+
+        index.upsert_speaker({"id": "sp-2", "name": "Grace"})
+        index.remove_session("s-2")
+        assert index.speaker_embeddings == {}
+        assert index.session_embeddings == {}
+
+
+class TestSpeakerSessionIndexLoading:
+    """Test loading the index from Cosmos DB and applying changes."""
+
+    @pytest.mark.asyncio
+    async def test_load_and_refresh(self):
+        """Test the index is built from Cosmos DB and updated from the change feed."""
+        db = AsyncMock()
+        db.get_all_sessions.return_value = [make_session("s-1", ["sp-1"])]
+        db.get_all_speakers.return_value = [{"id": "sp-1", "name": "Ada"}]
+        db.get_speaker_changes.return_value = ([], "speaker-token")
+        db.get_session_changes.return_value = (
+            [make_session("s-2", ["sp-1"], start="2025-06-02T09:00:00")],
+            "session-token",
+        )
+        index = SpeakerSessionIndex(db=db)
+
+        await index.ensure_loaded()
+        assert [s["id"] for s in index.sessions_for_speaker("sp-1")] == ["s-1"]
+
+        await index.refresh()
+        assert [s["id"] for s in index.sessions_for_speaker("sp-1")] == ["s-1", "s-2"]
+        assert db.get_session_changes.call_args.args[0] is None
+
+        await index.refresh()
+        assert db.get_session_changes.call_args.args[0] == "session-token"
+        db.get_all_sessions.assert_called_once()
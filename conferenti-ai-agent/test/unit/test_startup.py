@@ -0,0 +1,69 @@
+"""
+Unit tests for the service cold-start import budget.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import pytest
+
+# Cumulative import time of the API module (python -X importtime), overridable for slow machines
+STARTUP_IMPORT_BUDGET_MS = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1000"))
+
+# Backend SDKs (and NumPy, for speaker matching) that must only be imported on first use
+DEFERRED_MODULES = [
+    "ollama",
+    "openai",
+    "azure.ai.agents",
+    "azure.keyvault.secrets",
+    "numpy",
+]
+
+API_MODULE = "conferenti_agent.services.api_client"
+
+
+def _import_times(module: str) -> dict:
+    """Import module in a fresh interpreter and return the cumulative import time (us) by module."""
+    env = dict(os.environ)
+    env.update({"BYPASS_KEY_VAULT": "true", "DISABLE_AUTH": "true"})
+    src_path = os.path.join(os.path.dirname(__file__), "..", "..", "src")
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [os.path.abspath(src_path), env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| *(\S+)", line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+@pytest.mark.slow
+class TestStartupImports:
+    """Test importing the API doesn't load backend SDKs and stays within budget."""
+
+    def test_backend_sdks_are_deferred(self):
+        """Test backend-specific SDKs aren't imported at startup."""
+        times = _import_times(API_MODULE)
+
+        assert API_MODULE in times
+        imported = [module for module in DEFERRED_MODULES if module in times]
+        assert imported == []
+
+    def test_import_time_within_budget(self):
+        """Test the API module imports within the cold-start budget."""
+        # Best of two runs so a cold filesystem cache doesn't fail the test
+        import_ms = min(_import_times(API_MODULE)[API_MODULE] for _ in range(2)) / 1000
+
+        assert import_ms < STARTUP_IMPORT_BUDGET_MS, (
+            f"Importing {API_MODULE} took {import_ms:.0f}ms "
+            f"(budget {STARTUP_IMPORT_BUDGET_MS}ms)"
+        )